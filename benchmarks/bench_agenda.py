@@ -0,0 +1,104 @@
+"""
+bench_agenda.py
+===============
+Latencia de TaskManager.agenda (pendientes vencidas, de hoy, de la semana
+y posteriores) para un usuario con muchas tareas, frente a cargar las
+pendientes y agruparlas en Python (lo que había que hacer antes), y con y
+sin el índice parcial ix_tareas_pendientes_entrega.
+
+Se mide sin caché de resultados (el costo de cada consulta) y con ella
+(lecturas repetidas sin cambios de por medio).
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_agenda [tareas]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+from src.model.modelo import EstadoTarea  # noqa: E402
+
+MATERIAS = 20
+
+
+def poblar(cantidad: int) -> int:
+    """
+    Crea un usuario con MATERIAS materias y `cantidad` tareas repartidas
+    en el último año y los próximos seis meses; casi todas las pasadas
+    están completadas.
+    """
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    ids = [tm.crear_materia(f"Materia {i}", "#3B82F6").idMateria
+           for i in range(MATERIAS)]
+    azar = random.Random(42)
+    hoy = date.today()
+    filas = []
+    for i in range(cantidad):
+        dias = azar.randrange(-365, 180)
+        completada = azar.random() < (0.97 if dias < 0 else 0.2)
+        filas.append((f"Tarea {i}", i % 3, (hoy + timedelta(days=dias)).isoformat(),
+                      1 if completada else 0, azar.choice(ids), 1))
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO tareas (titulo, prioridad, fechaEntrega, estado, "
+            "materia_id, version) VALUES (?, ?, ?, ?, ?, ?)", filas)
+        conn.exec_driver_sql("ANALYZE")
+    return usuario.idUsuario
+
+
+def medir(funcion, repeticiones: int = 50) -> float:
+    """Retorna los milisegundos promedio por llamada."""
+    funcion()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    usuario_id = poblar(cantidad)
+    tm = TaskManager(usar_cache=False)
+    tm.seleccionar_usuario(usuario_id)
+    hoy = date.today()
+
+    def _agrupar_en_python():
+        grupos = ([], [], [], [])
+        for t in tm.listar_tareas(estado=EstadoTarea.Pendiente,
+                                  hasta=hoy + timedelta(days=30)):
+            dias = (t.fechaEntrega - hoy).days
+            grupos[0 if dias < 0 else 1 if dias == 0 else 2 if dias < 7 else 3].append(t)
+        return grupos
+
+    agenda = tm.agenda()
+    print(f"{cantidad} tareas en {MATERIAS} materias "
+          f"({tm.contar_tareas(estado=EstadoTarea.Pendiente)} pendientes)")
+    print(f"  grupos (hasta 20 c/u)          : {[len(g) for g in agenda]}")
+    print(f"  pendientes agrupadas en Python : {medir(_agrupar_en_python, 5):8.3f} ms")
+    print(f"  agenda()                       : {medir(tm.agenda):8.3f} ms")
+    con_cache = TaskManager()
+    con_cache.seleccionar_usuario(usuario_id)
+    print(f"  agenda() con caché             : {medir(con_cache.agenda):8.3f} ms")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_tareas_pendientes_entrega")
+    print(f"  agenda() sin índice parcial    : {medir(tm.agenda, 5):8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+bench_archivo.py
+================
+Consultas habituales de un usuario con muchas tareas completadas de
+semestres pasados, antes y después de moverlas al archivo con
+TaskManager.archivar, y costo de archivar y de consultar el historial.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_archivo [tareas]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+from src.model.modelo import EstadoTarea  # noqa: E402
+
+MATERIAS = 20
+LOTE = 100_000
+# Una de cada PENDIENTE_CADA tareas sigue pendiente y en el futuro
+PENDIENTE_CADA = 7
+
+
+def poblar(cantidad: int) -> int:
+    """
+    Crea un usuario con MATERIAS materias y `cantidad` tareas: la mayoría
+    completadas en los últimos cuatro años, el resto pendientes.
+    """
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    ids = [tm.crear_materia(f"Materia {i}", "#3B82F6").idMateria
+           for i in range(MATERIAS)]
+    hoy = date.today()
+
+    def _fila(i):
+        if i % PENDIENTE_CADA == 0:
+            return (f"Tarea {i}", i % 3, (hoy + timedelta(days=i % 120)).isoformat(), 0,
+                    ids[i % MATERIAS])
+        return (f"Tarea {i}", i % 3, (hoy - timedelta(days=1 + i % 1460)).isoformat(), 1,
+                ids[i % MATERIAS])
+
+    for desde in range(0, cantidad, LOTE):
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO tareas (titulo, prioridad, fechaEntrega, estado, materia_id, "
+                "version) VALUES (?, ?, ?, ?, ?, 1)",
+                [_fila(i) for i in range(desde, min(desde + LOTE, cantidad))])
+    return usuario.idUsuario
+
+
+def medir(funcion, repeticiones: int) -> float:
+    """Retorna los milisegundos promedio por llamada."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def consultas(tm: TaskManager) -> dict:
+    """Tiempos de las consultas habituales (sin caché)."""
+    materia = tm.listar_materias()[0].idMateria
+    return {
+        "listar_tareas(materia)": medir(lambda: tm.listar_tareas(materia_id=materia), 3),
+        "listar_tareas(pendientes)": medir(
+            lambda: tm.listar_tareas(estado=EstadoTarea.Pendiente), 3),
+        "contar_tareas()": medir(tm.contar_tareas, 3),
+        "contar_tareas(pendientes)": medir(
+            lambda: tm.contar_tareas(estado=EstadoTarea.Pendiente), 3),
+        "agenda()": medir(tm.agenda, 20),
+    }
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tm = TaskManager(usar_cache=False)
+    tm.seleccionar_usuario(poblar(cantidad))
+    ruta = os.path.join(tempfile.mkdtemp(prefix="taskmaster_bench_"), "{periodo}.sqlite")
+    print(f"{cantidad} tareas, {cantidad // PENDIENTE_CADA} pendientes")
+
+    antes = consultas(tm)
+    resultado = tm.archivar(date.today(), ruta)
+    print(f"  archivar                     : {resultado.segundos * 1000:9.0f} ms "
+          f"({resultado.tareas} tareas en {len(resultado.archivos)} archivos)")
+    despues = consultas(tm)
+    print(f"  {'consulta':<29}  {'antes':>9}  {'después':>9}")
+    for nombre, ms in antes.items():
+        print(f"  {nombre:<29}: {ms:9.1f}  {despues[nombre]:9.1f} ms")
+    desde = date.today() - timedelta(days=30)
+    print(f"  historial (último mes)       : "
+          f"{medir(lambda: tm.historial(resultado.archivos, desde=desde), 3):9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+bench_calendario.py
+===================
+Costo de mantener al día el calendario iCalendar de un usuario con muchas
+tareas pendientes, refrescado a menudo (como una tarea programada cada
+minuto): regeneración completa con exportar_calendario frente a
+actualizar_calendario sin cambios y después de editar una tarea.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_calendario [tareas]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+
+MATERIAS = 20
+
+
+def poblar(cantidad: int) -> int:
+    """Crea un usuario con MATERIAS materias y `cantidad` tareas pendientes."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    ids = [tm.crear_materia(f"Materia {i}", "#3B82F6").idMateria
+           for i in range(MATERIAS)]
+    hoy = date.today()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO tareas (titulo, prioridad, fechaEntrega, estado, materia_id, "
+            "version) VALUES (?, ?, ?, 0, ?, 1)",
+            [(f"Tarea {i}", i % 3, (hoy + timedelta(days=i % 365)).isoformat(),
+              ids[i % MATERIAS]) for i in range(cantidad)])
+    return usuario.idUsuario
+
+
+def medir(funcion, repeticiones: int) -> float:
+    """Retorna los milisegundos promedio por llamada."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    tm = TaskManager(usar_cache=False)
+    tm.seleccionar_usuario(poblar(cantidad))
+    ruta = os.path.join(tempfile.mkdtemp(prefix="taskmaster_bench_"), "entregas.ics")
+    print(f"{cantidad} tareas pendientes")
+
+    print(f"  regenerar todo               : "
+          f"{medir(lambda: tm.exportar_calendario(ruta), 3):9.1f} ms "
+          f"({os.path.getsize(ruta) / 2**20:.1f} MiB)")
+    print(f"  actualizar sin cambios       : "
+          f"{medir(lambda: tm.actualizar_calendario(ruta), 1000):9.3f} ms")
+
+    tarea = tm.listar_tareas()[0]
+    titulos = iter(f"Editada {i}" for i in range(1000))
+
+    def _editar_y_actualizar():
+        tm.editar_tarea(tarea.idTarea, nuevo_titulo=next(titulos))
+        resultado = tm.actualizar_calendario(ruta)
+        assert resultado.escritas == 1 and not resultado.completo
+
+    editar = medir(lambda: tm.editar_tarea(tarea.idTarea, nuevo_titulo=next(titulos)), 20)
+    print(f"  actualizar tras 1 edición    : "
+          f"{medir(_editar_y_actualizar, 20) - editar:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+bench_cola_escritura.py
+=======================
+Benchmark de marcado/desmarcado concurrente de tareas: commit por
+operación frente a la cola de escritura con commit agrupado.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_cola_escritura [hilos] [cambios_por_hilo]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from src.logic.cola_escritura import ColaEscritura  # noqa: E402
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+from src.model.modelo import Prioridad  # noqa: E402
+
+
+def preparar(hilos: int) -> tuple:
+    """Crea un usuario, una materia y una tarea por hilo."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    u = tm.crear_usuario("Usuario Benchmark", "bench@mail.com")
+    tm.seleccionar_usuario(u.idUsuario)
+    m = tm.crear_materia("Benchmark", "#3B82F6")
+    tareas = [tm.crear_tarea(f"Tarea {i:04d}", "", Prioridad.Media,
+                             date.today(), m.idMateria).idTarea
+              for i in range(hilos)]
+    return u.idUsuario, tareas
+
+
+def medir(hilos: int, cambios: int, cola=None) -> tuple:
+    """Ejecuta los cambios concurrentes y retorna (segundos, errores)."""
+    usuario_id, tareas = preparar(hilos)
+    errores = []
+    barrera = threading.Barrier(hilos + 1)
+
+    def trabajador(tarea_id):
+        tm = TaskManager(cola_escritura=cola)
+        tm.seleccionar_usuario(usuario_id)
+        barrera.wait()
+        for i in range(cambios):
+            try:
+                if i % 2 == 0:
+                    tm.marcar_tarea(tarea_id)
+                else:
+                    tm.desmarcar_tarea(tarea_id)
+            except Exception as ex:  # se reportan, no se ocultan
+                errores.append(ex)
+
+    ts = [threading.Thread(target=trabajador, args=(t,)) for t in tareas]
+    for t in ts:
+        t.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    for t in ts:
+        t.join()
+    return time.perf_counter() - inicio, errores
+
+
+def resumen_errores(errores: list) -> str:
+    """Agrupa los errores por tipo y mensaje abreviado."""
+    conteo = Counter(f"{type(e).__name__}: {str(e).splitlines()[0][:50]}"
+                     for e in errores)
+    return "; ".join(f"{n}x {msg}" for msg, n in conteo.most_common(3))
+
+
+def main():
+    hilos = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    cambios = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    total = hilos * cambios
+
+    seg, err = medir(hilos, cambios)
+    ok = total - len(err)
+    print(f"commit por operación : {ok / seg:10.1f} cambios exitosos/s "
+          f"({len(err)} errores) {resumen_errores(err)}")
+
+    with ColaEscritura(ventana_ms=2.0) as cola:
+        seg_c, err_c = medir(hilos, cambios, cola)
+        ok_c = total - len(err_c)
+        print(f"cola + group commit  : {ok_c / seg_c:10.1f} cambios exitosos/s "
+              f"({len(err_c)} errores, {cola.lotes} commits "
+              f"para {cola.operaciones} operaciones)")
+    print(f"aceleración          : {(ok_c / seg_c) / max(ok / seg, 1e-9):10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
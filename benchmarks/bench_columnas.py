@@ -0,0 +1,111 @@
+"""
+bench_columnas.py
+=================
+Costo de leer una página de tareas para un listado según lo que se
+carga: la entidad Tarea completa (comportamiento anterior, con la
+descripción), la entidad con `descripcion` diferida, y solo las columnas
+de TareaVista (lo que hace TaskManager.listar_tareas).
+
+Por cada variante se mide el tiempo, los bytes de valores leídos de la
+base de datos, los bloques de memoria que quedan asignados mientras se
+conserva el resultado (aproximación a los objetos Python creados) y el
+pico de memoria.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_columnas [tareas]
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from sqlalchemy.orm import undefer  # noqa: E402
+from src.logic.proyeccion import TareaVista, columnas_vista  # noqa: E402
+from src.logic.task_manager import TaskManager, Session  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+from src.model.modelo import Materia, Tarea  # noqa: E402
+
+
+def poblar(cantidad: int) -> int:
+    """Crea un usuario con una materia y `cantidad` tareas con descripción."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    materia = tm.crear_materia("Matemáticas", "#3B82F6")
+    hoy = date.today()
+    filas = [(f"Tarea {i}", ("Descripción larga " * 28)[:500], 1,
+              (hoy + timedelta(days=i % 90)).isoformat(), 0,
+              materia.idMateria, 1) for i in range(cantidad)]
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO tareas (titulo, descripcion, prioridad, fechaEntrega, "
+            "estado, materia_id, version) VALUES (?, ?, ?, ?, ?, ?, ?)", filas)
+    return usuario.idUsuario
+
+
+def _valores(fila) -> list:
+    """Valores de columna de una fila o de una entidad ORM."""
+    if isinstance(fila, tuple):
+        return list(fila)
+    return [v for k, v in vars(fila).items() if k != "_sa_instance_state"]
+
+
+def medir(nombre: str, consultar):
+    """Ejecuta `consultar` y reporta tiempo, bytes, bloques y pico de memoria."""
+    consultar()     # calentamiento (caché de sentencias)
+    inicio = time.perf_counter()
+    consultar()
+    ms = (time.perf_counter() - inicio) * 1000
+
+    gc.collect()
+    bloques = sys.getallocatedblocks()
+    tracemalloc.start()
+    resultado = consultar()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    retenidos = sys.getallocatedblocks() - bloques
+    leidos = sum(sys.getsizeof(v) for fila in resultado for v in _valores(fila))
+    print(f"{nombre:<30}: {ms:7.1f} ms  {leidos / 1024:6.0f} KiB leídos  "
+          f"{retenidos:7d} bloques  {pico / 1024:6.0f} KiB pico")
+    del resultado
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    usuario_id = poblar(cantidad)
+
+    def _consulta(*entidades, opciones=()):
+        def _ejecutar():
+            session = Session()
+            try:
+                return session.query(*entidades).options(*opciones).join(Materia) \
+                    .filter(Materia.usuario_id == usuario_id) \
+                    .order_by(Tarea.fechaEntrega, Tarea.idTarea).limit(cantidad).all()
+            finally:
+                session.close()
+        return _ejecutar
+
+    def _vistas():
+        return [TareaVista(*fila) for fila in _consulta(*columnas_vista())()]
+
+    print(f"página de {cantidad} tareas (descripción de 500 caracteres)")
+    medir("entidad completa (antes)",
+          _consulta(Tarea, opciones=[undefer(Tarea.descripcion)]))
+    medir("entidad, descripción diferida", _consulta(Tarea))
+    medir("columnas de TareaVista", _vistas)
+
+
+if __name__ == "__main__":
+    main()
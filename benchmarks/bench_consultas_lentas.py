@@ -0,0 +1,80 @@
+"""
+bench_consultas_lentas.py
+=========================
+Costo del registro de consultas lentas (src.logic.consultas_lentas):
+microsegundos por llamada de una lectura y de una escritura sin el
+registro, con el registro activo y un umbral que nada alcanza (solo se
+mide) y con umbral 0 (se anota todo, con plan la primera vez).
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_consultas_lentas [llamadas]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+_DIRECTORIO = tempfile.mkdtemp(prefix="taskmaster_bench_")
+os.environ["TASKMASTER_DB"] = os.path.join(_DIRECTORIO, "bench.sqlite")
+
+from src.logic.consultas_lentas import RegistroConsultasLentas, resumir  # noqa: E402
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+from src.model.modelo import Prioridad  # noqa: E402
+
+MANANA = date.today() + timedelta(days=1)
+RUTA = os.path.join(_DIRECTORIO, "consultas_lentas.log")
+
+
+def medir(funcion, llamadas: int) -> float:
+    """Retorna los microsegundos por llamada (mejor de 3 rondas)."""
+    mejor = float("inf")
+    for _ in range(3):
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / llamadas * 1e6
+
+
+def main():
+    llamadas = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager(usar_cache=False)
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    materia = tm.crear_materia("Física", "#3B82F6").idMateria
+    tarea = tm.crear_tarea("Informe", "", Prioridad.Media, MANANA, materia).idTarea
+    contador = [0]
+
+    def _crear():
+        contador[0] += 1
+        tm.crear_tarea(f"Tarea {contador[0]}", "", Prioridad.Media, MANANA, materia)
+
+    casos = (("seleccionar_tarea", lambda: tm.seleccionar_tarea(tarea), llamadas),
+             ("crear_tarea", _crear, max(llamadas // 10, 10)))
+    print(f"  {'operación':<20}  {'sin registro':>12}  {'umbral 50 ms':>12}  "
+          f"{'umbral 0':>12}")
+    for nombre, funcion, veces in casos:
+        sin_registro = medir(funcion, veces)
+        resultados = [sin_registro]
+        for umbral in (50.0, 0.0):
+            registro = RegistroConsultasLentas(RUTA, umbral_ms=umbral)
+            registro.activar()
+            resultados.append(medir(funcion, veces))
+            registro.desactivar()
+        print(f"  {nombre:<20}: " + "  ".join(f"{r:12.2f}" for r in resultados) + " µs")
+
+    print(f"\n  registro: {os.path.getsize(RUTA) / 1024:.0f} KiB")
+    for r in resumir(RUTA, limite=3):
+        print(f"  {r.veces:>6} × {r.promedio_ms:.3f} ms  {r.sentencia[:60]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+bench_crear_usuario.py
+======================
+Sentencias SQL por llamada a crear_usuario y seleccionar_usuario,
+comparadas con el esquema anterior (COUNT + SELECT por correo + INSERT +
+refresh, y COUNT completo en cada selección). El conteo incluye el BEGIN
+de cada transacción.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_crear_usuario [repeticiones]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from sqlalchemy import event  # noqa: E402
+from src.logic.task_manager import TaskManager, Session  # noqa: E402
+from src.model.declarative_base import Base, engine, SessionEscritura  # noqa: E402
+from src.model.modelo import Usuario  # noqa: E402
+
+_sentencias = []
+event.listen(engine, "before_cursor_execute",
+             lambda conn, cursor, sql, *args: _sentencias.append(sql))
+
+
+def crear_referencia(nombre: str, correo: str) -> Usuario:
+    """Versión anterior de crear_usuario: COUNT, SELECT e INSERT separados."""
+    session = SessionEscritura()
+    try:
+        if session.query(Usuario).count() >= 5:
+            raise ValueError("Límite de usuarios alcanzado (máximo 5)")
+        if session.query(Usuario).filter_by(correo=correo).first():
+            raise ValueError(f"El correo '{correo}' ya está registrado")
+        usuario = Usuario(nombre=nombre, correo=correo,
+                          fecha_creacion=date.today())
+        session.add(usuario)
+        session.flush()
+        session.refresh(usuario)
+        session.commit()
+        return usuario
+    finally:
+        session.close()
+
+
+def seleccionar_referencia(id_usuario: int) -> Usuario:
+    """Versión anterior de seleccionar_usuario: COUNT completo + SELECT."""
+    session = Session()
+    try:
+        if session.query(Usuario).count() == 0:
+            raise ValueError("No hay usuarios registrados")
+        return session.query(Usuario).filter_by(idUsuario=id_usuario).first()
+    finally:
+        session.close()
+
+
+def medir(funcion, repeticiones: int) -> tuple:
+    """Retorna (sentencias por llamada, microsegundos por llamada)."""
+    _sentencias.clear()
+    inicio = time.perf_counter()
+    for i in range(repeticiones):
+        funcion(i)
+    seg = time.perf_counter() - inicio
+    return len(_sentencias) / repeticiones, seg / repeticiones * 1e6
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    tm = TaskManager()
+
+    def ciclo_creacion(crear):
+        def _llamada(i):
+            # Crea hasta llenar el cupo y luego intenta una creación fallida
+            if i % 6 == 0:
+                Base.metadata.drop_all(engine)
+                Base.metadata.create_all(engine)
+            try:
+                crear(f"Usuario Bench {chr(65 + i % 6)}", f"u{i}@mail.com")
+            except ValueError:
+                pass
+        return _llamada
+
+    # La recreación de tablas no cuenta: se descuenta midiéndola aparte
+    base, _ = medir(ciclo_creacion(lambda n, c: None), repeticiones)
+    ref, ref_us = medir(ciclo_creacion(crear_referencia), repeticiones)
+    nue, nue_us = medir(ciclo_creacion(tm.crear_usuario), repeticiones)
+    print(f"crear_usuario        : {ref - base:5.2f} -> {nue - base:5.2f} "
+          f"sentencias/llamada ({ref_us:7.0f} -> {nue_us:7.0f} µs con recreación)")
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    uid = tm.crear_usuario("Usuario Bench", "bench@mail.com").idUsuario
+    ref, ref_us = medir(lambda i: seleccionar_referencia(uid), repeticiones)
+    nue, nue_us = medir(lambda i: tm.seleccionar_usuario(uid), repeticiones)
+    print(f"seleccionar_usuario  : {ref:5.2f} -> {nue:5.2f} "
+          f"sentencias/llamada ({ref_us:7.0f} -> {nue_us:7.0f} µs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+bench_directorio_usuarios.py
+============================
+Latencia del directorio de usuarios con muchos registros: listado
+completo (comportamiento anterior de la bienvenida) frente a páginas por
+clave (keyset), paginación con OFFSET y búsqueda por prefijo.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_directorio_usuarios [usuarios]
+"""
+
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from datetime import date
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from sqlalchemy import select  # noqa: E402
+from src.logic.task_manager import TaskManager, Session  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+from src.model.modelo import Usuario  # noqa: E402
+
+PAGINA = 30
+
+
+def poblar(cantidad: int):
+    """Inserta `cantidad` usuarios con nombres aleatorios."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    azar = random.Random(42)
+    hoy = date.today().isoformat()
+    filas = []
+    for i in range(cantidad):
+        nombre = "".join(azar.choice(string.ascii_lowercase) for _ in range(7))
+        filas.append((f"{nombre.capitalize()} Perez", f"{nombre}{i}@mail.com",
+                      hoy, 1))
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO usuarios (nombre, correo, fecha_creacion, version) "
+            "VALUES (?, ?, ?, ?)", filas)
+        conn.exec_driver_sql("ANALYZE")
+
+
+def medir(funcion, repeticiones: int = 20) -> float:
+    """Retorna los milisegundos promedio por llamada."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def pagina_offset(numero: int) -> list:
+    """Paginación de referencia con OFFSET (recorre las filas saltadas)."""
+    session = Session()
+    try:
+        return session.scalars(
+            select(Usuario).order_by(Usuario.nombre.collate("NOCASE"),
+                                     Usuario.idUsuario)
+            .offset(numero * PAGINA).limit(PAGINA)).all()
+    finally:
+        session.close()
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    poblar(cantidad)
+    tm = TaskManager(limite_usuarios=None)
+
+    # Cursor a mitad del directorio para medir una página profunda
+    medio = pagina_offset(cantidad // PAGINA // 2)[-1]
+    cursor = (medio.nombre, medio.idUsuario)
+
+    print(f"{cantidad} usuarios, páginas de {PAGINA}")
+    print(f"listar todos (antes)       : {medir(tm.listar_usuarios, 3):9.2f} ms")
+    print(f"primera página             : "
+          f"{medir(lambda: tm.listar_usuarios(limite=PAGINA)):9.2f} ms")
+    print(f"página media con OFFSET    : "
+          f"{medir(lambda: pagina_offset(cantidad // PAGINA // 2)):9.2f} ms")
+    print(f"página media con keyset    : "
+          f"{medir(lambda: tm.listar_usuarios(despues_de=cursor, limite=PAGINA)):9.2f} ms")
+    for prefijo in ("m", "mar", "marq"):
+        print(f"búsqueda '{prefijo}'".ljust(27) + ": "
+              f"{medir(lambda: tm.listar_usuarios(busqueda=prefijo, limite=PAGINA)):9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
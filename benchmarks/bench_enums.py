@@ -0,0 +1,161 @@
+"""
+bench_enums.py
+==============
+Tamaño de la base de datos y tiempo de recorrido de índices con
+prioridad/estado guardados como texto (esquema anterior, Enum de
+SQLAlchemy) y como enteros (EnumEntero).
+
+Se crean dos archivos con la misma tabla de tareas y el índice
+ix_tareas_materia_prioridad (materia_id, prioridad, fechaEntrega):
+    - antes:   prioridad VARCHAR(5) y estado VARCHAR(10) con el nombre.
+    - después: esquema actual del modelo (enteros pequeños).
+
+Se mide el recorrido completo del índice, el conteo por materia y
+prioridad (lo resuelve el índice sin leer la tabla) y la página
+"Alta primero" de cada materia. Con texto ese orden necesita un CASE que
+no puede usar el índice; con enteros basta ORDER BY prioridad DESC.
+
+Usa archivos temporales, por lo que no toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_enums [tareas]
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from sqlalchemy import create_engine  # noqa: E402
+from src.model.modelo import Tarea, Prioridad, EstadoTarea  # noqa: E402
+
+MATERIAS = 100
+PAGINA = 50
+
+_ESQUEMA_ANTES = [
+    """CREATE TABLE tareas (
+        "idTarea" INTEGER PRIMARY KEY, titulo VARCHAR(100) NOT NULL,
+        descripcion VARCHAR(500), prioridad VARCHAR(5) NOT NULL,
+        "fechaEntrega" DATE NOT NULL, estado VARCHAR(10) NOT NULL,
+        materia_id INTEGER NOT NULL, version INTEGER NOT NULL)""",
+    """CREATE INDEX ix_tareas_materia_prioridad
+        ON tareas (materia_id, prioridad, "fechaEntrega")""",
+]
+
+_ORDEN_ANTES = ("CASE prioridad WHEN 'Alta' THEN 0 WHEN 'Media' THEN 1 ELSE 2 END, "
+                "fechaEntrega, idTarea")
+_ORDEN_DESPUES = "prioridad DESC, fechaEntrega, idTarea"
+
+
+def _filas(cantidad: int, codificar):
+    """Genera las mismas tareas para ambos esquemas."""
+    azar = random.Random(42)
+    hoy = date.today()
+    prioridades = list(Prioridad)
+    for i in range(cantidad):
+        estado = EstadoTarea.Pendiente if azar.random() < 0.7 else EstadoTarea.Completada
+        yield (f"Tarea {i}", codificar(prioridades[azar.randrange(3)]),
+               (hoy + timedelta(days=azar.randrange(365))).isoformat(),
+               codificar(estado), azar.randrange(1, MATERIAS + 1), 1)
+
+
+def crear(ruta: str, antes: bool, cantidad: int):
+    """Crea la tabla de tareas con el esquema indicado y la puebla."""
+    if antes:
+        conn = sqlite3.connect(ruta)
+        for sentencia in _ESQUEMA_ANTES:
+            conn.execute(sentencia)
+        conn.commit()
+        codificar = (lambda miembro: miembro.name)
+    else:
+        engine = create_engine(f"sqlite:///{ruta}")
+        Tarea.__table__.create(engine)
+        engine.dispose()
+        conn = sqlite3.connect(ruta)
+        codigos = {m: i for columna in ("prioridad", "estado")
+                   for i, m in enumerate(Tarea.__table__.c[columna].type.miembros)}
+        codificar = codigos.__getitem__
+    conn.executemany(
+        "INSERT INTO tareas (titulo, prioridad, fechaEntrega, estado, materia_id, "
+        "version) VALUES (?, ?, ?, ?, ?, ?)", _filas(cantidad, codificar))
+    conn.commit()
+    conn.execute("ANALYZE")
+    return conn
+
+
+def medir(funcion, repeticiones: int = 3) -> float:
+    """Retorna los milisegundos de la mejor de `repeticiones` llamadas."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return min(tiempos)
+
+
+def _tiene_dbstat(conn) -> bool:
+    """Indica si la compilación de SQLite incluye la tabla virtual dbstat."""
+    try:
+        conn.execute("SELECT 1 FROM dbstat LIMIT 1")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def reportar(nombre: str, conn, orden: str):
+    """Imprime tamaño y tiempos de consulta de una base de datos."""
+    paginas = conn.execute("PRAGMA page_count").fetchone()[0]
+    tamano = paginas * conn.execute("PRAGMA page_size").fetchone()[0]
+    indice = conn.execute(
+        "SELECT COUNT(*) FROM dbstat WHERE name = 'ix_tareas_materia_prioridad'"
+    ).fetchone()[0] if _tiene_dbstat(conn) else None
+
+    def _recorrer():
+        conn.execute("SELECT COUNT(*) FROM tareas "
+                     "INDEXED BY ix_tareas_materia_prioridad").fetchone()
+
+    def _contar():
+        conn.execute("SELECT materia_id, prioridad, COUNT(*) FROM tareas "
+                     "GROUP BY materia_id, prioridad").fetchall()
+
+    consulta_pagina = (f"SELECT idTarea FROM tareas WHERE materia_id = ? "
+                       f"ORDER BY {orden} LIMIT {PAGINA}")
+
+    def _paginas():
+        for materia in range(1, MATERIAS + 1):
+            conn.execute(consulta_pagina, (materia,)).fetchall()
+
+    plan = " | ".join(f[-1] for f in conn.execute(
+        f"EXPLAIN QUERY PLAN {consulta_pagina}", (1,)))
+    print(f"\n{nombre}")
+    print(f"  archivo                       : {tamano / 2**20:8.1f} MiB")
+    if indice is not None:
+        print(f"  páginas del índice            : {indice:8d}")
+    print(f"  recorrer el índice            : {medir(_recorrer):8.1f} ms")
+    print(f"  contar por materia/prioridad  : {medir(_contar):8.1f} ms")
+    print(f"  Alta primero, {PAGINA} x {MATERIAS} materias: {medir(_paginas):8.1f} ms")
+    print(f"  plan: {plan}")
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    directorio = tempfile.mkdtemp(prefix="taskmaster_bench_")
+    print(f"{cantidad} tareas en {MATERIAS} materias")
+    for nombre, antes, orden in (("antes (texto)", True, _ORDEN_ANTES),
+                                 ("después (enteros)", False, _ORDEN_DESPUES)):
+        conn = crear(os.path.join(directorio, f"{'antes' if antes else 'despues'}.sqlite"),
+                     antes, cantidad)
+        try:
+            reportar(nombre, conn, orden)
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
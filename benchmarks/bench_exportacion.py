@@ -0,0 +1,85 @@
+"""
+bench_exportacion.py
+====================
+Duración de TaskManager.exportar para un usuario con muchas tareas, en
+CSV, JSONL y JSONL comprimido, y memoria máxima del proceso. La memoria
+no debería crecer con la cantidad de tareas (cursor del lado del
+servidor); como referencia se mide también cargar todas las tareas con
+listar_tareas, que sí las trae a memoria.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_exportacion [tareas]
+"""
+
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+
+MATERIAS = 20
+
+
+def poblar(cantidad: int) -> int:
+    """Crea un usuario con MATERIAS materias y `cantidad` tareas."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    ids = [tm.crear_materia(f"Materia {i}", "#3B82F6").idMateria
+           for i in range(MATERIAS)]
+    hoy = date.today()
+    # En bloques, para que la memoria máxima del proceso sea la de exportar
+    for bloque in range(0, cantidad, 10_000):
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO tareas (titulo, descripcion, prioridad, fechaEntrega, "
+                "estado, materia_id, version, esfuerzo) VALUES (?, ?, ?, ?, ?, ?, 1, ?)",
+                [(f"Tarea {i}", "Leer el capítulo y resolver los ejercicios", i % 3,
+                  (hoy + timedelta(days=i % 365)).isoformat(), i % 2, ids[i % MATERIAS],
+                  i % 40 or None)
+                 for i in range(bloque, min(bloque + 10_000, cantidad))])
+    return usuario.idUsuario
+
+
+def memoria_mib() -> float:
+    """Memoria residente máxima del proceso hasta ahora, en MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tm = TaskManager(usar_cache=False)
+    tm.seleccionar_usuario(poblar(cantidad))
+    carpeta = tempfile.mkdtemp(prefix="taskmaster_bench_")
+    print(f"{cantidad} tareas en {MATERIAS} materias")
+    for nombre in ("datos.csv", "datos.jsonl", "datos.jsonl.gz"):
+        ruta = os.path.join(carpeta, nombre)
+        antes = memoria_mib()
+        resultado = tm.exportar(ruta)
+        assert resultado.tareas == cantidad
+        print(f"  {nombre:15}: {resultado.segundos:6.2f} s, "
+              f"{resultado.filas_por_segundo:9.0f} registros/s, "
+              f"{os.path.getsize(ruta) / 2**20:6.1f} MiB, "
+              f"memoria máxima +{memoria_mib() - antes:.1f} MiB")
+
+    antes = memoria_mib()
+    inicio = time.perf_counter()
+    tm.listar_tareas()
+    print(f"  listar_tareas  : {time.perf_counter() - inicio:6.2f} s, "
+          f"memoria máxima +{memoria_mib() - antes:.1f} MiB (referencia)")
+
+
+if __name__ == "__main__":
+    main()
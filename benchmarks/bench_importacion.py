@@ -0,0 +1,72 @@
+"""
+bench_importacion.py
+====================
+Throughput de TaskManager.importar (registros por segundo) y memoria
+máxima del proceso al importar un archivo JSONL grande, con distintos
+tamaños de lote. La memoria no debería crecer con el tamaño del archivo.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_importacion [tareas]
+"""
+
+import json
+import os
+import resource
+import sys
+import tempfile
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+
+MATERIAS = 20
+
+
+def generar(ruta: str, cantidad: int):
+    """Escribe MATERIAS materias y `cantidad` tareas (1 de cada 100 inválida)."""
+    hoy = date.today()
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        for i in range(MATERIAS):
+            archivo.write(json.dumps({"tipo": "materia", "nombre": f"Materia {i}",
+                                      "color": "#3B82F6"}) + "\n")
+        for i in range(cantidad):
+            archivo.write(json.dumps({
+                "tipo": "tarea", "titulo": f"Tarea {i}" if i % 100 else "x",
+                "descripcion": "Leer el capítulo y resolver los ejercicios",
+                "prioridad": ("Baja", "Media", "Alta")[i % 3],
+                "fecha_entrega": (hoy + timedelta(days=i % 365)).isoformat(),
+                "materia": f"Materia {i % MATERIAS}"}) + "\n")
+
+
+def memoria_mib() -> float:
+    """Memoria residente máxima del proceso hasta ahora, en MiB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    ruta = os.path.join(tempfile.mkdtemp(prefix="taskmaster_bench_"), "datos.jsonl")
+    generar(ruta, cantidad)
+    print(f"{cantidad + MATERIAS} registros ({os.path.getsize(ruta) / 2**20:.1f} MiB)")
+    for lote in (100, 1000, 5000):
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        tm = TaskManager()
+        usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        tm.seleccionar_usuario(usuario.idUsuario)
+        antes = memoria_mib()
+        resultado = tm.importar(ruta, tamano_lote=lote)
+        print(f"  lote {lote:5}: {resultado.segundos:7.2f} s, "
+              f"{resultado.filas_por_segundo:8.0f} registros/s, "
+              f"{resultado.tareas} tareas, {resultado.total_errores} errores, "
+              f"memoria máxima +{memoria_mib() - antes:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
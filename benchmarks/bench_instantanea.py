@@ -0,0 +1,103 @@
+"""
+bench_instantanea.py
+====================
+Carga de todas las tareas de un usuario: instancias ORM de Tarea frente a
+la instantánea binaria (src.logic.instantanea), abierta con mmap.
+
+Se mide guardar la instantánea, abrirla, leer una tarea por ID, recorrer
+una columna (contar pendientes) y armar todas las filas, y como
+referencia cargar todas las tareas con el ORM.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_instantanea [tareas]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from sqlalchemy.orm import undefer  # noqa: E402
+from src.logic import instantanea  # noqa: E402
+from src.logic.task_manager import Session, TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+from src.model.modelo import Materia, Tarea  # noqa: E402
+
+MATERIAS = 20
+
+
+def poblar(cantidad: int) -> int:
+    """Crea un usuario con MATERIAS materias y `cantidad` tareas."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    ids = [tm.crear_materia(f"Materia {i}", "#3B82F6").idMateria
+           for i in range(MATERIAS)]
+    hoy = date.today()
+    for bloque in range(0, cantidad, 100_000):
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO tareas (titulo, descripcion, prioridad, fechaEntrega, "
+                "estado, materia_id, version, esfuerzo) VALUES (?, ?, ?, ?, ?, ?, 1, ?)",
+                [(f"Tarea {i}", "Leer el capítulo y resolver los ejercicios" if i % 2
+                  else None, i % 3, (hoy + timedelta(days=i % 365)).isoformat(), i % 2,
+                  ids[i % MATERIAS], i % 40 or None)
+                 for i in range(bloque, min(bloque + 100_000, cantidad))])
+    return usuario.idUsuario
+
+
+def cronometrar(funcion):
+    """Retorna (resultado, milisegundos) de una llamada."""
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tm = TaskManager(usar_cache=False)
+    usuario_id = poblar(cantidad)
+    tm.seleccionar_usuario(usuario_id)
+    ruta = os.path.join(tempfile.mkdtemp(prefix="taskmaster_bench_"), "juan.tmsnap")
+    print(f"{cantidad} tareas en {MATERIAS} materias")
+
+    resultado, ms = cronometrar(lambda: tm.guardar_instantanea(ruta))
+    print(f"  guardar instantánea          : {ms:9.1f} ms ({resultado.tamano / 2**20:.1f} MiB)")
+    inst, ms = cronometrar(lambda: instantanea.abrir(ruta))
+    print(f"  abrir (mmap)                 : {ms:9.3f} ms")
+    medio = inst.columna("tareas.id")[cantidad // 2]
+    _, ms = cronometrar(lambda: inst.tareas.buscar(medio))
+    print(f"  una tarea por ID             : {ms:9.3f} ms")
+    pendientes, ms = cronometrar(lambda: inst.columna("tareas.estado").tolist().count(0))
+    print(f"  contar pendientes (columna)  : {ms:9.1f} ms")
+    filas, ms = cronometrar(lambda: list(inst.tareas))
+    print(f"  armar todas las filas        : {ms:9.1f} ms")
+
+    def _orm():
+        session = Session()
+        try:
+            return session.query(Tarea).options(undefer(Tarea.descripcion)) \
+                .join(Materia).filter(Materia.usuario_id == usuario_id).all()
+        finally:
+            session.close()
+
+    tareas, ms = cronometrar(_orm)
+    print(f"  cargar con el ORM            : {ms:9.1f} ms (referencia)")
+    assert len(filas) == len(tareas) == cantidad
+    assert pendientes == cantidad - cantidad // 2
+    assert inst.tareas.buscar(tareas[-1].idTarea).titulo == tareas[-1].titulo
+    del filas
+    inst.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+bench_instrumentacion.py
+========================
+Costo de la medición por método de TaskManager
+(src.logic.instrumentacion): microsegundos por llamada de una lectura
+servida por la caché y de una escritura, antes de activarla, activa y
+después de desactivarla.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_instrumentacion [llamadas]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from src.logic.instrumentacion import instrumentacion  # noqa: E402
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+from src.model.modelo import Prioridad  # noqa: E402
+
+MANANA = date.today() + timedelta(days=1)
+
+
+def medir(funcion, llamadas: int) -> float:
+    """Retorna los microsegundos por llamada (mejor de 3 rondas)."""
+    mejor = float("inf")
+    for _ in range(3):
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / llamadas * 1e6
+
+
+def main():
+    llamadas = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    materia = tm.crear_materia("Física", "#3B82F6").idMateria
+    tarea = tm.crear_tarea("Informe", "", Prioridad.Media, MANANA, materia).idTarea
+    contador = [0]
+
+    def _crear():
+        contador[0] += 1
+        tm.crear_tarea(f"Tarea {contador[0]}", "", Prioridad.Media, MANANA, materia)
+
+    casos = (("seleccionar_tarea (caché)", lambda: tm.seleccionar_tarea(tarea), llamadas),
+             ("crear_tarea", _crear, max(llamadas // 100, 10)))
+    print(f"  {'operación':<26}  {'antes':>9}  {'activa':>9}  {'después':>9}")
+    for nombre, funcion, veces in casos:
+        antes = medir(funcion, veces)
+        instrumentacion.activar()
+        activa = medir(funcion, veces)
+        instrumentacion.desactivar()
+        despues = medir(funcion, veces)
+        print(f"  {nombre:<26}: {antes:9.2f}  {activa:9.2f}  {despues:9.2f} µs")
+    print()
+    print(instrumentacion.reporte())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+bench_mantenimiento.py
+======================
+Costo del mantenimiento de la base de datos (src.logic.mantenimiento):
+ANALYZE acotado, consultas habituales con y sin estadísticas, y espacio
+recuperado tras eliminar la mitad de las materias, por pasadas acotadas
+de incremental_vacuum comparado con un VACUUM completo.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_mantenimiento [tareas]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from sqlalchemy import create_engine  # noqa: E402
+from src.logic import mantenimiento  # noqa: E402
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+from src.model.modelo import EstadoTarea  # noqa: E402
+
+MATERIAS = 20
+LOTE = 100_000
+
+
+def poblar(cantidad: int) -> int:
+    """Crea un usuario con MATERIAS materias y `cantidad` tareas."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    ids = [tm.crear_materia(f"Materia {i}", "#3B82F6").idMateria
+           for i in range(MATERIAS)]
+    hoy = date.today()
+    for desde in range(0, cantidad, LOTE):
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO tareas (titulo, descripcion, prioridad, fechaEntrega, "
+                "estado, materia_id, version) VALUES (?, ?, ?, ?, ?, ?, 1)",
+                [(f"Tarea {i}", f"Descripción de la tarea {i}", i % 3,
+                  (hoy + timedelta(days=i % 365)).isoformat(), int(i % 4 == 0),
+                  ids[i % MATERIAS])
+                 for i in range(desde, min(desde + LOTE, cantidad))])
+    return usuario.idUsuario
+
+
+def medir(funcion, repeticiones: int) -> float:
+    """Retorna los milisegundos promedio por llamada (tras una de calentamiento)."""
+    funcion()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def consultas(tm: TaskManager) -> dict:
+    """Tiempos de las consultas habituales (sin caché)."""
+    materia = tm.listar_materias()[0].idMateria
+    return {
+        "listar_tareas(materia)": medir(lambda: tm.listar_tareas(materia_id=materia), 3),
+        "listar_tareas(pendientes)": medir(
+            lambda: tm.listar_tareas(estado=EstadoTarea.Pendiente), 3),
+        "agenda()": medir(tm.agenda, 20),
+        "siguientes()": medir(tm.siguientes, 20),
+    }
+
+
+def mib(estado: mantenimiento.Estado) -> str:
+    return (f"{estado.paginas * estado.tamano_pagina / 2**20:6.1f} MiB, "
+            f"{estado.libres} libres ({estado.fraccion_libre:.0%})")
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tm = TaskManager(usar_cache=False)
+    tm.seleccionar_usuario(poblar(cantidad))
+    print(f"{cantidad} tareas, {mib(mantenimiento.estado())}")
+
+    antes = consultas(tm)
+    resultado = mantenimiento.mantener(forzar=True)
+    print(f"  ANALYZE (límite {mantenimiento.LIMITE_ANALISIS} filas)  : "
+          f"{resultado.segundos * 1000:9.0f} ms")
+    despues = consultas(tm)
+    print(f"  {'consulta':<29}  {'sin stat1':>9}  {'con stat1':>9}")
+    for nombre, ms in antes.items():
+        print(f"  {nombre:<29}: {ms:9.1f}  {despues[nombre]:9.1f} ms")
+
+    for materia in tm.listar_materias()[:MATERIAS // 2]:
+        tm.eliminar_materia(materia.idMateria)
+    eliminadas = mantenimiento.estado()
+    print(f"Tras eliminar {MATERIAS // 2} materias: {mib(eliminadas)}")
+
+    # Copia para comparar con un VACUUM completo sobre los mismos datos
+    copia = os.path.join(tempfile.mkdtemp(prefix="taskmaster_bench_"), "copia.sqlite")
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    shutil.copy(engine.url.database, copia)
+
+    inicio = time.perf_counter()
+    pasadas = []
+    while mantenimiento.estado().requiere_vacuum:
+        pasadas.append(mantenimiento.mantener())
+    total = time.perf_counter() - inicio
+    mayor = max(p.segundos for p in pasadas) if pasadas else 0
+    print(f"  pasadas de {mantenimiento.PRESUPUESTO_S:g} s             : "
+          f"{len(pasadas)} pasadas, {sum(p.pasos for p in pasadas)} pasos, "
+          f"{total * 1000:.0f} ms en total (la más larga {mayor * 1000:.0f} ms)")
+    print(f"  después                      : {mib(mantenimiento.estado())}")
+
+    otro = create_engine(f"sqlite:///{copia}")
+    inicio = time.perf_counter()
+    with otro.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+    print(f"  VACUUM completo (bloqueante) : {(time.perf_counter() - inicio) * 1000:9.0f} ms")
+    otro.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+bench_proyeccion.py
+===================
+Latencia de las lecturas de tareas del usuario activo con y sin
+ProyeccionTareas: listado filtrado por estado, conteo por materia (lo que
+hace la vista de materias en cada refresco) y costo de una escritura con
+la proyección activa.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_proyeccion [tareas]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+from src.model.modelo import EstadoTarea  # noqa: E402
+
+MATERIAS = 10
+
+
+def poblar(cantidad: int) -> int:
+    """Crea un usuario con MATERIAS materias y `cantidad` tareas."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    ids = [tm.crear_materia(f"Materia {i}", "#3B82F6").idMateria
+           for i in range(MATERIAS)]
+    azar = random.Random(42)
+    hoy = date.today()
+    filas = [(f"Tarea {i}", i % 3,
+              (hoy + timedelta(days=azar.randrange(120))).isoformat(),
+              0 if azar.random() < 0.7 else 1,
+              azar.choice(ids), 1) for i in range(cantidad)]
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO tareas (titulo, prioridad, fechaEntrega, estado, "
+            "materia_id, version) VALUES (?, ?, ?, ?, ?, ?)", filas)
+    return usuario.idUsuario
+
+
+def medir(funcion, repeticiones: int = 50) -> float:
+    """Retorna los milisegundos promedio por llamada."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    usuario_id = poblar(cantidad)
+    print(f"{cantidad} tareas en {MATERIAS} materias")
+    for usar in (False, True):
+        tm = TaskManager(usar_proyeccion=usar)
+        inicio = time.perf_counter()
+        tm.seleccionar_usuario(usuario_id)
+        carga = (time.perf_counter() - inicio) * 1000
+        materias = [m.idMateria for m in tm.listar_materias()]
+        tarea = tm.listar_tareas(estado=EstadoTarea.Pendiente)[0]
+        marcar = [tm.marcar_tarea, tm.desmarcar_tarea]
+
+        def _escribir():
+            marcar[0](tarea.idTarea)
+            marcar.reverse()
+
+        print(f"\n{'con' if usar else 'sin'} proyección")
+        print(f"  seleccionar usuario       : {carga:9.2f} ms")
+        print(f"  listar pendientes         : "
+              f"{medir(lambda: tm.listar_tareas(estado=EstadoTarea.Pendiente)):9.3f} ms")
+        print(f"  listar de una materia     : "
+              f"{medir(lambda: tm.listar_tareas(materia_id=materias[0])):9.3f} ms")
+        print(f"  contar por materia (x{MATERIAS})  : "
+              f"{medir(lambda: [tm.contar_tareas(materia_id=m) for m in materias]):9.3f} ms")
+        print(f"  marcar / desmarcar        : {medir(_escribir, 20):9.3f} ms")
+        tm._cerrar_proyeccion()
+
+
+if __name__ == "__main__":
+    main()
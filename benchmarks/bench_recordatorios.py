@@ -0,0 +1,124 @@
+"""
+bench_recordatorios.py
+======================
+Costo de MotorRecordatorios con muchas tareas pendientes: carga inicial
+desde la base de datos, programación una por una, memoria del montículo y
+del diccionario de vigentes, y costo de cada aviso y de cada escritura
+observada.
+
+Presupuesto para 1.000.000 de tareas con dos antelaciones (2.000.000 de
+avisos): cargarlas en menos de 3 s, menos de 200 bytes por tarea entre el
+montículo y el diccionario, menos de 15 µs por tarea reprogramada y
+menos de 2 ms extra por escritura observada. Una revisión sin avisos ni
+cambios cuesta lo mismo que el sondeo de data_version (microsegundos).
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_recordatorios [tareas]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from src.logic.proyeccion import dejar_de_observar  # noqa: E402
+from src.logic.recordatorios import MotorRecordatorios  # noqa: E402
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+
+MATERIAS = 20
+
+
+def poblar(cantidad: int) -> tuple:
+    """
+    Crea un usuario con MATERIAS materias y `cantidad` tareas pendientes en
+    los próximos dos años. Retorna (usuario_id, [(idTarea, fecha), ...]).
+    """
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    ids = [tm.crear_materia(f"Materia {i}", "#3B82F6").idMateria
+           for i in range(MATERIAS)]
+    azar = random.Random(42)
+    hoy = date.today()
+    fechas = [hoy + timedelta(days=azar.randrange(1, 730)) for _ in range(cantidad)]
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO tareas (titulo, prioridad, fechaEntrega, estado, "
+            "materia_id, version) VALUES (?, ?, ?, 0, ?, 1)",
+            [(f"Tarea {i}", i % 3, f.isoformat(), azar.choice(ids))
+             for i, f in enumerate(fechas)])
+        primero = conn.exec_driver_sql("SELECT MIN(idTarea) FROM tareas").scalar()
+    return usuario.idUsuario, [(primero + i, f) for i, f in enumerate(fechas)]
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    usuario_id, tareas = poblar(cantidad)
+    print(f"{cantidad} tareas pendientes, antelaciones de 1 día y 1 hora")
+
+    inicio = time.perf_counter()
+    motor = MotorRecordatorios(usuario_id)
+    carga = time.perf_counter() - inicio
+    print(f"  cargar desde la BD            : {carga * 1000:9.1f} ms "
+          f"({len(motor._monticulo)} avisos)")
+    memoria = (sys.getsizeof(motor._monticulo)
+               + sum(map(sys.getsizeof, motor._monticulo))
+               + sys.getsizeof(motor._vigentes)
+               + sum(map(sys.getsizeof, motor._vigentes))
+               + sum(map(sys.getsizeof, motor._vigentes.values())))
+    print(f"  memoria del montículo y dict  : {memoria / 2**20:9.1f} MiB "
+          f"({memoria / cantidad:.0f} B por tarea)")
+
+    tm = TaskManager(usar_cache=False)
+    tm.seleccionar_usuario(usuario_id)
+    marcar = [tm.marcar_tarea, tm.desmarcar_tarea]
+    repeticiones = 200
+    inicio = time.perf_counter()
+    for i in range(repeticiones):
+        marcar[i % 2](tareas[0][0])
+    con_motor = (time.perf_counter() - inicio) / repeticiones * 1000
+    dejar_de_observar(motor)
+    inicio = time.perf_counter()
+    for i in range(repeticiones):
+        marcar[i % 2](tareas[0][0])
+    sin_motor = (time.perf_counter() - inicio) / repeticiones * 1000
+    print(f"  marcar / desmarcar            : {con_motor:9.3f} ms "
+          f"(sin motor: {sin_motor:.3f} ms)")
+
+    inicio = time.perf_counter()
+    for tarea_id, fecha in tareas:
+        motor.programar(tarea_id, fecha + timedelta(days=1))
+    programar = time.perf_counter() - inicio
+    print(f"  reprogramar una por una       : {programar * 1000:9.1f} ms "
+          f"({programar / cantidad * 1e6:.2f} µs c/u, con compactación)")
+    motor.cerrar()
+
+    reloj = [datetime.now()]
+    motor = MotorRecordatorios(usuario_id, reloj=lambda: reloj[0])
+    reloj[0] += timedelta(days=30)
+    inicio = time.perf_counter()
+    avisos = motor.revisar()
+    emitir = time.perf_counter() - inicio
+    print(f"  emitir 30 días de avisos      : {emitir * 1000:9.1f} ms "
+          f"({len(avisos)} avisos)")
+    inicio = time.perf_counter()
+    for _ in range(1000):
+        motor.revisar()
+    print(f"  revisar sin avisos ni cambios : "
+          f"{(time.perf_counter() - inicio) * 1000:9.3f} µs")
+    motor.cerrar()
+
+
+if __name__ == "__main__":
+    main()
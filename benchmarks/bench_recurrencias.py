@@ -0,0 +1,85 @@
+"""
+bench_recurrencias.py
+=====================
+Costo de las tareas recurrentes frente a cargar cada ocurrencia con
+crear_tarea: filas creadas al definir la regla, tiempo de crearla, de
+reponer una ocurrencia al completarla y de generar de una vez todas las
+ocurrencias de un rango (una sola transacción).
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_recurrencias [dias]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+from src.model.modelo import EstadoTarea, Prioridad  # noqa: E402
+
+
+def preparar() -> tuple:
+    """Reinicia la BD y retorna (TaskManager, idMateria) de un usuario nuevo."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager(usar_cache=False)
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    return tm, tm.crear_materia("Física", "#3B82F6").idMateria
+
+
+def main():
+    dias = int(sys.argv[1]) if len(sys.argv) > 1 else 180
+    hoy = date.today()
+    fin = hoy + timedelta(days=dias - 1)
+    print(f"regla diaria de {dias} días (un semestre con dias=180)")
+
+    tm, materia_id = preparar()
+    inicio = time.perf_counter()
+    for i in range(dias):
+        tm.crear_tarea("Lectura", "", Prioridad.Media, hoy + timedelta(days=i), materia_id)
+    una_por_una = time.perf_counter() - inicio
+    print(f"  crear_tarea una por una        : {una_por_una * 1000:9.1f} ms "
+          f"({len(tm.listar_tareas())} filas)")
+
+    tm, materia_id = preparar()
+    inicio = time.perf_counter()
+    tm.crear_recurrencia("Lectura", "", Prioridad.Media, materia_id, hoy,
+                         cada_dias=1, hasta=fin)
+    crear = time.perf_counter() - inicio
+    print(f"  crear_recurrencia              : {crear * 1000:9.1f} ms "
+          f"({len(tm.listar_tareas())} filas)")
+
+    repeticiones = 50
+    total = 0.0
+    for _ in range(repeticiones):
+        primera = tm.listar_tareas(estado=EstadoTarea.Pendiente)[0]
+        inicio = time.perf_counter()
+        tm.marcar_tarea(primera.idTarea)
+        total += time.perf_counter() - inicio
+    print(f"  completar y reponer (c/u)      : {total / repeticiones * 1000:9.3f} ms")
+
+    inicio = time.perf_counter()
+    tm.listar_tareas(hasta=fin)
+    rango = time.perf_counter() - inicio
+    print(f"  listar el rango completo       : {rango * 1000:9.1f} ms "
+          f"({len(tm.listar_tareas())} filas, una transacción)")
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        tm.listar_tareas(hasta=fin)
+    print(f"  listar el rango otra vez (c/u) : "
+          f"{(time.perf_counter() - inicio) / repeticiones * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+bench_respaldo.py
+=================
+Duración del respaldo en caliente (src.model.respaldo) y demora que sufre
+un escritor que marca y desmarca tareas mientras tanto: sin respaldo,
+copiando todo en un solo paso y copiando por pasos con pausas.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_respaldo [tareas]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model import respaldo  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+
+MATERIAS = 20
+LOTE = 100_000
+
+
+def poblar(cantidad: int) -> int:
+    """Crea un usuario con MATERIAS materias y `cantidad` tareas pendientes."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    ids = [tm.crear_materia(f"Materia {i}", "#3B82F6").idMateria
+           for i in range(MATERIAS)]
+    hoy = date.today()
+    for desde in range(0, cantidad, LOTE):
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO tareas (titulo, descripcion, prioridad, fechaEntrega, "
+                "estado, materia_id, version) VALUES (?, ?, ?, ?, 0, ?, 1)",
+                [(f"Tarea {i}", f"Descripción de la tarea {i}", i % 3,
+                  (hoy + timedelta(days=i % 365)).isoformat(), ids[i % MATERIAS])
+                 for i in range(desde, min(desde + LOTE, cantidad))])
+    return usuario.idUsuario
+
+
+class Escritor(threading.Thread):
+    """Marca y desmarca una tarea sin parar y anota cuánto tarda cada vez."""
+
+    def __init__(self, usuario_id: int):
+        super().__init__(daemon=True)
+        self.tm = TaskManager(usar_cache=False)
+        self.tm.seleccionar_usuario(usuario_id)
+        with engine.connect() as conn:
+            self.tarea = conn.exec_driver_sql('SELECT MIN("idTarea") FROM tareas').scalar()
+        self.demoras = []
+        self.activo = True
+
+    def run(self):
+        marcar = True
+        while self.activo:
+            inicio = time.perf_counter()
+            if marcar:
+                self.tm.marcar_tarea(self.tarea)
+            else:
+                self.tm.desmarcar_tarea(self.tarea)
+            self.demoras.append(time.perf_counter() - inicio)
+            marcar = not marcar
+
+
+def medir(escritor: Escritor, etiqueta: str, operacion) -> None:
+    """Ejecuta `operacion` y muestra su duración y las demoras del escritor."""
+    escritor.demoras = []
+    inicio = time.perf_counter()
+    detalle = operacion()
+    segundos = time.perf_counter() - inicio
+    demoras = sorted(escritor.demoras)
+    p99 = demoras[min(len(demoras) - 1, int(len(demoras) * 0.99))] if demoras else 0
+    maxima = demoras[-1] if demoras else 0
+    print(f"  {etiqueta:<28}: {segundos * 1000:8.0f} ms | escrituras {len(demoras):5d} "
+          f"({len(demoras) / segundos:6.0f}/s) p99 {p99 * 1000:6.1f} ms "
+          f"máx {maxima * 1000:6.1f} ms{detalle}")
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    usuario_id = poblar(cantidad)
+    ruta = os.path.join(tempfile.mkdtemp(prefix="taskmaster_bench_"), "db.sqlite")
+    print(f"{cantidad} tareas, {os.path.getsize(engine.url.database) / 2**20:.0f} MiB")
+
+    def _respaldar(**opciones):
+        resultado = respaldo.respaldar(ruta, generaciones=2, **opciones)
+        return (f" | {resultado.pasos} pasos, {resultado.reinicios} reinicios")
+
+    print("Sin escrituras concurrentes")
+    for etiqueta, opciones in (("un solo paso", {"paginas": -1}),
+                               ("por pasos (256 pág, 2 ms)", {})):
+        inicio = time.perf_counter()
+        detalle = _respaldar(**opciones)
+        print(f"  {etiqueta:<28}: {(time.perf_counter() - inicio) * 1000:8.0f} ms{detalle}")
+
+    print("Con un escritor marcando y desmarcando una tarea sin pausa")
+    escritor = Escritor(usuario_id)
+    escritor.start()
+    duracion = [0.0]
+
+    def _sin_respaldo():
+        time.sleep(duracion[0])
+        return ""
+
+    inicio = time.perf_counter()
+    respaldo.respaldar(ruta, generaciones=2, paginas=-1)
+    duracion[0] = time.perf_counter() - inicio
+    medir(escritor, "sin respaldo", _sin_respaldo)
+    medir(escritor, "un solo paso", lambda: _respaldar(paginas=-1))
+    medir(escritor, "por pasos (256 pág, 2 ms)", _respaldar)
+    medir(escritor, "por pasos (64 pág, 5 ms)",
+          lambda: _respaldar(paginas=64, pausa=0.005))
+    escritor.activo = False
+    escritor.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+bench_resumenes.py
+==================
+Costo del resumen del tablero (tareas por materia y totales del usuario):
+un COUNT(*) por materia y un conteo por estado (comportamiento anterior)
+frente a la lectura de resumen_materias / resumen_usuarios, mantenidas
+por triggers. También mide cuánto agregan esos triggers a cada escritura.
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_resumenes [tareas]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+from src.model.modelo import EstadoTarea, sentencias_triggers_resumen  # noqa: E402
+
+MATERIAS = 20
+
+
+def poblar(cantidad: int) -> int:
+    """Crea un usuario con MATERIAS materias y `cantidad` tareas."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    ids = [tm.crear_materia(f"Materia {i}", "#3B82F6").idMateria
+           for i in range(MATERIAS)]
+    azar = random.Random(42)
+    hoy = date.today()
+    filas = [(f"Tarea {i}", i % 3, (hoy + timedelta(days=azar.randrange(120))).isoformat(),
+              0 if azar.random() < 0.7 else 1, azar.choice(ids), 1)
+             for i in range(cantidad)]
+    inicio = time.perf_counter()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO tareas (titulo, prioridad, fechaEntrega, estado, "
+            "materia_id, version) VALUES (?, ?, ?, ?, ?, ?)", filas)
+    print(f"  insertar {cantidad} tareas      : "
+          f"{(time.perf_counter() - inicio) * 1000:9.1f} ms (con triggers)")
+    return usuario.idUsuario
+
+
+def medir(funcion, repeticiones: int = 20) -> float:
+    """Retorna los milisegundos promedio por llamada."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{cantidad} tareas en {MATERIAS} materias")
+    usuario_id = poblar(cantidad)
+    tm = TaskManager(usar_cache=False)
+    tm.seleccionar_usuario(usuario_id)
+    materias = [m.idMateria for m in tm.listar_materias()]
+
+    def _con_conteos():
+        return ({m: tm.contar_tareas(materia_id=m) for m in materias},
+                tm.contar_tareas(estado=EstadoTarea.Pendiente),
+                tm.contar_tareas(estado=EstadoTarea.Completada))
+
+    def _con_resumenes():
+        return tm.resumen_materias(), tm.resumen_usuario()
+
+    print(f"  tablero con COUNT(*) (antes)  : {medir(_con_conteos):9.2f} ms")
+    print(f"  tablero con resúmenes         : {medir(_con_resumenes):9.2f} ms")
+
+    tarea = tm.listar_tareas(estado=EstadoTarea.Pendiente)[0]
+    marcar = [tm.marcar_tarea, tm.desmarcar_tarea]
+
+    def _escribir():
+        marcar[0](tarea.idTarea)
+        marcar.reverse()
+
+    con_triggers = medir(_escribir)
+    with engine.begin() as conn:
+        for sentencia in sentencias_triggers_resumen():
+            nombre = sentencia.split("EXISTS", 1)[1].split()[0]
+            conn.exec_driver_sql(f"DROP TRIGGER {nombre}")
+    print(f"  marcar / desmarcar            : {con_triggers:9.2f} ms "
+          f"(sin triggers de resumen: {medir(_escribir):.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
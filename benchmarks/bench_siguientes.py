@@ -0,0 +1,116 @@
+"""
+bench_siguientes.py
+===================
+Latencia de TaskManager.siguientes (las n tareas pendientes más urgentes)
+para un usuario con muchas tareas pendientes, frente a puntuar y ordenar
+todas las pendientes en Python.
+
+Se mide sin caché de resultados (el costo de la consulta de candidatas
+sobre ix_tareas_pendientes_inicio), con caché (lecturas repetidas sin
+cambios) y justo después de una escritura (recálculo).
+
+Usa una base de datos temporal (variable TASKMASTER_DB), por lo que no
+toca src/model/db.sqlite.
+
+Ejecución:
+    python -m benchmarks.bench_siguientes [tareas] [n]
+"""
+
+import heapq
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ["TASKMASTER_DB"] = os.path.join(
+    tempfile.mkdtemp(prefix="taskmaster_bench_"), "bench.sqlite")
+
+from src.logic.ranking import puntaje  # noqa: E402
+from src.logic.task_manager import TaskManager  # noqa: E402
+from src.model.declarative_base import Base, engine  # noqa: E402
+from src.model.modelo import EstadoTarea, HORAS_POR_DIA, Prioridad  # noqa: E402
+
+MATERIAS = 20
+
+
+def poblar(cantidad: int) -> int:
+    """
+    Crea un usuario con MATERIAS materias y `cantidad` tareas pendientes en
+    los próximos dos años; una de cada tres tiene esfuerzo estimado.
+    """
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    usuario = tm.crear_usuario("Juan Lopez", "juan@mail.com")
+    tm.seleccionar_usuario(usuario.idUsuario)
+    ids = [tm.crear_materia(f"Materia {i}", "#3B82F6").idMateria
+           for i in range(MATERIAS)]
+    azar = random.Random(42)
+    hoy = date.today()
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO tareas (titulo, prioridad, fechaEntrega, estado, "
+            "materia_id, version, esfuerzo) VALUES (?, ?, ?, 0, ?, 1, ?)",
+            [(f"Tarea {i}", i % 3,
+              (hoy + timedelta(days=azar.randrange(1, 730))).isoformat(),
+              azar.choice(ids), azar.choice((None, None, azar.randrange(1, 60))))
+             for i in range(cantidad)])
+        conn.exec_driver_sql("ANALYZE")
+    return usuario.idUsuario
+
+
+def medir(funcion, repeticiones: int = 200) -> float:
+    """Retorna los milisegundos promedio por llamada."""
+    funcion()
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    usuario_id = poblar(cantidad)
+    tm = TaskManager(usar_cache=False)
+    tm.seleccionar_usuario(usuario_id)
+    hoy = date.today()
+    print(f"{cantidad} tareas pendientes en {MATERIAS} materias, top-{n}")
+
+    prioridades = list(Prioridad)
+
+    def _ordenar_todo():
+        with engine.connect() as conn:
+            filas = conn.exec_driver_sql(
+                "SELECT idTarea, prioridad, fechaEntrega, esfuerzo FROM tareas "
+                "WHERE estado = 0")
+            return heapq.nlargest(n, (
+                (puntaje(prioridades[p], date.fromisoformat(f)
+                         - timedelta(days=-(-(e or 0) // HORAS_POR_DIA)), hoy), i)
+                for i, p, f, e in filas))
+
+    print(f"  puntuar todas en Python      : {medir(_ordenar_todo, 1):9.1f} ms")
+    print(f"  siguientes()                 : {medir(lambda: tm.siguientes(n)):9.3f} ms")
+
+    con_cache = TaskManager()
+    con_cache.seleccionar_usuario(usuario_id)
+    print(f"  siguientes() con caché       : "
+          f"{medir(lambda: con_cache.siguientes(n), 2000):9.4f} ms")
+
+    primera = con_cache.siguientes(n)[0].tarea.idTarea
+    marcar = [con_cache.marcar_tarea, con_cache.desmarcar_tarea]
+    total = 0.0
+    for i in range(200):
+        marcar[i % 2](primera)
+        inicio = time.perf_counter()
+        con_cache.siguientes(n)
+        total += time.perf_counter() - inicio
+    print(f"  siguientes() tras escribir   : {total / 200 * 1000:9.3f} ms")
+    assert con_cache.siguientes(n) == tm.siguientes(n)
+    assert tm.contar_tareas(estado=EstadoTarea.Pendiente) == cantidad
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,27 @@
+import argparse
+import sys
 import src.model.modelo
 from src.logic.task_manager import TaskManager
-from src.model.declarative_base import engine, Base
+from src.logic.recordatorios import MotorRecordatorios
+from src.logic import mantenimiento
+from src.logic.instrumentacion import instrumentacion
+from src.logic import consultas_lentas
+from src.model.migraciones import inicializar_bd
+from src.model import respaldo
 from src.model.modelo import Prioridad, EstadoTarea
 from datetime import date, timedelta, datetime
 
-# ── Inicializar BD ─────────────────────────────────────────────────
-Base.metadata.create_all(engine)
+# ── Inicializar BD (crea tablas y aplica migraciones pendientes) ───
+inicializar_bd()
 
 tm = TaskManager()
 
+# Usuarios mostrados como máximo al seleccionar (el resto, vía búsqueda)
+MAX_USUARIOS_LISTADO = 20
+
+# Motor de recordatorios del usuario activo (None si no hay usuario)
+recordatorios = None
+
 # ══════════════════════════════════════════════════════════
 # UTILIDADES
 # ══════════════════════════════════════════════════════════
@@ -43,6 +56,22 @@ def menu(opciones: list) -> int:
 def pausa():
     input("\n  Presiona ENTER para continuar...")
 
+def mostrar_recordatorio(r):
+    """Aviso en consola; llega desde el hilo del motor de recordatorios."""
+    print(f"\n  🔔 Recordatorio: '{r.titulo}' vence el "
+          f"{r.vence:%d/%m/%Y a las %H:%M}")
+
+def activar_recordatorios():
+    """Reemplaza el motor de recordatorios por el del usuario activo."""
+    global recordatorios
+    if recordatorios is not None:
+        recordatorios.cerrar()
+        recordatorios = None
+    if tm.usuario_activo:
+        recordatorios = MotorRecordatorios(tm.usuario_activo.idUsuario)
+        recordatorios.suscribir(mostrar_recordatorio)
+        recordatorios.iniciar()
+
 # ══════════════════════════════════════════════════════════
 # FLUJO: GESTIÓN DE USUARIOS
 # ══════════════════════════════════════════════════════════
@@ -60,15 +89,21 @@ def flujo_crear_usuario():
 
 def flujo_seleccionar_usuario():
     titulo("🔑 SELECCIONAR USUARIO")
-    usuarios = tm.listar_usuarios()
-    if not usuarios:
+    if not tm.listar_usuarios(limite=1):
         print("\n  ⚠️  No hay usuarios registrados. Crea uno primero.")
         pausa()
         return False
 
+    busqueda = pedir("Buscar por nombre o correo (Enter para ver todos)")
+    usuarios = tm.listar_usuarios(busqueda=busqueda, limite=MAX_USUARIOS_LISTADO + 1)
     subtitulo("Usuarios disponibles")
-    for u in usuarios:
+    for u in usuarios[:MAX_USUARIOS_LISTADO]:
         print(f"     [{u.idUsuario}] {u.nombre} — {u.correo}")
+    if not usuarios:
+        print("     (sin coincidencias)")
+    elif len(usuarios) > MAX_USUARIOS_LISTADO:
+        print(f"     … se muestran los primeros {MAX_USUARIOS_LISTADO}; "
+              "refina la búsqueda para ver más")
 
     while True:
         try:
@@ -76,6 +111,7 @@ def flujo_seleccionar_usuario():
             usuario = tm.seleccionar_usuario(id_sel)
             if usuario:
                 print(f"\n  ✅ Usuario activo: {tm.usuario_activo.nombre}")
+                activar_recordatorios()
                 pausa()
                 return True
             else:
@@ -174,13 +210,8 @@ def flujo_crear_materia():
 
 def flujo_editar_materia():
     titulo("✏️  EDITAR MATERIA")
-    materias = tm.listar_usuarios()  # usamos seleccionar_materia via ID
     # Listar materias del usuario activo
-    from src.model.modelo import Materia
-    from src.model.declarative_base import Session
-    session = Session()
-    mis_materias = session.query(Materia).filter_by(usuario_id=tm.usuario_activo.idUsuario).all()
-    session.close()
+    mis_materias = tm.listar_materias()
 
     if not mis_materias:
         print("\n  ⚠️  No tienes materias creadas.")
@@ -213,11 +244,7 @@ def flujo_editar_materia():
 
 def flujo_eliminar_materia():
     titulo("🗑️  ELIMINAR MATERIA")
-    from src.model.modelo import Materia
-    from src.model.declarative_base import Session
-    session = Session()
-    mis_materias = session.query(Materia).filter_by(usuario_id=tm.usuario_activo.idUsuario).all()
-    session.close()
+    mis_materias = tm.listar_materias()
 
     if not mis_materias:
         print("\n  ⚠️  No tienes materias.")
@@ -246,22 +273,10 @@ def flujo_eliminar_materia():
 # ══════════════════════════════════════════════════════════
 
 def listar_mis_materias():
-    from src.model.modelo import Materia
-    from src.model.declarative_base import Session
-    session = Session()
-    materias = session.query(Materia).filter_by(usuario_id=tm.usuario_activo.idUsuario).all()
-    session.close()
-    return materias
+    return tm.listar_materias()
 
 def listar_mis_tareas():
-    from src.model.modelo import Tarea, Materia
-    from src.model.declarative_base import Session
-    session = Session()
-    tareas = session.query(Tarea).join(Materia).filter(
-        Materia.usuario_id == tm.usuario_activo.idUsuario
-    ).all()
-    session.close()
-    return tareas
+    return tm.listar_tareas()
 
 def flujo_crear_tarea():
     titulo("📝 CREAR TAREA")
@@ -309,13 +324,16 @@ def flujo_crear_tarea():
             except ValueError:
                 print("  ⚠️  Formato inválido. Usa YYYY-MM-DD")
 
+    esfuerzo = pedir("Horas de trabajo estimadas (opcional, ENTER para omitir)")
+
     try:
         tarea = tm.crear_tarea(
             titulo=titulo_tarea,
             descripcion=descripcion,
             prioridad=prioridad,
             fecha_entrega=fecha,
-            materia_id=id_m
+            materia_id=id_m,
+            esfuerzo=int(esfuerzo) if esfuerzo else None
         )
         print(f"\n  ✅ Tarea '{tarea.titulo}' creada")
         print(f"     Prioridad: {tarea.prioridad.value} | Entrega: {tarea.fechaEntrega} | Estado: {tarea.estado.value}")
@@ -326,6 +344,10 @@ def flujo_crear_tarea():
 def flujo_ver_tareas():
     titulo("📋 MIS TAREAS")
     tareas = listar_mis_tareas()
+    resumen = tm.resumen_usuario()
+    if resumen is not None and resumen.total:
+        print(f"\n  Total: {resumen.total} | Pendientes: {resumen.pendientes} "
+              f"| Completadas: {resumen.completadas}")
 
     if not tareas:
         print("\n  ⚠️  No tienes tareas creadas.")
@@ -347,6 +369,35 @@ def flujo_ver_tareas():
 
     pausa()
 
+def flujo_agenda():
+    titulo("📅 AGENDA")
+    agenda = tm.agenda()
+    grupos = [("⚠️  Vencidas", agenda.vencidas), ("📌 Hoy", agenda.hoy),
+              ("🗓️  Esta semana", agenda.semana), ("⏳ Más adelante", agenda.despues)]
+    if not any(tareas for _, tareas in grupos):
+        print("\n  ✅ No tienes tareas pendientes próximas.")
+        pausa()
+        return
+    for nombre, tareas in grupos:
+        if tareas:
+            subtitulo(nombre)
+            for t in tareas:
+                print(f"     [{t.idTarea}] {t.titulo} | {t.prioridad.value} | Entrega: {t.fechaEntrega}")
+    pausa()
+
+def flujo_siguientes():
+    titulo("🎯 ¿QUÉ HAGO AHORA?")
+    sugerencias = tm.siguientes(10)
+    if not sugerencias:
+        print("\n  ✅ No tienes tareas pendientes.")
+        pausa()
+        return
+    for i, s in enumerate(sugerencias, 1):
+        t = s.tarea
+        print(f"  {i:2}. [{t.idTarea}] {t.titulo} | {t.prioridad.value} "
+              f"| Entrega: {t.fechaEntrega} | Empezar: {s.inicio}")
+    pausa()
+
 def flujo_marcar_tarea():
     titulo("✅ MARCAR / DESMARCAR TAREA")
     tareas = listar_mis_tareas()
@@ -429,6 +480,8 @@ def menu_tareas():
         titulo("📝 GESTIÓN DE TAREAS")
         op = menu([
             "Ver mis tareas",
+            "Ver agenda (vencidas y próximas)",
+            "¿Qué hago ahora?",
             "Crear tarea",
             "Marcar / Desmarcar tarea",
             "Eliminar tarea",
@@ -437,12 +490,16 @@ def menu_tareas():
         if op == 1:
             flujo_ver_tareas()
         elif op == 2:
-            flujo_crear_tarea()
+            flujo_agenda()
         elif op == 3:
-            flujo_marcar_tarea()
+            flujo_siguientes()
         elif op == 4:
-            flujo_eliminar_tarea()
+            flujo_crear_tarea()
         elif op == 5:
+            flujo_marcar_tarea()
+        elif op == 6:
+            flujo_eliminar_tarea()
+        elif op == 7:
             break
 
 def menu_usuario():
@@ -504,7 +561,7 @@ def main():
 
     if op == 1:
         flujo_crear_usuario()
-        if tm.listar_usuarios():
+        if tm.listar_usuarios(limite=1):
             flujo_seleccionar_usuario()
     elif op == 2:
         exito = flujo_seleccionar_usuario()
@@ -515,7 +572,265 @@ def main():
         return
 
     if tm.usuario_activo:
-        menu_principal()
+        # Mientras el menú espera al usuario, la base de datos queda ociosa
+        reposo = mantenimiento.MantenimientoEnReposo()
+        reposo.iniciar()
+        try:
+            menu_principal()
+        finally:
+            reposo.cerrar()
+    if recordatorios is not None:
+        recordatorios.cerrar()
+
+# ══════════════════════════════════════════════════════════
+# COMANDOS (sin menú interactivo)
+# ══════════════════════════════════════════════════════════
+
+def usar_usuario(id_usuario: int):
+    """Selecciona el usuario de un comando; ValueError si no existe."""
+    if tm.seleccionar_usuario(id_usuario) is None:
+        raise ValueError(f"No existe el usuario {id_usuario}")
+
+def comando_importar(args) -> int:
+    usar_usuario(args.usuario)
+    resultado = tm.importar(args.archivo, formato=args.formato, tamano_lote=args.lote)
+    print(f"✅ {resultado.materias} materias y {resultado.tareas} tareas importadas "
+          f"de {resultado.registros} registros en {resultado.segundos:.1f} s "
+          f"({resultado.filas_por_segundo:.0f} registros/s)")
+    for error in resultado.errores:
+        print(f"  ❌ Línea {error.linea}: {error.mensaje}")
+    if resultado.total_errores > len(resultado.errores):
+        print(f"  … y {resultado.total_errores - len(resultado.errores)} errores más")
+    return 1 if resultado.total_errores else 0
+
+def comando_exportar(args) -> int:
+    usar_usuario(args.usuario)
+    resultado = tm.exportar(args.archivo, formato=args.formato,
+                            desde_id=args.desde, hasta_id=args.hasta)
+    print(f"✅ {resultado.materias} materias y {resultado.tareas} tareas exportadas "
+          f"en {resultado.segundos:.1f} s ({resultado.filas_por_segundo:.0f} registros/s)")
+    if resultado.ultimo_id is not None:
+        print(f"  Última tarea: {resultado.ultimo_id} "
+              f"(para continuar en otro archivo: --desde {resultado.ultimo_id})")
+    return 0
+
+def comando_calendario(args) -> int:
+    usar_usuario(args.usuario)
+    componente = "VEVENT" if args.eventos else "VTODO"
+    if args.completo:
+        resultado = tm.exportar_calendario(args.archivo, componente)
+    else:
+        resultado = tm.actualizar_calendario(args.archivo, componente)
+    if resultado.entradas is None:
+        print("✅ Calendario al día, sin cambios")
+    else:
+        print(f"✅ Calendario con {resultado.entradas} entregas "
+              f"({resultado.escritas} regeneradas) en {resultado.segundos:.2f} s")
+    return 0
+
+def comando_archivar(args) -> int:
+    usar_usuario(args.usuario)
+    try:
+        hasta = datetime.strptime(args.hasta, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("La fecha debe tener el formato AAAA-MM-DD") from None
+    resultado = tm.archivar(hasta, args.archivo)
+    print(f"✅ {resultado.tareas} tareas completadas archivadas "
+          f"en {resultado.segundos:.1f} s")
+    for ruta in resultado.archivos:
+        print(f"  → {ruta}")
+    if resultado.omitidas:
+        print(f"  ⚠️  {resultado.omitidas} tareas quedaron sin archivar "
+              "(su ID ya estaba en el archivo)")
+    return 0
+
+def mostrar_avance(copiadas: int, total: int):
+    print(f"\r  {copiadas}/{total} páginas ({copiadas * 100 // max(total, 1)}%)",
+          end="", flush=True)
+
+def comando_respaldar(args) -> int:
+    resultado = respaldo.respaldar(
+        args.archivo, generaciones=args.generaciones, paginas=args.paginas,
+        pausa=args.pausa / 1000, progreso=None if args.silencioso else mostrar_avance)
+    if not args.silencioso:
+        print()
+    print(f"✅ Respaldo verificado en {resultado.ruta}: {resultado.paginas} páginas "
+          f"en {resultado.pasos} pasos, {resultado.segundos:.2f} s"
+          + (f" ({resultado.reinicios} reinicios por escrituras)"
+             if resultado.reinicios else ""))
+    return 0
+
+def comando_restaurar(args) -> int:
+    resultado = respaldo.restaurar(args.archivo)
+    print(f"✅ Base de datos restaurada desde {resultado.ruta} "
+          f"({resultado.paginas} páginas, {resultado.segundos:.2f} s)")
+    return 0
+
+def mostrar_estado(estado: mantenimiento.Estado):
+    print(f"  Archivo: {estado.bytes_archivo / 2**20:.1f} MiB "
+          f"(+{estado.bytes_wal / 2**20:.1f} MiB de WAL), {estado.paginas} páginas")
+    print(f"  Libres : {estado.libres} páginas ({estado.fraccion_libre:.0%}), "
+          f"auto_vacuum {estado.auto_vacuum}")
+    analizada = estado.analizada.strftime("%d/%m/%Y %H:%M") if estado.analizada else "nunca"
+    print(f"  ANALYZE: {analizada} ({estado.cambios} filas modificadas desde entonces)")
+    if estado.auto_vacuum != "incremental" and estado.libres:
+        print("  ⚠️  Para recuperar el espacio libre por pasos: --convertir")
+
+def comando_mantenimiento(args) -> int:
+    if args.estado:
+        print("📊 Estado de la base de datos")
+        mostrar_estado(mantenimiento.estado())
+        return 0
+    if args.convertir:
+        resultado = mantenimiento.convertir()
+        print("✅ Base de datos en auto_vacuum incremental"
+              + (f" (VACUUM en {resultado.segundos:.1f} s)" if resultado.pasos else ""))
+    else:
+        resultado = mantenimiento.mantener(
+            forzar=args.forzar, presupuesto_s=args.presupuesto or None)
+        print(f"✅ {'ANALYZE' if resultado.analizada else 'PRAGMA optimize'}, "
+              f"{resultado.liberadas} páginas liberadas en {resultado.pasos} pasos, "
+              f"{resultado.segundos:.2f} s")
+    mostrar_estado(resultado.despues)
+    return 0
+
+def comando_lentas(args) -> int:
+    resumenes = consultas_lentas.resumir(args.archivo, limite=args.limite)
+    if not resumenes:
+        print("✅ El registro no tiene sentencias lentas")
+        return 0
+    print(f"🐢 Sentencias más lentas por tiempo total ({args.archivo})")
+    for posicion, r in enumerate(resumenes, 1):
+        print(f"\n  {posicion}. {r.total_ms:.0f} ms en {r.veces} veces "
+              f"(promedio {r.promedio_ms:.1f} ms, máx {r.maximo_ms:.1f} ms)")
+        print(f"     Origen: {', '.join(r.origenes)}")
+        print(f"     {r.sentencia[:300]}")
+        for linea in r.plan:
+            print(f"       {linea}")
+    return 0
+
+def crear_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="run.py",
+        description="Gestor de tareas académicas. Sin comando abre el menú interactivo.")
+    parser.add_argument("--stats", action="store_true",
+                        help="Al terminar muestra llamadas, latencias y sentencias SQL "
+                             "de cada operación")
+    parser.add_argument("--lentas", type=float, metavar="MS",
+                        help="Anota las sentencias SQL que tardan al menos MS "
+                             f"milisegundos en {consultas_lentas.RUTA_REGISTRO}")
+    comandos = parser.add_subparsers(dest="comando")
+
+    importar = comandos.add_parser(
+        "importar", help="Importa materias y tareas desde un archivo CSV o JSONL")
+    importar.add_argument("archivo", help="Ruta .csv, .jsonl o .ndjson (opcionalmente .gz)")
+    importar.add_argument("--usuario", type=int, required=True, help="ID del usuario")
+    importar.add_argument("--formato", choices=("csv", "jsonl"),
+                          help="Formato del archivo (por defecto, según la extensión)")
+    importar.add_argument("--lote", type=int, default=1000,
+                          help="Registros por transacción (por defecto 1000)")
+    importar.set_defaults(funcion=comando_importar)
+
+    exportar = comandos.add_parser(
+        "exportar", help="Exporta las materias y tareas a un archivo CSV o JSONL")
+    exportar.add_argument("archivo", help="Ruta .csv, .jsonl o .ndjson (con .gz, comprimido)")
+    exportar.add_argument("--usuario", type=int, required=True, help="ID del usuario")
+    exportar.add_argument("--formato", choices=("csv", "jsonl"),
+                          help="Formato del archivo (por defecto, según la extensión)")
+    exportar.add_argument("--desde", type=int,
+                          help="Solo tareas con ID mayor (sin materias); para continuar")
+    exportar.add_argument("--hasta", type=int, help="Solo tareas con ID menor o igual")
+    exportar.set_defaults(funcion=comando_exportar)
+
+    calendario = comandos.add_parser(
+        "calendario", help="Genera o actualiza un calendario .ics con las entregas pendientes")
+    calendario.add_argument("archivo", help="Ruta del archivo .ics")
+    calendario.add_argument("--usuario", type=int, required=True, help="ID del usuario")
+    calendario.add_argument("--eventos", action="store_true",
+                            help="Entregas como eventos (VEVENT) en lugar de tareas (VTODO)")
+    calendario.add_argument("--completo", action="store_true",
+                            help="Regenera todo el archivo en lugar de solo lo que cambió")
+    calendario.set_defaults(funcion=comando_calendario)
+
+    archivar = comandos.add_parser(
+        "archivar", help="Mueve las tareas completadas antiguas a un archivo aparte")
+    archivar.add_argument("archivo",
+                          help="Ruta del archivo; con {periodo}, uno por semestre "
+                               "(p. ej. archivo/{periodo}.sqlite)")
+    archivar.add_argument("--usuario", type=int, required=True, help="ID del usuario")
+    archivar.add_argument("--hasta", required=True,
+                          help="Archiva las entregas anteriores a esta fecha (AAAA-MM-DD)")
+    archivar.set_defaults(funcion=comando_archivar)
+
+    respaldar = comandos.add_parser(
+        "respaldar", help="Respalda la base de datos (se puede usar mientras está en uso)")
+    respaldar.add_argument("archivo", help="Ruta del respaldo; el anterior pasa a .1, .2, …")
+    respaldar.add_argument("--generaciones", type=int, default=respaldo.GENERACIONES,
+                           help=f"Respaldos conservados (por defecto {respaldo.GENERACIONES})")
+    respaldar.add_argument("--paginas", type=int, default=respaldo.PAGINAS_POR_PASO,
+                           help="Páginas copiadas por paso "
+                                f"(por defecto {respaldo.PAGINAS_POR_PASO}; 0, todo junto)")
+    respaldar.add_argument("--pausa", type=float, default=respaldo.PAUSA_ENTRE_PASOS * 1000,
+                           help="Milisegundos de pausa entre pasos "
+                                f"(por defecto {respaldo.PAUSA_ENTRE_PASOS * 1000:g})")
+    respaldar.add_argument("--silencioso", action="store_true", help="No muestra el avance")
+    respaldar.set_defaults(funcion=comando_respaldar)
+
+    restaurar = comandos.add_parser(
+        "restaurar", help="Reemplaza la base de datos por un respaldo verificado")
+    restaurar.add_argument("archivo", help="Ruta del respaldo")
+    restaurar.set_defaults(funcion=comando_restaurar)
+
+    mantener = comandos.add_parser(
+        "mantenimiento",
+        help="Actualiza las estadísticas y recupera el espacio libre de la base de datos")
+    mantener.add_argument("--estado", action="store_true",
+                          help="Solo muestra el tamaño y el espacio libre")
+    mantener.add_argument("--forzar", action="store_true",
+                          help="Analiza y recupera todo aunque no se alcancen los umbrales")
+    mantener.add_argument("--presupuesto", type=float, default=0,
+                          help="Segundos máximos recuperando espacio (por defecto, sin límite)")
+    mantener.add_argument("--convertir", action="store_true",
+                          help="Pasa una base de datos existente a auto_vacuum incremental "
+                               "(VACUUM completo)")
+    mantener.set_defaults(funcion=comando_mantenimiento)
+
+    lentas = comandos.add_parser(
+        "lentas", help="Resume el registro de consultas lentas por tiempo total")
+    lentas.add_argument("archivo", nargs="?", default=consultas_lentas.RUTA_REGISTRO,
+                        help="Registro a resumir (por defecto, el de --lentas)")
+    lentas.add_argument("--limite", type=int, default=10,
+                        help="Sentencias mostradas (por defecto 10)")
+    lentas.set_defaults(funcion=comando_lentas)
+    return parser
+
+def mostrar_stats():
+    titulo("📊 ESTADÍSTICAS DE LA SESIÓN")
+    print(instrumentacion.reporte())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = crear_parser().parse_args()
+    try:
+        if args.lentas is not None:
+            consultas_lentas.RegistroConsultasLentas(umbral_ms=args.lentas).activar()
+        else:
+            consultas_lentas.desde_entorno()
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(2)
+    if args.stats:
+        instrumentacion.activar()
+    codigo = 0
+    try:
+        if args.comando is None:
+            main()
+        else:
+            try:
+                codigo = args.funcion(args)
+            except ValueError as e:
+                print(f"❌ Error: {e}")
+                codigo = 2
+    finally:
+        if args.stats:
+            mostrar_stats()
+    sys.exit(codigo)
\ No newline at end of file
@@ -0,0 +1,273 @@
+"""
+archivo.py
+==========
+Archivo de tareas completadas antiguas para TaskManager.archivar,
+TaskManager.historial y TaskManager.restaurar_archivada, en el proyecto
+TaskMaster Student.
+
+Las tareas archivadas se mueven a otro archivo SQLite (uno solo, o uno
+por período si la ruta contiene "{periodo}", p. ej.
+"archivo/{periodo}.sqlite" → archivo/2025-2.sqlite). Así la tabla
+`tareas` y sus índices solo contienen los datos en uso, y los listados
+habituales no cambian: nunca leen el archivo.
+
+Tabla tareas_archivadas (en cada archivo):
+
+    idTarea, titulo, descripcion, prioridad, fechaEntrega, estado,
+    materia_id, version, recurrencia_id, esfuerzo
+                Como en `tareas` (mismos códigos de enumeración y fechas
+                ISO), conservando el ID original.
+    materia, usuario_id
+                Nombre de la materia y dueño, para consultar el archivo
+                aunque la materia ya no exista.
+    archivada   Fecha en que se archivó.
+    confirmada  1 cuando la tarea ya se quitó de `tareas`.
+
+Con la base principal en modo WAL, SQLite no garantiza que una
+transacción sobre varios archivos adjuntos sea atómica en conjunto, así
+que el traslado se hace en tres transacciones de un solo archivo cada
+una: copiar (sin confirmar), borrar de `tareas` las filas cuya versión
+sigue siendo la copiada y confirmar las borradas. Si el proceso se
+interrumpe a la mitad, la siguiente llamada termina el traslado; en
+ningún caso se pierde una tarea (a lo sumo, queda en los dos lados).
+
+Para consultar el archivo se adjunta con ATTACH y se crea la vista
+temporal tareas_historicas (tareas en uso UNION ALL las archivadas),
+solo mientras dura la consulta.
+"""
+
+import os
+from contextlib import contextmanager
+from datetime import date
+from typing import NamedTuple
+from src.model.modelo import EstadoTarea, Prioridad, Tarea
+
+TABLA_ARCHIVO = "tareas_archivadas"
+VISTA_HISTORIAL = "tareas_historicas"
+
+# Marca de la ruta que se reemplaza por el período de cada tarea
+MARCA_PERIODO = "{periodo}"
+
+_PRIORIDADES = Tarea.__table__.c.prioridad.type.miembros
+_ESTADOS = Tarea.__table__.c.estado.type.miembros
+COMPLETADA = Tarea.__table__.c.estado.type.codigo(EstadoTarea.Completada)
+
+_COLUMNAS = ('"idTarea", titulo, descripcion, prioridad, "fechaEntrega", estado, '
+             'materia_id, version, recurrencia_id, esfuerzo')
+
+
+class ResultadoArchivo(NamedTuple):
+    """
+    Resumen de TaskManager.archivar.
+
+    Atributos:
+        tareas    (int):       Tareas trasladadas al archivo.
+        archivos  (list[str]): Archivos que recibieron tareas.
+        omitidas  (int):       Tareas que quedaron en uso porque su ID ya
+                               estaba en el archivo (un ID reutilizado).
+        segundos  (float):     Duración.
+    """
+    tareas: int
+    archivos: list
+    omitidas: int
+    segundos: float
+
+
+class FilaHistorial(NamedTuple):
+    """Una tarea de TaskManager.historial, en uso o archivada."""
+    idTarea: int
+    titulo: str
+    prioridad: Prioridad
+    fechaEntrega: date
+    estado: EstadoTarea
+    materia_id: int
+    materia: str
+    archivada: bool
+
+
+def periodo(fecha: date) -> str:
+    """Semestre de una fecha: "2025-1" (enero a junio) o "2025-2"."""
+    return f"{fecha.year}-{1 if fecha.month <= 6 else 2}"
+
+
+def limites_periodo(nombre: str) -> tuple:
+    """(inicio, fin) del semestre `nombre`; el fin no está incluido."""
+    anio, semestre = (int(parte) for parte in nombre.split("-"))
+    if semestre == 1:
+        return date(anio, 1, 1), date(anio, 7, 1)
+    return date(anio, 7, 1), date(anio + 1, 1, 1)
+
+
+# Período de una fecha en SQL (debe coincidir con periodo)
+PERIODO_SQL = ("strftime('%Y', t.\"fechaEntrega\") || '-' || "
+               "(CASE WHEN strftime('%m', t.\"fechaEntrega\") <= '06' THEN 1 ELSE 2 END)")
+
+
+def sentencias_esquema(esquema: str) -> list:
+    """DDL de la tabla de archivo dentro del esquema adjunto `esquema`."""
+    return [
+        f"""CREATE TABLE IF NOT EXISTS {esquema}.{TABLA_ARCHIVO} (
+            "idTarea" INTEGER PRIMARY KEY,
+            titulo VARCHAR(100) NOT NULL,
+            descripcion VARCHAR(500),
+            prioridad INTEGER NOT NULL,
+            "fechaEntrega" DATE NOT NULL,
+            estado INTEGER NOT NULL,
+            materia_id INTEGER NOT NULL,
+            materia VARCHAR(50) NOT NULL,
+            usuario_id INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            recurrencia_id INTEGER,
+            esfuerzo SMALLINT,
+            archivada DATE NOT NULL,
+            confirmada INTEGER NOT NULL DEFAULT 0)""",
+        f'CREATE INDEX IF NOT EXISTS {esquema}.ix_{TABLA_ARCHIVO}_usuario '
+        f'ON {TABLA_ARCHIVO} (usuario_id, "fechaEntrega")',
+        f'CREATE INDEX IF NOT EXISTS {esquema}.ix_{TABLA_ARCHIVO}_sin_confirmar '
+        f'ON {TABLA_ARCHIVO} (usuario_id) WHERE confirmada = 0',
+    ]
+
+
+def sentencia_copiar(esquema: str) -> str:
+    """
+    Copia (sin confirmar) las tareas completadas del usuario (:usuario_id)
+    con entrega en [:desde, :hasta); las de ID ya archivado se omiten.
+    """
+    return f"""
+        INSERT OR IGNORE INTO {esquema}.{TABLA_ARCHIVO} ({_COLUMNAS}, materia, usuario_id,
+                                                 archivada, confirmada)
+        SELECT {', '.join(f't.{c.strip()}' for c in _COLUMNAS.split(','))},
+               m.nombre, m.usuario_id, :hoy, 0
+        FROM main.tareas t JOIN main.materias m ON m."idMateria" = t.materia_id
+        WHERE m.usuario_id = :usuario_id AND t.estado = {COMPLETADA}
+          AND t."fechaEntrega" >= :desde AND t."fechaEntrega" < :hasta"""
+
+
+def sentencia_contar() -> str:
+    """Tareas completadas del usuario (:usuario_id) con entrega en [:desde, :hasta)."""
+    return f"""
+        SELECT COUNT(*)
+        FROM main.tareas t JOIN main.materias m ON m."idMateria" = t.materia_id
+        WHERE m.usuario_id = :usuario_id AND t.estado = {COMPLETADA}
+          AND t."fechaEntrega" >= :desde AND t."fechaEntrega" < :hasta"""
+
+
+def sentencia_candidatas() -> str:
+    """Tareas a archivar del usuario (:usuario_id) antes de :hasta, por período."""
+    return f"""
+        SELECT {PERIODO_SQL}, COUNT(*)
+        FROM main.tareas t JOIN main.materias m ON m."idMateria" = t.materia_id
+        WHERE m.usuario_id = :usuario_id AND t.estado = {COMPLETADA}
+          AND t."fechaEntrega" < :hasta
+        GROUP BY 1"""
+
+
+def sentencia_borrar(esquema: str) -> str:
+    """
+    Borra de `tareas` las copiadas sin confirmar del usuario que no
+    cambiaron desde la copia, y retorna sus IDs.
+    """
+    return f"""
+        DELETE FROM main.tareas
+        WHERE "idTarea" IN (SELECT "idTarea" FROM {esquema}.{TABLA_ARCHIVO}
+                            WHERE usuario_id = :usuario_id AND confirmada = 0)
+          AND EXISTS (SELECT 1 FROM {esquema}.{TABLA_ARCHIVO} a
+                      WHERE a."idTarea" = tareas."idTarea" AND a.version = tareas.version
+                        AND a."fechaEntrega" = tareas."fechaEntrega")
+        RETURNING "idTarea\""""
+
+
+def sentencias_confirmar(esquema: str) -> tuple:
+    """
+    (confirmar_una, confirmar_todas, descartar): confirma una tarea
+    borrada de `tareas` (por "idTarea"), confirma todas las sin confirmar
+    del usuario (:usuario_id) o descarta las sin confirmar del usuario.
+    """
+    tabla = f"{esquema}.{TABLA_ARCHIVO}"
+    return (f'UPDATE {tabla} SET confirmada = 1 WHERE "idTarea" = ? AND confirmada = 0',
+            f"UPDATE {tabla} SET confirmada = 1 "
+            f"WHERE usuario_id = :usuario_id AND confirmada = 0",
+            f"DELETE FROM {tabla} WHERE usuario_id = :usuario_id AND confirmada = 0")
+
+
+def ruta_de_periodo(ruta: str, nombre: str) -> str:
+    """Reemplaza la marca {periodo} de la ruta por el período `nombre`."""
+    return ruta.replace(MARCA_PERIODO, nombre)
+
+
+@contextmanager
+def adjuntar(conexion, rutas: list, crear: bool = False, vista: bool = False):
+    """
+    Adjunta los archivos a una conexión sqlite3 (fuera de transacción) como
+    archivo_0, archivo_1, …, y los separa al salir.
+
+    Args:
+        conexion: Conexión sqlite3 (isolation_level None).
+        rutas (list[str]): Archivos a adjuntar.
+        crear (bool): Si es True, crea los archivos y la tabla que falten;
+            si es False, un archivo inexistente lanza ValueError.
+        vista (bool): Si es True, crea la vista temporal VISTA con las
+            tareas en uso y las archivadas confirmadas de todos los
+            archivos.
+
+    Yields:
+        list[str]: Nombres de los esquemas adjuntos, en el orden de rutas.
+    """
+    esquemas = []
+    try:
+        for ruta in rutas:
+            if not crear and not os.path.isfile(ruta):
+                raise ValueError(f"No existe el archivo {ruta}")
+            esquema = f"archivo_{len(esquemas)}"
+            conexion.execute(f"ATTACH DATABASE ? AS {esquema}", (ruta,))
+            esquemas.append(esquema)
+            if crear:
+                for sentencia in sentencias_esquema(esquema):
+                    conexion.execute(sentencia)
+            elif not conexion.execute(
+                    f"SELECT 1 FROM {esquema}.sqlite_schema WHERE name = ?",
+                    (TABLA_ARCHIVO,)).fetchone():
+                raise ValueError(f"{ruta} no es un archivo de tareas")
+        if vista:
+            partes = ['SELECT t."idTarea", t.titulo, t.prioridad, t."fechaEntrega", '
+                      't.estado, t.materia_id, m.nombre AS materia, m.usuario_id, '
+                      '0 AS archivada FROM main.tareas t '
+                      'JOIN main.materias m ON m."idMateria" = t.materia_id']
+            partes += [f'SELECT "idTarea", titulo, prioridad, "fechaEntrega", estado, '
+                       f'materia_id, materia, usuario_id, 1 FROM {esquema}.{TABLA_ARCHIVO} '
+                       f'WHERE confirmada = 1' for esquema in esquemas]
+            conexion.execute(f"CREATE TEMP VIEW {VISTA_HISTORIAL} AS " + " UNION ALL ".join(partes))
+        yield esquemas
+    finally:
+        conexion.execute(f"DROP VIEW IF EXISTS temp.{VISTA_HISTORIAL}")
+        for esquema in esquemas:
+            conexion.execute(f"DETACH DATABASE {esquema}")
+
+
+def fila_historial(fila: tuple) -> FilaHistorial:
+    """Convierte una fila de la vista (códigos y fecha ISO) en FilaHistorial."""
+    id_tarea, titulo, prioridad, fecha, estado, materia_id, materia, archivada = fila
+    return FilaHistorial(id_tarea, titulo, _PRIORIDADES[prioridad],
+                         date.fromisoformat(fecha), _ESTADOS[estado], materia_id,
+                         materia, bool(archivada))
+
+
+def leer_archivada(conexion, id_tarea: int):
+    """
+    Lee una tarea archivada y confirmada de una conexión al archivo.
+
+    Returns:
+        Optional[dict]: Columnas de la tarea (prioridad, estado y fecha ya
+                        convertidas) más usuario_id, o None si no está.
+    """
+    fila = conexion.execute(
+        f"SELECT {_COLUMNAS}, usuario_id FROM {TABLA_ARCHIVO} "
+        f'WHERE "idTarea" = ? AND confirmada = 1', (id_tarea,)).fetchone()
+    if fila is None:
+        return None
+    nombres = [c.strip().strip('"') for c in _COLUMNAS.split(",")] + ["usuario_id"]
+    datos = dict(zip(nombres, fila))
+    datos["prioridad"] = _PRIORIDADES[datos["prioridad"]]
+    datos["estado"] = _ESTADOS[datos["estado"]]
+    datos["fechaEntrega"] = date.fromisoformat(datos["fechaEntrega"])
+    return datos
@@ -0,0 +1,339 @@
+"""
+cache.py
+========
+Cachés en memoria acotadas (LRU) para el proyecto TaskMaster Student:
+
+    - CacheLRU: entidades por clave, con expiración por tiempo (TTL).
+    - CacheResultados: resultados de listados y conteos por usuario,
+      validados contra una versión de datos por usuario.
+
+TaskManager la usa para no repetir consultas de materias y tareas que la
+interfaz resuelve una y otra vez (nombre y color de la materia de cada
+tarjeta, listas de materias en cada flujo de la consola). La caché no
+conoce la base de datos: quien la usa decide qué claves invalidar tras
+cada escritura.
+
+Los valores guardados son objetos ORM desvinculados de su sesión (o
+tuplas de ellos) y se comparten entre llamadas, por lo que deben tratarse
+como de solo lectura.
+
+Uso típico:
+    from src.logic.cache import CacheLRU
+
+    cache = CacheLRU(capacidad=256, ttl_s=60)
+    encontrado, valor = cache.obtener(("materia", 3))
+    if not encontrado:
+        valor = consultar_materia(3)
+        cache.guardar(("materia", 3), valor)
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from itertools import count
+from typing import Callable, Hashable, Optional
+from src.logic.metricas import metricas
+
+
+class CacheLRU:
+    """
+    Diccionario acotado que descarta la entrada menos usada recientemente.
+
+    Atributos:
+        capacidad (int):             Máximo de entradas almacenadas.
+        ttl_s     (Optional[float]): Segundos de vida de cada entrada; None
+                                     si las entradas no expiran.
+        aciertos  (int):             Consultas resueltas desde la caché.
+        fallos    (int):             Consultas no encontradas o expiradas.
+    """
+
+    def __init__(
+        self,
+        capacidad: int = 512,
+        ttl_s: Optional[float] = 60.0,
+        nombre: str = "cache",
+        reloj: Callable[[], float] = time.monotonic
+    ):
+        """
+        Crea una caché vacía.
+
+        Args:
+            capacidad (int):             Máximo de entradas (>= 1).
+            ttl_s     (Optional[float]): Tiempo de vida en segundos (> 0),
+                                         o None para no expirar.
+            nombre    (str):             Prefijo de las métricas
+                                         "<nombre>.aciertos" y "<nombre>.fallos".
+            reloj     (Callable):        Fuente de tiempo (inyectable en pruebas).
+
+        Raises:
+            ValueError: Si capacidad < 1 o ttl_s <= 0.
+        """
+        if capacidad < 1:
+            raise ValueError("La capacidad de la caché debe ser al menos 1")
+        if ttl_s is not None and ttl_s <= 0:
+            raise ValueError("El TTL de la caché debe ser mayor a 0")
+        self.capacidad = capacidad
+        self.ttl_s = ttl_s
+        self.nombre = nombre
+        self.aciertos = 0
+        self.fallos = 0
+        self._reloj = reloj
+        self._entradas: OrderedDict = OrderedDict()  # clave -> (vence, valor)
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: Hashable) -> tuple:
+        """
+        Busca una clave y la marca como usada recientemente.
+
+        Args:
+            clave (Hashable): Clave a buscar.
+
+        Returns:
+            tuple: (True, valor) si la clave está vigente, o (False, None)
+                   si no existe o expiró.
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and (entrada[0] is None
+                                        or entrada[0] > self._reloj()):
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                encontrado = True
+            else:
+                if entrada is not None:
+                    del self._entradas[clave]
+                self.fallos += 1
+                encontrado = False
+        metricas.incrementar(f"{self.nombre}.{'aciertos' if encontrado else 'fallos'}")
+        return (True, entrada[1]) if encontrado else (False, None)
+
+    def guardar(self, clave: Hashable, valor):
+        """
+        Guarda un valor, descartando la entrada más antigua si no hay lugar.
+
+        Args:
+            clave (Hashable): Clave del valor.
+            valor:            Valor a guardar.
+        """
+        vence = None if self.ttl_s is None else self._reloj() + self.ttl_s
+        with self._lock:
+            self._entradas[clave] = (vence, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, *claves: Hashable):
+        """Elimina las claves indicadas (las inexistentes se ignoran)."""
+        with self._lock:
+            for clave in claves:
+                self._entradas.pop(clave, None)
+
+    def invalidar_si(self, predicado: Callable) -> int:
+        """
+        Elimina las entradas para las que predicado(clave, valor) es True.
+
+        Args:
+            predicado (Callable): Función (clave, valor) -> bool.
+
+        Returns:
+            int: Número de entradas eliminadas.
+        """
+        with self._lock:
+            claves = [c for c, (_, v) in self._entradas.items() if predicado(c, v)]
+            for clave in claves:
+                del self._entradas[clave]
+        return len(claves)
+
+    def limpiar(self):
+        """Elimina todas las entradas (los contadores se conservan)."""
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna los contadores de uso de la caché.
+
+        Returns:
+            dict: {"entradas", "capacidad", "aciertos", "fallos", "tasa_aciertos"}.
+        """
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "capacidad": self.capacidad,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entradas)
+
+
+def _tamano_aproximado(valor) -> int:
+    """
+    Estima los bytes que ocupa un resultado: el contenedor, sus elementos
+    y los atributos de cada elemento (un nivel).
+    """
+    tamano = sys.getsizeof(valor)
+    if isinstance(valor, (list, tuple)):
+        for item in valor:
+            tamano += sys.getsizeof(item)
+            campos = item if isinstance(item, tuple) else getattr(item, "__dict__", {}).values()
+            tamano += sum(sys.getsizeof(c) for c in campos)
+    return tamano
+
+
+class CacheResultados:
+    """
+    Caché de resultados de consultas validada por versión de datos.
+
+    Cada usuario (o None para datos globales, como el directorio de
+    usuarios) tiene una versión que crece con cada cambio de sus datos.
+    Cada entrada guarda la versión con la que se calculó: un acierto solo
+    compara esa versión con la actual, sin TTL ni invalidación por clave.
+    Las entradas viejas se descartan al consultarlas o por LRU. Quien
+    incrementa las versiones decide cuánto cuesta mantenerlas al día (en
+    TaskManager, una consulta PRAGMA data_version antes de cada lectura).
+
+    Atributos:
+        capacidad (int): Máximo de entradas.
+        max_bytes (int): Máximo de bytes estimados entre todas las entradas.
+        bytes     (int): Bytes estimados ocupados actualmente.
+        aciertos  (int): Consultas resueltas desde la caché.
+        fallos    (int): Consultas no encontradas o desactualizadas.
+    """
+
+    def __init__(
+        self,
+        capacidad: int = 256,
+        max_bytes: int = 4 * 1024 * 1024,
+        nombre: str = "cache.resultados"
+    ):
+        """
+        Crea una caché vacía.
+
+        Args:
+            capacidad (int): Máximo de entradas (>= 1).
+            max_bytes (int): Máximo de bytes estimados (>= 1).
+            nombre    (str): Prefijo de las métricas "<nombre>.aciertos" y
+                             "<nombre>.fallos".
+
+        Raises:
+            ValueError: Si capacidad o max_bytes son menores a 1.
+        """
+        if capacidad < 1:
+            raise ValueError("La capacidad de la caché debe ser al menos 1")
+        if max_bytes < 1:
+            raise ValueError("El tamaño máximo de la caché debe ser al menos 1 byte")
+        self.capacidad = capacidad
+        self.max_bytes = max_bytes
+        self.nombre = nombre
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        # (usuario_id, clave) -> (version, valor, bytes)
+        self._entradas: OrderedDict = OrderedDict()
+        self._versiones: dict = {}   # usuario_id -> versión
+        self._contador = count(1)
+        self._version_base = 0       # versión de los usuarios sin entrada
+        self._lock = threading.Lock()
+
+    def version(self, usuario_id: Optional[int]) -> int:
+        """Retorna la versión actual de los datos de un usuario."""
+        return self._versiones.get(usuario_id, self._version_base)
+
+    def invalidar_usuarios(self, *usuarios: Optional[int]):
+        """Incrementa la versión de los usuarios indicados."""
+        with self._lock:
+            for usuario_id in usuarios:
+                self._versiones[usuario_id] = next(self._contador)
+
+    def invalidar_todo(self):
+        """Incrementa la versión de todos los usuarios."""
+        with self._lock:
+            self._versiones.clear()
+            self._version_base = next(self._contador)
+
+    def obtener(self, usuario_id: Optional[int], clave: Hashable) -> tuple:
+        """
+        Busca un resultado vigente.
+
+        Args:
+            usuario_id (Optional[int]): Dueño de los datos consultados.
+            clave      (Hashable):      Consulta y filtros normalizados.
+
+        Returns:
+            tuple: (True, valor) si hay un resultado calculado con la
+                   versión actual, o (False, None).
+        """
+        with self._lock:
+            entrada = self._entradas.get((usuario_id, clave))
+            if entrada is not None and entrada[0] == self._versiones.get(
+                    usuario_id, self._version_base):
+                self._entradas.move_to_end((usuario_id, clave))
+                self.aciertos += 1
+                encontrado = True
+            else:
+                if entrada is not None:
+                    del self._entradas[(usuario_id, clave)]
+                    self.bytes -= entrada[2]
+                self.fallos += 1
+                encontrado = False
+        metricas.incrementar(f"{self.nombre}.{'aciertos' if encontrado else 'fallos'}")
+        return (True, entrada[1]) if encontrado else (False, None)
+
+    def guardar(self, usuario_id: Optional[int], clave: Hashable, valor, version: int):
+        """
+        Guarda un resultado calculado con la versión `version`.
+
+        La versión debe leerse con version() antes de calcular: si los
+        datos cambiaron mientras tanto, el resultado no se guarda.
+
+        Args:
+            usuario_id (Optional[int]): Dueño de los datos consultados.
+            clave      (Hashable):      Consulta y filtros normalizados.
+            valor:                      Resultado (inmutable).
+            version    (int):           Versión leída antes de calcular.
+        """
+        tamano = _tamano_aproximado(valor)
+        if tamano > self.max_bytes:
+            return
+        with self._lock:
+            if version != self._versiones.get(usuario_id, self._version_base):
+                return
+            anterior = self._entradas.pop((usuario_id, clave), None)
+            if anterior is not None:
+                self.bytes -= anterior[2]
+            self._entradas[(usuario_id, clave)] = (version, valor, tamano)
+            self.bytes += tamano
+            while (len(self._entradas) > self.capacidad
+                   or self.bytes > self.max_bytes):
+                _, (_, _, liberado) = self._entradas.popitem(last=False)
+                self.bytes -= liberado
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna los contadores de uso y memoria de la caché.
+
+        Returns:
+            dict: {"entradas", "capacidad", "bytes", "max_bytes",
+                   "aciertos", "fallos", "tasa_aciertos"}.
+        """
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "capacidad": self.capacidad,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entradas)
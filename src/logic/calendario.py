@@ -0,0 +1,257 @@
+"""
+calendario.py
+=============
+Calendario iCalendar (RFC 5545) con las entregas pendientes de un usuario
+para TaskManager.exportar_calendario y TaskManager.actualizar_calendario,
+en el proyecto TaskMaster Student.
+
+Cada tarea pendiente es un VTODO (con DUE) o un VEVENT de día completo,
+con:
+
+    UID         tarea-<idTarea>@taskmaster-student (estable: la aplicación
+                de calendario reconoce la misma tarea entre descargas)
+    SUMMARY     Título.
+    CATEGORIES  Nombre de la materia.
+    PRIORITY    1 (Alta), 5 (Media) o 9 (Baja).
+    SEQUENCE    Versión de la tarea (cambia con cada edición).
+
+La cabecera lleva propiedades propias: X-TASKMASTER-USUARIO,
+X-TASKMASTER-COMPONENTE y X-TASKMASTER-SEQ (el último número de
+registro_cambios que el archivo refleja). actualizar_calendario las usa
+para reescribir solo las entradas de las tareas (o materias) que
+cambiaron desde entonces y copiar las demás tal como están.
+"""
+
+import os
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from sqlalchemy import bindparam, func, select
+from src.model.modelo import Materia, Prioridad, RegistroCambio, Tarea, TAREA_PENDIENTE
+
+COMPONENTES = ("VTODO", "VEVENT")
+
+PRODID = "-//TaskMaster Student//Entregas//ES"
+
+PRIORIDAD_ICAL = {Prioridad.Alta: 1, Prioridad.Media: 5, Prioridad.Baja: 9}
+
+# Propiedades de la cabecera con el usuario, el tipo de entrada y el
+# último cambio reflejado
+MARCA_USUARIO = "X-TASKMASTER-USUARIO"
+MARCA_COMPONENTE = "X-TASKMASTER-COMPONENTE"
+MARCA_SEQ = "X-TASKMASTER-SEQ"
+
+# Largo máximo de una línea en octetos, sin el CRLF (RFC 5545, 3.1)
+LARGO_LINEA = 75
+
+
+class ResultadoCalendario(NamedTuple):
+    """
+    Resumen de TaskManager.exportar_calendario / actualizar_calendario.
+
+    Atributos:
+        entradas  (Optional[int]): Tareas en el calendario; None si no
+                           hubo cambios y el archivo no se tocó.
+        escritas  (int):   Entradas generadas desde la base de datos (el
+                           resto se copió del archivo anterior).
+        completo  (bool):  Si se regeneró todo el calendario.
+        seq       (int):   Último cambio reflejado (X-TASKMASTER-SEQ).
+        segundos  (float): Duración.
+    """
+    entradas: int
+    escritas: int
+    completo: bool
+    seq: int
+    segundos: float
+
+
+def uid(id_tarea: int) -> str:
+    """UID estable de la entrada de una tarea."""
+    return f"tarea-{id_tarea}@taskmaster-student"
+
+
+def escapar(texto: str) -> str:
+    """Escapa un valor TEXT: barra invertida, ';', ',' y saltos de línea."""
+    return (texto.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+                 .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def plegar(linea: str) -> str:
+    """
+    Retorna la línea terminada en CRLF, partida cada LARGO_LINEA octetos
+    (las continuaciones empiezan con un espacio) sin cortar caracteres
+    UTF-8.
+    """
+    if len(linea) * 4 <= LARGO_LINEA:
+        return linea + "\r\n"
+    datos = linea.encode("utf-8")
+    if len(datos) <= LARGO_LINEA:
+        return linea + "\r\n"
+    partes = []
+    inicio, limite = 0, LARGO_LINEA
+    while inicio < len(datos):
+        fin = min(inicio + limite, len(datos))
+        while fin < len(datos) and datos[fin] & 0xC0 == 0x80:
+            fin -= 1
+        partes.append(datos[inicio:fin].decode("utf-8"))
+        inicio, limite = fin, LARGO_LINEA - 1
+    return "\r\n ".join(partes) + "\r\n"
+
+
+def marca_de_tiempo(momento: Optional[datetime] = None) -> str:
+    """Fecha y hora UTC en formato iCalendar (DTSTAMP)."""
+    momento = momento or datetime.now(timezone.utc)
+    return momento.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def cabecera(nombre: str, usuario_id: int, componente: str, seq: int) -> str:
+    """Comienzo del VCALENDAR, con las marcas de actualizar_calendario."""
+    return "".join(plegar(linea) for linea in (
+        "BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{escapar(nombre)}", f"{MARCA_USUARIO}:{usuario_id}",
+        f"{MARCA_COMPONENTE}:{componente}", f"{MARCA_SEQ}:{seq}"))
+
+
+PIE = "END:VCALENDAR\r\n"
+
+
+def entrada(componente: str, dtstamp: str, id_tarea: int, titulo: str,
+            prioridad: Prioridad, fecha_entrega: date, version: int,
+            materia: str) -> str:
+    """Texto de un VTODO o VEVENT (de día completo) para una tarea."""
+    dia = fecha_entrega.strftime("%Y%m%d")
+    if componente == "VTODO":
+        fechas = (f"DUE;VALUE=DATE:{dia}", "STATUS:NEEDS-ACTION")
+    else:
+        fechas = (f"DTSTART;VALUE=DATE:{dia}",
+                  f"DTEND;VALUE=DATE:{(fecha_entrega + timedelta(days=1)):%Y%m%d}",
+                  "TRANSP:TRANSPARENT")
+    return "".join(plegar(linea) for linea in (
+        f"BEGIN:{componente}", f"UID:{uid(id_tarea)}", f"DTSTAMP:{dtstamp}",
+        f"SUMMARY:{escapar(titulo)}", f"CATEGORIES:{escapar(materia)}",
+        f"PRIORITY:{PRIORIDAD_ICAL[prioridad]}", f"SEQUENCE:{version - 1}",
+        *fechas, f"END:{componente}"))
+
+
+def leer_marcas(archivo) -> Optional[tuple]:
+    """
+    Lee la cabecera de un calendario generado por este módulo.
+
+    Returns:
+        Optional[tuple]: (usuario_id, componente, seq), o None si el
+                         archivo no tiene las marcas (no lo generó este
+                         módulo).
+    """
+    marcas = {}
+    for linea in archivo:
+        clave, _, valor = linea.rstrip("\r\n").partition(":")
+        if clave in (MARCA_USUARIO, MARCA_COMPONENTE, MARCA_SEQ):
+            marcas[clave] = valor
+        elif clave in ("BEGIN", "END") and valor != "VCALENDAR":
+            break
+    try:
+        return (int(marcas[MARCA_USUARIO]), marcas[MARCA_COMPONENTE],
+                int(marcas[MARCA_SEQ]))
+    except (KeyError, ValueError):
+        return None
+
+
+def copiar_entradas(anterior, destino, componente: str, quitar: set,
+                    tamano: int = 1 << 20) -> int:
+    """
+    Copia las entradas de un calendario a otro archivo, salvo las de UID
+    en `quitar`.
+
+    Lee de a `tamano` caracteres; los tramos que no contienen ninguno de
+    los UID buscados se copian enteros, sin separarlos en entradas.
+
+    Args:
+        anterior: Calendario abierto para lectura (con newline="").
+        destino: Archivo abierto para escritura.
+        componente (str): Componente de las entradas ("VTODO" o "VEVENT").
+        quitar (set[str]): UIDs que no se copian.
+        tamano (int): Caracteres leídos por vez.
+
+    Returns:
+        int: Entradas copiadas.
+    """
+    comienzo, fin = f"BEGIN:{componente}\r\n", f"END:{componente}\r\n"
+    # Con muchos UID es más rápido separar cada tramo en entradas
+    buscados = [f"\r\nUID:{u}\r\n" for u in quitar] if len(quitar) <= 64 else None
+    copiadas = 0
+    pendiente = ""
+    cabecera = True
+    while True:
+        leido = anterior.read(tamano)
+        texto = pendiente + leido
+        corte = texto.rfind(fin)
+        if corte < 0:
+            pendiente = texto
+        else:
+            corte += len(fin)
+            completas, pendiente = texto[:corte], texto[corte:]
+            if cabecera:
+                completas = completas[max(completas.find(comienzo), 0):]
+                cabecera = False
+            if buscados is not None and not any(b in completas for b in buscados):
+                destino.write(completas)
+                copiadas += completas.count(fin)
+            else:
+                for texto_entrada in completas.split(fin)[:-1]:
+                    inicio_uid = texto_entrada.find("\r\nUID:") + 6
+                    if texto_entrada[inicio_uid:texto_entrada.find("\r\n", inicio_uid)] \
+                            not in quitar:
+                        destino.write(texto_entrada + fin)
+                        copiadas += 1
+        if not leido:
+            return copiadas
+
+
+def reemplazar_archivo(ruta: str, escribir) -> None:
+    """
+    Escribe un archivo nuevo con `escribir(archivo)` y lo pone en lugar de
+    `ruta` recién al terminar, para que un lector nunca vea uno a medias.
+    """
+    temporal = f"{ruta}.tmp"
+    try:
+        with open(temporal, "w", encoding="utf-8", newline="") as archivo:
+            escribir(archivo)
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+@lru_cache(maxsize=None)
+def consultas_calendario() -> tuple:
+    """
+    Sentencias (rango, todas, cambiadas, cambios) construidas una sola vez.
+
+    - rango: (primer, último) número de cambio de registro_cambios (0 si
+      está vacío).
+    - todas: tareas pendientes del usuario (:usuario_id), sin orden (el
+      orden de las entradas no importa), por el índice parcial
+      ix_tareas_pendientes_entrega.
+    - cambiadas: las mismas, restringidas a las tareas y materias con
+      cambios posteriores a :seq en registro_cambios.
+    - cambios: (tabla, id_entidad) de esos cambios del usuario; incluye
+      los de usuario desconocido (tareas borradas junto con su materia).
+    """
+    rango = select(func.coalesce(func.min(RegistroCambio.seq), 0),
+                   func.coalesce(func.max(RegistroCambio.seq), 0))
+    todas = select(Tarea.idTarea, Tarea.titulo, Tarea.prioridad, Tarea.fechaEntrega,
+                   Tarea.version, Materia.nombre) \
+        .join(Materia) \
+        .where(Materia.usuario_id == bindparam("usuario_id"), TAREA_PENDIENTE)
+    del_usuario = (RegistroCambio.seq > bindparam("seq")) & (
+        (RegistroCambio.usuario_id == bindparam("usuario_id"))
+        | RegistroCambio.usuario_id.is_(None))
+    cambios = select(RegistroCambio.tabla, RegistroCambio.id_entidad).where(del_usuario)
+
+    def _ids(tabla):
+        return select(RegistroCambio.id_entidad).where(del_usuario,
+                                                       RegistroCambio.tabla == tabla)
+
+    cambiadas = todas.where(Tarea.idTarea.in_(_ids("tareas"))
+                            | Tarea.materia_id.in_(_ids("materias")))
+    return rango, todas, cambiadas, cambios
@@ -0,0 +1,341 @@
+"""
+cambios.py
+==========
+Detección y notificación de cambios en la base de datos del proyecto
+TaskMaster Student, incluidos los hechos por otros procesos (la consola
+run.py y la interfaz Flet, o dos ventanas, comparten db.sqlite).
+
+Se combinan dos mecanismos de SQLite:
+
+    - `PRAGMA data_version`: valor por conexión que cambia cuando otra
+      conexión confirma escrituras. Consultarlo cuesta unos pocos
+      microsegundos y no lee páginas de la base de datos, por lo que es
+      el sondeo habitual cuando no pasó nada.
+    - `registro_cambios`: historial llenado por triggers (ver
+      src.model.modelo) con la tabla, la operación, la entidad y el
+      usuario afectado. Solo se lee cuando data_version cambió, y solo
+      desde el último número de cambio visto.
+
+DetectorCambios expone ambos sobre una conexión sqlite3 propia, fuera del
+pool de SQLAlchemy. MonitorCambios sondea en un hilo y avisa a sus
+suscriptores qué entidades cambiaron.
+
+Uso típico:
+    from src.logic.cambios import MonitorCambios
+
+    monitor = MonitorCambios(intervalo_s=0.5)
+    monitor.suscribir(lambda cambios: print(cambios))
+    monitor.iniciar()
+    ...
+    monitor.detener()
+"""
+
+import sqlite3
+import threading
+from typing import Callable, NamedTuple, Optional
+from src.model.declarative_base import db_path
+from src.model.modelo import TABLA_RESTAURACION
+
+
+class Cambio(NamedTuple):
+    """
+    Una fila de registro_cambios.
+
+    Atributos:
+        seq        (int):           Número de cambio.
+        tabla      (str):           'usuarios', 'materias' o 'tareas'.
+        operacion  (str):           'INSERT', 'UPDATE' o 'DELETE'.
+        id_entidad (int):           Clave primaria de la fila modificada.
+        usuario_id (Optional[int]): Usuario dueño de la fila.
+    """
+    seq: int
+    tabla: str
+    operacion: str
+    id_entidad: int
+    usuario_id: Optional[int]
+
+
+class DetectorCambios:
+    """
+    Conexión dedicada que consulta PRAGMA data_version y el historial.
+
+    Atributos:
+        ruta (str): Archivo SQLite observado.
+    """
+
+    def __init__(self, ruta: str = db_path):
+        """
+        Abre la conexión de observación.
+
+        Args:
+            ruta (str): Archivo SQLite a observar (por defecto, el del proyecto).
+        """
+        self.ruta = ruta
+        self._conn = sqlite3.connect(ruta, check_same_thread=False,
+                                     isolation_level=None)
+        self._lock = threading.Lock()
+
+    def version(self) -> int:
+        """
+        Retorna el valor actual de PRAGMA data_version.
+
+        Returns:
+            int: Cambia cuando otra conexión confirmó escrituras desde la
+                 lectura anterior.
+        """
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def cambios_desde(self, seq: Optional[int]) -> tuple:
+        """
+        Lee los cambios registrados después de `seq`.
+
+        Args:
+            seq (Optional[int]): Último número de cambio ya procesado, o
+                                 None si todavía no se procesó ninguno.
+
+        Returns:
+            tuple: (cambios, ultimo_seq). `cambios` es una lista de Cambio
+                   en orden, o None si el historial no permite saber qué
+                   cambió (primera lectura, filas ya recortadas, tablas
+                   recreadas o base restaurada desde un respaldo) y hay
+                   que recargar todo.
+        """
+        with self._lock:
+            try:
+                minimo, maximo = self._conn.execute(
+                    "SELECT COALESCE(MIN(seq), 0), COALESCE(MAX(seq), 0) "
+                    "FROM registro_cambios").fetchone()
+                if seq is None or maximo < seq or minimo > seq + 1:
+                    return None, maximo
+                filas = self._conn.execute(
+                    "SELECT seq, tabla, operacion, id_entidad, usuario_id "
+                    "FROM registro_cambios WHERE seq > ? ORDER BY seq",
+                    (seq,)).fetchall()
+            except sqlite3.OperationalError:
+                # Sin historial (tablas aún no creadas o eliminadas)
+                return None, 0
+        if any(fila[1] == TABLA_RESTAURACION for fila in filas):
+            return None, maximo
+        cambios = [Cambio(*fila) for fila in filas]
+        return cambios, (cambios[-1].seq if cambios else seq)
+
+    def cerrar(self):
+        """Cierra la conexión de observación."""
+        with self._lock:
+            self._conn.close()
+
+
+_detectores: dict = {}
+_detectores_lock = threading.Lock()
+
+
+def detector_compartido(ruta: Optional[str] = None) -> DetectorCambios:
+    """
+    Retorna el detector del proceso para un archivo, creándolo si falta.
+
+    Todas las instancias de TaskManager de un proceso comparten el mismo
+    detector (una sola conexión adicional por archivo).
+
+    Args:
+        ruta (Optional[str]): Archivo SQLite; None usa el del proyecto.
+
+    Returns:
+        DetectorCambios: Detector asociado a ese archivo.
+    """
+    ruta = ruta or db_path
+    with _detectores_lock:
+        if ruta not in _detectores:
+            _detectores[ruta] = DetectorCambios(ruta)
+        return _detectores[ruta]
+
+
+class SeguidorCambios:
+    """
+    Posición de un consumidor en el historial de cambios.
+
+    Combina data_version (sondeo barato) con registro_cambios (detalle).
+    Cada consumidor (una caché, un monitor) tiene su propio seguidor, ya
+    que cada uno avanza a su ritmo.
+    """
+
+    def __init__(self, detector: DetectorCambios):
+        """
+        Crea un seguidor sin posición: la primera revisión pide recargar.
+
+        Args:
+            detector (DetectorCambios): Detector compartido del archivo.
+        """
+        self._detector = detector
+        self._version = None
+        self._seq = None
+
+    def revisar(self) -> tuple:
+        """
+        Indica si hubo cambios desde la revisión anterior.
+
+        Returns:
+            tuple: (hubo_cambios, cambios). Si no hubo cambios retorna
+                   (False, []). Si los hubo, `cambios` es la lista de
+                   Cambio, o None si hay que recargar todo.
+        """
+        version = self._detector.version()
+        if version == self._version:
+            return False, []
+        self._version = version
+        cambios, self._seq = self._detector.cambios_desde(self._seq)
+        if cambios == []:
+            return False, []
+        return True, cambios
+
+
+class MonitorCambios:
+    """
+    Servicio que sondea la base de datos y notifica los cambios.
+
+    Cada suscriptor recibe una lista de Cambio (ya filtrada por usuario si
+    así se suscribió) o None cuando debe recargar todo. Las notificaciones
+    se entregan desde el hilo del monitor.
+
+    Con solo_externos=True se omiten los cambios escritos por este proceso
+    (los rangos de números de cambio de sus transacciones, igual que en
+    ProyeccionTareas), ya que quien escribe ya actualizó su vista.
+
+    Atributos:
+        intervalo_s (float): Segundos entre sondeos.
+    """
+
+    def __init__(self, intervalo_s: float = 0.5,
+                 detector: Optional[DetectorCambios] = None,
+                 solo_externos: bool = False):
+        """
+        Crea el monitor (sin iniciar el hilo).
+
+        Args:
+            intervalo_s (float): Segundos entre sondeos (> 0).
+            detector (Optional[DetectorCambios]): Detector a usar; None usa
+                el detector compartido del proyecto.
+            solo_externos (bool): Si es True, no notifica los cambios
+                escritos por este proceso.
+
+        Raises:
+            ValueError: Si intervalo_s <= 0.
+        """
+        if intervalo_s <= 0:
+            raise ValueError("El intervalo de sondeo debe ser mayor a 0")
+        self.intervalo_s = intervalo_s
+        self._seguidor = SeguidorCambios(detector or detector_compartido())
+        self._seguidor.revisar()    # parte de la posición actual
+        self._suscriptores: list = []
+        self._lock = threading.Lock()
+        self._detenido = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._propios: Optional[list] = None     # rangos (inicio, fin]
+        if solo_externos:
+            # Importación diferida: src.logic.proyeccion importa este módulo
+            from src.logic.proyeccion import observar_escrituras
+            self._propios = []
+            observar_escrituras(self)
+
+    def _aplicar(self, operaciones: list, rango: Optional[tuple]):
+        """
+        Anota el rango de cambios de una transacción propia confirmada
+        (ver src.logic.proyeccion.observar_escrituras).
+        """
+        if rango is not None:
+            with self._lock:
+                self._propios.append(rango)
+
+    def _quitar_propios(self, cambios: list) -> list:
+        """Descarta los cambios escritos por este proceso."""
+        with self._lock:
+            externos = [c for c in cambios if not any(
+                inicio < c.seq <= fin for inicio, fin in self._propios)]
+            ultimo = cambios[-1].seq
+            self._propios = [r for r in self._propios if r[1] > ultimo]
+        return externos
+
+    def suscribir(self, callback: Callable,
+                  usuario_id: Optional[int] = None) -> Callable:
+        """
+        Registra un suscriptor.
+
+        Args:
+            callback (Callable): Función callback(cambios) con una lista de
+                                 Cambio o None (recargar todo).
+            usuario_id (Optional[int]): Si se indica, solo se notifican los
+                                        cambios de ese usuario.
+
+        Returns:
+            Callable: Función sin argumentos que cancela la suscripción.
+        """
+        entrada = (callback, usuario_id)
+        with self._lock:
+            self._suscriptores.append(entrada)
+
+        def cancelar():
+            with self._lock:
+                if entrada in self._suscriptores:
+                    self._suscriptores.remove(entrada)
+        return cancelar
+
+    def revisar(self) -> bool:
+        """
+        Realiza un sondeo y notifica a los suscriptores si hubo cambios.
+
+        Todos los suscriptores reciben la notificación aunque alguno falle;
+        el primer error se propaga al final.
+
+        Returns:
+            bool: True si hubo cambios.
+        """
+        hubo, cambios = self._seguidor.revisar()
+        if not hubo:
+            return False
+        if cambios and self._propios is not None:
+            cambios = self._quitar_propios(cambios)
+            if not cambios:
+                return False
+        with self._lock:
+            suscriptores = list(self._suscriptores)
+        error = None
+        for callback, usuario_id in suscriptores:
+            if cambios is None or usuario_id is None:
+                notificar = cambios
+            else:
+                notificar = [c for c in cambios if c.usuario_id == usuario_id]
+                if not notificar:
+                    continue
+            try:
+                callback(notificar)
+            except Exception as ex:
+                error = error or ex
+        if error is not None:
+            raise error
+        return True
+
+    def iniciar(self):
+        """Inicia el hilo de sondeo (si no estaba iniciado)."""
+        if self._hilo is not None:
+            return
+        self._detenido.clear()
+        self._hilo = threading.Thread(target=self._bucle,
+                                      name="taskmaster-monitor", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo de sondeo y espera a que termine."""
+        self._detenido.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def _bucle(self):
+        """Sondea cada intervalo_s hasta que se detenga el monitor."""
+        while not self._detenido.wait(self.intervalo_s):
+            try:
+                self.revisar()
+            except Exception:
+                # Un suscriptor con errores (o un bloqueo pasajero de la
+                # base de datos) no debe detener el monitor
+                pass
@@ -0,0 +1,330 @@
+"""
+cola_escritura.py
+=================
+Canal de escritura opcional con un único hilo escritor y commit agrupado
+(group commit) para el proyecto TaskMaster Student.
+
+SQLite admite un solo escritor a la vez. Cuando varios hilos usan
+TaskManager al mismo tiempo, cada mutación abre su propia transacción y
+compite por el bloqueo de escritura; el resultado son errores
+"database is locked" o un rendimiento limitado por el fsync de cada commit.
+
+ColaEscritura serializa las mutaciones en un hilo dedicado que agrupa
+varias operaciones en una sola transacción:
+
+    - Cada operación se ejecuta dentro de su propio SAVEPOINT, de modo que
+      el error de una operación no afecta a las demás del mismo lote.
+    - El lote se cierra al alcanzar `max_lote` operaciones o al vencer la
+      ventana de latencia `ventana_ms`, contada desde la primera operación.
+    - Cada llamador recibe su resultado (o su excepción) a través de un
+      concurrent.futures.Future.
+    - Si la base de datos está bloqueada por otro proceso, el lote completo
+      se revierte y se reintenta según la PoliticaReintentos configurada;
+      los futures solo se resuelven después de un commit exitoso.
+
+Uso típico:
+    from src.logic.cola_escritura import ColaEscritura
+    from src.logic.task_manager import TaskManager
+
+    cola = ColaEscritura(ventana_ms=2.0)
+    tm = TaskManager(cola_escritura=cola)
+    ...
+    cola.cerrar()
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.exc import NoInspectionAvailable
+from src.model.declarative_base import SessionEscritura
+from src.logic.reintentos import PoliticaReintentos, es_error_bloqueo
+
+# Marcador que indica al hilo escritor que debe terminar
+_FIN = object()
+
+
+def _es_persistente(resultado) -> bool:
+    """Indica si el resultado es una instancia ORM persistente."""
+    try:
+        return bool(getattr(sa_inspect(resultado), "persistent", False))
+    except NoInspectionAvailable:
+        return False
+
+
+def recargar_resultado(session, resultado):
+    """
+    Recarga el resultado de una operación antes del commit.
+
+    Si el resultado es una instancia ORM persistente con cambios pendientes
+    o atributos expirados, se vuelcan los cambios y se recarga desde la
+    base de datos dentro de la misma transacción (equivale al
+    session.refresh posterior al commit, sin abrir una transacción nueva).
+    Una instancia recién leída (por ejemplo, con INSERT ... RETURNING) ya
+    está al día y no se vuelve a consultar. Otros valores no se modifican.
+
+    Args:
+        session:   Sesión en la que se ejecutó la operación.
+        resultado: Valor devuelto por la operación.
+    """
+    if _es_persistente(resultado):
+        estado = sa_inspect(resultado)
+        if estado.modified or estado.expired_attributes:
+            session.flush()
+            session.refresh(resultado)
+
+
+def desvincular_resultado(session, resultado):
+    """
+    Desvincula de la sesión un resultado ya confirmado.
+
+    Args:
+        session:   Sesión en la que se ejecutó la operación (ya confirmada).
+        resultado: Valor devuelto por la operación.
+
+    Returns:
+        El mismo resultado, listo para usarse con la sesión cerrada.
+    """
+    if _es_persistente(resultado):
+        session.expunge(resultado)
+    return resultado
+
+
+class ColaEscritura:
+    """
+    Hilo escritor único que aplica mutaciones en lotes (group commit).
+
+    Atributos:
+        max_lote   (int):   Máximo de operaciones por transacción.
+        ventana_ms (float): Tiempo máximo (ms) que espera el escritor para
+                            completar un lote desde la primera operación.
+        lotes      (int):   Número de transacciones confirmadas.
+        operaciones (int):  Número de operaciones procesadas.
+    """
+
+    def __init__(
+        self,
+        fabrica_sesiones: Callable = SessionEscritura,
+        max_lote: int = 64,
+        ventana_ms: float = 2.0,
+        politica_reintentos: Optional[PoliticaReintentos] = None
+    ):
+        """
+        Crea la cola e inicia el hilo escritor.
+
+        Args:
+            fabrica_sesiones (Callable): Fábrica de sesiones SQLAlchemy.
+            max_lote         (int):      Operaciones máximas por lote (>= 1).
+            ventana_ms       (float):    Ventana de agrupación en milisegundos.
+            politica_reintentos (Optional[PoliticaReintentos]): Política
+                ante bloqueos; None usa la política por defecto.
+
+        Raises:
+            ValueError: Si max_lote < 1 o ventana_ms < 0.
+        """
+        if max_lote < 1:
+            raise ValueError("El tamaño máximo del lote debe ser al menos 1")
+        if ventana_ms < 0:
+            raise ValueError("La ventana de agrupación no puede ser negativa")
+
+        self._fabrica = fabrica_sesiones
+        self.max_lote = max_lote
+        self.ventana_ms = ventana_ms
+        self.politica_reintentos = politica_reintentos or PoliticaReintentos()
+        self.lotes = 0
+        self.operaciones = 0
+
+        self._cola: queue.Queue = queue.Queue()
+        self._cerrada = False
+        self._lock = threading.Lock()
+        self._hilo = threading.Thread(
+            target=self._bucle, name="taskmaster-escritor", daemon=True)
+        self._hilo.start()
+
+    # ──────────────────────────────────────────────────────────────
+    # API PÚBLICA
+    # ──────────────────────────────────────────────────────────────
+
+    def enviar(self, operacion: Callable) -> Future:
+        """
+        Encola una operación de escritura.
+
+        La operación recibe la sesión del lote y no debe hacer commit ni
+        rollback: el escritor se encarga de ambos.
+
+        Args:
+            operacion (Callable): Función operacion(session) -> resultado.
+
+        Returns:
+            Future: Se resuelve con el resultado de la operación, o con la
+                    excepción que esta haya lanzado.
+
+        Raises:
+            RuntimeError: Si la cola ya fue cerrada.
+        """
+        futuro = Future()
+        with self._lock:
+            if self._cerrada:
+                raise RuntimeError("La cola de escritura está cerrada")
+            self._cola.put((operacion, futuro))
+        return futuro
+
+    def ejecutar(self, operacion: Callable):
+        """
+        Encola una operación y espera su resultado.
+
+        Args:
+            operacion (Callable): Función operacion(session) -> resultado.
+
+        Returns:
+            El resultado de la operación.
+
+        Raises:
+            Exception: La misma excepción que lanzó la operación.
+        """
+        return self.enviar(operacion).result()
+
+    def cerrar(self, timeout: Optional[float] = None):
+        """
+        Procesa las operaciones pendientes y detiene el hilo escritor.
+
+        Args:
+            timeout (Optional[float]): Segundos máximos de espera.
+        """
+        with self._lock:
+            if self._cerrada:
+                return
+            self._cerrada = True
+            self._cola.put(_FIN)
+        self._hilo.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    # ──────────────────────────────────────────────────────────────
+    # HILO ESCRITOR
+    # ──────────────────────────────────────────────────────────────
+
+    def _bucle(self):
+        """Bucle principal: arma lotes y los confirma hasta recibir _FIN."""
+        terminar = False
+        while not terminar:
+            primero = self._cola.get()
+            if primero is _FIN:
+                break
+            lote = [primero]
+            limite = time.monotonic() + self.ventana_ms / 1000.0
+            while len(lote) < self.max_lote:
+                restante = limite - time.monotonic()
+                try:
+                    item = (self._cola.get(timeout=restante) if restante > 0
+                            else self._cola.get_nowait())
+                except queue.Empty:
+                    break
+                if item is _FIN:
+                    terminar = True
+                    break
+                lote.append(item)
+            self._procesar_lote(lote)
+
+    def _procesar_lote(self, lote: list):
+        """
+        Ejecuta un lote completo en una sola transacción.
+
+        Cada operación corre en su propio SAVEPOINT. Los resultados se
+        entregan solo tras el commit. Si la base de datos está bloqueada,
+        el lote entero se reintenta; si el commit falla por otro motivo,
+        las operaciones exitosas se repiten una a una en transacciones
+        independientes para que cada llamador reciba su propio resultado.
+        """
+        activos = [(op, fut) for op, fut in lote
+                   if fut.set_running_or_notify_cancel()]
+        if not activos:
+            return
+
+        try:
+            resultados = self.politica_reintentos.ejecutar(
+                lambda: self._intentar_lote(activos))
+        except Exception as ex:
+            if es_error_bloqueo(ex):
+                for _, futuro in activos:
+                    futuro.set_exception(ex)
+                return
+            # El commit del lote falló: aislar cada operación.
+            for operacion, futuro in activos:
+                self._procesar_individual(operacion, futuro)
+            return
+
+        self.lotes += 1
+        self.operaciones += len(activos)
+        for futuro, exito, valor in resultados:
+            if exito:
+                futuro.set_result(valor)
+            else:
+                futuro.set_exception(valor)
+
+    def _intentar_lote(self, activos: list) -> list:
+        """
+        Un intento de ejecutar y confirmar el lote.
+
+        Returns:
+            list: Tuplas (futuro, exito, resultado_o_excepcion).
+
+        Raises:
+            Exception: Si falla el inicio de la transacción o el commit
+                       (la transacción queda revertida).
+        """
+        session = self._fabrica()
+        try:
+            # Toma el bloqueo de escritura (BEGIN IMMEDIATE) antes de ejecutar
+            session.connection()
+            parciales = []
+            for operacion, futuro in activos:
+                try:
+                    with session.begin_nested():
+                        resultado = operacion(session)
+                    parciales.append((futuro, True, resultado))
+                except Exception as ex:
+                    if es_error_bloqueo(ex):
+                        raise
+                    parciales.append((futuro, False, ex))
+
+            for _, exito, valor in parciales:
+                if exito:
+                    recargar_resultado(session, valor)
+            session.commit()
+            return [(futuro, exito,
+                     desvincular_resultado(session, valor) if exito else valor)
+                    for futuro, exito, valor in parciales]
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _procesar_individual(self, operacion: Callable, futuro: Future):
+        """Ejecuta una operación en su propia transacción (con reintentos)."""
+        def _transaccion():
+            session = self._fabrica()
+            try:
+                resultado = operacion(session)
+                recargar_resultado(session, resultado)
+                session.commit()
+                return desvincular_resultado(session, resultado)
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+        try:
+            futuro.set_result(self.politica_reintentos.ejecutar(_transaccion))
+            self.lotes += 1
+            self.operaciones += 1
+        except Exception as ex:
+            futuro.set_exception(ex)
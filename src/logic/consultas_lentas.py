@@ -0,0 +1,377 @@
+"""
+consultas_lentas.py
+===================
+Registro opcional de las sentencias SQL lentas del proyecto TaskMaster
+Student, con el plan de ejecución de SQLite.
+
+El engine se crea con echo=False y sin medir nada, así que una consulta
+que pasó a recorrer toda la tabla (un índice que dejó de usarse, un
+filtro nuevo) no se nota hasta que la aplicación se vuelve lenta. Con el
+registro activo, cada sentencia que tarda al menos umbral_ms se anota en
+un archivo local rotativo, una línea JSON por sentencia:
+
+    fecha       momento de la ejecución
+    ms          duración
+    origen      método de TaskManager que la emitió, o la función de la
+                interfaz (ui_taskmaster / run) si no pasó por TaskManager
+    sentencia   SQL con sus parámetros "?"
+    parametros  valores redactados: números y NULL tal cual, textos y
+                blobs reemplazados por su largo ("<texto:12>")
+    plan        salida de EXPLAIN QUERY PLAN, solo la primera vez que
+                se anota cada sentencia distinta en el proceso
+
+La duración es la de cursor.execute: incluye lo que SQLite hace antes de
+entregar la primera fila (ordenar, agrupar, contar, escribir), no la
+lectura de las filas siguientes.
+
+resumir() lee el archivo y sus copias rotadas y ordena las sentencias por
+tiempo total.
+
+Uso típico:
+    from src.logic.consultas_lentas import RegistroConsultasLentas, resumir
+
+    registro = RegistroConsultasLentas(umbral_ms=20)
+    registro.activar()
+    ...
+    registro.desactivar()
+    for r in resumir():
+        print(r.total_ms, r.sentencia)
+
+Ejecución directa:
+    python run.py --lentas 20
+    python run.py lentas
+    TASKMASTER_CONSULTAS_LENTAS_MS=20 python -m src.view.ui_taskmaster
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Iterator, NamedTuple, Optional
+from sqlalchemy import event
+from src.model.declarative_base import db_path, engine as engine_defecto
+
+# Duración a partir de la cual se anota una sentencia
+UMBRAL_MS = 50.0
+
+# Archivo del registro, junto a la base de datos
+RUTA_REGISTRO = os.path.join(os.path.dirname(db_path), "consultas_lentas.log")
+
+# Tamaño de cada archivo antes de rotar y copias anteriores conservadas
+MAX_BYTES = 5 * 2 ** 20
+COPIAS = 3
+
+# Variable de entorno que activa el registro con ese umbral (en ms)
+VARIABLE_ENTORNO = "TASKMASTER_CONSULTAS_LENTAS_MS"
+
+_ARCHIVO_TASK_MANAGER = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                     "task_manager.py")
+_RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_INTERFACES = {os.path.join(_RAIZ, "src", "view", "ui_taskmaster.py"): "ui_taskmaster",
+               os.path.join(_RAIZ, "run.py"): "run"}
+
+
+class ResumenSentencia(NamedTuple):
+    """
+    Apariciones de una misma sentencia en el registro.
+
+    Atributos:
+        sentencia (str):   SQL (con los espacios normalizados).
+        veces     (int):   Veces que se anotó.
+        total_ms  (float): Suma de las duraciones.
+        maximo_ms (float): Mayor duración.
+        origenes  (tuple): Orígenes, del más al menos frecuente.
+        plan      (tuple): Líneas de EXPLAIN QUERY PLAN (vacía si no se
+                           capturó).
+    """
+    sentencia: str
+    veces: int
+    total_ms: float
+    maximo_ms: float
+    origenes: tuple
+    plan: tuple
+
+    @property
+    def promedio_ms(self) -> float:
+        """Duración promedio."""
+        return self.total_ms / self.veces
+
+
+def _redactar_valor(valor):
+    """Conserva números y NULL; de textos y blobs solo anota el largo."""
+    if valor is None or isinstance(valor, (bool, int, float)):
+        return valor
+    if isinstance(valor, str):
+        return f"<texto:{len(valor)}>"
+    if isinstance(valor, (bytes, bytearray, memoryview)):
+        return f"<bytes:{len(valor)}>"
+    return f"<{type(valor).__name__}>"
+
+
+def redactar(parametros, executemany: bool = False):
+    """
+    Redacta los parámetros de una sentencia para el registro.
+
+    Args:
+        parametros: Secuencia o diccionario de parámetros (o una lista de
+            ellos si `executemany`).
+        executemany (bool): Si la sentencia se ejecutó con varias filas.
+
+    Returns:
+        Los parámetros redactados; con executemany, {"filas": N,
+        "primera": parámetros de la primera fila}.
+    """
+    if executemany:
+        filas = list(parametros)
+        return {"filas": len(filas),
+                "primera": redactar(filas[0]) if filas else None}
+    if isinstance(parametros, dict):
+        return {clave: _redactar_valor(v) for clave, v in parametros.items()}
+    return [_redactar_valor(v) for v in parametros or ()]
+
+
+def origen() -> str:
+    """
+    Quién emitió la sentencia en curso, según la pila de llamadas.
+
+    Returns:
+        str: "TaskManager.<método público más externo>", o
+             "<ui_taskmaster|run>.<función>" si no pasó por TaskManager, o
+             "<archivo>:<función>" del primer marco fuera de SQLAlchemy y
+             de este módulo, o "desconocido".
+    """
+    metodo = interfaz = otro = None
+    marco = sys._getframe(1)
+    while marco is not None:
+        codigo = marco.f_code
+        archivo = codigo.co_filename
+        if archivo == _ARCHIVO_TASK_MANAGER:
+            if codigo.co_qualname.startswith("TaskManager.") \
+                    and not codigo.co_name.startswith("_"):
+                metodo = f"TaskManager.{codigo.co_name}"
+        elif archivo in _INTERFACES:
+            if interfaz is None and codigo.co_name != "<module>":
+                interfaz = f"{_INTERFACES[archivo]}.{codigo.co_name}"
+        elif otro is None and archivo != __file__ and "sqlalchemy" not in archivo \
+                and not archivo.startswith("<"):
+            otro = f"{os.path.basename(archivo)}:{codigo.co_name}"
+        marco = marco.f_back
+    return metodo or interfaz or otro or "desconocido"
+
+
+def _plan(conexion: sqlite3.Connection, sentencia: str, parametros,
+          executemany: bool) -> list:
+    """Líneas de EXPLAIN QUERY PLAN, indentadas según el árbol (vacía si falla)."""
+    if executemany:
+        parametros = next(iter(parametros), ())
+    try:
+        filas = conexion.execute(f"EXPLAIN QUERY PLAN {sentencia}",
+                                 parametros or ()).fetchall()
+    except (sqlite3.Error, ValueError):
+        return []
+    niveles = {0: -1}
+    lineas = []
+    for id_nodo, padre, _, detalle in filas:
+        niveles[id_nodo] = niveles.get(padre, -1) + 1
+        lineas.append("  " * niveles[id_nodo] + detalle)
+    return lineas
+
+
+class RegistroConsultasLentas:
+    """
+    Anota en un archivo rotativo las sentencias de un engine que superan
+    un umbral de duración.
+
+    Atributos:
+        ruta      (str):   Archivo del registro.
+        umbral_ms (float): Duración mínima anotada.
+        engine:            Engine de SQLAlchemy observado.
+    """
+
+    def __init__(self, ruta: str = RUTA_REGISTRO, umbral_ms: float = UMBRAL_MS,
+                 max_bytes: int = MAX_BYTES, copias: int = COPIAS,
+                 engine=engine_defecto):
+        """
+        Crea el registro (inactivo).
+
+        Args:
+            ruta (str): Archivo del registro; al llegar a `max_bytes` pasa
+                a ruta.1, y así hasta `copias`.
+            umbral_ms (float): Duración mínima anotada (>= 0).
+            max_bytes (int): Tamaño de cada archivo antes de rotar (> 0).
+            copias (int): Archivos anteriores conservados (>= 0).
+            engine: Engine de SQLAlchemy (por defecto, el del proyecto).
+
+        Raises:
+            ValueError: Si algún parámetro está fuera de rango.
+        """
+        if umbral_ms < 0:
+            raise ValueError("El umbral no puede ser negativo")
+        if max_bytes <= 0:
+            raise ValueError("El tamaño máximo del registro debe ser mayor a 0")
+        if copias < 0:
+            raise ValueError("Las copias conservadas no pueden ser negativas")
+        self.ruta = ruta
+        self.umbral_ms = umbral_ms
+        self.engine = engine
+        self._max_bytes = max_bytes
+        self._copias = copias
+        self._umbral_s = umbral_ms / 1000
+        self._explicadas: set = set()
+        self._lock = threading.Lock()
+        self._manejador: Optional[RotatingFileHandler] = None
+        self._logger = logging.getLogger(f"{__name__}.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+
+    @property
+    def activo(self) -> bool:
+        """Si se están midiendo las sentencias."""
+        return self._manejador is not None
+
+    def activar(self):
+        """Empieza a medir (no hace nada si ya estaba activo)."""
+        with self._lock:
+            if self._manejador is not None:
+                return
+            carpeta = os.path.dirname(self.ruta)
+            if carpeta:
+                os.makedirs(carpeta, exist_ok=True)
+            self._manejador = RotatingFileHandler(
+                self.ruta, maxBytes=self._max_bytes, backupCount=self._copias,
+                encoding="utf-8", delay=True)
+            self._logger.addHandler(self._manejador)
+            event.listen(self.engine, "before_cursor_execute", self._antes)
+            event.listen(self.engine, "after_cursor_execute", self._despues)
+
+    def desactivar(self):
+        """Deja de medir y cierra el archivo."""
+        with self._lock:
+            if self._manejador is None:
+                return
+            event.remove(self.engine, "before_cursor_execute", self._antes)
+            event.remove(self.engine, "after_cursor_execute", self._despues)
+            self._logger.removeHandler(self._manejador)
+            self._manejador.close()
+            self._manejador = None
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany):
+        """Listener before_cursor_execute: marca el inicio en el contexto."""
+        if context is not None:
+            context._inicio_consulta_lenta = time.perf_counter()
+
+    def _despues(self, conn, cursor, statement, parameters, context, executemany):
+        """Listener after_cursor_execute: anota la sentencia si superó el umbral."""
+        inicio = getattr(context, "_inicio_consulta_lenta", None)
+        if inicio is None:
+            return
+        duracion = time.perf_counter() - inicio
+        if duracion < self._umbral_s:
+            return
+        with self._lock:
+            nueva = statement not in self._explicadas
+            self._explicadas.add(statement)
+        entrada = {
+            "fecha": datetime.now().isoformat(timespec="milliseconds"),
+            "ms": round(duracion * 1000, 3),
+            "origen": origen(),
+            "sentencia": statement,
+            "parametros": redactar(parameters, executemany),
+        }
+        if nueva:
+            entrada["plan"] = _plan(cursor.connection, statement, parameters, executemany)
+        self._logger.info(json.dumps(entrada, ensure_ascii=False))
+
+
+def desde_entorno(engine=engine_defecto) -> Optional[RegistroConsultasLentas]:
+    """
+    Activa el registro si la variable TASKMASTER_CONSULTAS_LENTAS_MS
+    tiene un umbral.
+
+    Returns:
+        Optional[RegistroConsultasLentas]: El registro activo, o None si
+            la variable no está definida.
+
+    Raises:
+        ValueError: Si el valor de la variable no es un número válido.
+    """
+    valor = os.environ.get(VARIABLE_ENTORNO)
+    if not valor:
+        return None
+    try:
+        umbral = float(valor)
+    except ValueError:
+        raise ValueError(f"{VARIABLE_ENTORNO} debe ser un número de milisegundos") from None
+    registro = RegistroConsultasLentas(umbral_ms=umbral, engine=engine)
+    registro.activar()
+    return registro
+
+
+def leer(ruta: str = RUTA_REGISTRO) -> Iterator[dict]:
+    """
+    Recorre las entradas del registro, de las copias rotadas más viejas
+    al archivo actual. Las líneas que no son JSON se omiten.
+
+    Args:
+        ruta (str): Archivo del registro.
+
+    Yields:
+        dict: Una entrada por sentencia anotada.
+    """
+    archivos = []
+    numero = 1
+    while os.path.exists(f"{ruta}.{numero}"):
+        archivos.append(f"{ruta}.{numero}")
+        numero += 1
+    archivos.reverse()
+    if os.path.exists(ruta):
+        archivos.append(ruta)
+    for archivo in archivos:
+        with open(archivo, encoding="utf-8") as entrada:
+            for linea in entrada:
+                try:
+                    yield json.loads(linea)
+                except ValueError:
+                    continue
+
+
+def resumir(ruta: str = RUTA_REGISTRO, limite: Optional[int] = 20) -> list:
+    """
+    Agrupa el registro por sentencia y la ordena por tiempo total.
+
+    Args:
+        ruta (str): Archivo del registro (incluye sus copias rotadas).
+        limite (Optional[int]): Sentencias retornadas (None, todas).
+
+    Returns:
+        list[ResumenSentencia]: De mayor a menor tiempo total.
+
+    Raises:
+        ValueError: Si no existe el registro.
+    """
+    if not os.path.exists(ruta) and not os.path.exists(f"{ruta}.1"):
+        raise ValueError(f"No existe el registro de consultas lentas {ruta}")
+    grupos: dict = {}
+    for entrada in leer(ruta):
+        sentencia = " ".join(str(entrada.get("sentencia", "")).split())
+        grupo = grupos.setdefault(sentencia, {"veces": 0, "total": 0.0, "maximo": 0.0,
+                                              "origenes": Counter(), "plan": ()})
+        ms = float(entrada.get("ms", 0))
+        grupo["veces"] += 1
+        grupo["total"] += ms
+        grupo["maximo"] = max(grupo["maximo"], ms)
+        grupo["origenes"][entrada.get("origen", "desconocido")] += 1
+        if entrada.get("plan"):
+            grupo["plan"] = tuple(entrada["plan"])
+    resumenes = sorted(
+        (ResumenSentencia(sentencia, g["veces"], g["total"], g["maximo"],
+                          tuple(o for o, _ in g["origenes"].most_common()), g["plan"])
+         for sentencia, g in grupos.items()),
+        key=lambda r: -r.total_ms)
+    return resumenes if limite is None else resumenes[:limite]
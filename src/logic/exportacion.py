@@ -0,0 +1,87 @@
+"""
+exportacion.py
+==============
+Escritura en streaming de las materias y tareas de un usuario a CSV o
+JSONL para TaskManager.exportar, en el proyecto TaskMaster Student.
+
+Los registros tienen el mismo formato que lee la importación (ver
+src.logic.importacion), más dos campos que la importación ignora:
+
+    id      ID de la materia o de la tarea.
+    estado  Pendiente o Completada (solo tareas).
+
+Las materias se escriben primero y las tareas después, en orden de ID;
+así una exportación interrumpida se puede continuar en otro archivo a
+partir del último `id` escrito (ver TaskManager.exportar). Los archivos
+terminados en .gz se comprimen al escribir.
+
+Este módulo solo escribe: la lectura con cursor del lado del servidor
+está en TaskManager.exportar, cuyas consultas ya entregan cada registro
+como una tupla en el orden de CAMPOS_EXPORTACION.
+"""
+
+import csv
+import json
+from typing import Callable, NamedTuple, Optional
+
+from src.logic.importacion import CAMPOS_CSV
+
+# Encabezado de los archivos CSV exportados
+CAMPOS_EXPORTACION = ("id",) + CAMPOS_CSV + ("estado",)
+
+
+class ResultadoExportacion(NamedTuple):
+    """
+    Resumen de TaskManager.exportar.
+
+    Atributos:
+        materias  (int):   Materias escritas.
+        tareas    (int):   Tareas escritas.
+        ultimo_id (Optional[int]): ID de la última tarea escrita (para
+                           continuar con desde_id); None si no hubo tareas.
+        segundos  (float): Duración de la exportación.
+    """
+    materias: int
+    tareas: int
+    ultimo_id: Optional[int]
+    segundos: float
+
+    @property
+    def filas_por_segundo(self) -> float:
+        """Registros escritos por segundo."""
+        total = self.materias + self.tareas
+        return total / self.segundos if self.segundos else 0.0
+
+
+def escritor(archivo, formato: str) -> Callable[[list], None]:
+    """
+    Prepara un archivo de texto abierto para escribir registros por lotes.
+
+    En CSV escribe el encabezado (CAMPOS_EXPORTACION) de inmediato; en
+    JSONL los campos nulos o vacíos se omiten.
+
+    Args:
+        archivo: Archivo de texto abierto para escritura.
+        formato (str): "csv" o "jsonl".
+
+    Returns:
+        Callable[[list], None]: Función que escribe una lista de
+                                registros, cada uno una tupla en el
+                                orden de CAMPOS_EXPORTACION.
+
+    Raises:
+        ValueError: Si el formato es desconocido.
+    """
+    if formato == "csv":
+        salida = csv.writer(archivo, lineterminator="\n")
+        salida.writerow(CAMPOS_EXPORTACION)
+        return salida.writerows
+    if formato == "jsonl":
+        def _escribir(registros: list):
+            archivo.writelines(
+                json.dumps({campo: valor for campo, valor in zip(CAMPOS_EXPORTACION, registro)
+                            if valor is not None and valor != ""},
+                           ensure_ascii=False) + "\n"
+                for registro in registros)
+        return _escribir
+    raise ValueError(f"Formato desconocido: {formato} (use csv o jsonl)")
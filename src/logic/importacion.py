@@ -0,0 +1,163 @@
+"""
+importacion.py
+==============
+Lectura en streaming de archivos CSV o JSONL con materias y tareas para
+TaskManager.importar, en el proyecto TaskMaster Student.
+
+Cada registro es una materia o una tarea, según su campo `tipo`:
+
+    tipo     materia            tarea
+    ───────  ─────────────────  ──────────────────────────────────────
+    campos   nombre, color      titulo, descripcion, prioridad,
+                                fecha_entrega (AAAA-MM-DD), materia
+                                (nombre), esfuerzo (horas, opcional)
+
+En CSV la primera fila es el encabezado y los campos que no corresponden
+al tipo quedan vacíos; en JSONL cada línea es un objeto. Una tarea puede
+referirse a una materia existente del usuario o a una definida antes en
+el mismo archivo. Los archivos terminados en .gz se descomprimen al leer.
+
+Ejemplo (JSONL):
+    {"tipo": "materia", "nombre": "Física", "color": "#3B82F6"}
+    {"tipo": "tarea", "titulo": "Laboratorio 1", "prioridad": "Alta",
+     "fecha_entrega": "2026-03-15", "materia": "Física"}
+
+Este módulo solo lee: leer_registros() entrega los registros de a uno,
+con su número de línea, sin cargar el archivo en memoria. La validación y
+la escritura en lotes están en TaskManager.importar.
+"""
+
+import csv
+import gzip
+import json
+import os
+from typing import Iterator, NamedTuple, Optional
+
+FORMATOS = ("csv", "jsonl")
+
+# Encabezado de los archivos CSV (también lo usa la exportación)
+CAMPOS_CSV = ("tipo", "nombre", "color", "titulo", "descripcion", "prioridad",
+              "fecha_entrega", "materia", "esfuerzo")
+
+
+class ErrorImportacion(NamedTuple):
+    """
+    Un registro rechazado.
+
+    Atributos:
+        linea   (int): Línea del archivo donde termina el registro.
+        mensaje (str): Motivo del rechazo.
+    """
+    linea: int
+    mensaje: str
+
+
+class ResultadoImportacion(NamedTuple):
+    """
+    Resumen de TaskManager.importar.
+
+    Atributos:
+        registros     (int):   Registros leídos (válidos o no).
+        materias      (int):   Materias creadas.
+        tareas        (int):   Tareas creadas.
+        errores       (list[ErrorImportacion]): Primeros errores, en orden
+                               de línea (hasta max_errores).
+        total_errores (int):   Cantidad total de registros rechazados.
+        segundos      (float): Duración de la importación.
+    """
+    registros: int
+    materias: int
+    tareas: int
+    errores: list
+    total_errores: int
+    segundos: float
+
+    @property
+    def filas_por_segundo(self) -> float:
+        """Registros procesados por segundo."""
+        return self.registros / self.segundos if self.segundos else 0.0
+
+
+def detectar_formato(ruta) -> str:
+    """
+    Deduce el formato por la extensión (.csv, .jsonl o .ndjson, con o sin
+    .gz al final).
+
+    Raises:
+        ValueError: Si la extensión no es de un formato conocido.
+    """
+    nombre = os.fspath(ruta).lower()
+    if nombre.endswith(".gz"):
+        nombre = nombre[:-3]
+    if nombre.endswith(".csv"):
+        return "csv"
+    if nombre.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    raise ValueError("No se reconoce el formato del archivo (use .csv o .jsonl)")
+
+
+def abrir_texto(ruta, modo: str = "r"):
+    """
+    Abre un archivo de texto UTF-8, comprimido con gzip si termina en .gz
+    (con el nivel de compresión por omisión de la herramienta gzip, 6: el
+    9 de gzip.open tarda varias veces más y reduce poco el tamaño).
+    """
+    if os.fspath(ruta).lower().endswith(".gz"):
+        return gzip.open(ruta, modo + "t", compresslevel=6, encoding="utf-8",
+                         newline="")
+    return open(ruta, modo, encoding="utf-8", newline="")
+
+
+def leer_registros(archivo, formato: str) -> Iterator[tuple]:
+    """
+    Genera los registros de un archivo abierto en modo texto.
+
+    Args:
+        archivo: Archivo de texto (o cualquier iterable de líneas).
+        formato (str): "csv" o "jsonl".
+
+    Yields:
+        tuple: (linea, registro) con registro un dict de campos a valores
+               (cadenas vacías y nulos se omiten), o (linea, error) con un
+               ValueError si la línea no se pudo interpretar.
+    """
+    if formato == "csv":
+        lector = csv.DictReader(archivo)
+        faltantes = {"tipo"} - set(lector.fieldnames or ())
+        if faltantes:
+            yield 1, ValueError("El encabezado CSV debe incluir la columna 'tipo'")
+            return
+        for fila in lector:
+            yield lector.line_num, {clave: valor for clave, valor in fila.items()
+                                    if clave is not None and valor not in (None, "")}
+    elif formato == "jsonl":
+        for linea, texto in enumerate(archivo, 1):
+            if not texto.strip():
+                continue
+            try:
+                registro = json.loads(texto)
+            except json.JSONDecodeError as ex:
+                yield linea, ValueError(f"JSON inválido: {ex.msg}")
+                continue
+            if not isinstance(registro, dict):
+                yield linea, ValueError("Cada línea debe ser un objeto JSON")
+                continue
+            yield linea, {clave: valor for clave, valor in registro.items()
+                          if valor not in (None, "")}
+    else:
+        raise ValueError(f"Formato desconocido: {formato} (use csv o jsonl)")
+
+
+def campo_texto(registro: dict, campo: str, defecto: Optional[str] = None) -> str:
+    """
+    Valor de texto de un campo.
+
+    Raises:
+        ValueError: Si falta (y no hay valor por defecto) o no es texto.
+    """
+    valor = registro.get(campo, defecto)
+    if valor is None:
+        raise ValueError(f"Falta el campo '{campo}'")
+    if not isinstance(valor, str):
+        raise ValueError(f"El campo '{campo}' debe ser texto")
+    return valor
@@ -0,0 +1,481 @@
+"""
+instantanea.py
+==============
+Instantánea binaria de todas las materias y tareas de un usuario, para
+cargarlas sin pasar por el ORM (interfaz, análisis, respaldo), en el
+proyecto TaskMaster Student.
+
+Formato (versión FORMATO, enteros little-endian):
+
+    cabecera   CABECERA: magia b"TMSNAP", versión del formato, cantidad
+               de columnas, usuario, último número de registro_cambios
+               reflejado y fecha de creación (segundos desde 1970).
+    índice     Una entrada ENTRADA_INDICE por columna: nombre, tipo de
+               `array` ('q', 'i', 'h', 'b' o 'B'), posición y cantidad
+               de elementos.
+    columnas   Los datos de cada columna, alineados a 8 bytes.
+
+Cada columna numérica es un arreglo con un valor por fila:
+
+    materias.id, materias.version
+    tareas.id (creciente), tareas.materia_id, tareas.version,
+    tareas.fecha (ordinal de date), tareas.prioridad y tareas.estado
+    (códigos de EnumEntero), tareas.esfuerzo (-1 = sin estimar),
+    tareas.recurrencia_id (0 = ninguna)
+
+Cada columna de texto usa dos o tres arreglos: `<nombre>.txt` con los
+textos UTF-8 seguidos, `<nombre>.off` con la posición donde empieza cada
+uno (una más que filas, para el final del último) y, si admite nulos,
+`<nombre>.nul` con 1 en las filas nulas. Son de texto materias.nombre,
+materias.color, tareas.titulo y tareas.descripcion (con nulos).
+
+Los lectores buscan las columnas por nombre: una versión nueva puede
+agregar columnas sin romper a los lectores existentes, y un cambio
+incompatible sube FORMATO.
+
+Instantanea abre el archivo con mmap: abrir no lee los datos, las
+columnas se exponen como memoryview sin copiarlas y cada fila se arma
+recién al pedirla.
+"""
+
+import array
+import mmap
+import os
+import struct
+import sys
+import time
+from bisect import bisect_left
+from collections.abc import Sequence
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from sqlalchemy import Integer, bindparam, cast, func, select, type_coerce
+from src.model.modelo import (EstadoTarea, Materia, Prioridad, RegistroCambio,
+                              Tarea)
+
+MAGIA = b"TMSNAP"
+FORMATO = 1
+
+# magia, formato, columnas, usuario_id, seq, creada
+CABECERA = struct.Struct("<6sHIqqq")
+# nombre, tipo de array, posición, cantidad de elementos
+ENTRADA_INDICE = struct.Struct("<31sBqq")
+
+_PRIORIDADES = Tarea.__table__.c.prioridad.type.miembros
+_ESTADOS = Tarea.__table__.c.estado.type.miembros
+
+# Filas que se arman por vez al recorrer una instantánea
+FILAS_POR_TRAMO = 4096
+
+# julianday('0001-01-01') - 1: convierte fechas de SQLite en ordinales
+# de date sin pasar por Python
+_JULIANO_ORDINAL = 1721424.5
+
+
+class FilaMateria(NamedTuple):
+    """Materia leída de una instantánea (mismos nombres que Materia)."""
+    idMateria: int
+    nombre: str
+    color: str
+    version: int
+
+
+class FilaTarea(NamedTuple):
+    """Tarea leída de una instantánea (mismos nombres que Tarea)."""
+    idTarea: int
+    titulo: str
+    descripcion: Optional[str]
+    prioridad: Prioridad
+    fechaEntrega: date
+    estado: EstadoTarea
+    materia_id: int
+    version: int
+    esfuerzo: Optional[int]
+    recurrencia_id: Optional[int]
+
+
+class ResultadoInstantanea(NamedTuple):
+    """
+    Resumen de TaskManager.guardar_instantanea.
+
+    Atributos:
+        materias (int):   Materias guardadas.
+        tareas   (int):   Tareas guardadas.
+        tamano   (int):   Tamaño del archivo en bytes.
+        seq      (int):   Último cambio reflejado.
+        segundos (float): Duración.
+    """
+    materias: int
+    tareas: int
+    tamano: int
+    seq: int
+    segundos: float
+
+
+# ──────────────────────────────────────────────────────────────
+# Escritura
+# ──────────────────────────────────────────────────────────────
+
+class ColumnaTexto:
+    """Acumula una columna de texto: textos UTF-8 seguidos y posiciones."""
+
+    def __init__(self, con_nulos: bool = False):
+        self.texto = array.array("B")
+        self.posiciones = array.array("q", [0])
+        self.nulos = array.array("B") if con_nulos else None
+
+    def extender(self, valores):
+        """Agrega los valores de varias filas (None solo si admite nulos)."""
+        texto, posiciones = self.texto, self.posiciones
+        if self.nulos is not None:
+            self.nulos.extend(valor is None for valor in valores)
+        for valor in valores:
+            if valor:
+                texto.frombytes(valor.encode("utf-8"))
+            posiciones.append(len(texto))
+
+    def arreglos(self, nombre: str) -> dict:
+        """Arreglos de la columna con sus nombres en el archivo."""
+        arreglos = {f"{nombre}.off": self.posiciones, f"{nombre}.txt": self.texto}
+        if self.nulos is not None:
+            arreglos[f"{nombre}.nul"] = self.nulos
+        return arreglos
+
+
+@lru_cache(maxsize=None)
+def consultas_instantanea() -> tuple:
+    """
+    Sentencias (seq, materias, tareas) de TaskManager.guardar_instantanea,
+    construidas una sola vez. Las columnas ya vienen como se guardan
+    (códigos de enumeración, ordinales de fecha, -1 y 0 en lugar de
+    nulos), en orden de ID. Parámetro: usuario_id.
+    """
+    seq = select(func.coalesce(func.max(RegistroCambio.seq), 0))
+    materias = select(Materia.idMateria, Materia.version, Materia.nombre, Materia.color) \
+        .where(Materia.usuario_id == bindparam("usuario_id")) \
+        .order_by(Materia.idMateria)
+    tareas = select(Tarea.idTarea, Tarea.materia_id, Tarea.version,
+                    cast(func.julianday(Tarea.fechaEntrega) - _JULIANO_ORDINAL, Integer),
+                    type_coerce(Tarea.prioridad, Integer),
+                    type_coerce(Tarea.estado, Integer),
+                    func.coalesce(Tarea.esfuerzo, -1),
+                    func.coalesce(Tarea.recurrencia_id, 0),
+                    Tarea.titulo, Tarea.descripcion) \
+        .join(Materia) \
+        .where(Materia.usuario_id == bindparam("usuario_id")) \
+        .order_by(Tarea.idTarea)
+    return seq, materias, tareas
+
+
+def columnas_materias(filas) -> dict:
+    """
+    Columnas de las materias a partir de las filas de la consulta de
+    materias de consultas_instantanea.
+    """
+    ids, versiones = array.array("q"), array.array("i")
+    nombres, colores = ColumnaTexto(), ColumnaTexto()
+    if filas:
+        id_, version, nombre, color = zip(*filas)
+        ids.extend(id_)
+        versiones.extend(version)
+        nombres.extender(nombre)
+        colores.extender(color)
+    return {"materias.id": ids, "materias.version": versiones,
+            **nombres.arreglos("materias.nombre"), **colores.arreglos("materias.color")}
+
+
+def columnas_tareas(lotes) -> dict:
+    """
+    Columnas de las tareas a partir de los lotes de filas de la consulta
+    de tareas de consultas_instantanea. Cada lote se traspone con zip y
+    se agrega a los arreglos de una vez.
+    """
+    numericas = [("tareas.id", "q"), ("tareas.materia_id", "q"), ("tareas.version", "i"),
+                 ("tareas.fecha", "i"), ("tareas.prioridad", "b"), ("tareas.estado", "b"),
+                 ("tareas.esfuerzo", "h"), ("tareas.recurrencia_id", "q")]
+    arreglos = [array.array(tipo) for _, tipo in numericas]
+    titulos, descripciones = ColumnaTexto(), ColumnaTexto(con_nulos=True)
+    for lote in lotes:
+        *valores, titulo, descripcion = zip(*lote)
+        for arreglo, columna in zip(arreglos, valores):
+            arreglo.extend(columna)
+        titulos.extender(titulo)
+        descripciones.extender(descripcion)
+    columnas = {nombre: arreglo for (nombre, _), arreglo in zip(numericas, arreglos)}
+    columnas.update(titulos.arreglos("tareas.titulo"))
+    columnas.update(descripciones.arreglos("tareas.descripcion"))
+    return columnas
+
+
+def guardar(ruta, usuario_id: int, seq: int, columnas: dict) -> int:
+    """
+    Escribe una instantánea; el archivo se reemplaza recién al terminar.
+
+    Returns:
+        int: Tamaño del archivo en bytes.
+    """
+    ruta = os.fspath(ruta)
+    temporal = f"{ruta}.tmp"
+    try:
+        with open(temporal, "wb") as archivo:
+            escribir(archivo, usuario_id, seq, columnas)
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    return os.path.getsize(ruta)
+
+
+def escribir(archivo, usuario_id: int, seq: int, columnas: dict):
+    """
+    Escribe una instantánea en un archivo binario abierto.
+
+    Args:
+        archivo: Archivo abierto en modo "wb".
+        usuario_id (int): Usuario de la instantánea.
+        seq (int): Último número de cambio reflejado.
+        columnas (dict[str, array.array]): Columnas por nombre.
+    """
+    indice = []
+    posicion = CABECERA.size + ENTRADA_INDICE.size * len(columnas)
+    for nombre, arreglo in columnas.items():
+        posicion += -posicion % 8
+        indice.append((nombre.encode("ascii"), ord(arreglo.typecode), posicion, len(arreglo)))
+        posicion += len(arreglo) * arreglo.itemsize
+    archivo.write(CABECERA.pack(MAGIA, FORMATO, len(columnas), usuario_id, seq,
+                                int(time.time())))
+    for entrada in indice:
+        archivo.write(ENTRADA_INDICE.pack(*entrada))
+    escrito = CABECERA.size + ENTRADA_INDICE.size * len(columnas)
+    for (_, _, posicion, _), arreglo in zip(indice, columnas.values()):
+        archivo.write(b"\0" * (posicion - escrito))
+        if sys.byteorder == "big" and arreglo.itemsize > 1:
+            arreglo = array.array(arreglo.typecode, arreglo)
+            arreglo.byteswap()
+        arreglo.tofile(archivo)
+        escrito = posicion + len(arreglo) * arreglo.itemsize
+
+
+# ──────────────────────────────────────────────────────────────
+# Lectura
+# ──────────────────────────────────────────────────────────────
+
+class _Filas(Sequence):
+    """Secuencia de filas que se arman al pedirlas."""
+
+    def __init__(self, instantanea: "Instantanea", prefijo: str):
+        self._instantanea = instantanea
+        self._ids = instantanea.columna(f"{prefijo}.id")
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self):
+        return map(self._fila, range(len(self)))
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self._fila(i) for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("Fila fuera de rango")
+        return self._fila(indice)
+
+    def buscar(self, id_entidad: int):
+        """Fila con ese ID (búsqueda binaria), o None si no está."""
+        i = bisect_left(self._ids, id_entidad)
+        if i < len(self._ids) and self._ids[i] == id_entidad:
+            return self._fila(i)
+        return None
+
+
+class _Materias(_Filas):
+    def __init__(self, instantanea: "Instantanea"):
+        super().__init__(instantanea, "materias")
+        self._version = instantanea.columna("materias.version")
+        self._nombre = instantanea.texto("materias.nombre")
+        self._color = instantanea.texto("materias.color")
+
+    def _fila(self, i: int) -> FilaMateria:
+        return FilaMateria(self._ids[i], self._nombre(i), self._color(i), self._version[i])
+
+
+class _Tareas(_Filas):
+    def __init__(self, instantanea: "Instantanea"):
+        super().__init__(instantanea, "tareas")
+        columna = instantanea.columna
+        self._materia = columna("tareas.materia_id")
+        self._version = columna("tareas.version")
+        self._fecha = columna("tareas.fecha")
+        self._prioridad = columna("tareas.prioridad")
+        self._estado = columna("tareas.estado")
+        self._esfuerzo = columna("tareas.esfuerzo")
+        self._recurrencia = columna("tareas.recurrencia_id")
+        self._titulo = instantanea.texto("tareas.titulo")
+        self._descripcion = instantanea.texto("tareas.descripcion")
+
+    def __iter__(self):
+        # De a FILAS_POR_TRAMO filas: cada columna del tramo se convierte
+        # en lista de una vez en lugar de indexar el memoryview por fila
+        numericas = (self._ids, self._materia, self._version, self._fecha,
+                     self._prioridad, self._estado, self._esfuerzo, self._recurrencia)
+        desde_ordinal = date.fromordinal
+        for inicio in range(0, len(self), FILAS_POR_TRAMO):
+            fin = min(inicio + FILAS_POR_TRAMO, len(self))
+            columnas = [c[inicio:fin].tolist() for c in numericas]
+            for (id_, materia, version, fecha, prioridad, estado, esfuerzo, recurrencia,
+                 titulo, descripcion) in zip(*columnas, self._titulo.tramo(inicio, fin),
+                                             self._descripcion.tramo(inicio, fin)):
+                yield FilaTarea(id_, titulo, descripcion, _PRIORIDADES[prioridad],
+                                desde_ordinal(fecha), _ESTADOS[estado], materia, version,
+                                None if esfuerzo < 0 else esfuerzo, recurrencia or None)
+
+    def _fila(self, i: int) -> FilaTarea:
+        esfuerzo = self._esfuerzo[i]
+        return FilaTarea(self._ids[i], self._titulo(i), self._descripcion(i),
+                         _PRIORIDADES[self._prioridad[i]],
+                         date.fromordinal(self._fecha[i]), _ESTADOS[self._estado[i]],
+                         self._materia[i], self._version[i],
+                         None if esfuerzo < 0 else esfuerzo,
+                         self._recurrencia[i] or None)
+
+
+class Instantanea:
+    """
+    Instantánea abierta con mmap.
+
+    Atributos:
+        usuario_id (int):  Usuario de la instantánea.
+        seq        (int):  Último número de registro_cambios reflejado.
+        creada     (int):  Fecha de creación (segundos desde 1970).
+        materias   (Sequence[FilaMateria]): En orden de ID.
+        tareas     (Sequence[FilaTarea]):   En orden de ID.
+
+    materias y tareas admiten len, índices, iteración y buscar(id). Las
+    filas se arman al pedirlas; las columnas (ver columna) se leen sin
+    copiarse. Todo es válido hasta cerrar la instantánea.
+
+    Uso típico:
+        with Instantanea("juan.tmsnap") as inst:
+            pendientes = sum(1 for e in inst.columna("tareas.estado") if e == 0)
+            tarea = inst.tareas.buscar(42)
+    """
+
+    def __init__(self, ruta):
+        """
+        Abre la instantánea.
+
+        Raises:
+            ValueError: Si el archivo no es una instantánea o es de un
+                        formato posterior.
+        """
+        with open(ruta, "rb") as archivo:
+            try:
+                self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError("El archivo no es una instantánea") from None
+        self._vistas = []
+        try:
+            self._leer_indice()
+        except (ValueError, struct.error):
+            self.cerrar()
+            raise
+
+    def _leer_indice(self):
+        try:
+            magia, formato, cantidad, self.usuario_id, self.seq, self.creada = \
+                CABECERA.unpack_from(self._mapa)
+        except struct.error:
+            raise ValueError("El archivo no es una instantánea") from None
+        if magia != MAGIA:
+            raise ValueError("El archivo no es una instantánea")
+        if formato > FORMATO:
+            raise ValueError(f"Formato de instantánea {formato} no soportado "
+                             f"(se admite hasta {FORMATO})")
+        base = memoryview(self._mapa)
+        self._vistas.append(base)
+        self._columnas = {}
+        for n in range(cantidad):
+            nombre, tipo, posicion, elementos = ENTRADA_INDICE.unpack_from(
+                self._mapa, CABECERA.size + n * ENTRADA_INDICE.size)
+            tipo = chr(tipo)
+            largo = elementos * array.array(tipo).itemsize
+            if posicion + largo > len(self._mapa):
+                raise ValueError("La instantánea está incompleta")
+            vista = base[posicion:posicion + largo]
+            if sys.byteorder == "big" and largo > elementos:
+                # Las columnas están en little-endian: se copian invertidas
+                copia = array.array(tipo, vista.tobytes())
+                copia.byteswap()
+                vista = memoryview(copia)
+            else:
+                vista = vista.cast(tipo)
+            self._vistas.append(vista)
+            self._columnas[nombre.rstrip(b"\0").decode("ascii")] = vista
+        self.materias = _Materias(self)
+        self.tareas = _Tareas(self)
+
+    def columnas(self) -> list:
+        """Nombres de las columnas del archivo."""
+        return list(self._columnas)
+
+    def columna(self, nombre: str) -> memoryview:
+        """
+        Columna numérica sin copiar (memoryview de enteros).
+
+        Raises:
+            ValueError: Si la columna no existe.
+        """
+        try:
+            return self._columnas[nombre]
+        except KeyError:
+            raise ValueError(f"La instantánea no tiene la columna '{nombre}'") from None
+
+    def texto(self, nombre: str):
+        """
+        Función i → texto de la fila i de una columna de texto (None si
+        es nula). La función tiene además el método `tramo(inicio, fin)`,
+        que retorna la lista de textos de esas filas de una vez.
+        """
+        posiciones = self.columna(f"{nombre}.off")
+        texto = self.columna(f"{nombre}.txt")
+        nulos = self._columnas.get(f"{nombre}.nul")
+
+        def _valor(i: int) -> Optional[str]:
+            if nulos is not None and nulos[i]:
+                return None
+            return str(texto[posiciones[i]:posiciones[i + 1]], "utf-8")
+
+        def _tramo(inicio: int, fin: int) -> list:
+            limites = posiciones[inicio:fin + 1].tolist()
+            datos = texto[limites[0]:limites[-1]].tobytes()
+            base = limites[0]
+            valores = [datos[a - base:b - base].decode("utf-8")
+                       for a, b in zip(limites, limites[1:])]
+            if nulos is not None:
+                for i in range(inicio, fin):
+                    if nulos[i]:
+                        valores[i - inicio] = None
+            return valores
+
+        _valor.tramo = _tramo
+        return _valor
+
+    def cerrar(self):
+        """Libera las columnas y el mapeo del archivo."""
+        for vista in reversed(self._vistas):
+            vista.release()
+        self._vistas = []
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+
+def abrir(ruta) -> Instantanea:
+    """Abre una instantánea (ver Instantanea)."""
+    return Instantanea(os.fspath(ruta))
@@ -0,0 +1,270 @@
+"""
+instrumentacion.py
+==================
+Medición por método de las operaciones de TaskManager: cantidad de
+llamadas, histograma de latencias (p50 / p95 / p99), sentencias SQL
+emitidas y filas retornadas.
+
+Desactivada no cuesta nada: activar() reemplaza los métodos públicos de
+la clase por envoltorios que miden y registra un listener
+before_cursor_execute en el engine; desactivar() restaura los métodos
+originales y quita el listener.
+
+Solo se mide la llamada más externa de cada hilo: si crear_tarea llama a
+seleccionar_materia, todo cuenta para crear_tarea. Las sentencias son las
+que ese hilo ejecuta con SQLAlchemy mientras dura la llamada (no las de
+la cola de escritura, que corren en su propio hilo, ni las de conexiones
+sqlite3 directas). Las filas retornadas son el largo del resultado si es
+una lista o tupla, 0 si es None y 1 en otro caso.
+
+Las latencias se agrupan en un histograma logarítmico de
+CUBETAS_POR_OCTAVA cubetas por cada duplicación (error de los percentiles
+menor al 19 %), con memoria fija por método.
+
+Uso típico:
+    from src.logic.instrumentacion import instrumentacion
+
+    instrumentacion.activar()
+    ...
+    print(instrumentacion.reporte())
+    instrumentacion.desactivar()
+
+Ejecución directa:
+    python run.py --stats
+"""
+
+import inspect
+import math
+import threading
+import time
+from functools import wraps
+from typing import NamedTuple
+from sqlalchemy import event
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import engine as engine_defecto
+
+# Cubetas del histograma por cada duplicación de la latencia
+CUBETAS_POR_OCTAVA = 4
+
+# Latencia de la primera cubeta (las menores también caen en ella)
+_BASE_S = 1e-6
+
+# 4 cubetas por octava desde 1 µs cubren hasta ~18 minutos
+_CUBETAS = CUBETAS_POR_OCTAVA * 30
+
+
+class EstadisticaMetodo(NamedTuple):
+    """
+    Mediciones acumuladas de un método.
+
+    Atributos:
+        metodo     (str):   Nombre del método.
+        llamadas   (int):   Llamadas medidas.
+        errores    (int):   Llamadas que terminaron con una excepción.
+        total_s    (float): Suma de las latencias.
+        p50_s      (float): Mediana de la latencia (cota superior de su cubeta).
+        p95_s      (float): Percentil 95.
+        p99_s      (float): Percentil 99.
+        maximo_s   (float): Mayor latencia observada.
+        sentencias (int):   Sentencias SQL emitidas en total.
+        filas      (int):   Filas retornadas en total.
+    """
+    metodo: str
+    llamadas: int
+    errores: int
+    total_s: float
+    p50_s: float
+    p95_s: float
+    p99_s: float
+    maximo_s: float
+    sentencias: int
+    filas: int
+
+    @property
+    def promedio_s(self) -> float:
+        """Latencia promedio."""
+        return self.total_s / self.llamadas if self.llamadas else 0.0
+
+    @property
+    def sentencias_por_llamada(self) -> float:
+        """Sentencias SQL promedio por llamada."""
+        return self.sentencias / self.llamadas if self.llamadas else 0.0
+
+
+class _Acumulado:
+    """Contadores e histograma de un método (protegidos por el lock del registro)."""
+
+    __slots__ = ("llamadas", "errores", "total_s", "maximo_s", "sentencias",
+                 "filas", "cubetas")
+
+    def __init__(self):
+        self.llamadas = self.errores = self.sentencias = self.filas = 0
+        self.total_s = self.maximo_s = 0.0
+        self.cubetas = [0] * _CUBETAS
+
+    def percentil(self, fraccion: float) -> float:
+        """Cota superior de la cubeta que contiene el percentil pedido."""
+        objetivo = max(1, math.ceil(self.llamadas * fraccion))
+        acumuladas = 0
+        for indice, cantidad in enumerate(self.cubetas):
+            acumuladas += cantidad
+            if acumuladas >= objetivo:
+                return min(_BASE_S * 2 ** ((indice + 1) / CUBETAS_POR_OCTAVA),
+                           self.maximo_s)
+        return self.maximo_s
+
+
+def _cubeta(segundos: float) -> int:
+    """Índice de la cubeta del histograma de una latencia."""
+    if segundos <= _BASE_S:
+        return 0
+    return min(int(math.log2(segundos / _BASE_S) * CUBETAS_POR_OCTAVA), _CUBETAS - 1)
+
+
+def _filas(resultado) -> int:
+    """Filas retornadas por un método según el tipo de su resultado."""
+    if resultado is None:
+        return 0
+    if isinstance(resultado, (list, tuple)) and not hasattr(resultado, "_fields"):
+        return len(resultado)
+    return 1
+
+
+class Instrumentacion:
+    """
+    Registro de mediciones por método, seguro para uso entre hilos.
+
+    Atributos:
+        clase:  Clase cuyos métodos públicos se miden.
+        engine: Engine de SQLAlchemy cuyas sentencias se cuentan.
+    """
+
+    def __init__(self, clase=TaskManager, engine=engine_defecto):
+        """
+        Crea el registro (desactivado).
+
+        Args:
+            clase: Clase a medir (por defecto, TaskManager).
+            engine: Engine de SQLAlchemy (por defecto, el del proyecto).
+        """
+        self.clase = clase
+        self.engine = engine
+        self._acumulados: dict = {}
+        self._originales: dict = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def activa(self) -> bool:
+        """Si los métodos están siendo medidos."""
+        return bool(self._originales)
+
+    def activar(self):
+        """Empieza a medir (no hace nada si ya estaba activa)."""
+        with self._lock:
+            if self._originales:
+                return
+            for nombre, atributo in list(vars(self.clase).items()):
+                if nombre.startswith("_") or not inspect.isfunction(atributo):
+                    continue
+                self._originales[nombre] = atributo
+                setattr(self.clase, nombre, self._envolver(nombre, atributo))
+            event.listen(self.engine, "before_cursor_execute", self._contar_sentencia)
+
+    def desactivar(self):
+        """Deja de medir y restaura los métodos originales (conserva lo medido)."""
+        with self._lock:
+            if not self._originales:
+                return
+            event.remove(self.engine, "before_cursor_execute", self._contar_sentencia)
+            for nombre, original in self._originales.items():
+                setattr(self.clase, nombre, original)
+            self._originales.clear()
+
+    def reiniciar(self):
+        """Descarta todo lo medido."""
+        with self._lock:
+            self._acumulados.clear()
+
+    def _envolver(self, nombre: str, funcion):
+        """Envoltorio que mide las llamadas externas a `funcion`."""
+        local = self._local
+
+        @wraps(funcion)
+        def medido(*args, **kwargs):
+            if getattr(local, "sentencias", None) is not None:
+                return funcion(*args, **kwargs)
+            local.sentencias = 0
+            resultado = None
+            error = True
+            inicio = time.perf_counter()
+            try:
+                resultado = funcion(*args, **kwargs)
+                error = False
+                return resultado
+            finally:
+                duracion = time.perf_counter() - inicio
+                sentencias, local.sentencias = local.sentencias, None
+                self._registrar(nombre, duracion, sentencias,
+                                0 if error else _filas(resultado), error)
+
+        return medido
+
+    def _contar_sentencia(self, conn, cursor, statement, parameters, context,
+                          executemany):
+        """Listener before_cursor_execute: suma una sentencia al método en curso."""
+        if getattr(self._local, "sentencias", None) is not None:
+            self._local.sentencias += 1
+
+    def _registrar(self, nombre: str, duracion: float, sentencias: int, filas: int,
+                   error: bool):
+        with self._lock:
+            acumulado = self._acumulados.get(nombre)
+            if acumulado is None:
+                acumulado = self._acumulados[nombre] = _Acumulado()
+            acumulado.llamadas += 1
+            acumulado.errores += error
+            acumulado.total_s += duracion
+            acumulado.maximo_s = max(acumulado.maximo_s, duracion)
+            acumulado.sentencias += sentencias
+            acumulado.filas += filas
+            acumulado.cubetas[_cubeta(duracion)] += 1
+
+    def instantanea(self) -> dict:
+        """
+        Retorna las mediciones de cada método llamado al menos una vez.
+
+        Returns:
+            dict: {nombre del método: EstadisticaMetodo}.
+        """
+        with self._lock:
+            return {
+                nombre: EstadisticaMetodo(
+                    nombre, a.llamadas, a.errores, a.total_s, a.percentil(0.50),
+                    a.percentil(0.95), a.percentil(0.99), a.maximo_s,
+                    a.sentencias, a.filas)
+                for nombre, a in self._acumulados.items()}
+
+    def reporte(self) -> str:
+        """
+        Tabla legible de las mediciones, de mayor a menor tiempo total.
+
+        Returns:
+            str: Una línea por método (o un aviso si no se midió nada).
+        """
+        estadisticas = sorted(self.instantanea().values(), key=lambda e: -e.total_s)
+        if not estadisticas:
+            return "Sin llamadas medidas"
+        lineas = [f"{'método':<24} {'llamadas':>8} {'errores':>7} {'total ms':>9} "
+                  f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'máx ms':>8} "
+                  f"{'SQL/llam':>8} {'filas':>7}"]
+        for e in estadisticas:
+            lineas.append(
+                f"{e.metodo:<24} {e.llamadas:>8} {e.errores:>7} {e.total_s * 1000:>9.1f} "
+                f"{e.p50_s * 1000:>8.2f} {e.p95_s * 1000:>8.2f} {e.p99_s * 1000:>8.2f} "
+                f"{e.maximo_s * 1000:>8.2f} {e.sentencias_por_llamada:>8.1f} {e.filas:>7}")
+        return "\n".join(lineas)
+
+
+# Registro global de TaskManager compartido por todo el proceso
+instrumentacion = Instrumentacion()
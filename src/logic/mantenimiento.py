@@ -0,0 +1,410 @@
+"""
+mantenimiento.py
+================
+Mantenimiento de la base de datos del proyecto TaskMaster Student:
+estadísticas del planificador de consultas y recuperación del espacio
+libre.
+
+Tras borrados grandes (eliminar_materia, archivar, limpiezas masivas)
+db.sqlite no se achica: las páginas liberadas quedan en la lista de
+páginas libres. Y sin ANALYZE el planificador elige índices sin saber
+cuántas filas tiene cada tabla. Este módulo resuelve ambas cosas:
+
+    - ANALYZE (acotado a LIMITE_ANALISIS filas por índice) cuando desde
+      el último se modificaron al menos UMBRAL_CAMBIOS filas, según
+      contadores_cambios; si no, el PRAGMA optimize habitual. Además,
+      cada conexión del pool ejecuta PRAGMA optimize al cerrarse (ver
+      src.model.declarative_base).
+    - PRAGMA incremental_vacuum de a PAGINAS_POR_PASO páginas, con pausas
+      y dentro de un presupuesto de tiempo, cuando las páginas libres son
+      al menos UMBRAL_LIBRES del archivo. Requiere auto_vacuum
+      incremental: las bases nuevas lo tienen; las creadas antes se
+      convierten una vez con convertir() (un VACUUM completo).
+
+mantener() hace una pasada; MantenimientoEnReposo la ejecuta en un hilo
+cuando la base de datos lleva un tiempo sin escrituras. estado() informa
+el tamaño del archivo y las páginas libres, y los publica en las métricas
+"bd.*".
+
+Uso típico:
+    from src.logic.mantenimiento import MantenimientoEnReposo, estado
+
+    print(estado().fraccion_libre)
+    reposo = MantenimientoEnReposo(reposo_s=60)
+    reposo.iniciar()
+    ...
+    reposo.detener()
+
+Ejecución directa:
+    python run.py mantenimiento
+    python run.py mantenimiento --convertir
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+from src.logic.cambios import DetectorCambios
+from src.logic.metricas import metricas
+from src.logic.reintentos import PoliticaReintentos
+from src.model.declarative_base import LIMITE_ANALISIS, engine as engine_defecto
+
+# Filas modificadas desde el último ANALYZE que justifican repetirlo
+UMBRAL_CAMBIOS = 10_000
+
+# Fracción del archivo en páginas libres a partir de la cual se recupera
+UMBRAL_LIBRES = 0.10
+
+# Páginas libres mínimas para recuperar (con páginas de 4 KiB, 1 MiB)
+MIN_PAGINAS_LIBRES = 256
+
+# Páginas devueltas al sistema por cada paso de incremental_vacuum
+PAGINAS_POR_PASO = 512
+
+# Segundos de pausa entre pasos, para dejar pasar a los escritores
+PAUSA_ENTRE_PASOS = 0.005
+
+# Segundos que puede durar una pasada de mantenimiento en reposo
+PRESUPUESTO_S = 0.5
+
+_MODOS_AUTO_VACUUM = ("none", "full", "incremental")
+
+
+class Estado(NamedTuple):
+    """
+    Tamaño y espacio libre de la base de datos.
+
+    Atributos:
+        bytes_archivo (int):   Tamaño de db.sqlite.
+        bytes_wal     (int):   Tamaño de db.sqlite-wal (0 si no existe).
+        paginas       (int):   Páginas de la base de datos.
+        libres        (int):   Páginas en la lista de páginas libres.
+        tamano_pagina (int):   Bytes por página.
+        auto_vacuum   (str):   'none', 'full' o 'incremental'.
+        cambios       (int):   Filas modificadas desde el último ANALYZE.
+        analizada     (Optional[datetime]): Último ANALYZE de mantener()
+                               (None si nunca se ejecutó).
+    """
+    bytes_archivo: int
+    bytes_wal: int
+    paginas: int
+    libres: int
+    tamano_pagina: int
+    auto_vacuum: str
+    cambios: int
+    analizada: Optional[datetime]
+
+    @property
+    def fraccion_libre(self) -> float:
+        """Proporción de páginas libres (0 a 1)."""
+        return self.libres / self.paginas if self.paginas else 0.0
+
+    @property
+    def requiere_analyze(self) -> bool:
+        """Nunca se analizó o cambiaron al menos UMBRAL_CAMBIOS filas."""
+        return self.analizada is None or self.cambios >= UMBRAL_CAMBIOS
+
+    @property
+    def requiere_vacuum(self) -> bool:
+        """Hay espacio libre suficiente y se puede recuperar por pasos."""
+        return (self.auto_vacuum == "incremental"
+                and self.libres >= MIN_PAGINAS_LIBRES
+                and self.fraccion_libre >= UMBRAL_LIBRES)
+
+
+class ResultadoMantenimiento(NamedTuple):
+    """
+    Resumen de mantener / convertir.
+
+    Atributos:
+        analizada (bool):   Si se ejecutó ANALYZE (si no, PRAGMA optimize).
+        liberadas (int):    Páginas devueltas al sistema.
+        pasos     (int):    Pasos de incremental_vacuum.
+        segundos  (float):  Duración total.
+        antes     (Estado): Estado al comenzar.
+        despues   (Estado): Estado al terminar.
+    """
+    analizada: bool
+    liberadas: int
+    pasos: int
+    segundos: float
+    antes: Estado
+    despues: Estado
+
+
+def _tamano(ruta: str) -> int:
+    """Tamaño de un archivo, o 0 si no existe."""
+    try:
+        return os.path.getsize(ruta)
+    except OSError:
+        return 0
+
+
+def estado(engine=engine_defecto) -> Estado:
+    """
+    Lee el tamaño y el espacio libre de la base de datos.
+
+    También fija las métricas "bd.bytes_archivo", "bd.bytes_wal",
+    "bd.paginas" y "bd.paginas_libres".
+
+    Args:
+        engine: Engine de SQLAlchemy (por defecto, el del proyecto).
+
+    Returns:
+        Estado: Medidas actuales.
+    """
+    with engine.connect() as conn:
+        pragmas = [conn.exec_driver_sql(f"PRAGMA {nombre}").scalar()
+                   for nombre in ("page_count", "freelist_count", "page_size",
+                                  "auto_vacuum")]
+        total = conn.exec_driver_sql(
+            "SELECT COALESCE(SUM(cambios), 0) FROM contadores_cambios").scalar()
+        marca = conn.exec_driver_sql(
+            "SELECT cambios, fecha FROM marcas_mantenimiento WHERE tarea = 'analyze'"
+        ).fetchone()
+    paginas, libres, tamano_pagina, auto_vacuum = pragmas
+    if marca is None:
+        cambios, analizada = total, None
+    else:
+        # Los contadores vuelven atrás si se restauró un respaldo
+        cambios = total - marca[0] if total >= marca[0] else total
+        analizada = datetime.fromisoformat(marca[1])
+    ruta = engine.url.database
+    actual = Estado(_tamano(ruta), _tamano(f"{ruta}-wal"), paginas, libres, tamano_pagina,
+                    _MODOS_AUTO_VACUUM[auto_vacuum], cambios, analizada)
+    for nombre, valor in (("bd.bytes_archivo", actual.bytes_archivo),
+                          ("bd.bytes_wal", actual.bytes_wal),
+                          ("bd.paginas", actual.paginas),
+                          ("bd.paginas_libres", actual.libres)):
+        metricas.establecer(nombre, valor)
+    return actual
+
+
+def _analizar(conexion) -> None:
+    """ANALYZE y marca de la suma de contadores, en una misma transacción."""
+    conexion.execute("BEGIN IMMEDIATE")
+    try:
+        conexion.execute("ANALYZE")
+        conexion.execute(
+            "INSERT OR REPLACE INTO marcas_mantenimiento (tarea, cambios, fecha) "
+            "SELECT 'analyze', COALESCE(SUM(cambios), 0), ? FROM contadores_cambios",
+            (datetime.now().isoformat(sep=" "),))
+        conexion.execute("COMMIT")
+    except BaseException:
+        conexion.execute("ROLLBACK")
+        raise
+
+
+def mantener(forzar: bool = False, presupuesto_s: Optional[float] = PRESUPUESTO_S,
+             paginas: int = PAGINAS_POR_PASO, pausa: float = PAUSA_ENTRE_PASOS,
+             politica: Optional[PoliticaReintentos] = None,
+             engine=engine_defecto) -> ResultadoMantenimiento:
+    """
+    Hace una pasada de mantenimiento según los umbrales.
+
+    Analiza si Estado.requiere_analyze (si no, PRAGMA optimize) y, si
+    Estado.requiere_vacuum, devuelve páginas libres de a `paginas` por
+    paso hasta agotarlas o el presupuesto. Al final intenta un checkpoint
+    pasivo, que es el que achica db.sqlite en modo WAL.
+
+    Args:
+        forzar (bool): Analiza y recupera todo el espacio libre aunque no
+            se alcancen los umbrales (la recuperación sigue requiriendo
+            auto_vacuum incremental).
+        presupuesto_s (Optional[float]): Segundos tras los cuales no se
+            empiezan más pasos (None, sin límite).
+        paginas (int): Páginas por paso (>= 1).
+        pausa (float): Segundos de espera entre pasos (>= 0).
+        politica (Optional[PoliticaReintentos]): Reintentos ante bloqueos
+            (por defecto, la política estándar).
+        engine: Engine de SQLAlchemy (por defecto, el del proyecto).
+
+    Returns:
+        ResultadoMantenimiento: Resumen de la pasada.
+
+    Raises:
+        ValueError: Si un parámetro es inválido.
+    """
+    if isinstance(paginas, bool) or not isinstance(paginas, int) or paginas < 1:
+        raise ValueError("Las páginas por paso deben ser un entero mayor o igual a 1")
+    if pausa < 0:
+        raise ValueError("La pausa entre pasos no puede ser negativa")
+    if presupuesto_s is not None and presupuesto_s <= 0:
+        raise ValueError("El presupuesto de tiempo debe ser mayor a 0")
+    politica = politica or PoliticaReintentos()
+
+    inicio = time.perf_counter()
+    antes = estado(engine)
+    analizada = forzar or antes.requiere_analyze
+    liberadas = pasos = 0
+    conexion = engine.raw_connection()
+    try:
+        sqlite = conexion.driver_connection
+        if analizada:
+            sqlite.execute(f"PRAGMA analysis_limit={LIMITE_ANALISIS}")
+            politica.ejecutar(lambda: _analizar(sqlite))
+            metricas.incrementar("mantenimiento.analyze")
+        else:
+            politica.ejecutar(lambda: sqlite.execute("PRAGMA optimize"))
+        if antes.requiere_vacuum or (forzar and antes.auto_vacuum == "incremental"):
+            libres = antes.libres
+            while libres:
+                # execute() avanza la sentencia un solo paso (una página);
+                # executescript la ejecuta completa
+                politica.ejecutar(lambda: sqlite.executescript(
+                    f"PRAGMA incremental_vacuum({paginas})"))
+                pasos += 1
+                restantes = sqlite.execute("PRAGMA freelist_count").fetchone()[0]
+                if restantes >= libres:
+                    break
+                liberadas += libres - restantes
+                libres = restantes
+                if presupuesto_s is not None \
+                        and time.perf_counter() - inicio >= presupuesto_s:
+                    break
+                if libres and pausa:
+                    time.sleep(pausa)
+            if liberadas:
+                sqlite.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+                metricas.incrementar("mantenimiento.paginas_liberadas", liberadas)
+    finally:
+        conexion.close()
+    return ResultadoMantenimiento(analizada, liberadas, pasos,
+                                  time.perf_counter() - inicio, antes, estado(engine))
+
+
+def convertir(engine=engine_defecto) -> ResultadoMantenimiento:
+    """
+    Pasa una base de datos existente a auto_vacuum incremental.
+
+    Ejecuta un VACUUM completo, que reescribe todo el archivo (y de paso
+    devuelve todas las páginas libres): las escrituras de las demás
+    conexiones esperan mientras dura. No hace nada si ya estaba en modo
+    incremental.
+
+    Args:
+        engine: Engine de SQLAlchemy (por defecto, el del proyecto).
+
+    Returns:
+        ResultadoMantenimiento: Resumen (pasos es 1 si hubo VACUUM).
+    """
+    inicio = time.perf_counter()
+    antes = estado(engine)
+    pasos = 0
+    if antes.auto_vacuum != "incremental":
+        conexion = engine.raw_connection()
+        try:
+            sqlite = conexion.driver_connection
+            sqlite.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            sqlite.execute("VACUUM")
+            sqlite.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+        finally:
+            conexion.close()
+        pasos = 1
+    despues = estado(engine)
+    return ResultadoMantenimiento(False, max(antes.paginas - despues.paginas, 0), pasos,
+                                  time.perf_counter() - inicio, antes, despues)
+
+
+class MantenimientoEnReposo:
+    """
+    Ejecuta mantener() cuando la base de datos lleva un tiempo sin escrituras.
+
+    Un hilo consulta PRAGMA data_version cada intervalo_s. Si no cambió
+    durante reposo_s y algún umbral se alcanzó, hace una pasada acotada a
+    presupuesto_s; la pasada misma cambia data_version, así que la
+    siguiente espera otro período de reposo completo.
+
+    Atributos:
+        reposo_s      (float): Segundos sin escrituras antes de mantener.
+        intervalo_s   (float): Espera del hilo entre revisiones.
+        presupuesto_s (float): Duración máxima de cada pasada.
+        ultimo (Optional[ResultadoMantenimiento]): Última pasada ejecutada.
+    """
+
+    def __init__(self, reposo_s: float = 60.0, intervalo_s: float = 5.0,
+                 presupuesto_s: float = PRESUPUESTO_S,
+                 reloj: Callable = time.monotonic, engine=engine_defecto):
+        """
+        Crea el mantenimiento en reposo (sin iniciar el hilo).
+
+        Args:
+            reposo_s (float): Segundos sin escrituras antes de mantener (>= 0).
+            intervalo_s (float): Espera del hilo entre revisiones (> 0).
+            presupuesto_s (float): Duración máxima de cada pasada (> 0).
+            reloj (Callable): Función sin argumentos que retorna segundos
+                              monotónicos (se reemplaza en las pruebas).
+            engine: Engine de SQLAlchemy (por defecto, el del proyecto).
+
+        Raises:
+            ValueError: Si algún tiempo está fuera de rango.
+        """
+        if reposo_s < 0:
+            raise ValueError("El tiempo de reposo no puede ser negativo")
+        if intervalo_s <= 0:
+            raise ValueError("El intervalo de revisión debe ser mayor a 0")
+        if presupuesto_s <= 0:
+            raise ValueError("El presupuesto de tiempo debe ser mayor a 0")
+        self.reposo_s = reposo_s
+        self.intervalo_s = intervalo_s
+        self.presupuesto_s = presupuesto_s
+        self.ultimo: Optional[ResultadoMantenimiento] = None
+        self._reloj = reloj
+        self._engine = engine
+        self._detector = DetectorCambios(engine.url.database)
+        self._version: Optional[int] = None
+        self._quieta_desde = 0.0
+        self._detenido = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def revisar(self) -> Optional[ResultadoMantenimiento]:
+        """
+        Hace una pasada si corresponde.
+
+        Returns:
+            Optional[ResultadoMantenimiento]: La pasada, o None si hubo
+                escrituras recientes o no se alcanzó ningún umbral.
+        """
+        version = self._detector.version()
+        ahora = self._reloj()
+        if version != self._version:
+            self._version, self._quieta_desde = version, ahora
+            return None
+        if ahora - self._quieta_desde < self.reposo_s:
+            return None
+        actual = estado(self._engine)
+        if not (actual.requiere_analyze or actual.requiere_vacuum):
+            return None
+        self.ultimo = mantener(presupuesto_s=self.presupuesto_s, engine=self._engine)
+        return self.ultimo
+
+    def iniciar(self):
+        """Inicia el hilo (si no estaba iniciado)."""
+        if self._hilo is not None:
+            return
+        self._detenido.clear()
+        self._hilo = threading.Thread(target=self._bucle,
+                                      name="taskmaster-mantenimiento", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo y espera a que termine."""
+        self._detenido.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def cerrar(self):
+        """Detiene el hilo y cierra la conexión de observación."""
+        self.detener()
+        self._detector.cerrar()
+
+    def _bucle(self):
+        """Revisa cada intervalo_s hasta que se detenga."""
+        while not self._detenido.wait(self.intervalo_s):
+            try:
+                self.revisar()
+            except Exception:
+                # Un bloqueo prolongado u otro error no debe matar el hilo
+                metricas.incrementar("mantenimiento.errores")
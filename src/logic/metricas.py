@@ -0,0 +1,86 @@
+"""
+metricas.py
+===========
+Registro de métricas en memoria para el proyecto TaskMaster Student.
+
+Centraliza contadores simples (reintentos de escritura, aciertos de caché,
+etc.) que otros módulos incrementan y que pueden consultarse como una
+instantánea para diagnóstico o reportes.
+
+Uso típico:
+    from src.logic.metricas import metricas
+
+    metricas.incrementar("escritura.reintentos")
+    print(metricas.instantanea())
+"""
+
+import threading
+
+
+class RegistroMetricas:
+    """
+    Conjunto de contadores con nombre, seguro para uso entre hilos.
+
+    Los nombres siguen la convención "<área>.<evento>", por ejemplo
+    "escritura.reintentos".
+    """
+
+    def __init__(self):
+        """Inicializa el registro sin contadores."""
+        self._contadores: dict = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, nombre: str, cantidad: int = 1):
+        """
+        Suma `cantidad` al contador `nombre`, creándolo si no existe.
+
+        Args:
+            nombre   (str): Nombre del contador.
+            cantidad (int): Valor a sumar (por defecto 1).
+        """
+        with self._lock:
+            self._contadores[nombre] = self._contadores.get(nombre, 0) + cantidad
+
+    def establecer(self, nombre: str, valor: int):
+        """
+        Reemplaza el valor de `nombre`, para medidas que suben y bajan
+        (por ejemplo "bd.paginas_libres").
+
+        Args:
+            nombre (str): Nombre del contador.
+            valor  (int): Valor medido.
+        """
+        with self._lock:
+            self._contadores[nombre] = valor
+
+    def valor(self, nombre: str) -> int:
+        """
+        Retorna el valor actual de un contador.
+
+        Args:
+            nombre (str): Nombre del contador.
+
+        Returns:
+            int: Valor del contador, o 0 si nunca se incrementó.
+        """
+        with self._lock:
+            return self._contadores.get(nombre, 0)
+
+    def instantanea(self) -> dict:
+        """
+        Retorna una copia de todos los contadores.
+
+        Returns:
+            dict: Diccionario {nombre: valor}.
+        """
+        with self._lock:
+            return dict(self._contadores)
+
+    def reiniciar(self):
+        """Elimina todos los contadores (útil en pruebas)."""
+        with self._lock:
+            self._contadores.clear()
+
+
+# Registro global compartido por todo el proceso
+metricas = RegistroMetricas()
@@ -0,0 +1,509 @@
+"""
+proyeccion.py
+=============
+Proyección en memoria de las tareas de un usuario para el proyecto
+TaskMaster Student.
+
+La aplicación lee mucho más de lo que escribe: cada pantalla vuelve a
+consultar las materias y tareas del usuario activo. ProyeccionTareas
+carga esos datos una sola vez y los mantiene al día sin volver a
+consultar la base de datos:
+
+    - Las escrituras de este proceso (TaskManager directo o ColaEscritura)
+      se aplican a partir de los eventos de sesión de SessionEscritura:
+      `after_flush` anota las materias y tareas creadas, modificadas o
+      eliminadas; `after_commit` las aplica a todas las proyecciones
+      registradas; un rollback (incluido el de un SAVEPOINT de la cola)
+      descarta lo anotado en esa transacción.
+    - Las escrituras de otros procesos se detectan con el registro de
+      cambios (src.logic.cambios). Cada transacción propia anota el rango
+      de números de cambio que generó; si aparece un cambio del usuario
+      fuera de esos rangos, la proyección se recarga completa.
+
+Índices mantenidos (listas ordenadas por fecha de entrega e ID):
+    - todas las tareas;
+    - por materia, por estado y por prioridad;
+    - conteos por (materia, estado, prioridad).
+
+Listar con un filtro recorre solo la lista de ese filtro (O(resultado)),
+con rango de fechas resuelto por búsqueda binaria; contar no recorre
+tareas.
+
+Uso típico:
+    from src.logic.proyeccion import ProyeccionTareas
+
+    proyeccion = ProyeccionTareas(usuario_id=1)
+    pendientes = proyeccion.listar(estado=EstadoTarea.Pendiente)
+    ...
+    proyeccion.cerrar()
+"""
+
+import math
+import threading
+import weakref
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from datetime import date
+from typing import NamedTuple, Optional
+from sqlalchemy import event, func, inspect
+from src.model.declarative_base import Session, SessionEscritura
+from src.model.modelo import Materia, Tarea, Prioridad, EstadoTarea
+from src.logic.cambios import SeguidorCambios, detector_compartido
+
+
+# Caracteres de la descripción que se muestran en los listados
+LARGO_RESUMEN = 80
+
+# Resumen de una vista creada de una Tarea sin la descripción cargada; la
+# proyección conserva el resumen que ya tenía
+_RESUMEN_SIN_CARGAR = object()
+
+
+class TareaVista(NamedTuple):
+    """
+    Copia inmutable de una Tarea para listados.
+
+    Tiene los mismos nombres de atributo que Tarea, salvo `resumen` (los
+    primeros LARGO_RESUMEN caracteres de la descripción) en lugar de
+    `descripcion`; la descripción completa se obtiene con
+    TaskManager.seleccionar_tarea. Se comparte entre llamadas, por lo que
+    no se puede modificar ni guardar en una sesión; para editar se usa
+    TaskManager.editar_tarea.
+    """
+    idTarea: int
+    titulo: str
+    resumen: Optional[str]
+    prioridad: Prioridad
+    fechaEntrega: date
+    estado: EstadoTarea
+    materia_id: int
+    version: int
+
+    @classmethod
+    def de(cls, tarea: Tarea) -> "TareaVista":
+        """
+        Crea la vista a partir de una instancia ORM.
+
+        La descripción es diferida: si no está cargada no se consulta (se
+        llama desde after_flush) y el resumen queda como
+        _RESUMEN_SIN_CARGAR.
+        """
+        cargados = inspect(tarea).dict
+        if "descripcion" not in cargados:
+            resumen = _RESUMEN_SIN_CARGAR
+        elif cargados["descripcion"] is None:
+            resumen = None
+        else:
+            resumen = cargados["descripcion"][:LARGO_RESUMEN]
+        return cls(tarea.idTarea, tarea.titulo, resumen,
+                   tarea.prioridad, tarea.fechaEntrega, tarea.estado,
+                   tarea.materia_id, tarea.version)
+
+
+def columnas_vista() -> tuple:
+    """
+    Columnas a consultar para construir TareaVista(*fila) sin cargar la
+    entidad Tarea ni la descripción completa.
+    """
+    return (Tarea.idTarea, Tarea.titulo,
+            func.substr(Tarea.descripcion, 1, LARGO_RESUMEN).label("resumen"),
+            Tarea.prioridad, Tarea.fechaEntrega, Tarea.estado,
+            Tarea.materia_id, Tarea.version)
+
+
+def _clave(tarea: TareaVista) -> tuple:
+    """Clave de orden de los índices: (fechaEntrega, idTarea)."""
+    return (tarea.fechaEntrega, tarea.idTarea)
+
+
+# ---------------------------------------------------------------------------
+# Eventos de sesión
+# ---------------------------------------------------------------------------
+
+# Proyecciones (y otros observadores) activas del proceso; se quitan
+# solas al liberarse
+_proyecciones: "weakref.WeakSet[ProyeccionTareas]" = weakref.WeakSet()
+_proyecciones_lock = threading.Lock()
+
+_SQL_ULTIMO_CAMBIO = "SELECT COALESCE(MAX(seq), 0) FROM registro_cambios"
+
+
+def _activas() -> list:
+    with _proyecciones_lock:
+        return list(_proyecciones)
+
+
+def observar_escrituras(observador):
+    """
+    Registra un objeto que recibe las escrituras confirmadas del proceso.
+
+    El observador implementa `_aplicar(operaciones, rango)` como
+    ProyeccionTareas; se guarda con una referencia débil, por lo que deja
+    de recibir eventos al liberarse aunque no se llame dejar_de_observar.
+    """
+    with _proyecciones_lock:
+        _proyecciones.add(observador)
+
+
+def dejar_de_observar(observador):
+    """Quita un observador registrado con observar_escrituras."""
+    with _proyecciones_lock:
+        _proyecciones.discard(observador)
+
+
+def anotar_tareas(session, tareas):
+    """
+    Anota tareas escritas sin la unidad de trabajo del ORM (por ejemplo,
+    con insert().returning en una importación masiva) para que los
+    observadores las reciban al confirmar, como las demás escrituras.
+
+    Args:
+        session: Sesión de escritura con la transacción abierta.
+        tareas (Iterable[TareaVista]): Tareas insertadas o modificadas.
+    """
+    if not _activas():
+        return
+    transaccion = session.get_nested_transaction() or session.get_transaction()
+    session.info.setdefault("proyeccion_pendientes", []).extend(
+        (transaccion, "tarea", tarea) for tarea in tareas)
+
+
+@event.listens_for(SessionEscritura, "after_begin")
+def _al_iniciar(session, transaccion, conexion):
+    """Anota el último número de cambio antes de escribir."""
+    if not transaccion.nested and _activas():
+        session.info["cambios_inicio"] = conexion.exec_driver_sql(
+            _SQL_ULTIMO_CAMBIO).scalar()
+
+
+@event.listens_for(SessionEscritura, "after_flush")
+def _al_volcar(session, contexto):
+    """Anota las materias y tareas escritas en este flush."""
+    if not _activas():
+        return
+    transaccion = session.get_nested_transaction() or session.get_transaction()
+    pendientes = session.info.setdefault("proyeccion_pendientes", [])
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Tarea):
+            pendientes.append((transaccion, "tarea", TareaVista.de(obj)))
+        elif isinstance(obj, Materia):
+            pendientes.append((transaccion, "materia",
+                               (obj.idMateria, obj.usuario_id)))
+    for obj in session.deleted:
+        if isinstance(obj, Tarea):
+            pendientes.append((transaccion, "tarea_eliminada", obj.idTarea))
+        elif isinstance(obj, Materia):
+            pendientes.append((transaccion, "materia_eliminada", obj.idMateria))
+
+
+@event.listens_for(SessionEscritura, "after_soft_rollback")
+def _al_revertir(session, transaccion_previa):
+    """Descarta lo anotado en la transacción (o SAVEPOINT) revertida."""
+    pendientes = session.info.get("proyeccion_pendientes")
+    if not pendientes:
+        return
+
+    def _dentro(transaccion):
+        while transaccion is not None:
+            if transaccion is transaccion_previa:
+                return True
+            transaccion = transaccion.parent
+        return False
+
+    pendientes[:] = [p for p in pendientes if not _dentro(p[0])]
+
+
+@event.listens_for(SessionEscritura, "before_commit")
+def _antes_de_confirmar(session):
+    """Anota el último número de cambio generado por esta transacción."""
+    if "cambios_inicio" in session.info:
+        session.flush()
+        session.info["cambios_fin"] = session.connection().exec_driver_sql(
+            _SQL_ULTIMO_CAMBIO).scalar()
+
+
+@event.listens_for(SessionEscritura, "after_commit")
+def _al_confirmar(session):
+    """Aplica lo anotado a todas las proyecciones activas."""
+    pendientes = session.info.pop("proyeccion_pendientes", [])
+    inicio = session.info.pop("cambios_inicio", None)
+    fin = session.info.pop("cambios_fin", None)
+    rango = (inicio, fin) if inicio is not None and fin is not None else None
+    if not pendientes and rango is None:
+        return
+    operaciones = [(tipo, dato) for _, tipo, dato in pendientes]
+    for proyeccion in _activas():
+        proyeccion._aplicar(operaciones, rango)
+
+
+@event.listens_for(SessionEscritura, "after_rollback")
+def _al_revertir_todo(session):
+    """Limpia las anotaciones de una transacción revertida por completo."""
+    for clave in ("proyeccion_pendientes", "cambios_inicio", "cambios_fin"):
+        session.info.pop(clave, None)
+
+
+# ---------------------------------------------------------------------------
+# Proyección
+# ---------------------------------------------------------------------------
+
+class ProyeccionTareas:
+    """
+    Índices en memoria de las materias y tareas de un usuario.
+
+    Atributos:
+        usuario_id (int): Usuario proyectado.
+        recargas   (int): Veces que se cargó desde la base de datos (1 al
+                          crearse, más una por cada cambio externo).
+    """
+
+    def __init__(self, usuario_id: int, fabrica_sesiones=Session):
+        """
+        Carga las materias y tareas del usuario y registra la proyección.
+
+        Args:
+            usuario_id (int): Usuario a proyectar.
+            fabrica_sesiones: Fábrica de sesiones de lectura.
+        """
+        self.usuario_id = usuario_id
+        self.recargas = 0
+        self._fabrica = fabrica_sesiones
+        self._lock = threading.RLock()
+        self._seguidor = SeguidorCambios(detector_compartido())
+        self._propios: list = []     # rangos (inicio, fin] de cambios propios
+        self._reiniciar()
+        observar_escrituras(self)
+        self._seguidor.revisar()    # posición previa a la carga
+        self.recargar()
+
+    def cerrar(self):
+        """Deja de recibir eventos de escritura."""
+        dejar_de_observar(self)
+
+    # ──────────────────────────────────────────────────────────────
+    # CARGA Y MANTENIMIENTO
+    # ──────────────────────────────────────────────────────────────
+
+    def _reiniciar(self):
+        """Vacía todos los índices."""
+        self._materias: set = set()
+        self._tareas: dict = {}
+        self._por_fecha: list = []
+        self._indices: dict = {}     # (campo, valor) -> lista ordenada
+        self._conteos: Counter = Counter()
+
+    def _leer(self) -> tuple:
+        """Lee de la BD los IDs de materia y las tareas del usuario."""
+        session = self._fabrica()
+        try:
+            materias = {m for (m,) in session.query(Materia.idMateria)
+                        .filter_by(usuario_id=self.usuario_id)}
+            tareas = [TareaVista(*fila) for fila in session.query(*columnas_vista())
+                      .join(Materia).filter(Materia.usuario_id == self.usuario_id)]
+            return materias, tareas
+        finally:
+            session.close()
+
+    def recargar(self):
+        """Vuelve a cargar todo desde la base de datos."""
+        materias, tareas = self._leer()
+        with self._lock:
+            self._reiniciar()
+            self._materias = materias
+            for tarea in tareas:
+                self._insertar(tarea)
+            self.recargas += 1
+
+    def sincronizar(self):
+        """
+        Recarga la proyección si otro proceso modificó datos del usuario.
+
+        Si data_version no cambió, cuesta una sola consulta PRAGMA.
+        """
+        hubo, cambios = self._seguidor.revisar()
+        if not hubo:
+            return
+        with self._lock:
+            externos = cambios is None or any(
+                c.tabla in ("materias", "tareas")
+                and c.usuario_id == self.usuario_id
+                and not self._es_propio(c.seq)
+                for c in cambios)
+            if cambios:
+                ultimo = cambios[-1].seq
+                self._propios = [r for r in self._propios if r[1] > ultimo]
+        if externos:
+            self.recargar()
+
+    def _es_propio(self, seq: int) -> bool:
+        """Indica si el cambio `seq` lo escribió este proceso."""
+        return any(inicio < seq <= fin for inicio, fin in self._propios)
+
+    def _aplicar(self, operaciones: list, rango: Optional[tuple]):
+        """
+        Aplica las escrituras confirmadas por una transacción propia.
+
+        Las materias se agregan antes que las tareas y se quitan después,
+        para que una misma transacción pueda crear una materia con sus
+        tareas o eliminarla junto con ellas.
+        """
+        orden = {"materia": 0, "tarea": 1, "tarea_eliminada": 2,
+                 "materia_eliminada": 3}
+        with self._lock:
+            if rango is not None:
+                self._propios.append(rango)
+            for tipo, dato in sorted(operaciones, key=lambda o: orden[o[0]]):
+                if tipo == "materia":
+                    id_materia, usuario_id = dato
+                    if usuario_id == self.usuario_id:
+                        self._materias.add(id_materia)
+                elif tipo == "tarea":
+                    self._poner(dato)
+                elif tipo == "tarea_eliminada":
+                    self._quitar(dato)
+                elif dato in self._materias:
+                    self._materias.discard(dato)
+                    for _, id_tarea in list(self._indices.get(("materia", dato), [])):
+                        self._quitar(id_tarea)
+
+    def _poner(self, tarea: TareaVista):
+        """Inserta o reemplaza una tarea (ignora versiones anteriores)."""
+        actual = self._tareas.get(tarea.idTarea)
+        if tarea.resumen is _RESUMEN_SIN_CARGAR:
+            tarea = tarea._replace(resumen=None if actual is None else actual.resumen)
+        if actual is not None:
+            if actual.version > tarea.version:
+                return
+            self._quitar(tarea.idTarea)
+        if tarea.materia_id in self._materias:
+            self._insertar(tarea)
+
+    def _insertar(self, tarea: TareaVista):
+        """Agrega una tarea nueva a todos los índices."""
+        clave = _clave(tarea)
+        self._tareas[tarea.idTarea] = tarea
+        insort(self._por_fecha, clave)
+        for indice in self._indices_de(tarea):
+            insort(self._indices.setdefault(indice, []), clave)
+        self._conteos[(tarea.materia_id, tarea.estado, tarea.prioridad)] += 1
+
+    def _quitar(self, id_tarea: int):
+        """Elimina una tarea de todos los índices (si estaba)."""
+        tarea = self._tareas.pop(id_tarea, None)
+        if tarea is None:
+            return
+        clave = _clave(tarea)
+        for lista in [self._por_fecha] + [self._indices[i] for i in self._indices_de(tarea)]:
+            del lista[bisect_left(lista, clave)]
+        grupo = (tarea.materia_id, tarea.estado, tarea.prioridad)
+        self._conteos[grupo] -= 1
+        if not self._conteos[grupo]:
+            del self._conteos[grupo]
+
+    @staticmethod
+    def _indices_de(tarea: TareaVista) -> tuple:
+        return (("materia", tarea.materia_id), ("estado", tarea.estado),
+                ("prioridad", tarea.prioridad))
+
+    # ──────────────────────────────────────────────────────────────
+    # CONSULTAS
+    # ──────────────────────────────────────────────────────────────
+
+    def listar(
+        self,
+        materia_id: Optional[int] = None,
+        estado: Optional[EstadoTarea] = None,
+        prioridad: Optional[Prioridad] = None,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None
+    ) -> list:
+        """
+        Retorna las tareas que cumplen los filtros indicados.
+
+        Se recorre la lista más corta entre las de los filtros indicados,
+        acotada al rango de fechas por búsqueda binaria.
+
+        Args:
+            materia_id (Optional[int]):         Solo tareas de esa materia.
+            estado     (Optional[EstadoTarea]): Solo tareas en ese estado.
+            prioridad  (Optional[Prioridad]):   Solo tareas de esa prioridad.
+            desde      (Optional[date]):        Entrega en o después de esa fecha.
+            hasta      (Optional[date]):        Entrega en o antes de esa fecha.
+
+        Returns:
+            list[TareaVista]: Ordenadas por fecha de entrega e ID.
+        """
+        filtros = [(campo, valor) for campo, valor in (
+            ("materia", materia_id), ("estado", estado),
+            ("prioridad", prioridad)) if valor is not None]
+        with self._lock:
+            candidatas = [self._indices.get(f, []) for f in filtros] or [self._por_fecha]
+            base = min(candidatas, key=len)
+            inicio = bisect_left(base, (desde,)) if desde is not None else 0
+            fin = (bisect_right(base, (hasta, math.inf)) if hasta is not None
+                   else len(base))
+            resultado = []
+            for _, id_tarea in base[inicio:fin]:
+                tarea = self._tareas[id_tarea]
+                if ((materia_id is None or tarea.materia_id == materia_id)
+                        and (estado is None or tarea.estado == estado)
+                        and (prioridad is None or tarea.prioridad == prioridad)):
+                    resultado.append(tarea)
+            return resultado
+
+    def contar(
+        self,
+        materia_id: Optional[int] = None,
+        estado: Optional[EstadoTarea] = None,
+        prioridad: Optional[Prioridad] = None
+    ) -> int:
+        """
+        Cuenta las tareas que cumplen los filtros sin recorrerlas.
+
+        Returns:
+            int: Cantidad de tareas.
+        """
+        with self._lock:
+            if materia_id is None and estado is None and prioridad is None:
+                return len(self._tareas)
+            return sum(
+                n for (m, e, p), n in self._conteos.items()
+                if (materia_id is None or m == materia_id)
+                and (estado is None or e == estado)
+                and (prioridad is None or p == prioridad))
+
+    def verificar_consistencia(self) -> list:
+        """
+        Compara la proyección con la base de datos y con sus propios índices.
+
+        Pensado para pruebas: recorre todo y consulta la BD.
+
+        Returns:
+            list[str]: Diferencias encontradas (vacía si es consistente).
+        """
+        materias, tareas = self._leer()
+        esperado = {t.idTarea: t for t in tareas}
+        errores = []
+        with self._lock:
+            if materias != self._materias:
+                errores.append(f"materias: BD={sorted(materias)} "
+                               f"proyección={sorted(self._materias)}")
+            for id_tarea in esperado.keys() | self._tareas.keys():
+                if esperado.get(id_tarea) != self._tareas.get(id_tarea):
+                    errores.append(f"tarea {id_tarea}: BD={esperado.get(id_tarea)} "
+                                   f"proyección={self._tareas.get(id_tarea)}")
+            if self._por_fecha != sorted(map(_clave, self._tareas.values())):
+                errores.append("índice por fecha desordenado o incompleto")
+            indices, conteos = {}, Counter()
+            for tarea in self._tareas.values():
+                for indice in self._indices_de(tarea):
+                    indices.setdefault(indice, []).append(_clave(tarea))
+                conteos[(tarea.materia_id, tarea.estado, tarea.prioridad)] += 1
+            for indice, claves in indices.items():
+                if self._indices.get(indice) != sorted(claves):
+                    errores.append(f"índice {indice} desactualizado")
+            if any(self._indices.get(i) for i in self._indices.keys() - indices.keys()):
+                errores.append("índices con tareas inexistentes")
+            if conteos != self._conteos:
+                errores.append("conteos desactualizados")
+        return errores
@@ -0,0 +1,109 @@
+"""
+ranking.py
+==========
+Puntaje de "qué hago ahora" para TaskManager.siguientes, en el proyecto
+TaskMaster Student.
+
+Cada tarea pendiente recibe
+
+    puntaje = PESOS_PRIORIDAD[prioridad] * 2 ** (-holgura / VIDA_MEDIA_DIAS)
+
+donde `holgura` son los días que faltan hasta Tarea.inicio_sugerido (la
+fecha de entrega menos los días de esfuerzo estimado; negativa si ya se
+debería haber empezado). Con los valores por defecto una tarea Alta
+equivale a una Baja que vence dos semanas antes.
+
+La parte que no depende del día (inicio_sugerido) la calcula SQLite como
+columna generada e indexa en ix_tareas_pendientes_inicio; la que depende
+del día se aplica al leer. Para una prioridad fija el puntaje solo baja al
+avanzar inicio_sugerido, así que las n mejores de cada prioridad son las n
+primeras de su rango del índice: la ventana de candidatas es de 3n filas,
+leídas en una sola consulta, y las n mejores se eligen con un montículo.
+"""
+
+import heapq
+from datetime import date
+from functools import lru_cache
+from typing import NamedTuple
+from sqlalchemy import bindparam, literal, select, union_all
+from src.logic.proyeccion import TareaVista, columnas_vista
+from src.model.modelo import Materia, Prioridad, Tarea, TAREA_PENDIENTE
+
+PESOS_PRIORIDAD = {Prioridad.Baja: 1.0, Prioridad.Media: 2.0, Prioridad.Alta: 4.0}
+
+# Días de holgura que reducen el puntaje a la mitad
+VIDA_MEDIA_DIAS = 7
+
+
+class Sugerencia(NamedTuple):
+    """
+    Una tarea de TaskManager.siguientes con su puntaje.
+
+    Atributos:
+        tarea   (TareaVista): La tarea pendiente.
+        puntaje (float):      Mayor es más urgente (ver puntaje()).
+        inicio  (date):       Fecha en que conviene empezarla.
+    """
+    tarea: TareaVista
+    puntaje: float
+    inicio: date
+
+
+def puntaje(prioridad: Prioridad, inicio: date, hoy: date) -> float:
+    """
+    Puntaje de una tarea pendiente.
+
+    Args:
+        prioridad (Prioridad): Prioridad de la tarea.
+        inicio    (date):      Su inicio_sugerido.
+        hoy       (date):      Fecha de referencia.
+
+    Returns:
+        float: Puntaje positivo; mayor es más urgente.
+    """
+    return PESOS_PRIORIDAD[prioridad] * 2.0 ** (-(inicio - hoy).days / VIDA_MEDIA_DIAS)
+
+
+@lru_cache(maxsize=None)
+def consulta_candidatas():
+    """
+    Sentencia de las candidatas de TaskManager.siguientes, construida una
+    sola vez.
+
+    Una rama por prioridad, unidas con UNION ALL; cada rama recorre
+    ix_tareas_pendientes_inicio en orden y se corta en :limite filas.
+    Cada fila es la de TareaVista seguida de inicio_sugerido.
+    Parámetros: usuario_id, limite.
+    """
+    ramas = []
+    for prioridad in Prioridad:
+        rama = select(*columnas_vista(), Tarea.inicio_sugerido) \
+            .join(Materia) \
+            .where(Materia.usuario_id == bindparam("usuario_id"), TAREA_PENDIENTE,
+                   Tarea.prioridad == literal(prioridad, Tarea.prioridad.type)) \
+            .order_by(Tarea.inicio_sugerido, Tarea.fechaEntrega, Tarea.idTarea) \
+            .limit(bindparam("limite"))
+        ramas.append(select(rama.subquery()))
+    return union_all(*ramas)
+
+
+def mejores(filas, n: int, hoy: date) -> list:
+    """
+    Elige las n filas candidatas de mayor puntaje.
+
+    Los empates se resuelven por fecha de entrega y luego por ID.
+
+    Args:
+        filas: Filas de consulta_candidatas().
+        n (int): Cantidad a retornar.
+        hoy (date): Fecha de referencia del puntaje.
+
+    Returns:
+        list[Sugerencia]: De mayor a menor puntaje.
+    """
+    candidatas = []
+    for *columnas, inicio in filas:
+        tarea = TareaVista(*columnas)
+        candidatas.append(Sugerencia(tarea, puntaje(tarea.prioridad, inicio, hoy), inicio))
+    return heapq.nlargest(n, candidatas, key=lambda s: (
+        s.puntaje, -s.tarea.fechaEntrega.toordinal(), -s.tarea.idTarea))
@@ -0,0 +1,528 @@
+"""
+recordatorios.py
+================
+Motor de recordatorios de entregas para el proyecto TaskMaster Student.
+
+MotorRecordatorios avisa, con una o varias antelaciones configurables
+(por defecto un día y una hora antes), que se acerca la fecha de entrega
+de las tareas pendientes de un usuario. La consola (run.py) imprime el
+aviso y la interfaz Flet lo muestra en un SnackBar.
+
+Estructuras:
+    - Un montículo (heapq) con un entero por aviso programado: el momento
+      del aviso en los bits altos, seguido del ID de la tarea, una
+      generación y el índice de la antelación. Comparar enteros es más
+      rápido y ocupa menos memoria que comparar tuplas.
+    - Un diccionario tarea -> (vencimiento, generación). Reprogramar o
+      cancelar una tarea solo cambia el diccionario; las entradas viejas
+      del montículo quedan obsoletas y se descartan al salir (invalidación
+      perezosa). Si las obsoletas superan a las vigentes, el montículo se
+      reconstruye.
+    - Un diccionario tarea -> vencimiento de las tareas cuyo último aviso
+      ya se emitió. Se conserva hasta que la tarea vence, se completa o se
+      elimina, para que editarla sin cambiar la fecha no repita el aviso.
+
+El motor se mantiene al día sin recorrer todas las tareas:
+    - Las escrituras de este proceso llegan por los eventos de sesión de
+      src.logic.proyeccion (igual que a ProyeccionTareas).
+    - Las de otros procesos se leen del registro de cambios en cada
+      revisión; solo se vuelven a consultar las tareas que cambiaron.
+
+Las fechas de entrega no tienen hora; se considera que una tarea vence a
+la `hora_entrega` de ese día (23:59 por defecto).
+
+Uso típico:
+    from src.logic.recordatorios import MotorRecordatorios
+
+    motor = MotorRecordatorios(usuario_id=1)
+    motor.suscribir(lambda r: print(r.titulo, r.vence))
+    motor.iniciar()
+    ...
+    motor.cerrar()
+"""
+
+import heapq
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Callable, NamedTuple, Optional
+from sqlalchemy import select
+from src.model.declarative_base import Session
+from src.model.modelo import Materia, Tarea, EstadoTarea, TAREA_PENDIENTE
+from src.logic.cambios import SeguidorCambios, detector_compartido
+from src.logic.proyeccion import observar_escrituras, dejar_de_observar
+
+# Distribución de los bits de cada entrada del montículo (de menor a mayor
+# peso): índice de antelación, generación, ID de tarea y momento del aviso
+_BITS_ANTELACION = 4
+_BITS_GENERACION = 8
+_BITS_TAREA = 32
+_MAX_ANTELACIONES = 1 << _BITS_ANTELACION
+_MASCARA_GENERACION = (1 << _BITS_GENERACION) - 1
+_MASCARA_TAREA = (1 << _BITS_TAREA) - 1
+_DESPLAZAR_GENERACION = _BITS_ANTELACION
+_DESPLAZAR_TAREA = _DESPLAZAR_GENERACION + _BITS_GENERACION
+_DESPLAZAR_MOMENTO = _DESPLAZAR_TAREA + _BITS_TAREA
+
+# IDs por consulta al validar avisos o releer tareas cambiadas
+_LOTE_IDS = 500
+
+# Tareas pendientes del usuario con su vencimiento en segundos (ver
+# _segundos); julianday() - 1721424.5 equivale a date.toordinal(). El
+# filtro de estado se escribe igual que el del índice parcial
+# ix_tareas_pendientes_entrega para que SQLite lo use.
+_SQL_PENDIENTES = (
+    'SELECT t."idTarea", '
+    'CAST(julianday(t."fechaEntrega") - 1721424.5 AS INTEGER) * 86400 + ? '
+    'FROM tareas t JOIN materias m ON m."idMateria" = t.materia_id '
+    'WHERE m.usuario_id = ? AND t.estado = '
+    f'{Tarea.__table__.c.estado.type.codigo(EstadoTarea.Pendiente)} '
+    'AND t."fechaEntrega" >= ?')
+
+
+def _segundos(momento: datetime) -> int:
+    """Segundos desde el día 1 del calendario (sin zona horaria)."""
+    return (momento.toordinal() * 86400 + momento.hour * 3600
+            + momento.minute * 60 + momento.second)
+
+
+def _fecha_hora(segundos: int) -> datetime:
+    """Inversa de _segundos."""
+    dias, resto = divmod(segundos, 86400)
+    return datetime.fromordinal(dias) + timedelta(seconds=resto)
+
+
+class Recordatorio(NamedTuple):
+    """
+    Aviso de entrega próxima de una tarea.
+
+    Atributos:
+        tarea_id   (int):       ID de la tarea.
+        titulo     (str):       Título de la tarea.
+        vence      (datetime):  Fecha de entrega a la hora_entrega del motor.
+        antelacion (timedelta): Antelación configurada que generó el aviso.
+    """
+    tarea_id: int
+    titulo: str
+    vence: datetime
+    antelacion: timedelta
+
+
+class MotorRecordatorios:
+    """
+    Avisos de entregas próximas de las tareas pendientes de un usuario.
+
+    Los avisos se entregan a los suscriptores desde revisar(), que el hilo
+    del motor llama al llegar el próximo aviso (o cada intervalo_s, para
+    incorporar los cambios de otros procesos).
+
+    Atributos:
+        usuario_id  (int):   Usuario cuyas tareas se vigilan.
+        antelaciones (tuple): Antelaciones de aviso, de mayor a menor.
+        intervalo_s (float): Espera máxima del hilo entre revisiones.
+    """
+
+    def __init__(
+        self,
+        usuario_id: int,
+        antelaciones: tuple = (timedelta(days=1), timedelta(hours=1)),
+        hora_entrega: time = time(23, 59),
+        reloj: Callable = datetime.now,
+        intervalo_s: float = 1.0,
+        fabrica_sesiones=Session,
+    ):
+        """
+        Crea el motor, carga las tareas pendientes y empieza a recibir las
+        escrituras del proceso (sin iniciar el hilo).
+
+        Args:
+            usuario_id (int): Usuario a vigilar.
+            antelaciones (tuple): timedelta de aviso antes del vencimiento
+                                  (>= 0, hasta 16, en segundos enteros).
+            hora_entrega (time): Hora del día en que vence cada tarea.
+            reloj (Callable): Función sin argumentos que retorna la fecha y
+                              hora actual (se reemplaza en las pruebas).
+            intervalo_s (float): Espera máxima del hilo entre revisiones (> 0).
+            fabrica_sesiones: Fábrica de sesiones de lectura.
+
+        Raises:
+            ValueError: Si las antelaciones o el intervalo no son válidos.
+        """
+        if not antelaciones or len(antelaciones) > _MAX_ANTELACIONES:
+            raise ValueError(
+                f"Se necesitan entre 1 y {_MAX_ANTELACIONES} antelaciones")
+        if any(not isinstance(a, timedelta) or a < timedelta(0)
+               or a.microseconds for a in antelaciones):
+            raise ValueError(
+                "Cada antelación debe ser un timedelta mayor o igual a 0 "
+                "en segundos enteros")
+        if intervalo_s <= 0:
+            raise ValueError("El intervalo de revisión debe ser mayor a 0")
+        self.usuario_id = usuario_id
+        self.antelaciones = tuple(sorted(set(antelaciones), reverse=True))
+        self.intervalo_s = intervalo_s
+        self._antelaciones_s = [int(a.total_seconds()) for a in self.antelaciones]
+        self._hora_s = hora_entrega.hour * 3600 + hora_entrega.minute * 60 \
+            + hora_entrega.second
+        self._reloj = reloj
+        self._fabrica = fabrica_sesiones
+        self._lock = threading.RLock()
+        self._monticulo: list = []
+        self._vigentes: dict = {}     # tarea -> vence << 8 | generación
+        self._agotados: dict = {}     # tarea -> vence (último aviso emitido)
+        self._materias: set = set()
+        self._generacion = 0
+        self._suscriptores: list = []
+        self._seguidor = SeguidorCambios(detector_compartido())
+        self._detenido = threading.Event()
+        self._despertar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        observar_escrituras(self)
+        self._seguidor.revisar()    # posición previa a la carga
+        self.cargar()
+
+    def cerrar(self):
+        """Detiene el hilo y deja de recibir eventos de escritura."""
+        self.detener()
+        dejar_de_observar(self)
+
+    def __len__(self) -> int:
+        """Cantidad de tareas con avisos pendientes."""
+        return len(self._vigentes)
+
+    # ──────────────────────────────────────────────────────────────
+    # PROGRAMACIÓN
+    # ──────────────────────────────────────────────────────────────
+
+    def _ahora(self) -> int:
+        return _segundos(self._reloj())
+
+    def cargar(self):
+        """
+        Vuelve a leer las materias y tareas pendientes del usuario.
+
+        El vencimiento de cada tarea se calcula en la consulta y los avisos
+        de cada antelación se generan juntos; el montículo se ordena una
+        sola vez al final (heapify, O(n)).
+        """
+        momento = self._reloj()
+        ahora = _segundos(momento)
+        session = self._fabrica()
+        try:
+            materias = {m for (m,) in session.query(Materia.idMateria)
+                        .filter_by(usuario_id=self.usuario_id)}
+            # Cursor de sqlite3 sin pasar por las filas de SQLAlchemy: con
+            # un millón de tareas, procesar cada Row cuesta más que la consulta
+            cursor = session.connection().connection.driver_connection.execute(
+                _SQL_PENDIENTES, (self._hora_s, self.usuario_id,
+                                  momento.date().isoformat()))
+            filas = [(tarea_id, segundos) for tarea_id, segundos in cursor
+                     if segundos > ahora]
+        finally:
+            session.close()
+        with self._lock:
+            agotados = {tarea_id: segundos for tarea_id, segundos in filas
+                        if self._agotados.get(tarea_id) == segundos}
+        filas = [fila for fila in filas if fila[0] not in agotados]
+        monticulo = []
+        for indice, antelacion in enumerate(self._antelaciones_s):
+            limite = ahora + antelacion
+            monticulo += [(segundos - antelacion) << _DESPLAZAR_MOMENTO
+                          | tarea_id << _DESPLAZAR_TAREA | indice
+                          for tarea_id, segundos in filas if segundos > limite]
+        # Tareas con alguna antelación ya pasada: un aviso inmediato
+        limite = ahora + self._antelaciones_s[0]
+        for tarea_id, segundos in filas:
+            if segundos <= limite:
+                indice = max(i for i, a in enumerate(self._antelaciones_s)
+                             if segundos - a <= ahora)
+                monticulo.append((segundos - self._antelaciones_s[indice])
+                                 << _DESPLAZAR_MOMENTO
+                                 | tarea_id << _DESPLAZAR_TAREA | indice)
+        heapq.heapify(monticulo)
+        with self._lock:
+            self._materias = materias
+            self._monticulo = monticulo
+            self._agotados = agotados
+            self._vigentes = {tarea_id: segundos << _BITS_GENERACION
+                              for tarea_id, segundos in filas}
+            self._generacion = 0
+        self._despertar.set()
+
+    def programar(self, tarea_id: int, fecha_entrega: date):
+        """
+        Programa (o reprograma) los avisos de una tarea pendiente.
+
+        Solo se programan los avisos futuros; si ya pasó alguna antelación
+        pero la tarea aún no vence, se programa un aviso inmediato. Si la
+        fecha no cambió, los avisos ya emitidos no se repiten.
+
+        Args:
+            tarea_id (int): ID de la tarea.
+            fecha_entrega (date): Fecha de entrega.
+        """
+        vence = fecha_entrega.toordinal() * 86400 + self._hora_s
+        with self._lock:
+            actual = self._vigentes.get(tarea_id)
+            if actual is not None and actual >> _BITS_GENERACION == vence:
+                return
+            if self._agotados.get(tarea_id) == vence:
+                return
+            ahora = self._ahora()
+            if vence <= ahora:
+                self.cancelar(tarea_id)
+                return
+            self._agotados.pop(tarea_id, None)
+            primero = self._monticulo[0] if self._monticulo else None
+            # La generación distingue estas entradas de las de una
+            # programación anterior de la misma tarea que sigan en el montículo
+            self._generacion = generacion = (self._generacion + 1) & _MASCARA_GENERACION
+            self._vigentes[tarea_id] = vence << _BITS_GENERACION | generacion
+            base = (tarea_id << _BITS_GENERACION | generacion) << _BITS_ANTELACION
+            pasado = None
+            for indice, antelacion in enumerate(self._antelaciones_s):
+                momento = vence - antelacion
+                entrada = momento << _DESPLAZAR_MOMENTO | base | indice
+                if momento > ahora:
+                    heapq.heappush(self._monticulo, entrada)
+                else:
+                    pasado = entrada    # de las ya pasadas, solo la más cercana
+            if pasado is not None:
+                heapq.heappush(self._monticulo, pasado)
+            self._compactar()
+            if self._monticulo[0] != primero:
+                self._despertar.set()
+
+    def cancelar(self, tarea_id: int):
+        """Cancela los avisos pendientes de una tarea (si tenía)."""
+        with self._lock:
+            self._agotados.pop(tarea_id, None)
+            if self._vigentes.pop(tarea_id, None) is not None:
+                self._compactar()
+
+    def _es_vigente(self, entrada: int) -> bool:
+        """
+        Indica si la entrada pertenece a la programación actual de su tarea.
+
+        La generación tiene solo 8 bits y se repite cada 256 programaciones;
+        por eso también se compara el vencimiento de la entrada (momento +
+        antelación) con el vigente, para que una entrada vieja que repita
+        la generación no se tome por actual.
+        """
+        tarea_id = entrada >> _DESPLAZAR_TAREA & _MASCARA_TAREA
+        actual = self._vigentes.get(tarea_id)
+        if actual is None or actual & _MASCARA_GENERACION \
+                != entrada >> _DESPLAZAR_GENERACION & _MASCARA_GENERACION:
+            return False
+        antelacion = self._antelaciones_s[entrada & (_MAX_ANTELACIONES - 1)]
+        return (entrada >> _DESPLAZAR_MOMENTO) + antelacion == actual >> _BITS_GENERACION
+
+    def _compactar(self):
+        """Reconstruye el montículo si la mitad de sus entradas son obsoletas."""
+        if len(self._monticulo) <= 2 * len(self._vigentes) * len(self._antelaciones_s) + 64:
+            return
+        self._monticulo = [e for e in self._monticulo if self._es_vigente(e)]
+        heapq.heapify(self._monticulo)
+
+    def proximo(self) -> Optional[datetime]:
+        """Retorna el momento del próximo aviso programado, o None."""
+        with self._lock:
+            while self._monticulo and not self._es_vigente(self._monticulo[0]):
+                heapq.heappop(self._monticulo)
+            if not self._monticulo:
+                return None
+            return _fecha_hora(self._monticulo[0] >> _DESPLAZAR_MOMENTO)
+
+    # ──────────────────────────────────────────────────────────────
+    # ESCRITURAS
+    # ──────────────────────────────────────────────────────────────
+
+    def _aplicar(self, operaciones: list, rango: Optional[tuple]):
+        """
+        Aplica las escrituras confirmadas por una transacción propia
+        (ver src.logic.proyeccion). Las tareas de una materia eliminada se
+        descartan al validar sus avisos.
+        """
+        orden = {"materia": 0, "tarea": 1, "tarea_eliminada": 2,
+                 "materia_eliminada": 3}
+        with self._lock:
+            for tipo, dato in sorted(operaciones, key=lambda o: orden[o[0]]):
+                if tipo == "materia":
+                    if dato[1] == self.usuario_id:
+                        self._materias.add(dato[0])
+                elif tipo == "tarea":
+                    if dato.materia_id not in self._materias:
+                        continue
+                    if dato.estado == EstadoTarea.Pendiente:
+                        self.programar(dato.idTarea, dato.fechaEntrega)
+                    else:
+                        self.cancelar(dato.idTarea)
+                elif tipo == "tarea_eliminada":
+                    self.cancelar(dato)
+                else:
+                    self._materias.discard(dato)
+
+    def _sincronizar(self):
+        """Relee las tareas del usuario que cambiaron en otros procesos."""
+        hubo, cambios = self._seguidor.revisar()
+        if not hubo:
+            return
+        if cambios is None:
+            self.cargar()
+            return
+        propios = [c for c in cambios if c.usuario_id in (self.usuario_id, None)]
+        if any(c.tabla == "materias" for c in propios):
+            session = self._fabrica()
+            try:
+                self._materias = {m for (m,) in session.query(Materia.idMateria)
+                                  .filter_by(usuario_id=self.usuario_id)}
+            finally:
+                session.close()
+        ids = list({c.id_entidad for c in propios if c.tabla == "tareas"})
+        for inicio in range(0, len(ids), _LOTE_IDS):
+            lote = ids[inicio:inicio + _LOTE_IDS]
+            session = self._fabrica()
+            try:
+                pendientes = dict(
+                    session.query(Tarea.idTarea, Tarea.fechaEntrega)
+                    .join(Materia)
+                    .filter(Tarea.idTarea.in_(lote),
+                            Materia.usuario_id == self.usuario_id,
+                            TAREA_PENDIENTE))
+            finally:
+                session.close()
+            for tarea_id in lote:
+                if tarea_id in pendientes:
+                    self.programar(tarea_id, pendientes[tarea_id])
+                else:
+                    self.cancelar(tarea_id)
+
+    # ──────────────────────────────────────────────────────────────
+    # AVISOS
+    # ──────────────────────────────────────────────────────────────
+
+    def suscribir(self, callback: Callable) -> Callable:
+        """
+        Registra un suscriptor.
+
+        Args:
+            callback (Callable): Función callback(recordatorio) que recibe
+                                 cada Recordatorio emitido.
+
+        Returns:
+            Callable: Función sin argumentos que cancela la suscripción.
+        """
+        with self._lock:
+            self._suscriptores.append(callback)
+
+        def cancelar():
+            with self._lock:
+                if callback in self._suscriptores:
+                    self._suscriptores.remove(callback)
+        return cancelar
+
+    def revisar(self) -> list:
+        """
+        Emite los avisos cuyo momento ya llegó.
+
+        Antes incorpora los cambios de otros procesos. Cada aviso se
+        confirma contra la base de datos (la tarea sigue pendiente y con
+        la misma fecha) en una sola consulta. Si una tarea tiene varios
+        avisos vencidos a la vez, solo se emite el más cercano a la entrega.
+        Todos los suscriptores reciben los avisos aunque alguno falle; el
+        primer error se propaga al final.
+
+        Returns:
+            list: Recordatorio emitidos, en orden de momento de aviso.
+        """
+        self._sincronizar()
+        ahora = self._ahora()
+        vencidos: dict = {}
+        with self._lock:
+            # Las tareas ya vencidas no vuelven a programarse
+            self._agotados = {tarea_id: vence for tarea_id, vence
+                              in self._agotados.items() if vence > ahora}
+            limite = (ahora + 1) << _DESPLAZAR_MOMENTO
+            while self._monticulo and self._monticulo[0] < limite:
+                entrada = heapq.heappop(self._monticulo)
+                if not self._es_vigente(entrada):
+                    continue
+                tarea_id = entrada >> _DESPLAZAR_TAREA & _MASCARA_TAREA
+                indice = entrada & (_MAX_ANTELACIONES - 1)
+                vence = self._vigentes[tarea_id] >> _BITS_GENERACION
+                vencidos.pop(tarea_id, None)
+                vencidos[tarea_id] = (vence, indice)
+                if indice == len(self._antelaciones_s) - 1:
+                    del self._vigentes[tarea_id]
+                    self._agotados[tarea_id] = vence
+        if not vencidos:
+            return []
+        recordatorios = []
+        ids = list(vencidos)
+        session = self._fabrica()
+        try:
+            for inicio in range(0, len(ids), _LOTE_IDS):
+                lote = ids[inicio:inicio + _LOTE_IDS]
+                filas = {tarea_id: (titulo, fecha) for tarea_id, titulo, fecha in
+                         session.execute(select(Tarea.idTarea, Tarea.titulo,
+                                                Tarea.fechaEntrega)
+                                         .where(Tarea.idTarea.in_(lote), TAREA_PENDIENTE))}
+                for tarea_id in lote:
+                    vence, indice = vencidos[tarea_id]
+                    fila = filas.get(tarea_id)
+                    if fila is None or fila[1].toordinal() * 86400 + self._hora_s != vence:
+                        continue
+                    recordatorios.append(Recordatorio(
+                        tarea_id, fila[0], _fecha_hora(vence), self.antelaciones[indice]))
+        finally:
+            session.close()
+        with self._lock:
+            suscriptores = list(self._suscriptores)
+        error = None
+        for recordatorio in recordatorios:
+            for callback in suscriptores:
+                try:
+                    callback(recordatorio)
+                except Exception as ex:
+                    error = error or ex
+        if error is not None:
+            raise error
+        return recordatorios
+
+    # ──────────────────────────────────────────────────────────────
+    # HILO
+    # ──────────────────────────────────────────────────────────────
+
+    def iniciar(self):
+        """Inicia el hilo de avisos (si no estaba iniciado)."""
+        if self._hilo is not None:
+            return
+        self._detenido.clear()
+        self._hilo = threading.Thread(target=self._bucle,
+                                      name="taskmaster-recordatorios", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Detiene el hilo de avisos y espera a que termine."""
+        self._detenido.set()
+        self._despertar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def _bucle(self):
+        """Espera hasta el próximo aviso (como máximo intervalo_s) y revisa."""
+        while not self._detenido.is_set():
+            espera = self.intervalo_s
+            proximo = self.proximo()
+            if proximo is not None:
+                espera = min(espera, max(0.0, (proximo - self._reloj()).total_seconds()))
+            self._despertar.wait(espera)
+            self._despertar.clear()
+            if self._detenido.is_set():
+                break
+            try:
+                self.revisar()
+            except Exception:
+                # Un suscriptor con errores (o un bloqueo pasajero de la
+                # base de datos) no debe detener los avisos
+                pass
@@ -0,0 +1,141 @@
+"""
+recurrencias.py
+===============
+Generación perezosa de las ocurrencias de una Recurrencia para el
+proyecto TaskMaster Student.
+
+Una recurrencia (ver src.model.modelo.Recurrencia) no crea todas sus
+tareas al definirse: un semestre de laboratorios semanales serían decenas
+de filas que el estudiante no necesita ver todavía. Solo se guardan las
+próximas `adelantadas` ocurrencias pendientes; el resto se genera:
+
+    - al completar o eliminar una ocurrencia (se repone hasta volver a
+      tener `adelantadas` pendientes);
+    - al listar un rango de fechas (TaskManager.listar_tareas con `hasta`,
+      TaskManager.agenda), hasta el final del rango.
+
+`Recurrencia.siguiente` es el cursor: la primera fecha de la regla que aún
+no tiene tarea. Las fechas anteriores a hoy nunca se generan (una tarea no
+puede crearse con entrega pasada).
+
+Este módulo no abre sesiones ni confirma: TaskManager llama a
+materializar() dentro de la transacción de la operación que corresponda,
+de modo que todas las tareas nuevas se insertan juntas.
+"""
+
+from datetime import date, timedelta
+from typing import Iterator, Optional
+from sqlalchemy import func
+from src.model.modelo import Recurrencia, Tarea, EstadoTarea, TAREA_PENDIENTE
+
+# Ocurrencias generadas como máximo por recurrencia en una sola llamada
+# (acota lo que crea un rango muy largo sobre una regla sin fin)
+MAX_OCURRENCIAS_POR_LOTE = 500
+
+DIAS_SEMANA = ("lunes", "martes", "miércoles", "jueves", "viernes",
+               "sábado", "domingo")
+
+
+def mascara_dias(dias) -> int:
+    """
+    Convierte días de la semana (0 = lunes … 6 = domingo) en la máscara
+    de Recurrencia.dias_semana.
+
+    Args:
+        dias (Iterable[int]): Días de la semana, sin importar el orden.
+
+    Returns:
+        int: Máscara con el bit de cada día.
+
+    Raises:
+        ValueError: Si no hay días o alguno está fuera de 0..6.
+    """
+    mascara = 0
+    for dia in dias:
+        if not isinstance(dia, int) or not 0 <= dia <= 6:
+            raise ValueError("Los días de la semana van de 0 (lunes) a 6 (domingo)")
+        mascara |= 1 << dia
+    if not mascara:
+        raise ValueError("Indique al menos un día de la semana")
+    return mascara
+
+
+def dias_de_mascara(mascara: int) -> list:
+    """Inversa de mascara_dias: días de la semana marcados, en orden."""
+    return [dia for dia in range(7) if mascara >> dia & 1]
+
+
+def fechas(regla: Recurrencia, desde: date) -> Iterator[date]:
+    """
+    Genera, en orden, las fechas de la regla en o después de `desde`
+    (sin tener en cuenta `hasta`).
+
+    Args:
+        regla (Recurrencia): Regla con inicio y cada_dias o dias_semana.
+        desde (date): Primera fecha a considerar.
+    """
+    fecha = max(regla.inicio, desde)
+    if regla.cada_dias:
+        paso = timedelta(days=regla.cada_dias)
+        atraso = (fecha - regla.inicio).days % regla.cada_dias
+        if atraso:
+            fecha += timedelta(days=regla.cada_dias - atraso)
+        while True:
+            yield fecha
+            fecha += paso
+    else:
+        un_dia = timedelta(days=1)
+        while True:
+            if regla.dias_semana >> fecha.weekday() & 1:
+                yield fecha
+            fecha += un_dia
+
+
+def materializar(session, regla: Recurrencia, adelantadas: int,
+                 hasta: Optional[date] = None, hoy: Optional[date] = None) -> list:
+    """
+    Crea las ocurrencias que faltan de una regla y avanza su cursor.
+
+    Se generan fechas desde `siguiente` (o desde hoy, si es anterior)
+    mientras haya menos de `adelantadas` ocurrencias pendientes o la
+    fecha no pase de `hasta`, sin superar la fecha final de la regla ni
+    MAX_OCURRENCIAS_POR_LOTE tareas.
+
+    Args:
+        session: Sesión de escritura abierta (no se confirma aquí).
+        regla (Recurrencia): Regla persistente de la sesión.
+        adelantadas (int): Ocurrencias pendientes a mantener guardadas.
+        hasta (Optional[date]): Generar además todas las fechas hasta esta.
+        hoy (Optional[date]): Fecha de referencia (por defecto, hoy).
+
+    Returns:
+        list[Tarea]: Tareas agregadas a la sesión.
+    """
+    if regla.siguiente is None:
+        return []
+    hoy = hoy or date.today()
+    pendientes = session.query(func.count(Tarea.idTarea)).filter(
+        Tarea.recurrencia_id == regla.idRecurrencia, TAREA_PENDIENTE).scalar()
+    nuevas = []
+    siguiente = None
+    for fecha in fechas(regla, max(regla.siguiente, hoy)):
+        if regla.hasta is not None and fecha > regla.hasta:
+            break
+        if (len(nuevas) >= MAX_OCURRENCIAS_POR_LOTE
+                or (pendientes + len(nuevas) >= adelantadas
+                    and (hasta is None or fecha > hasta))):
+            siguiente = fecha
+            break
+        nuevas.append(Tarea(
+            titulo=regla.titulo,
+            descripcion=regla.descripcion,
+            prioridad=regla.prioridad,
+            fechaEntrega=fecha,
+            estado=EstadoTarea.Pendiente,
+            materia_id=regla.materia_id,
+            recurrencia_id=regla.idRecurrencia,
+        ))
+    if regla.siguiente != siguiente:
+        regla.siguiente = siguiente
+    session.add_all(nuevas)
+    return nuevas
@@ -0,0 +1,142 @@
+"""
+reintentos.py
+=============
+Política de reintentos ante bloqueos de SQLite (SQLITE_BUSY / SQLITE_LOCKED)
+para el proyecto TaskMaster Student.
+
+Cuando run.py y la interfaz Flet comparten db.sqlite, una escritura puede
+fallar con "OperationalError: database is locked" si otro proceso mantiene
+el bloqueo de escritura más allá del busy timeout. PoliticaReintentos
+vuelve a ejecutar la transacción completa con espera exponencial y jitter.
+
+El punto de reintento es siempre el inicio de la transacción: la función
+reintentada abre su propia sesión, y si falla se revierte por completo
+antes de volver a intentarlo, por lo que reintentar es idempotente.
+Solo se reintentan errores de bloqueo; cualquier otro error se propaga
+de inmediato.
+
+Uso típico:
+    from src.logic.reintentos import PoliticaReintentos
+
+    politica = PoliticaReintentos(max_intentos=8, espera_base_ms=5)
+    resultado = politica.ejecutar(lambda: transaccion())
+"""
+
+import random
+import sqlite3
+import time
+from typing import Callable
+from sqlalchemy.exc import OperationalError
+from src.logic.metricas import metricas
+
+# Códigos primarios de SQLite que indican contención por bloqueo
+_SQLITE_BUSY = 5
+_SQLITE_LOCKED = 6
+
+
+def es_error_bloqueo(ex: BaseException) -> bool:
+    """
+    Indica si una excepción corresponde a un bloqueo de la base de datos.
+
+    Args:
+        ex (BaseException): Excepción a evaluar.
+
+    Returns:
+        bool: True si es SQLITE_BUSY/SQLITE_LOCKED (o sus códigos extendidos).
+    """
+    if isinstance(ex, OperationalError):
+        ex = ex.orig
+    if not isinstance(ex, sqlite3.OperationalError):
+        return False
+    codigo = getattr(ex, "sqlite_errorcode", None)
+    if codigo is not None:
+        return (codigo & 0xFF) in (_SQLITE_BUSY, _SQLITE_LOCKED)
+    mensaje = str(ex).lower()
+    return "database is locked" in mensaje or "database is busy" in mensaje
+
+
+class PoliticaReintentos:
+    """
+    Reintentos con espera exponencial y jitter completo.
+
+    La espera antes del intento n (n >= 1) es un valor aleatorio uniforme
+    entre 0 y min(espera_max_ms, espera_base_ms * 2**(n-1)).
+
+    Atributos:
+        max_intentos   (int):   Intentos totales, incluido el primero.
+        espera_base_ms (float): Espera base en milisegundos.
+        espera_max_ms  (float): Tope de la espera en milisegundos.
+    """
+
+    def __init__(
+        self,
+        max_intentos: int = 6,
+        espera_base_ms: float = 10.0,
+        espera_max_ms: float = 500.0
+    ):
+        """
+        Crea una política de reintentos.
+
+        Args:
+            max_intentos   (int):   Intentos totales (>= 1).
+            espera_base_ms (float): Espera base (>= 0).
+            espera_max_ms  (float): Tope de espera (>= espera_base_ms).
+
+        Raises:
+            ValueError: Si algún parámetro está fuera de rango.
+        """
+        if max_intentos < 1:
+            raise ValueError("El número de intentos debe ser al menos 1")
+        if espera_base_ms < 0 or espera_max_ms < espera_base_ms:
+            raise ValueError(
+                "Las esperas deben cumplir 0 <= espera_base_ms <= espera_max_ms")
+        self.max_intentos = max_intentos
+        self.espera_base_ms = espera_base_ms
+        self.espera_max_ms = espera_max_ms
+
+    def espera(self, intento: int) -> float:
+        """
+        Calcula la espera (en segundos) antes de un reintento.
+
+        Args:
+            intento (int): Número de reintento (1 para el primero).
+
+        Returns:
+            float: Segundos a esperar.
+        """
+        tope = min(self.espera_max_ms,
+                   self.espera_base_ms * (2 ** (intento - 1)))
+        return random.uniform(0, tope) / 1000.0
+
+    def ejecutar(self, funcion: Callable):
+        """
+        Ejecuta `funcion` reintentándola ante errores de bloqueo.
+
+        Cada reintento se cuenta en la métrica "escritura.reintentos"; si se
+        agotan los intentos se cuenta "escritura.reintentos_agotados" y se
+        propaga el último error.
+
+        Args:
+            funcion (Callable): Función sin argumentos que ejecuta una
+                                transacción completa.
+
+        Returns:
+            El resultado de `funcion`.
+
+        Raises:
+            Exception: El error original si no es de bloqueo, o el último
+                       error de bloqueo tras agotar los intentos.
+        """
+        intento = 1
+        while True:
+            try:
+                return funcion()
+            except Exception as ex:
+                if not es_error_bloqueo(ex):
+                    raise
+                if intento >= self.max_intentos:
+                    metricas.incrementar("escritura.reintentos_agotados")
+                    raise
+                metricas.incrementar("escritura.reintentos")
+                time.sleep(self.espera(intento))
+                intento += 1
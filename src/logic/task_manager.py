@@ -10,6 +10,17 @@ Implementa las Historias de Usuario HU-001 a HU-011.
 Dependencias:
     - SQLAlchemy ORM (sesiones y consultas a SQLite)
     - src.model.declarative_base (engine)
+    - src.logic.cola_escritura (canal opcional de escritura agrupada)
+    - src.logic.reintentos (reintentos ante bloqueos de SQLite)
+    - src.logic.cache / src.logic.cambios (caché de lecturas e invalidación)
+    - src.logic.proyeccion (índices en memoria de las tareas, opcional)
+    - src.logic.recurrencias (ocurrencias de las tareas recurrentes)
+    - src.logic.ranking (puntaje de siguientes)
+    - src.logic.importacion (lectura de archivos CSV / JSONL)
+    - src.logic.exportacion (escritura de archivos CSV / JSONL)
+    - src.logic.calendario (calendario iCalendar de las entregas)
+    - src.logic.instantanea (instantánea binaria de un usuario)
+    - src.logic.archivo (archivo de tareas completadas antiguas)
     - src.model.modelo (Usuario, Materia, Tarea, Prioridad, EstadoTarea)
 
 Uso típico:
@@ -23,17 +34,170 @@ Uso típico:
                               date(2026, 3, 15), materia.idMateria)
 """
 
+import os
 import re
-from datetime import date
-from typing import Optional
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import IntegrityError
-from src.model.declarative_base import engine
-from src.model.modelo import Usuario, Materia, Tarea, Prioridad, EstadoTarea
+import sqlite3
+import time
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from sqlalchemy import (Date, SmallInteger, String, bindparam, case, func, insert,
+                        literal, null, select, type_coerce, union_all)
+from sqlalchemy.orm import sessionmaker, undefer
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm.exc import StaleDataError
+from src.model.declarative_base import BUSY_TIMEOUT_MS, engine, SessionEscritura
+from src.model.modelo import (Usuario, Materia, Tarea, Recurrencia, Prioridad,
+                              EstadoTarea, ResumenMateria, ResumenUsuario,
+                              TAREA_PENDIENTE, TABLA_RESTAURACION)
+from src.logic.cola_escritura import (
+    ColaEscritura, recargar_resultado, desvincular_resultado)
+from src.logic.reintentos import PoliticaReintentos
+from src.logic.cache import CacheLRU, CacheResultados
+from src.logic.cambios import SeguidorCambios, detector_compartido
+from src.logic.proyeccion import (ProyeccionTareas, TareaVista, anotar_tareas,
+                                  columnas_vista)
+from src.logic.recurrencias import materializar, mascara_dias
+from src.logic.ranking import consulta_candidatas, mejores
+from src.logic.importacion import (FORMATOS, ErrorImportacion, ResultadoImportacion,
+                                   abrir_texto, campo_texto, detectar_formato,
+                                   leer_registros)
+from src.logic.exportacion import ResultadoExportacion, escritor
+from src.logic.calendario import (COMPONENTES, PIE, ResultadoCalendario, cabecera,
+                                  consultas_calendario, copiar_entradas, entrada,
+                                  leer_marcas, marca_de_tiempo, reemplazar_archivo, uid)
+from src.logic.instantanea import (ResultadoInstantanea, columnas_materias,
+                                   columnas_tareas, consultas_instantanea, guardar)
+from src.logic.archivo import (MARCA_PERIODO, TABLA_ARCHIVO, VISTA_HISTORIAL,
+                               ResultadoArchivo, adjuntar, fila_historial,
+                               leer_archivada, limites_periodo, ruta_de_periodo,
+                               sentencia_borrar, sentencia_candidatas, sentencia_contar,
+                               sentencia_copiar, sentencias_confirmar)
 
 # Fábrica de sesiones ligada al engine configurado en declarative_base
 Session = sessionmaker(bind=engine)
 
+# Cantidad máxima de usuarios por defecto. TASKMASTER_LIMITE_USUARIOS=0
+# desactiva el límite (instalaciones con muchos usuarios).
+LIMITE_USUARIOS = int(os.environ.get('TASKMASTER_LIMITE_USUARIOS', '5')) or None
+
+# Ocurrencias pendientes que se guardan por adelantado de cada recurrencia
+OCURRENCIAS_ADELANTADAS = 3
+
+# Máximo de horas de esfuerzo estimado de una tarea
+MAX_ESFUERZO_HORAS = 500
+
+# Registros válidos escritos por transacción al importar
+TAMANO_LOTE_IMPORTACION = 1000
+
+# Filas que se traen de SQLite por vez al exportar
+FILAS_POR_LECTURA_EXPORTACION = 1000
+
+# Mayor ID posible en SQLite (cota superior por defecto al exportar)
+_ID_MAXIMO = 2 ** 63 - 1
+
+
+def _escapar_like(texto: str) -> str:
+    """Escapa los comodines de LIKE (%, _ y \\) de un texto literal."""
+    return (texto.replace("\\", "\\\\")
+                 .replace("%", "\\%").replace("_", "\\_"))
+
+
+class ConflictoVersionError(ValueError):
+    """
+    La entidad fue modificada por otro proceso o ventana desde que se leyó.
+
+    Se lanza cuando una operación de edición recibe una versión esperada
+    distinta de la versión actual de la fila (concurrencia optimista).
+    Hereda de ValueError para que las vistas existentes la muestren como
+    cualquier otro error de validación.
+    """
+
+
+@lru_cache(maxsize=None)
+def _consulta_agenda():
+    """
+    Sentencia de TaskManager.agenda, construida una sola vez.
+
+    Una rama por grupo, unidas con UNION ALL; cada rama recorre el índice
+    parcial ix_tareas_pendientes_entrega en las materias del usuario y se
+    corta en :limite filas. Parámetros: usuario_id, limite, hasta_0 y
+    desde_i / hasta_i de los grupos 1 a 3.
+    """
+    ramas = []
+    for grupo in range(4):
+        rama = select(literal(grupo).label("grupo"), *columnas_vista()) \
+            .join(Materia) \
+            .where(Materia.usuario_id == bindparam("usuario_id"), TAREA_PENDIENTE,
+                   Tarea.fechaEntrega <= bindparam(f"hasta_{grupo}", type_=Date))
+        if grupo > 0:
+            rama = rama.where(Tarea.fechaEntrega >= bindparam(f"desde_{grupo}", type_=Date))
+        rama = rama.order_by(Tarea.fechaEntrega, Tarea.idTarea).limit(bindparam("limite"))
+        ramas.append(select(rama.subquery()))
+    return union_all(*ramas)
+
+
+def _nombre_enum(columna):
+    """
+    Expresión SQL con el nombre del miembro guardado en una columna
+    EnumEntero (p. ej. 'Alta'), para leerlo sin convertir fila por fila.
+    """
+    codigo = type_coerce(columna, SmallInteger)
+    return case({i: m.name for i, m in enumerate(columna.type.miembros)}, value=codigo)
+
+
+@lru_cache(maxsize=None)
+def _consultas_exportacion() -> tuple:
+    """
+    Sentencias (materias, tareas) de TaskManager.exportar, construidas una
+    sola vez. Cada fila ya es un registro de exportación, con las columnas
+    de CAMPOS_EXPORTACION: los nombres de prioridad y estado se resuelven
+    en SQL y la fecha se lee tal como se guarda (AAAA-MM-DD).
+
+    La de tareas recorre tareas por rango de clave primaria
+    (:desde_id, :hasta_id] en orden de ID, sin ordenar aparte, y trae el
+    nombre de la materia por su clave primaria. Parámetros: usuario_id, y
+    desde_id y hasta_id en la de tareas.
+    """
+    vacio = [null().label(c) for c in ("titulo", "descripcion", "prioridad",
+                                       "fecha_entrega", "materia", "esfuerzo", "estado")]
+    materias = select(Materia.idMateria.label("id"), literal("materia").label("tipo"),
+                      Materia.nombre, Materia.color, *vacio) \
+        .where(Materia.usuario_id == bindparam("usuario_id")) \
+        .order_by(Materia.idMateria)
+    tareas = select(Tarea.idTarea.label("id"), literal("tarea").label("tipo"),
+                    null().label("nombre"), null().label("color"),
+                    Tarea.titulo, Tarea.descripcion,
+                    _nombre_enum(Tarea.prioridad).label("prioridad"),
+                    type_coerce(Tarea.fechaEntrega, String).label("fecha_entrega"),
+                    Materia.nombre.label("materia"), Tarea.esfuerzo,
+                    _nombre_enum(Tarea.estado).label("estado")) \
+        .join(Materia) \
+        .where(Materia.usuario_id == bindparam("usuario_id"),
+               Tarea.idTarea > bindparam("desde_id"),
+               Tarea.idTarea <= bindparam("hasta_id")) \
+        .order_by(Tarea.idTarea)
+    return materias, tareas
+
+
+class Agenda(NamedTuple):
+    """
+    Tareas pendientes del usuario activo agrupadas por fecha de entrega.
+
+    Cada grupo está ordenado por fecha de entrega e ID y tiene como
+    máximo `limite` tareas (ver TaskManager.agenda).
+
+    Atributos:
+        vencidas (list[TareaVista]): Entrega anterior a hoy.
+        hoy      (list[TareaVista]): Entrega hoy.
+        semana   (list[TareaVista]): Entrega en los próximos 6 días.
+        despues  (list[TareaVista]): Entrega posterior, hasta el horizonte.
+    """
+    vencidas: list
+    hoy: list
+    semana: list
+    despues: list
+
 
 class TaskManager:
     """
@@ -48,6 +212,27 @@ class TaskManager:
             Usuario que tiene la sesión activa. Es None si no se ha
             seleccionado ningún usuario. La mayoría de operaciones sobre
             materias y tareas requieren que este atributo esté definido.
+        cola_escritura (Optional[ColaEscritura]):
+            Canal de escritura agrupada. Si está definido, todas las
+            mutaciones se envían al hilo escritor compartido en lugar de
+            confirmar su propia transacción.
+        politica_reintentos (PoliticaReintentos):
+            Política aplicada a las escrituras directas cuando la base de
+            datos está bloqueada por otro proceso.
+        limite_usuarios (Optional[int]):
+            Cantidad máxima de usuarios registrados, o None si no hay
+            límite.
+        cache (Optional[CacheLRU]):
+            Caché de lecturas de materias y tareas (None si está
+            desactivada). Expone los contadores de aciertos y fallos.
+        cache_resultados (Optional[CacheResultados]):
+            Caché de listados y conteos por usuario y filtros (None si
+            está desactivada).
+        proyeccion (Optional[ProyeccionTareas]):
+            Índices en memoria de las tareas del usuario activo, o None
+            si no se usa proyección o no hay usuario activo.
+        ocurrencias_adelantadas (int):
+            Ocurrencias pendientes guardadas de cada recurrencia.
 
     Ejemplo de flujo básico:
         tm = TaskManager()
@@ -59,9 +244,293 @@ class TaskManager:
         tm.marcar_tarea(t.idTarea)
     """
 
-    def __init__(self):
-        """Inicializa el TaskManager sin usuario activo."""
+    def __init__(
+        self,
+        cola_escritura: Optional[ColaEscritura] = None,
+        politica_reintentos: Optional[PoliticaReintentos] = None,
+        limite_usuarios: Optional[int] = LIMITE_USUARIOS,
+        usar_cache: bool = True,
+        usar_proyeccion: bool = False,
+        ocurrencias_adelantadas: int = OCURRENCIAS_ADELANTADAS
+    ):
+        """
+        Inicializa el TaskManager sin usuario activo.
+
+        Args:
+            cola_escritura (Optional[ColaEscritura]): Canal de escritura
+                agrupada opcional. Varias instancias de TaskManager pueden
+                compartir la misma cola (que aplica su propia política).
+            politica_reintentos (Optional[PoliticaReintentos]): Política de
+                reintentos ante bloqueos. Si es None se usa la política
+                por defecto.
+            limite_usuarios (Optional[int]): Cantidad máxima de usuarios
+                (por defecto LIMITE_USUARIOS). None permite usuarios
+                ilimitados.
+            usar_cache (bool): Si es True, seleccionar_materia,
+                seleccionar_tarea y listar_materias se sirven desde una
+                CacheLRU, y listar_usuarios, listar_tareas y contar_tareas
+                desde una CacheResultados; ambas se invalidan por las
+                mutaciones de esta instancia y por las escrituras de otras
+                conexiones.
+            usar_proyeccion (bool): Si es True, al seleccionar un usuario
+                se cargan sus tareas en una ProyeccionTareas y
+                listar_tareas / contar_tareas se resuelven en memoria.
+            ocurrencias_adelantadas (int): Ocurrencias pendientes que se
+                guardan de cada recurrencia (ver crear_recurrencia).
+
+        Raises:
+            ValueError: Si limite_usuarios u ocurrencias_adelantadas es
+                        menor a 1.
+        """
+        if limite_usuarios is not None and limite_usuarios < 1:
+            raise ValueError("El límite de usuarios debe ser al menos 1")
+        if ocurrencias_adelantadas < 1:
+            raise ValueError("Las ocurrencias adelantadas deben ser al menos 1")
         self.usuario_activo: Optional[Usuario] = None
+        self.cola_escritura = cola_escritura
+        self.politica_reintentos = politica_reintentos or PoliticaReintentos()
+        self.limite_usuarios = limite_usuarios
+        self.cache: Optional[CacheLRU] = (
+            CacheLRU(nombre="cache.entidades") if usar_cache else None)
+        self.cache_resultados: Optional[CacheResultados] = (
+            CacheResultados() if usar_cache else None)
+        self._seguidor = (SeguidorCambios(detector_compartido())
+                          if usar_cache else None)
+        self.usar_proyeccion = usar_proyeccion
+        self.proyeccion: Optional[ProyeccionTareas] = None
+        self.ocurrencias_adelantadas = ocurrencias_adelantadas
+
+    # ──────────────────────────────────────────────────────────────
+    # EJECUCIÓN DE ESCRITURAS
+    # ──────────────────────────────────────────────────────────────
+
+    def _ejecutar_escritura(self, operacion):
+        """
+        Ejecuta una operación de escritura y confirma sus cambios.
+
+        La operación recibe una sesión abierta y devuelve su resultado sin
+        hacer commit. Si hay cola de escritura, la operación se agrupa con
+        las de otros llamadores; en caso contrario se ejecuta en una
+        transacción propia (BEGIN IMMEDIATE), que se reintenta completa
+        según politica_reintentos si la base de datos está bloqueada.
+        En ambos casos el resultado ORM se devuelve recargado y
+        desvinculado de la sesión.
+
+        Args:
+            operacion (Callable): Función operacion(session) -> resultado.
+
+        Returns:
+            El resultado de la operación.
+
+        Raises:
+            Exception: Cualquier excepción lanzada por la operación; la
+                       transacción se revierte antes de propagarla.
+        """
+        if self.cola_escritura is not None:
+            try:
+                return self.cola_escritura.ejecutar(operacion)
+            except StaleDataError as ex:
+                raise ConflictoVersionError(
+                    "Los datos fueron modificados por otra ventana o proceso") from ex
+
+        def _transaccion():
+            session = SessionEscritura()
+            try:
+                resultado = operacion(session)
+                recargar_resultado(session, resultado)
+                session.commit()
+                return desvincular_resultado(session, resultado)
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+        try:
+            return self.politica_reintentos.ejecutar(_transaccion)
+        except StaleDataError as ex:
+            raise ConflictoVersionError(
+                "Los datos fueron modificados por otra ventana o proceso") from ex
+
+    # ──────────────────────────────────────────────────────────────
+    # CACHÉ DE LECTURAS Y PROYECCIÓN
+    # ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _claves_afectadas(cambios: list) -> list:
+        """
+        Traduce filas de registro_cambios a claves de la caché.
+
+        Args:
+            cambios (list[Cambio]): Cambios leídos del historial.
+
+        Returns:
+            list: Claves a invalidar.
+        """
+        claves = []
+        for c in cambios:
+            if c.tabla == "tareas":
+                claves.append(("tarea", c.id_entidad))
+            elif c.tabla == "materias":
+                claves += [("materia", c.id_entidad), ("materias", c.usuario_id)]
+            else:
+                claves.append(("materias", c.id_entidad))
+        return claves
+
+    @staticmethod
+    def _usuarios_afectados(cambios: list) -> set:
+        """
+        Usuarios cuyos datos cambiaron; None representa el directorio de
+        usuarios (altas, ediciones y bajas de usuarios).
+        """
+        usuarios = {c.usuario_id for c in cambios}
+        if any(c.tabla == "usuarios" for c in cambios):
+            usuarios.add(None)
+        return usuarios
+
+    def _cache_vigente(self) -> Optional[CacheLRU]:
+        """
+        Retorna la caché tras aplicar los cambios confirmados por cualquier
+        conexión (esta instancia, otra instancia u otro proceso).
+
+        Se llama en cada lectura cacheada, también en los aciertos. Si
+        PRAGMA data_version no cambió no se consulta nada más; si cambió,
+        se invalidan solo las entidades registradas en registro_cambios, o
+        toda la caché si el historial no alcanza. Los mismos cambios
+        incrementan la versión de datos de cada usuario afectado en
+        cache_resultados.
+
+        Returns:
+            Optional[CacheLRU]: La caché, o None si está desactivada.
+        """
+        if self.cache is None:
+            return None
+        hubo, cambios = self._seguidor.revisar()
+        if hubo:
+            if cambios is None:
+                self.cache.limpiar()
+                self.cache_resultados.invalidar_todo()
+            else:
+                self.cache.invalidar(*self._claves_afectadas(cambios))
+                self.cache_resultados.invalidar_usuarios(
+                    *self._usuarios_afectados(cambios))
+        return self.cache
+
+    def _resultado_cacheado(self, usuario_id: Optional[int], clave, calcular):
+        """
+        Resuelve un listado o conteo desde cache_resultados o calculándolo.
+
+        Cada llamada, también un acierto, sondea antes PRAGMA data_version
+        en la conexión del detector compartido (ver _cache_vigente): es el
+        único camino por el que llegan a la caché las escrituras de esta
+        u otra instancia y de otros procesos. Un acierto cuesta entonces
+        esa consulta (unos microsegundos, sin leer páginas) más la
+        comparación de versiones.
+
+        Args:
+            usuario_id (Optional[int]): Dueño de los datos (None: directorio).
+            clave: Nombre de la consulta y sus filtros, en orden fijo.
+            calcular (Callable): Función sin argumentos que calcula el
+                                 resultado (inmutable: tupla o entero).
+
+        Returns:
+            El resultado vigente.
+        """
+        if self._cache_vigente() is None:
+            return calcular()
+        encontrado, valor = self.cache_resultados.obtener(usuario_id, clave)
+        if encontrado:
+            return valor
+        version = self.cache_resultados.version(usuario_id)
+        valor = calcular()
+        self.cache_resultados.guardar(usuario_id, clave, valor, version)
+        return valor
+
+    def _proyeccion_vigente(self) -> Optional[ProyeccionTareas]:
+        """
+        Retorna la proyección del usuario activo, recargada si otro proceso
+        modificó sus datos.
+
+        Returns:
+            Optional[ProyeccionTareas]: La proyección, o None si no se usa.
+        """
+        if self.proyeccion is not None:
+            self.proyeccion.sincronizar()
+        return self.proyeccion
+
+    def _cerrar_proyeccion(self):
+        """Libera la proyección del usuario anterior (si la hay)."""
+        if self.proyeccion is not None:
+            self.proyeccion.cerrar()
+            self.proyeccion = None
+
+    def _invalidar(self, *claves):
+        """Elimina claves de la caché (si está activa)."""
+        if self.cache is not None:
+            self.cache.invalidar(*claves)
+
+    def _leer_cacheado(self, clave, consulta):
+        """
+        Resuelve una lectura desde la caché o, si falta, desde la consulta.
+
+        Args:
+            clave: Clave de la caché, p. ej. ("materia", 3).
+            consulta (Callable): Función sin argumentos que lee de la BD.
+
+        Returns:
+            El valor cacheado o el resultado de la consulta. Los resultados
+            None no se guardan.
+        """
+        cache = self._cache_vigente()
+        if cache is not None:
+            encontrado, valor = cache.obtener(clave)
+            if encontrado:
+                return valor
+        valor = consulta()
+        if cache is not None and valor is not None:
+            cache.guardar(clave, valor)
+        return valor
+
+    @staticmethod
+    def _verificar_version(entidad, version_esperada: Optional[int], nombre: str):
+        """
+        Compara la versión leída de una entidad con la que espera el llamador.
+
+        Args:
+            entidad: Instancia ORM recién leída en la transacción.
+            version_esperada (Optional[int]): Versión que el llamador leyó.
+                                              None desactiva la verificación.
+            nombre (str): Nombre de la entidad para el mensaje de error.
+
+        Raises:
+            ConflictoVersionError: Si las versiones no coinciden.
+        """
+        if version_esperada is not None and entidad.version != version_esperada:
+            raise ConflictoVersionError(
+                f"{nombre} fue modificada por otra ventana o proceso "
+                f"(versión actual {entidad.version}, esperada {version_esperada})")
+
+    def consultar_version(self, modelo, id_entidad: int) -> Optional[int]:
+        """
+        Retorna la versión actual de una entidad sin cargar la fila completa.
+
+        Permite a cachés e interfaces comprobar de forma barata si algo
+        cambió desde la última lectura.
+
+        Args:
+            modelo: Clase del modelo (Usuario, Materia o Tarea).
+            id_entidad (int): Clave primaria de la entidad.
+
+        Returns:
+            Optional[int]: La versión, o None si la entidad no existe.
+        """
+        pk = modelo.__mapper__.primary_key[0]
+        session = Session()
+        try:
+            return session.query(modelo.version).filter(
+                pk == id_entidad).scalar()
+        finally:
+            session.close()
 
     # ──────────────────────────────────────────────────────────────
     # MÉTODOS PRIVADOS DE VALIDACIÓN
@@ -223,6 +692,26 @@ class TaskManager:
                 "El título de la tarea es muy largo (máximo 100 caracteres)")
         return titulo
 
+    @staticmethod
+    def _validar_esfuerzo(esfuerzo: int) -> Optional[int]:
+        """
+        Valida el esfuerzo estimado de una tarea, en horas.
+
+        Args:
+            esfuerzo (int): Horas estimadas, de 0 a MAX_ESFUERZO_HORAS.
+
+        Returns:
+            Optional[int]: Las horas, o None si es 0 (sin estimación).
+
+        Raises:
+            ValueError: Si no es un entero o está fuera de rango.
+        """
+        if (not isinstance(esfuerzo, int) or isinstance(esfuerzo, bool)
+                or not 0 <= esfuerzo <= MAX_ESFUERZO_HORAS):
+            raise ValueError(
+                f"El esfuerzo debe ser un entero de 0 a {MAX_ESFUERZO_HORAS} horas")
+        return esfuerzo or None
+
     # ──────────────────────────────────────────────────────────────
     # HU-001: Crear Usuario
     # ──────────────────────────────────────────────────────────────
@@ -231,9 +720,13 @@ class TaskManager:
         """
         HU-001: Crea y persiste un nuevo usuario en el sistema.
 
-        Valida los datos de entrada, verifica que no se supere el límite
-        de 5 usuarios y que el correo no esté duplicado, y guarda el
-        usuario en la base de datos.
+        Valida los datos de entrada y guarda el usuario con una única
+        sentencia INSERT ... SELECT ... WHERE condicionada a que no se
+        haya alcanzado self.limite_usuarios (sin condición si el límite
+        es None). La unicidad del correo la
+        garantiza la restricción UNIQUE de la tabla. Ambas reglas se
+        verifican de forma atómica, sin la carrera que existiría entre un
+        COUNT previo y el INSERT.
 
         Args:
             nombre (str): Nombre completo del usuario.
@@ -246,65 +739,105 @@ class TaskManager:
             ValueError: Si:
                 - El nombre es inválido (vacío, muy corto/largo, con números).
                 - El correo es inválido (formato incorrecto, vacío, muy largo).
-                - Ya existen 5 usuarios registrados.
+                - Ya se alcanzó el límite de usuarios registrados.
                 - El correo ya está registrado por otro usuario.
         """
         nombre = self._validar_nombre_usuario(nombre)
         correo = self._validar_correo(correo)
 
-        session = Session()
-        try:
-            # Verificar límite máximo de usuarios
-            count = session.query(Usuario).count()
-            if count >= 5:
-                raise ValueError("Límite de usuarios alcanzado (máximo 5)")
-
-            # Verificar unicidad del correo
-            existente = session.query(Usuario).filter_by(correo=correo).first()
-            if existente:
+        limite = self.limite_usuarios
+        fila = select(literal(nombre), literal(correo), literal(date.today()),
+                      literal(1))
+        if limite is not None:
+            # Cuenta como máximo `limite` filas: no recorre toda la tabla
+            registrados = select(func.count()).select_from(
+                select(literal(1)).select_from(Usuario).limit(limite).subquery()
+            ).scalar_subquery()
+            fila = fila.where(registrados < limite)
+        sentencia = insert(Usuario).from_select(
+            ["nombre", "correo", "fecha_creacion", "version"], fila
+        ).returning(Usuario)
+
+        def _op(session):
+            try:
+                usuario = session.execute(sentencia).scalars().first()
+            except IntegrityError:
                 raise ValueError(f"El correo '{correo}' ya está registrado")
-
-            usuario = Usuario(
-                nombre=nombre,
-                correo=correo,
-                fecha_creacion=date.today()
-            )
-            session.add(usuario)
-            session.commit()
-            session.refresh(usuario)
-            session.expunge(usuario)
+            if usuario is None:
+                raise ValueError(
+                    f"Límite de usuarios alcanzado (máximo {limite})")
             return usuario
 
-        except IntegrityError:
-            session.rollback()
-            raise ValueError(
-                "El correo ya está registrado (error de concurrencia)")
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+        return self._ejecutar_escritura(_op)
 
     # ──────────────────────────────────────────────────────────────
     # HU-002: Seleccionar Usuario
     # ──────────────────────────────────────────────────────────────
 
-    def listar_usuarios(self) -> list:
+    def listar_usuarios(
+        self,
+        busqueda: Optional[str] = None,
+        despues_de: Optional[tuple] = None,
+        limite: Optional[int] = None
+    ) -> list:
         """
-        HU-002 (auxiliar): Retorna todos los usuarios registrados en el sistema.
+        HU-002 (auxiliar): Retorna los usuarios registrados, ordenados por
+        nombre (sin distinguir mayúsculas) y luego por ID.
+
+        Admite búsqueda por prefijo de nombre o correo y paginación por
+        clave (keyset): cada página continúa después del último usuario de
+        la anterior, de modo que el costo no crece con el número de página.
+        Ambas operaciones usan los índices ix_usuarios_nombre e
+        ix_usuarios_correo (COLLATE NOCASE).
+
+        Args:
+            busqueda   (Optional[str]):   Prefijo de nombre o correo. None o
+                                          vacío no filtra.
+            despues_de (Optional[tuple]): Cursor (nombre, idUsuario) del
+                                          último usuario de la página anterior.
+            limite     (Optional[int]):   Tamaño de página. None retorna
+                                          todos los resultados.
 
         Returns:
             list[Usuario]: Lista de objetos Usuario. Puede estar vacía si
-                           no hay usuarios registrados.
+                           no hay usuarios registrados o no hay coincidencias.
+
+        Raises:
+            ValueError: Si limite es menor a 1.
         """
-        session = Session()
-        try:
-            usuarios = session.query(Usuario).all()
-            for u in usuarios:
-                session.expunge(u)
-            return usuarios
-        finally:
-            session.close()
+        if limite is not None and limite < 1:
+            raise ValueError("El tamaño de página debe ser al menos 1")
+
+        nombre = Usuario.nombre.collate("NOCASE")
+        consulta = select(Usuario).order_by(nombre, Usuario.idUsuario)
+        busqueda = (busqueda or "").strip()
+        if busqueda:
+            # El patrón se arma en Python: SQLite solo usa el índice con LIKE
+            # si el prefijo es un literal (o parámetro) sin comodín inicial.
+            patron = _escapar_like(busqueda) + "%"
+            consulta = consulta.where(
+                Usuario.nombre.like(patron, escape="\\")
+                | Usuario.correo.like(patron, escape="\\"))
+        if despues_de is not None:
+            ultimo_nombre, ultimo_id = despues_de
+            consulta = consulta.where(
+                nombre >= ultimo_nombre,
+                (nombre > ultimo_nombre) | (Usuario.idUsuario > ultimo_id))
+        if limite is not None:
+            consulta = consulta.limit(limite)
+
+        def _consulta():
+            session = Session()
+            try:
+                usuarios = session.scalars(consulta).all()
+                for u in usuarios:
+                    session.expunge(u)
+                return tuple(usuarios)
+            finally:
+                session.close()
+
+        clave = ("usuarios", busqueda, despues_de and tuple(despues_de), limite)
+        return list(self._resultado_cacheado(None, clave, _consulta))
 
     def seleccionar_usuario(self, id_usuario: int) -> Optional[Usuario]:
         """
@@ -326,22 +859,30 @@ class TaskManager:
         """
         session = Session()
         try:
-            count = session.query(Usuario).count()
-            if count == 0:
-                raise ValueError("No hay usuarios registrados")
-
-            if id_usuario <= 0:
-                raise ValueError("El ID del usuario debe ser mayor a 0")
+            usuario = None
+            if id_usuario > 0:
+                usuario = session.get(Usuario, id_usuario)
+
+            if usuario is None:
+                # Solo ante un fallo se distingue "tabla vacía" (EXISTS, sin
+                # contar filas) de "ID inválido" o "ID inexistente".
+                if not session.query(select(Usuario.idUsuario).exists()).scalar():
+                    raise ValueError("No hay usuarios registrados")
+                if id_usuario <= 0:
+                    raise ValueError("El ID del usuario debe ser mayor a 0")
+                return None
 
-            usuario = session.query(Usuario).filter_by(
-                idUsuario=id_usuario).first()
-            if usuario:
-                session.expunge(usuario)
-                self.usuario_activo = usuario
-            return usuario
+            session.expunge(usuario)
         finally:
             session.close()
 
+        self.usuario_activo = usuario
+        if self.usar_proyeccion and (self.proyeccion is None
+                                     or self.proyeccion.usuario_id != usuario.idUsuario):
+            self._cerrar_proyeccion()
+            self.proyeccion = ProyeccionTareas(usuario.idUsuario)
+        return usuario
+
     # ──────────────────────────────────────────────────────────────
     # HU-003: Crear Materia
     # ──────────────────────────────────────────────────────────────
@@ -370,13 +911,13 @@ class TaskManager:
         self._validar_usuario_activo()
         nombre = self._validar_nombre_materia(nombre)
         self._validar_color_hex(color)
+        usuario_id = self.usuario_activo.idUsuario
 
-        session = Session()
-        try:
+        def _op(session):
             # Verificar que el nombre no esté duplicado para este usuario
             duplicado = session.query(Materia).filter_by(
                 nombre=nombre,
-                usuario_id=self.usuario_activo.idUsuario
+                usuario_id=usuario_id
             ).first()
             if duplicado:
                 raise ValueError(
@@ -385,23 +926,49 @@ class TaskManager:
             materia = Materia(
                 nombre=nombre,
                 color=color,
-                usuario_id=self.usuario_activo.idUsuario
+                usuario_id=usuario_id
             )
             session.add(materia)
-            session.commit()
-            session.refresh(materia)
-            session.expunge(materia)
+            try:
+                session.flush()
+            except IntegrityError:
+                raise ValueError(
+                    "Ya existe una materia con ese nombre para este usuario")
             return materia
 
-        except IntegrityError:
-            session.rollback()
-            raise ValueError(
-                "Ya existe una materia con ese nombre para este usuario")
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+        materia = self._ejecutar_escritura(_op)
+        self._invalidar(("materias", usuario_id))
+        return materia
+
+    def listar_materias(self) -> list:
+        """
+        HU-003 (auxiliar): Retorna las materias del usuario activo.
+
+        El resultado se sirve desde la caché mientras ninguna mutación ni
+        otra conexión haya modificado la base de datos.
+
+        Returns:
+            list[Materia]: Materias del usuario activo en orden de creación.
+                           Puede estar vacía.
+
+        Raises:
+            ValueError: Si no hay usuario activo.
+        """
+        self._validar_usuario_activo()
+        usuario_id = self.usuario_activo.idUsuario
+
+        def _consulta():
+            session = Session()
+            try:
+                materias = session.query(Materia).filter_by(
+                    usuario_id=usuario_id).order_by(Materia.idMateria).all()
+                for m in materias:
+                    session.expunge(m)
+                return tuple(materias)
+            finally:
+                session.close()
+
+        return list(self._leer_cacheado(("materias", usuario_id), _consulta))
 
     # ──────────────────────────────────────────────────────────────
     # HU-004: Crear Tarea
@@ -413,7 +980,8 @@ class TaskManager:
         descripcion: str,
         prioridad: Prioridad,
         fecha_entrega: date,
-        materia_id: int
+        materia_id: int,
+        esfuerzo: Optional[int] = None
     ) -> Tarea:
         """
         HU-004: Crea y persiste una tarea asociada a una materia del usuario activo.
@@ -427,6 +995,8 @@ class TaskManager:
             prioridad     (Prioridad): Nivel de prioridad (debe ser instancia de Prioridad).
             fecha_entrega (date):     Fecha límite (no puede ser anterior a hoy).
             materia_id    (int):      ID de la materia a la que pertenece la tarea.
+            esfuerzo      (Optional[int]): Horas de trabajo estimadas (0 o
+                                      None = sin estimación; ver siguientes).
 
         Returns:
             Tarea: Objeto Tarea recién creada, con estado Pendiente.
@@ -438,10 +1008,13 @@ class TaskManager:
                 - La descripción supera 500 caracteres.
                 - La fecha de entrega es pasada o no es un objeto date.
                 - La prioridad no es una instancia del enum Prioridad.
+                - El esfuerzo no es un entero de 0 a MAX_ESFUERZO_HORAS.
                 - La materia no existe o pertenece a otro usuario.
         """
         self._validar_usuario_activo()
         titulo = self._validar_titulo_tarea(titulo)
+        if esfuerzo is not None:
+            esfuerzo = self._validar_esfuerzo(esfuerzo)
 
         if descripcion and len(descripcion) > 500:
             raise ValueError(
@@ -456,13 +1029,14 @@ class TaskManager:
             raise ValueError(
                 "La prioridad debe ser una instancia de Prioridad (Baja, Media o Alta)")
 
-        session = Session()
-        try:
+        usuario_id = self.usuario_activo.idUsuario
+
+        def _op(session):
             materia = session.query(Materia).filter_by(
                 idMateria=materia_id).first()
             if not materia:
                 raise ValueError("La materia no existe")
-            if materia.usuario_id != self.usuario_activo.idUsuario:
+            if materia.usuario_id != usuario_id:
                 raise ValueError(
                     "No puede crear una tarea en una materia de otro usuario")
 
@@ -472,19 +1046,295 @@ class TaskManager:
                 materia_id=materia_id,
                 prioridad=prioridad,
                 fechaEntrega=fecha_entrega,
-                estado=EstadoTarea.Pendiente
+                estado=EstadoTarea.Pendiente,
+                esfuerzo=esfuerzo
             )
             session.add(tarea)
-            session.commit()
-            session.refresh(tarea)
-            session.expunge(tarea)
             return tarea
 
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+        return self._ejecutar_escritura(_op)
+
+    def listar_tareas(
+        self,
+        materia_id: Optional[int] = None,
+        estado: Optional[EstadoTarea] = None,
+        prioridad: Optional[Prioridad] = None,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+        por_prioridad: bool = False
+    ) -> list:
+        """
+        HU-004 (auxiliar): Retorna las tareas del usuario activo.
+
+        Con proyección activa se resuelve en memoria; en caso contrario se
+        consulta la base de datos con los mismos filtros y el mismo orden,
+        leyendo solo las columnas de TareaVista (la descripción se reduce
+        a su resumen; la completa se obtiene con seleccionar_tarea).
+
+        Args:
+            materia_id (Optional[int]):         Solo tareas de esa materia.
+            estado     (Optional[EstadoTarea]): Solo tareas en ese estado.
+            prioridad  (Optional[Prioridad]):   Solo tareas de esa prioridad.
+            desde      (Optional[date]):        Entrega en o después de esa fecha.
+            hasta      (Optional[date]):        Entrega en o antes de esa fecha.
+            por_prioridad (bool):               Si es True, primero las de
+                                                prioridad Alta, luego Media
+                                                y Baja.
+
+        Con `hasta`, antes se generan las ocurrencias de las recurrencias
+        del usuario que caen en el rango.
+
+        Returns:
+            list[TareaVista]: Tareas ordenadas por fecha de entrega e ID
+                              (dentro de cada prioridad si por_prioridad).
+
+        Raises:
+            ValueError: Si no hay usuario activo.
+        """
+        self._validar_usuario_activo()
+        if hasta is not None:
+            self._materializar_hasta(hasta)
+
+        def _calcular():
+            proyeccion = self._proyeccion_vigente()
+            if proyeccion is not None:
+                niveles = ([prioridad] if prioridad is not None or not por_prioridad
+                           else reversed(Prioridad))
+                return tuple(t for nivel in niveles for t in proyeccion.listar(
+                    materia_id, estado, nivel, desde, hasta))
+            session = Session()
+            try:
+                consulta = self._filtrar_tareas(session.query(*columnas_vista()),
+                                                materia_id, estado, prioridad)
+                if desde is not None:
+                    consulta = consulta.filter(Tarea.fechaEntrega >= desde)
+                if hasta is not None:
+                    consulta = consulta.filter(Tarea.fechaEntrega <= hasta)
+                # prioridad se guarda como entero (Baja=0 … Alta=2), así
+                # que el orden descendente puede usar ix_tareas_materia_prioridad
+                orden = [Tarea.fechaEntrega, Tarea.idTarea]
+                if por_prioridad:
+                    orden.insert(0, Tarea.prioridad.desc())
+                return tuple(TareaVista(*fila) for fila in consulta.order_by(*orden))
+            finally:
+                session.close()
+
+        clave = ("tareas", materia_id, estado, prioridad, desde, hasta, por_prioridad)
+        return list(self._resultado_cacheado(
+            self.usuario_activo.idUsuario, clave, _calcular))
+
+    def contar_tareas(
+        self,
+        materia_id: Optional[int] = None,
+        estado: Optional[EstadoTarea] = None,
+        prioridad: Optional[Prioridad] = None
+    ) -> int:
+        """
+        HU-004 (auxiliar): Cuenta las tareas del usuario activo.
+
+        Args:
+            materia_id (Optional[int]):         Solo tareas de esa materia.
+            estado     (Optional[EstadoTarea]): Solo tareas en ese estado.
+            prioridad  (Optional[Prioridad]):   Solo tareas de esa prioridad.
+
+        Returns:
+            int: Cantidad de tareas.
+
+        Raises:
+            ValueError: Si no hay usuario activo.
+        """
+        self._validar_usuario_activo()
+
+        def _calcular():
+            proyeccion = self._proyeccion_vigente()
+            if proyeccion is not None:
+                return proyeccion.contar(materia_id, estado, prioridad)
+            session = Session()
+            try:
+                return self._filtrar_tareas(
+                    session.query(func.count(Tarea.idTarea)).select_from(Tarea),
+                    materia_id, estado, prioridad).scalar()
+            finally:
+                session.close()
+
+        clave = ("contar_tareas", materia_id, estado, prioridad)
+        return self._resultado_cacheado(
+            self.usuario_activo.idUsuario, clave, _calcular)
+
+    def resumen_materias(self) -> dict:
+        """
+        HU-004 (auxiliar): Contadores de tareas de cada materia del usuario
+        activo.
+
+        Se leen de resumen_materias (mantenida por triggers), por lo que el
+        costo depende de la cantidad de materias y no de la de tareas.
+
+        Returns:
+            dict[int, ResumenMateria]: Resumen por idMateria.
+
+        Raises:
+            ValueError: Si no hay usuario activo.
+        """
+        self._validar_usuario_activo()
+        usuario_id = self.usuario_activo.idUsuario
+
+        def _calcular():
+            session = Session()
+            try:
+                resumenes = session.query(ResumenMateria).filter_by(
+                    usuario_id=usuario_id).all()
+                session.expunge_all()
+                return tuple(resumenes)
+            finally:
+                session.close()
+
+        resumenes = self._resultado_cacheado(usuario_id, ("resumen_materias",), _calcular)
+        return {r.materia_id: r for r in resumenes}
+
+    def resumen_usuario(self) -> Optional[ResumenUsuario]:
+        """
+        HU-004 (auxiliar): Totales de tareas del usuario activo (total,
+        pendientes, completadas y entrega pendiente más próxima).
+
+        Returns:
+            Optional[ResumenUsuario]: El resumen, o None si aún no existe.
+
+        Raises:
+            ValueError: Si no hay usuario activo.
+        """
+        self._validar_usuario_activo()
+        usuario_id = self.usuario_activo.idUsuario
+
+        def _calcular():
+            session = Session()
+            try:
+                resumen = session.get(ResumenUsuario, usuario_id)
+                if resumen is not None:
+                    session.expunge(resumen)
+                return resumen
+            finally:
+                session.close()
+
+        return self._resultado_cacheado(usuario_id, ("resumen_usuario",), _calcular)
+
+    def agenda(self, horizonte: int = 30, limite: int = 20,
+               hoy: Optional[date] = None) -> Agenda:
+        """
+        HU-004 (auxiliar): Tareas pendientes vencidas, de hoy, de esta
+        semana y posteriores (hasta `horizonte` días).
+
+        Se resuelve con una sola consulta (ver _consulta_agenda) que
+        recorre el índice parcial ix_tareas_pendientes_entrega. Con
+        proyección activa se resuelve en memoria. Las ocurrencias de las
+        recurrencias se generan hasta el horizonte.
+
+        Args:
+            horizonte (int):      Días hacia adelante que abarca la agenda.
+            limite    (int):      Máximo de tareas por grupo.
+            hoy       (Optional[date]): Fecha de referencia (por defecto,
+                                        la fecha actual).
+
+        Returns:
+            Agenda: Grupos vencidas, hoy, semana y despues.
+
+        Raises:
+            ValueError: Si no hay usuario activo, si horizonte es negativo
+                        o si limite es menor que 1.
+        """
+        self._validar_usuario_activo()
+        if not isinstance(horizonte, int) or horizonte < 0:
+            raise ValueError("El horizonte debe ser un número de días no negativo")
+        if not isinstance(limite, int) or limite < 1:
+            raise ValueError("El límite debe ser un entero positivo")
+        hoy = hoy or date.today()
+        fin = hoy + timedelta(days=horizonte)
+        self._materializar_hasta(fin)
+        fin_semana = min(hoy + timedelta(days=6), fin)
+        # (desde, hasta) de cada grupo, ambos inclusive; None = sin cota
+        rangos = [(None, hoy - timedelta(days=1)), (hoy, hoy),
+                  (hoy + timedelta(days=1), fin_semana),
+                  (fin_semana + timedelta(days=1), fin)]
+
+        def _calcular():
+            proyeccion = self._proyeccion_vigente()
+            if proyeccion is not None:
+                return Agenda(*(
+                    tuple(proyeccion.listar(estado=EstadoTarea.Pendiente,
+                                            desde=desde, hasta=hasta)[:limite])
+                    if desde is None or desde <= hasta else ()
+                    for desde, hasta in rangos))
+            parametros = {"usuario_id": self.usuario_activo.idUsuario, "limite": limite}
+            for grupo, (desde, hasta) in enumerate(rangos):
+                parametros[f"hasta_{grupo}"] = hasta
+                if desde is not None:
+                    parametros[f"desde_{grupo}"] = desde
+            grupos = ([], [], [], [])
+            session = Session()
+            try:
+                for grupo, *columnas in session.execute(_consulta_agenda(), parametros):
+                    grupos[grupo].append(TareaVista(*columnas))
+            finally:
+                session.close()
+            return Agenda(*(tuple(g) for g in grupos))
+
+        clave = ("agenda", hoy, horizonte, limite)
+        resultado = self._resultado_cacheado(
+            self.usuario_activo.idUsuario, clave, _calcular)
+        return Agenda(*(list(g) for g in resultado))
+
+    def siguientes(self, n: int = 10, hoy: Optional[date] = None) -> list:
+        """
+        HU-004 (auxiliar): Las n tareas pendientes del usuario activo en
+        las que conviene trabajar primero.
+
+        Se ordenan por un puntaje que combina la prioridad con los días
+        que faltan para empezarlas (la entrega menos el esfuerzo estimado;
+        ver src.logic.ranking). Se resuelve con una consulta de a lo sumo
+        3n filas sobre el índice parcial ix_tareas_pendientes_inicio,
+        cualquiera sea la cantidad de tareas. El resultado se guarda en
+        cache_resultados por día: se recalcula cuando cambian las tareas
+        del usuario y al cambiar la fecha.
+
+        Args:
+            n   (int):            Cantidad máxima de tareas.
+            hoy (Optional[date]): Fecha de referencia (por defecto, la
+                                  fecha actual).
+
+        Returns:
+            list[Sugerencia]: De mayor a menor puntaje; a igual puntaje,
+                              por fecha de entrega e ID.
+
+        Raises:
+            ValueError: Si no hay usuario activo o n es menor que 1.
+        """
+        self._validar_usuario_activo()
+        if not isinstance(n, int) or isinstance(n, bool) or n < 1:
+            raise ValueError("La cantidad debe ser un entero positivo")
+        hoy = hoy or date.today()
+        usuario_id = self.usuario_activo.idUsuario
+
+        def _calcular():
+            session = Session()
+            try:
+                filas = session.execute(consulta_candidatas(),
+                                        {"usuario_id": usuario_id, "limite": n})
+                return tuple(mejores(filas, n, hoy))
+            finally:
+                session.close()
+
+        return list(self._resultado_cacheado(usuario_id, ("siguientes", hoy, n), _calcular))
+
+    def _filtrar_tareas(self, consulta, materia_id, estado, prioridad):
+        """Restringe una consulta sobre Tarea al usuario activo y a los filtros."""
+        consulta = consulta.join(Materia).filter(
+            Materia.usuario_id == self.usuario_activo.idUsuario)
+        if materia_id is not None:
+            consulta = consulta.filter(Tarea.materia_id == materia_id)
+        if estado is not None:
+            consulta = consulta.filter(Tarea.estado == estado)
+        if prioridad is not None:
+            consulta = consulta.filter(Tarea.prioridad == prioridad)
+        return consulta
 
     def buscar_usuario_por_correo(self, correo):
         """
@@ -517,6 +1367,8 @@ class TaskManager:
 
         Verifica que haya usuario activo, que la tarea exista, que pertenezca
         al usuario activo y que el nuevo estado sea diferente al actual.
+        Al completar una ocurrencia de una recurrencia, en la misma
+        transacción se genera la siguiente.
 
         Args:
             tarea_id     (int):         ID de la tarea a modificar.
@@ -530,16 +1382,17 @@ class TaskManager:
                         pertenece a otro usuario, o ya tiene el estado indicado.
         """
         self._validar_usuario_activo()
+        usuario_id = self.usuario_activo.idUsuario
 
-        session = Session()
-        try:
-            tarea = session.query(Tarea).filter_by(idTarea=tarea_id).first()
+        def _op(session):
+            tarea = session.query(Tarea).options(undefer(Tarea.descripcion)) \
+                .filter_by(idTarea=tarea_id).first()
             if not tarea:
                 raise ValueError("La tarea no existe")
 
             materia = session.query(Materia).filter_by(
                 idMateria=tarea.materia_id).first()
-            if materia.usuario_id != self.usuario_activo.idUsuario:
+            if materia.usuario_id != usuario_id:
                 raise ValueError(
                     "No puede modificar una tarea de otro usuario")
 
@@ -550,16 +1403,13 @@ class TaskManager:
                     raise ValueError("La tarea ya está pendiente")
 
             tarea.estado = nuevo_estado
-            session.commit()
-            session.refresh(tarea)
-            session.expunge(tarea)
+            if nuevo_estado == EstadoTarea.Completada:
+                self._reponer_ocurrencias(session, tarea.recurrencia_id)
             return tarea
 
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+        tarea = self._ejecutar_escritura(_op)
+        self._invalidar(("tarea", tarea_id))
+        return tarea
 
     def marcar_tarea(self, tarea_id: int) -> Tarea:
         """
@@ -601,7 +1451,8 @@ class TaskManager:
         self,
         id_usuario: int,
         nuevo_nombre: Optional[str] = None,
-        nuevo_correo: Optional[str] = None
+        nuevo_correo: Optional[str] = None,
+        version_esperada: Optional[int] = None
     ) -> Usuario:
         """
         HU-006: Edita los datos del usuario activo.
@@ -613,11 +1464,14 @@ class TaskManager:
             id_usuario    (int):           ID del usuario a editar (debe ser el activo).
             nuevo_nombre  (Optional[str]): Nuevo nombre. Si es None, no se modifica.
             nuevo_correo  (Optional[str]): Nuevo correo. Si es None, no se modifica.
+            version_esperada (Optional[int]): Versión leída por el llamador.
+                              Si es None, no se verifica.
 
         Returns:
             Usuario: Objeto Usuario actualizado. También actualiza usuario_activo.
 
         Raises:
+            ConflictoVersionError: Si el usuario cambió desde version_esperada.
             ValueError: Si:
                 - No hay usuario activo.
                 - Se intenta editar un usuario distinto al activo.
@@ -634,12 +1488,12 @@ class TaskManager:
         if nuevo_correo is not None:
             nuevo_correo = self._validar_correo(nuevo_correo)
 
-        session = Session()
-        try:
+        def _op(session):
             usuario = session.query(Usuario).filter_by(
                 idUsuario=id_usuario).first()
             if not usuario:
                 raise ValueError("El usuario no existe")
+            self._verificar_version(usuario, version_esperada, "El usuario")
 
             if nuevo_nombre is not None:
                 usuario.nombre = nuevo_nombre
@@ -655,21 +1509,16 @@ class TaskManager:
                         f"El correo '{nuevo_correo}' ya está registrado")
                 usuario.correo = nuevo_correo
 
-            session.commit()
-            session.refresh(usuario)
-            session.expunge(usuario)
-            # Actualizar referencia en memoria
-            self.usuario_activo = usuario
+            try:
+                session.flush()
+            except IntegrityError:
+                raise ValueError("El correo ya está registrado")
             return usuario
 
-        except IntegrityError:
-            session.rollback()
-            raise ValueError("El correo ya está registrado")
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+        usuario = self._ejecutar_escritura(_op)
+        # Actualizar referencia en memoria
+        self.usuario_activo = usuario
+        return usuario
 
     # ──────────────────────────────────────────────────────────────
     # HU-007: Eliminar Usuario
@@ -705,8 +1554,7 @@ class TaskManager:
         if id_usuario != self.usuario_activo.idUsuario:
             raise ValueError("Solo puede eliminar su propio usuario")
 
-        session = Session()
-        try:
+        def _op(session):
             usuario = session.query(Usuario).filter_by(
                 idUsuario=id_usuario).first()
             if not usuario:
@@ -718,15 +1566,13 @@ class TaskManager:
                     "Debe eliminar primero todas las materias del usuario")
 
             session.delete(usuario)
-            session.commit()
-            self.usuario_activo = None  # Limpiar sesión activa
             return True
 
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+        resultado = self._ejecutar_escritura(_op)
+        self._invalidar(("materias", id_usuario))
+        self.usuario_activo = None  # Limpiar sesión activa
+        self._cerrar_proyeccion()
+        return resultado
 
     # ──────────────────────────────────────────────────────────────
     # HU-008: Editar Materia
@@ -736,7 +1582,8 @@ class TaskManager:
         self,
         id_materia: int,
         nuevo_nombre: Optional[str] = None,
-        nuevo_color: Optional[str] = None
+        nuevo_color: Optional[str] = None,
+        version_esperada: Optional[int] = None
     ) -> Materia:
         """
         HU-008: Edita una materia del usuario activo.
@@ -748,11 +1595,14 @@ class TaskManager:
             id_materia   (int):           ID de la materia a editar.
             nuevo_nombre (Optional[str]): Nuevo nombre. Si es None, no se modifica.
             nuevo_color  (Optional[str]): Nuevo color HEX. Si es None, no se modifica.
+            version_esperada (Optional[int]): Versión leída por el llamador.
+                             Si es None, no se verifica.
 
         Returns:
             Materia: Objeto Materia actualizado.
 
         Raises:
+            ConflictoVersionError: Si la materia cambió desde version_esperada.
             ValueError: Si:
                 - No hay usuario activo.
                 - La materia no existe o pertenece a otro usuario.
@@ -766,20 +1616,22 @@ class TaskManager:
         if nuevo_color is not None:
             self._validar_color_hex(nuevo_color)
 
-        session = Session()
-        try:
+        usuario_id = self.usuario_activo.idUsuario
+
+        def _op(session):
             materia = session.query(Materia).filter_by(
                 idMateria=id_materia).first()
             if not materia:
                 raise ValueError("La materia no existe")
-            if materia.usuario_id != self.usuario_activo.idUsuario:
+            if materia.usuario_id != usuario_id:
                 raise ValueError("No puede editar una materia de otro usuario")
+            self._verificar_version(materia, version_esperada, "La materia")
 
             if nuevo_nombre is not None:
                 # Verificar que el nuevo nombre no esté duplicado para este usuario
                 duplicado = session.query(Materia).filter(
                     Materia.nombre == nuevo_nombre,
-                    Materia.usuario_id == self.usuario_activo.idUsuario,
+                    Materia.usuario_id == usuario_id,
                     Materia.idMateria != id_materia
                 ).first()
                 if duplicado:
@@ -790,16 +1642,11 @@ class TaskManager:
             if nuevo_color is not None:
                 materia.color = nuevo_color
 
-            session.commit()
-            session.refresh(materia)
-            session.expunge(materia)
             return materia
 
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+        materia = self._ejecutar_escritura(_op)
+        self._invalidar(("materia", id_materia), ("materias", usuario_id))
+        return materia
 
     # ──────────────────────────────────────────────────────────────
     # HU-009: Editar Tarea
@@ -812,7 +1659,9 @@ class TaskManager:
         nueva_descripcion: Optional[str] = None,
         nueva_prioridad: Optional[Prioridad] = None,
         nueva_fecha_entrega: Optional[date] = None,
-        nueva_materia_id: Optional[int] = None
+        nueva_materia_id: Optional[int] = None,
+        version_esperada: Optional[int] = None,
+        nuevo_esfuerzo: Optional[int] = None
     ) -> Tarea:
         """
         HU-009: Edita una tarea del usuario activo.
@@ -828,11 +1677,16 @@ class TaskManager:
             nueva_prioridad     (Optional[Prioridad]): Nueva prioridad. None = sin cambio.
             nueva_fecha_entrega (Optional[date]):   Nueva fecha (no pasada). None = sin cambio.
             nueva_materia_id    (Optional[int]):    ID de nueva materia. None = sin cambio.
+            version_esperada    (Optional[int]):    Versión leída por el llamador.
+                                                    None = sin verificación.
+            nuevo_esfuerzo      (Optional[int]):    Horas estimadas (0 = quitar la
+                                                    estimación). None = sin cambio.
 
         Returns:
             Tarea: Objeto Tarea actualizado. El estado no se modifica.
 
         Raises:
+            ConflictoVersionError: Si la tarea cambió desde version_esperada.
             ValueError: Si:
                 - No hay usuario activo.
                 - La tarea no existe o pertenece a otro usuario.
@@ -840,6 +1694,7 @@ class TaskManager:
                 - La nueva descripción supera 500 caracteres.
                 - La nueva fecha es pasada o inválida.
                 - La nueva prioridad no es instancia de Prioridad.
+                - El nuevo esfuerzo no es un entero de 0 a MAX_ESFUERZO_HORAS.
                 - La nueva materia no existe o pertenece a otro usuario.
         """
         self._validar_usuario_activo()
@@ -862,23 +1717,30 @@ class TaskManager:
             raise ValueError(
                 "La prioridad debe ser una instancia de Prioridad (Baja, Media o Alta)")
 
-        session = Session()
-        try:
-            tarea = session.query(Tarea).filter_by(idTarea=id_tarea).first()
+        cambiar_esfuerzo = nuevo_esfuerzo is not None
+        if cambiar_esfuerzo:
+            nuevo_esfuerzo = self._validar_esfuerzo(nuevo_esfuerzo)
+
+        usuario_id = self.usuario_activo.idUsuario
+
+        def _op(session):
+            tarea = session.query(Tarea).options(undefer(Tarea.descripcion)) \
+                .filter_by(idTarea=id_tarea).first()
             if not tarea:
                 raise ValueError("La tarea no existe")
 
             materia_actual = session.query(Materia).filter_by(
                 idMateria=tarea.materia_id).first()
-            if materia_actual.usuario_id != self.usuario_activo.idUsuario:
+            if materia_actual.usuario_id != usuario_id:
                 raise ValueError("No puede editar una tarea de otro usuario")
+            self._verificar_version(tarea, version_esperada, "La tarea")
 
             if nueva_materia_id is not None:
                 nueva_materia = session.query(Materia).filter_by(
                     idMateria=nueva_materia_id).first()
                 if not nueva_materia:
                     raise ValueError("La nueva materia no existe")
-                if nueva_materia.usuario_id != self.usuario_activo.idUsuario:
+                if nueva_materia.usuario_id != usuario_id:
                     raise ValueError(
                         "No puede mover una tarea a una materia de otro usuario")
                 tarea.materia_id = nueva_materia_id
@@ -891,17 +1753,14 @@ class TaskManager:
                 tarea.prioridad = nueva_prioridad
             if nueva_fecha_entrega is not None:
                 tarea.fechaEntrega = nueva_fecha_entrega
+            if cambiar_esfuerzo:
+                tarea.esfuerzo = nuevo_esfuerzo
 
-            session.commit()
-            session.refresh(tarea)
-            session.expunge(tarea)
             return tarea
 
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+        tarea = self._ejecutar_escritura(_op)
+        self._invalidar(("tarea", id_tarea))
+        return tarea
 
     # ──────────────────────────────────────────────────────────────
     # HU-010: Eliminar Materia
@@ -920,15 +1779,17 @@ class TaskManager:
         Returns:
             Optional[Materia]: La materia encontrada, o None si no existe.
         """
-        session = Session()
-        try:
-            materia = session.query(Materia).filter_by(
-                idMateria=materia_id).first()
-            if materia:
-                session.expunge(materia)
-            return materia
-        finally:
-            session.close()
+        def _consulta():
+            session = Session()
+            try:
+                materia = session.get(Materia, materia_id)
+                if materia:
+                    session.expunge(materia)
+                return materia
+            finally:
+                session.close()
+
+        return self._leer_cacheado(("materia", materia_id), _consulta)
 
     def eliminar_materia(self, materia_id: int) -> bool:
         """
@@ -949,27 +1810,28 @@ class TaskManager:
                         o pertenece a otro usuario.
         """
         self._validar_usuario_activo()
+        usuario_id = self.usuario_activo.idUsuario
 
-        session = Session()
-        try:
+        def _op(session):
             materia = session.query(Materia).filter_by(
                 idMateria=materia_id).first()
             if not materia:
                 raise ValueError("La materia no existe")
-            if materia.usuario_id != self.usuario_activo.idUsuario:
+            if materia.usuario_id != usuario_id:
                 raise ValueError(
                     "No puede eliminar una materia de otro usuario")
 
             # cascade="all, delete-orphan" elimina las tareas automáticamente
             session.delete(materia)
-            session.commit()
             return True
 
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+        resultado = self._ejecutar_escritura(_op)
+        self._invalidar(("materia", materia_id), ("materias", usuario_id))
+        if self.cache is not None:
+            self.cache.invalidar_si(
+                lambda clave, valor: clave[0] == "tarea"
+                and valor.materia_id == materia_id)
+        return resultado
 
     # ──────────────────────────────────────────────────────────────
     # HU-011: Eliminar Tarea
@@ -980,28 +1842,36 @@ class TaskManager:
         HU-011 (auxiliar): Retorna una tarea por su ID.
 
         Método de consulta simple sin restricciones de usuario activo.
-        Utilizado principalmente para verificar existencia tras eliminaciones.
+        Utilizado para verificar existencia tras eliminaciones y para
+        obtener la descripción completa (que los listados no cargan).
 
         Args:
             tarea_id (int): ID de la tarea a buscar.
 
         Returns:
-            Optional[Tarea]: La tarea encontrada, o None si no existe.
+            Optional[Tarea]: La tarea encontrada, con su descripción, o None
+                             si no existe.
         """
-        session = Session()
-        try:
-            tarea = session.query(Tarea).filter_by(idTarea=tarea_id).first()
-            if tarea:
-                session.expunge(tarea)
-            return tarea
-        finally:
-            session.close()
+        def _consulta():
+            session = Session()
+            try:
+                tarea = session.get(Tarea, tarea_id,
+                                    options=[undefer(Tarea.descripcion)])
+                if tarea:
+                    session.expunge(tarea)
+                return tarea
+            finally:
+                session.close()
+
+        return self._leer_cacheado(("tarea", tarea_id), _consulta)
 
     def eliminar_tarea(self, id_tarea: int) -> bool:
         """
         HU-011: Elimina una tarea del usuario activo.
 
-        La tarea debe pertenecer a una materia del usuario activo.
+        La tarea debe pertenecer a una materia del usuario activo. Si es
+        una ocurrencia de una recurrencia, se omite esa fecha y se genera
+        la siguiente.
 
         Args:
             id_tarea (int): ID de la tarea a eliminar.
@@ -1020,24 +1890,870 @@ class TaskManager:
             raise TypeError("El ID de la tarea debe ser un número entero")
 
         self._validar_usuario_activo()
+        usuario_id = self.usuario_activo.idUsuario
 
-        session = Session()
-        try:
+        def _op(session):
             tarea = session.query(Tarea).filter_by(idTarea=id_tarea).first()
             if not tarea:
                 raise ValueError(f"La tarea con id {id_tarea} no existe")
 
             materia = session.query(Materia).filter_by(
                 idMateria=tarea.materia_id).first()
-            if materia.usuario_id != self.usuario_activo.idUsuario:
+            if materia.usuario_id != usuario_id:
                 raise ValueError("No puede eliminar una tarea de otro usuario")
 
             session.delete(tarea)
-            session.commit()
+            if tarea.recurrencia_id is not None:
+                session.flush()
+                self._reponer_ocurrencias(session, tarea.recurrencia_id)
             return True
 
-        except Exception:
-            session.rollback()
-            raise
+        resultado = self._ejecutar_escritura(_op)
+        self._invalidar(("tarea", id_tarea))
+        return resultado
+
+    # ──────────────────────────────────────────────────────────────
+    # Tareas recurrentes
+    # ──────────────────────────────────────────────────────────────
+
+    def crear_recurrencia(
+        self,
+        titulo: str,
+        descripcion: str,
+        prioridad: Prioridad,
+        materia_id: int,
+        inicio: date,
+        cada_dias: Optional[int] = None,
+        dias_semana=None,
+        hasta: Optional[date] = None
+    ) -> Recurrencia:
+        """
+        Crea una tarea recurrente en una materia del usuario activo.
+
+        La regla es cada `cada_dias` días desde `inicio` (7 = semanal) o
+        los `dias_semana` indicados (0 = lunes … 6 = domingo), opcionalmente
+        hasta una fecha. Solo se crean las primeras ocurrencias_adelantadas
+        tareas, en la misma transacción que la regla; las siguientes se
+        generan al completar o eliminar una ocurrencia y al listar un rango
+        de fechas (ver src.logic.recurrencias).
+
+        Args:
+            titulo      (str):       Título de cada ocurrencia (mín. 3, máx. 100).
+            descripcion (str):       Descripción opcional (máx. 500 caracteres).
+            prioridad   (Prioridad): Prioridad de cada ocurrencia.
+            materia_id  (int):       Materia del usuario activo.
+            inicio      (date):      Primera fecha posible (no puede ser pasada).
+            cada_dias   (Optional[int]): Días entre ocurrencias (>= 1).
+            dias_semana (Optional[Iterable[int]]): Días de la semana.
+            hasta       (Optional[date]): Última fecha posible (>= inicio).
+
+        Returns:
+            Recurrencia: La regla creada.
+
+        Raises:
+            ValueError: Si no hay usuario activo, algún dato es inválido, se
+                        indica cada_dias y dias_semana a la vez (o ninguno),
+                        o la materia no existe o es de otro usuario.
+        """
+        self._validar_usuario_activo()
+        titulo = self._validar_titulo_tarea(titulo)
+        if descripcion and len(descripcion) > 500:
+            raise ValueError(
+                "La descripción es muy larga (máximo 500 caracteres)")
+        if not isinstance(prioridad, Prioridad):
+            raise ValueError(
+                "La prioridad debe ser una instancia de Prioridad (Baja, Media o Alta)")
+        if not isinstance(inicio, date):
+            raise ValueError("La fecha de inicio es inválida")
+        if inicio < date.today():
+            raise ValueError("La fecha de inicio no puede ser en el pasado")
+        if hasta is not None and (not isinstance(hasta, date) or hasta < inicio):
+            raise ValueError("La fecha final debe ser igual o posterior al inicio")
+        if (cada_dias is None) == (dias_semana is None):
+            raise ValueError("Indique cada cuántos días o qué días de la semana")
+        if cada_dias is not None and (not isinstance(cada_dias, int)
+                                      or isinstance(cada_dias, bool) or cada_dias < 1):
+            raise ValueError("La cantidad de días debe ser un entero positivo")
+        mascara = mascara_dias(dias_semana) if dias_semana is not None else None
+
+        usuario_id = self.usuario_activo.idUsuario
+
+        def _op(session):
+            materia = session.query(Materia).filter_by(
+                idMateria=materia_id).first()
+            if not materia:
+                raise ValueError("La materia no existe")
+            if materia.usuario_id != usuario_id:
+                raise ValueError(
+                    "No puede crear una tarea en una materia de otro usuario")
+
+            regla = Recurrencia(
+                titulo=titulo,
+                descripcion=descripcion,
+                prioridad=prioridad,
+                materia_id=materia_id,
+                inicio=inicio,
+                cada_dias=cada_dias,
+                dias_semana=mascara,
+                hasta=hasta,
+                siguiente=inicio
+            )
+            session.add(regla)
+            session.flush()
+            materializar(session, regla, self.ocurrencias_adelantadas)
+            return regla
+
+        return self._ejecutar_escritura(_op)
+
+    def listar_recurrencias(self, materia_id: Optional[int] = None) -> list:
+        """
+        Retorna las recurrencias del usuario activo.
+
+        Args:
+            materia_id (Optional[int]): Solo las de esa materia.
+
+        Returns:
+            list[Recurrencia]: Recurrencias ordenadas por ID.
+
+        Raises:
+            ValueError: Si no hay usuario activo.
+        """
+        self._validar_usuario_activo()
+        session = Session()
+        try:
+            consulta = session.query(Recurrencia).join(Materia).filter(
+                Materia.usuario_id == self.usuario_activo.idUsuario)
+            if materia_id is not None:
+                consulta = consulta.filter(Recurrencia.materia_id == materia_id)
+            recurrencias = consulta.order_by(Recurrencia.idRecurrencia).all()
+            session.expunge_all()
+            return recurrencias
+        finally:
+            session.close()
+
+    def eliminar_recurrencia(self, recurrencia_id: int,
+                             conservar_pendientes: bool = False) -> bool:
+        """
+        Elimina una recurrencia del usuario activo.
+
+        Las ocurrencias completadas se conservan como tareas sueltas; las
+        pendientes se eliminan, salvo que se pida conservarlas.
+
+        Args:
+            recurrencia_id (int): ID de la recurrencia.
+            conservar_pendientes (bool): Si es True, las pendientes también
+                                         quedan como tareas sueltas.
+
+        Returns:
+            bool: True si la eliminación fue exitosa.
+
+        Raises:
+            ValueError: Si no hay usuario activo, la recurrencia no existe
+                        o pertenece a otro usuario.
+        """
+        self._validar_usuario_activo()
+        usuario_id = self.usuario_activo.idUsuario
+
+        def _op(session):
+            regla = session.get(Recurrencia, recurrencia_id)
+            if not regla:
+                raise ValueError("La recurrencia no existe")
+            if regla.materia.usuario_id != usuario_id:
+                raise ValueError(
+                    "No puede eliminar una recurrencia de otro usuario")
+
+            for tarea in session.query(Tarea).filter_by(recurrencia_id=recurrencia_id):
+                if tarea.estado == EstadoTarea.Pendiente and not conservar_pendientes:
+                    session.delete(tarea)
+                else:
+                    tarea.recurrencia_id = None
+            session.delete(regla)
+            return True
+
+        resultado = self._ejecutar_escritura(_op)
+        if self.cache is not None:
+            self.cache.invalidar_si(
+                lambda clave, valor: clave[0] == "tarea"
+                and valor.recurrencia_id == recurrencia_id)
+        return resultado
+
+    def _reponer_ocurrencias(self, session, recurrencia_id: Optional[int]):
+        """Genera las ocurrencias que falten de una recurrencia (si la hay)."""
+        if recurrencia_id is None:
+            return
+        regla = session.get(Recurrencia, recurrencia_id)
+        if regla is not None:
+            materializar(session, regla, self.ocurrencias_adelantadas)
+
+    def _materializar_hasta(self, hasta: date):
+        """
+        Genera, en una sola transacción, las ocurrencias de las recurrencias
+        del usuario activo con fechas pendientes de generar hasta `hasta`.
+
+        Si ninguna lo necesita cuesta una consulta sobre recurrencias.
+        """
+        if hasta < date.today():
+            return
+        session = Session()
+        try:
+            ids = [r for (r,) in session.query(Recurrencia.idRecurrencia)
+                   .join(Materia)
+                   .filter(Materia.usuario_id == self.usuario_activo.idUsuario,
+                           Recurrencia.siguiente <= hasta)]
         finally:
             session.close()
+        if not ids:
+            return
+
+        def _op(session):
+            for regla in session.query(Recurrencia).filter(
+                    Recurrencia.idRecurrencia.in_(ids)):
+                materializar(session, regla, self.ocurrencias_adelantadas, hasta=hasta)
+
+        self._ejecutar_escritura(_op)
+
+    # ──────────────────────────────────────────────────────────────
+    # Importación
+    # ──────────────────────────────────────────────────────────────
+
+    def importar(self, archivo, formato: Optional[str] = None,
+                 tamano_lote: int = TAMANO_LOTE_IMPORTACION,
+                 max_errores: int = 1000) -> ResultadoImportacion:
+        """
+        Importa materias y tareas desde un archivo CSV o JSONL (ver
+        src.logic.importacion) para el usuario activo.
+
+        El archivo se lee en streaming. Cada registro se valida con las
+        mismas reglas que crear_materia y crear_tarea; los inválidos se
+        informan con su número de línea y no detienen la importación. Los
+        válidos se escriben en transacciones de `tamano_lote` registros,
+        por lo que la memoria no depende del tamaño del archivo. Si un
+        lote falla al escribirse (p. ej., otra ventana creó una materia
+        con el mismo nombre), sus registros se informan como errores.
+
+        Args:
+            archivo: Ruta (.csv, .jsonl o .ndjson, opcionalmente .gz) o
+                     archivo de texto ya abierto.
+            formato (Optional[str]): "csv" o "jsonl"; por defecto se
+                                     deduce de la extensión.
+            tamano_lote (int): Registros válidos por transacción.
+            max_errores (int): Errores que se conservan en el resultado
+                               (el total siempre se cuenta).
+
+        Returns:
+            ResultadoImportacion: Registros leídos, materias y tareas
+                                  creadas, errores y duración.
+
+        Raises:
+            ValueError: Si no hay usuario activo, el formato es
+                        desconocido o tamano_lote es menor que 1.
+        """
+        self._validar_usuario_activo()
+        if not isinstance(tamano_lote, int) or tamano_lote < 1:
+            raise ValueError("El tamaño de lote debe ser un entero positivo")
+        if isinstance(archivo, (str, os.PathLike)):
+            formato = formato or detectar_formato(archivo)
+            if formato not in FORMATOS:
+                raise ValueError(f"Formato desconocido: {formato} (use csv o jsonl)")
+            with abrir_texto(archivo) as abierto:
+                return self.importar(abierto, formato, tamano_lote, max_errores)
+        if formato not in FORMATOS:
+            raise ValueError("Indique el formato del archivo (csv o jsonl)")
+
+        inicio = time.perf_counter()
+        usuario_id = self.usuario_activo.idUsuario
+        hoy = date.today()
+        # Nombre → ID de las materias del usuario; None mientras la materia
+        # espera en el lote actual. Cada entrada del lote es
+        # (tipo, línea, nombre de la materia de la tarea, campos).
+        materias = {m.nombre: m.idMateria for m in self.listar_materias()}
+        lote = []
+        errores = []
+        cuenta = {"registros": 0, "errores": 0, "materias": 0, "tareas": 0}
+
+        def _rechazar(linea: int, mensaje: str):
+            cuenta["errores"] += 1
+            if len(errores) < max_errores:
+                errores.append(ErrorImportacion(linea, mensaje))
+
+        def _escribir():
+            if not lote:
+                return
+
+            def _op(session):
+                nuevas = [Materia(usuario_id=usuario_id, **datos)
+                          for tipo, _, _, datos in lote if tipo == "materia"]
+                if nuevas:
+                    session.add_all(nuevas)
+                    session.flush()
+                ids = {m.nombre: m.idMateria for m in nuevas}
+                # Las tareas se insertan en bloque (una instancia ORM por
+                # fila costaría un INSERT por fila) y se anotan para la
+                # proyección y los recordatorios
+                filas = [dict(datos, materia_id=ids.get(materia) or materias[materia],
+                              estado=EstadoTarea.Pendiente, version=1)
+                         for tipo, _, materia, datos in lote if tipo == "tarea"]
+                if filas:
+                    anotar_tareas(session, [TareaVista(*fila) for fila in session.execute(
+                        insert(Tarea.__table__).returning(*columnas_vista()), filas)])
+                return ids, len(filas)
+
+            try:
+                ids, tareas = self._ejecutar_escritura(_op)
+            except (ValueError, SQLAlchemyError) as ex:
+                for tipo, linea, _, datos in lote:
+                    if tipo == "materia":
+                        materias.pop(datos["nombre"], None)
+                    _rechazar(linea, f"No se pudo guardar: {ex}")
+            else:
+                materias.update(ids)
+                cuenta["materias"] += len(ids)
+                cuenta["tareas"] += tareas
+            lote.clear()
+
+        for linea, registro in leer_registros(archivo, formato):
+            cuenta["registros"] += 1
+            try:
+                if isinstance(registro, Exception):
+                    raise registro
+                tipo = registro.get("tipo")
+                if tipo == "materia":
+                    datos = self._registro_materia(registro, materias)
+                    materias[datos["nombre"]] = None
+                    lote.append(("materia", linea, None, datos))
+                elif tipo == "tarea":
+                    lote.append(("tarea", linea,
+                                  *self._registro_tarea(registro, materias, hoy)))
+                else:
+                    raise ValueError("El tipo de registro debe ser 'materia' o 'tarea'")
+            except ValueError as ex:
+                _rechazar(linea, str(ex))
+            if len(lote) >= tamano_lote:
+                _escribir()
+        _escribir()
+
+        if cuenta["materias"]:
+            self._invalidar(("materias", usuario_id))
+        errores.sort()
+        return ResultadoImportacion(cuenta["registros"], cuenta["materias"],
+                                    cuenta["tareas"], errores, cuenta["errores"],
+                                    time.perf_counter() - inicio)
+
+    def _registro_materia(self, registro: dict, materias: dict) -> dict:
+        """Valida un registro de materia; retorna los campos de Materia."""
+        nombre = self._validar_nombre_materia(campo_texto(registro, "nombre"))
+        color = campo_texto(registro, "color").strip()
+        self._validar_color_hex(color)
+        if nombre in materias:
+            raise ValueError(f"Ya existe una materia llamada '{nombre}' para este usuario")
+        return {"nombre": nombre, "color": color}
+
+    def _registro_tarea(self, registro: dict, materias: dict, hoy: date) -> tuple:
+        """
+        Valida un registro de tarea; retorna (nombre de la materia, campos
+        de Tarea).
+        """
+        titulo = self._validar_titulo_tarea(campo_texto(registro, "titulo"))
+        descripcion = campo_texto(registro, "descripcion", "")
+        if len(descripcion) > 500:
+            raise ValueError("La descripción es muy larga (máximo 500 caracteres)")
+        try:
+            prioridad = Prioridad[campo_texto(registro, "prioridad").strip().capitalize()]
+        except KeyError:
+            raise ValueError("La prioridad debe ser Baja, Media o Alta") from None
+        fecha_entrega = campo_texto(registro, "fecha_entrega").strip()
+        try:
+            fecha_entrega = date.fromisoformat(fecha_entrega)
+        except ValueError:
+            raise ValueError("La fecha de entrega es inválida (use AAAA-MM-DD)") from None
+        if fecha_entrega < hoy:
+            raise ValueError("La fecha de entrega no puede ser en el pasado")
+        materia = campo_texto(registro, "materia").strip()
+        if materia not in materias:
+            raise ValueError(f"La materia '{materia}' no existe")
+        esfuerzo = registro.get("esfuerzo")
+        if isinstance(esfuerzo, str):
+            try:
+                esfuerzo = int(esfuerzo)
+            except ValueError:
+                raise ValueError("El esfuerzo debe ser un número entero de horas") from None
+        if esfuerzo is not None:
+            esfuerzo = self._validar_esfuerzo(esfuerzo)
+        return materia, {"titulo": titulo, "descripcion": descripcion,
+                         "prioridad": prioridad, "fechaEntrega": fecha_entrega,
+                         "esfuerzo": esfuerzo}
+
+    # ──────────────────────────────────────────────────────────────
+    # Exportación
+    # ──────────────────────────────────────────────────────────────
+
+    def exportar(self, destino, formato: Optional[str] = None,
+                 desde_id: Optional[int] = None,
+                 hasta_id: Optional[int] = None) -> ResultadoExportacion:
+        """
+        Exporta las materias y tareas del usuario activo a un archivo CSV
+        o JSONL (ver src.logic.exportacion).
+
+        Las filas se leen con un cursor del lado del servidor, de a
+        FILAS_POR_LECTURA_EXPORTACION, y se escriben a medida que llegan,
+        por lo que la memoria no depende de la cantidad de tareas. Toda la
+        exportación lee una misma instantánea de la base de datos.
+
+        Las tareas se escriben en orden de ID. Con desde_id y hasta_id se
+        exporta solo un rango, en archivos independientes: para continuar
+        una exportación interrumpida se exporta a otro archivo con
+        desde_id igual al último `id` escrito (o a ultimo_id del
+        resultado). Las materias se escriben solo en el primer tramo (sin
+        desde_id); importar los tramos en orden recrea todo.
+
+        Args:
+            destino: Ruta (.csv, .jsonl o .ndjson, opcionalmente .gz) o
+                     archivo de texto ya abierto para escritura.
+            formato  (Optional[str]): "csv" o "jsonl"; por defecto se
+                                      deduce de la extensión.
+            desde_id (Optional[int]): Exporta las tareas con ID mayor.
+            hasta_id (Optional[int]): Exporta las tareas con ID menor o
+                                      igual.
+
+        Returns:
+            ResultadoExportacion: Materias y tareas escritas, ID de la
+                                  última tarea y duración.
+
+        Raises:
+            ValueError: Si no hay usuario activo, el formato es
+                        desconocido o el rango de IDs es inválido.
+        """
+        self._validar_usuario_activo()
+        for cota in (desde_id, hasta_id):
+            if cota is not None and (not isinstance(cota, int) or isinstance(cota, bool)
+                                     or cota < 0):
+                raise ValueError("Los IDs del rango deben ser enteros no negativos")
+        if isinstance(destino, (str, os.PathLike)):
+            formato = formato or detectar_formato(destino)
+            if formato not in FORMATOS:
+                raise ValueError(f"Formato desconocido: {formato} (use csv o jsonl)")
+            with abrir_texto(destino, "w") as abierto:
+                return self.exportar(abierto, formato, desde_id, hasta_id)
+        if formato not in FORMATOS:
+            raise ValueError("Indique el formato del archivo (csv o jsonl)")
+
+        inicio = time.perf_counter()
+        usuario_id = self.usuario_activo.idUsuario
+        escribir = escritor(destino, formato)
+        consulta_materias, consulta_tareas = _consultas_exportacion()
+        materias = tareas = 0
+        ultimo_id = None
+        with engine.connect() as conn:
+            if desde_id is None:
+                filas = conn.execute(consulta_materias, {"usuario_id": usuario_id}).all()
+                escribir(filas)
+                materias = len(filas)
+            filas = conn.execution_options(yield_per=FILAS_POR_LECTURA_EXPORTACION).execute(
+                consulta_tareas,
+                {"usuario_id": usuario_id, "desde_id": desde_id or 0,
+                 "hasta_id": _ID_MAXIMO if hasta_id is None else hasta_id})
+            for lote in filas.partitions():
+                escribir(lote)
+                tareas += len(lote)
+                ultimo_id = lote[-1][0]
+        return ResultadoExportacion(materias, tareas, ultimo_id,
+                                    time.perf_counter() - inicio)
+
+    # ──────────────────────────────────────────────────────────────
+    # Calendario (iCalendar)
+    # ──────────────────────────────────────────────────────────────
+
+    def exportar_calendario(self, destino, componente: str = "VTODO") -> ResultadoCalendario:
+        """
+        Escribe las tareas pendientes del usuario activo como calendario
+        iCalendar (ver src.logic.calendario).
+
+        Las tareas se leen con un cursor del lado del servidor y cada
+        entrada se escribe a medida que llega, por lo que la memoria no
+        depende de la cantidad de tareas. Si destino es una ruta, el
+        archivo se reemplaza recién al terminar.
+
+        Args:
+            destino: Ruta del archivo .ics o archivo de texto abierto
+                     (con newline="").
+            componente (str): "VTODO" (tareas) o "VEVENT" (eventos de día
+                              completo).
+
+        Returns:
+            ResultadoCalendario: Entradas escritas y número de cambio
+                                 reflejado.
+
+        Raises:
+            ValueError: Si no hay usuario activo o el componente es
+                        desconocido.
+        """
+        self._validar_usuario_activo()
+        if componente not in COMPONENTES:
+            raise ValueError("El componente debe ser VTODO o VEVENT")
+        if isinstance(destino, (str, os.PathLike)):
+            resultados = []
+            reemplazar_archivo(os.fspath(destino), lambda archivo: resultados.append(
+                self.exportar_calendario(archivo, componente)))
+            return resultados[0]
+
+        inicio = time.perf_counter()
+        usuario_id = self.usuario_activo.idUsuario
+        rango, todas, _, _ = consultas_calendario()
+        dtstamp = marca_de_tiempo()
+        entradas = 0
+        # Una sola transacción de lectura: el número de cambio corresponde
+        # exactamente a las tareas escritas
+        with engine.connect() as conn:
+            seq = conn.execute(rango).one()[1]
+            destino.write(cabecera(self.usuario_activo.nombre, usuario_id, componente, seq))
+            filas = conn.execution_options(yield_per=FILAS_POR_LECTURA_EXPORTACION).execute(
+                todas, {"usuario_id": usuario_id})
+            for lote in filas.partitions():
+                destino.writelines(entrada(componente, dtstamp, *fila) for fila in lote)
+                entradas += len(lote)
+        destino.write(PIE)
+        return ResultadoCalendario(entradas, entradas, True, seq,
+                                   time.perf_counter() - inicio)
+
+    def actualizar_calendario(self, ruta, componente: str = "VTODO") -> ResultadoCalendario:
+        """
+        Pone al día un archivo .ics generado por exportar_calendario.
+
+        Lee el último número de cambio reflejado en la cabecera del
+        archivo y consulta registro_cambios desde ahí. Sin cambios del
+        usuario no se toca el archivo (una consulta por clave primaria);
+        con cambios se regeneran solo las entradas de las tareas cambiadas
+        (y de las tareas de materias cambiadas) y las demás se copian del
+        archivo anterior. Se regenera todo si el archivo no existe, es de
+        otro usuario o componente, si el historial ya no llega hasta su
+        número de cambio (ver MAX_REGISTRO_CAMBIOS) o si desde entonces se
+        restauró un respaldo.
+
+        Pensado para un calendario que se refresca a menudo (p. ej., cada
+        minuto desde una tarea programada).
+
+        Args:
+            ruta: Archivo .ics.
+            componente (str): "VTODO" o "VEVENT".
+
+        Returns:
+            ResultadoCalendario: Entradas totales (None si no hubo
+                                 cambios), regeneradas y si se regeneró
+                                 todo.
+
+        Raises:
+            ValueError: Si no hay usuario activo o el componente es
+                        desconocido.
+        """
+        self._validar_usuario_activo()
+        if componente not in COMPONENTES:
+            raise ValueError("El componente debe ser VTODO o VEVENT")
+        inicio = time.perf_counter()
+        ruta = os.fspath(ruta)
+        usuario_id = self.usuario_activo.idUsuario
+        marcas = None
+        if os.path.exists(ruta):
+            with open(ruta, encoding="utf-8", newline="") as archivo:
+                marcas = leer_marcas(archivo)
+        if marcas is None or marcas[:2] != (usuario_id, componente):
+            return self.exportar_calendario(ruta, componente)
+
+        rango, _, cambiadas, consulta_cambios = consultas_calendario()
+        parametros = {"usuario_id": usuario_id, "seq": marcas[2]}
+        with engine.connect() as conn:
+            minimo, seq = conn.execute(rango).one()
+            historial_completo = seq >= marcas[2] and minimo <= marcas[2] + 1
+            if historial_completo:
+                cambios = conn.execute(consulta_cambios, parametros).all()
+                historial_completo = all(
+                    tabla != TABLA_RESTAURACION for tabla, _ in cambios)
+            if historial_completo:
+                filas = conn.execute(cambiadas, parametros).all() if cambios else []
+        if not historial_completo:
+            return self.exportar_calendario(ruta, componente)
+        if not cambios:
+            return ResultadoCalendario(None, 0, False, marcas[2],
+                                       time.perf_counter() - inicio)
+
+        dtstamp = marca_de_tiempo()
+        nuevas = {uid(fila[0]): entrada(componente, dtstamp, *fila) for fila in filas}
+        quitar = {uid(id_entidad) for tabla, id_entidad in cambios if tabla == "tareas"}
+        quitar.update(nuevas)
+        copiadas = 0
+
+        def _escribir(archivo):
+            nonlocal copiadas
+            archivo.write(cabecera(self.usuario_activo.nombre, usuario_id, componente, seq))
+            with open(ruta, encoding="utf-8", newline="") as anterior:
+                copiadas = copiar_entradas(anterior, archivo, componente, quitar)
+            archivo.writelines(nuevas.values())
+            archivo.write(PIE)
+
+        reemplazar_archivo(ruta, _escribir)
+        return ResultadoCalendario(copiadas + len(nuevas), len(nuevas), False, seq,
+                                   time.perf_counter() - inicio)
+
+    # ──────────────────────────────────────────────────────────────
+    # Instantánea binaria
+    # ──────────────────────────────────────────────────────────────
+
+    def guardar_instantanea(self, ruta) -> ResultadoInstantanea:
+        """
+        Guarda todas las materias y tareas del usuario activo en una
+        instantánea binaria (ver src.logic.instantanea), que se abre con
+        src.logic.instantanea.abrir sin pasar por el ORM.
+
+        Las filas se leen en una sola transacción, ya convertidas por
+        SQLite al formato de las columnas, y se acumulan en arreglos
+        compactos (unos 40 bytes por tarea más sus textos). El archivo se
+        reemplaza recién al terminar.
+
+        Args:
+            ruta: Archivo de la instantánea.
+
+        Returns:
+            ResultadoInstantanea: Materias y tareas guardadas, tamaño,
+                                  número de cambio reflejado y duración.
+
+        Raises:
+            ValueError: Si no hay usuario activo.
+        """
+        self._validar_usuario_activo()
+        inicio = time.perf_counter()
+        usuario_id = self.usuario_activo.idUsuario
+        consulta_seq, consulta_materias, consulta_tareas = consultas_instantanea()
+        parametros = {"usuario_id": usuario_id}
+        with engine.connect() as conn:
+            seq = conn.execute(consulta_seq).scalar()
+            columnas = columnas_materias(conn.execute(consulta_materias, parametros).all())
+            columnas.update(columnas_tareas(
+                conn.execution_options(yield_per=FILAS_POR_LECTURA_EXPORTACION)
+                .execute(consulta_tareas, parametros).partitions()))
+        tamano = guardar(ruta, usuario_id, seq, columnas)
+        return ResultadoInstantanea(len(columnas["materias.id"]), len(columnas["tareas.id"]),
+                                    tamano, seq, time.perf_counter() - inicio)
+
+    # ──────────────────────────────────────────────────────────────
+    # Archivo de tareas completadas
+    # ──────────────────────────────────────────────────────────────
+
+    def _en_transaccion(self, conexion, funcion, modo: str = ""):
+        """
+        Ejecuta funcion() entre BEGIN y COMMIT sobre una conexión sqlite3,
+        reintentando la transacción completa si la base está bloqueada.
+        """
+        def _intento():
+            conexion.execute(f"BEGIN {modo}".strip())
+            try:
+                resultado = funcion()
+                conexion.execute("COMMIT")
+                return resultado
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+
+        return self.politica_reintentos.ejecutar(_intento)
+
+    def _trasladar(self, conexion, esquema: str, parametros: dict) -> tuple:
+        """
+        Traslada las tareas de un período a un archivo adjunto (ver
+        src.logic.archivo): copia sin confirmar, borra de `tareas` las que
+        no cambiaron y confirma las borradas. Antes de copiar termina un
+        traslado anterior interrumpido (confirmando lo que quedó en el
+        archivo, para no perder nada).
+
+        Returns:
+            tuple: (trasladadas, omitidas).
+        """
+        borrar = sentencia_borrar(esquema)
+        confirmar_una, confirmar_todas, descartar = sentencias_confirmar(esquema)
+
+        def _borrar():
+            return [fila[0] for fila in conexion.execute(borrar, parametros)]
+
+        # Termina un traslado interrumpido: lo que siga en el archivo sin
+        # confirmar se conserva (aunque también esté en uso)
+        self._en_transaccion(conexion, _borrar, "IMMEDIATE")
+        self._en_transaccion(conexion, lambda: conexion.execute(confirmar_todas, parametros))
+
+        def _copiar():
+            candidatas = conexion.execute(sentencia_contar(), parametros).fetchone()[0]
+            return candidatas, conexion.execute(sentencia_copiar(esquema),
+                                                parametros).rowcount
+
+        candidatas, copiadas = self._en_transaccion(conexion, _copiar)
+        borradas = self._en_transaccion(conexion, _borrar, "IMMEDIATE")
+
+        def _confirmar():
+            conexion.executemany(confirmar_una, [(i,) for i in borradas])
+            # Las que no se borraron cambiaron mientras tanto: siguen en uso
+            conexion.execute(descartar, parametros)
+
+        self._en_transaccion(conexion, _confirmar)
+        return len(borradas), candidatas - copiadas
+
+    def archivar(self, hasta: date, ruta: str) -> ResultadoArchivo:
+        """
+        Mueve las tareas completadas del usuario activo con entrega
+        anterior a `hasta` a un archivo SQLite aparte (ver
+        src.logic.archivo), para que `tareas` y sus índices conserven solo
+        lo que está en uso. Los listados y conteos dejan de verlas; se
+        consultan con historial y se recuperan con restaurar_archivada.
+
+        Si la ruta contiene "{periodo}", cada tarea va al archivo de su
+        semestre (p. ej. "archivo/{periodo}.sqlite" → archivo/2025-1.sqlite).
+        Volver a ejecutarlo agrega las nuevas tareas a los mismos archivos.
+
+        Args:
+            hasta (date): Se archivan las entregas anteriores a esta fecha.
+            ruta  (str):  Archivo de destino, con o sin "{periodo}".
+
+        Returns:
+            ResultadoArchivo: Tareas trasladadas, archivos, omitidas y
+                              duración.
+
+        Raises:
+            ValueError: Si no hay usuario activo o `hasta` no es una fecha.
+        """
+        self._validar_usuario_activo()
+        if not isinstance(hasta, date):
+            raise ValueError("La fecha límite del archivo debe ser una fecha")
+        inicio = time.perf_counter()
+        parametros = {"usuario_id": self.usuario_activo.idUsuario,
+                      "hoy": date.today().isoformat()}
+        with engine.connect() as conn:
+            por_periodo = dict(conn.exec_driver_sql(
+                sentencia_candidatas(),
+                {**parametros, "hasta": hasta.isoformat()}).all())
+        if MARCA_PERIODO in ruta:
+            tramos = []
+            for nombre in sorted(por_periodo):
+                desde_periodo, hasta_periodo = limites_periodo(nombre)
+                tramos.append((ruta_de_periodo(ruta, nombre), desde_periodo,
+                               min(hasta, hasta_periodo)))
+        else:
+            tramos = [(ruta, date.min, hasta)] if por_periodo else []
+
+        trasladadas = omitidas = 0
+        archivos = []
+        conexion = engine.raw_connection()
+        try:
+            for destino, desde_tramo, hasta_tramo in tramos:
+                carpeta = os.path.dirname(destino)
+                if carpeta:
+                    os.makedirs(carpeta, exist_ok=True)
+                with adjuntar(conexion.driver_connection, [destino], crear=True) as esquemas:
+                    cantidad, sin_mover = self._trasladar(
+                        conexion.driver_connection, esquemas[0],
+                        {**parametros, "desde": desde_tramo.isoformat(),
+                         "hasta": hasta_tramo.isoformat()})
+                trasladadas += cantidad
+                omitidas += sin_mover
+                if cantidad:
+                    archivos.append(destino)
+        finally:
+            conexion.close()
+        return ResultadoArchivo(trasladadas, archivos, omitidas,
+                                time.perf_counter() - inicio)
+
+    def historial(self, rutas: list, desde: Optional[date] = None,
+                  hasta: Optional[date] = None) -> list:
+        """
+        Tareas del usuario activo en uso y archivadas, consultadas juntas
+        con ATTACH y la vista tareas_historicas (ver src.logic.archivo).
+
+        Args:
+            rutas (list[str]): Archivos a incluir.
+            desde (Optional[date]): Solo entregas desde esta fecha.
+            hasta (Optional[date]): Solo entregas hasta esta fecha.
+
+        Returns:
+            list[FilaHistorial]: Tareas ordenadas por fecha de entrega.
+
+        Raises:
+            ValueError: Si no hay usuario activo o un archivo no existe o no
+                        es un archivo de tareas.
+        """
+        self._validar_usuario_activo()
+        if isinstance(rutas, str):
+            rutas = [rutas]
+        condiciones = ["usuario_id = :usuario_id"]
+        parametros = {"usuario_id": self.usuario_activo.idUsuario}
+        if desde is not None:
+            condiciones.append('"fechaEntrega" >= :desde')
+            parametros["desde"] = desde.isoformat()
+        if hasta is not None:
+            condiciones.append('"fechaEntrega" <= :hasta')
+            parametros["hasta"] = hasta.isoformat()
+        conexion = engine.raw_connection()
+        try:
+            db = conexion.driver_connection
+            with adjuntar(db, rutas, vista=True):
+                filas = db.execute(
+                    'SELECT "idTarea", titulo, prioridad, "fechaEntrega", estado, '
+                    f'materia_id, materia, archivada FROM {VISTA_HISTORIAL} '
+                    f'WHERE {" AND ".join(condiciones)} '
+                    'ORDER BY "fechaEntrega", "idTarea"', parametros).fetchall()
+        finally:
+            conexion.close()
+        return [fila_historial(fila) for fila in filas]
+
+    def restaurar_archivada(self, ruta: str, id_tarea: int) -> Tarea:
+        """
+        Devuelve una tarea archivada a `tareas` y la quita del archivo.
+
+        Conserva su ID si sigue libre (si no, recibe uno nuevo) y vuelve a
+        su materia, que debe seguir existiendo.
+
+        Args:
+            ruta     (str): Archivo donde está la tarea.
+            id_tarea (int): ID de la tarea archivada.
+
+        Returns:
+            Tarea: La tarea restaurada.
+
+        Raises:
+            TypeError:  Si id_tarea no es un entero.
+            ValueError: Si no hay usuario activo, el archivo no existe, la
+                        tarea no está archivada o es de otro usuario, o su
+                        materia ya no existe.
+        """
+        if not isinstance(id_tarea, int):
+            raise TypeError("El ID de la tarea debe ser un número entero")
+        self._validar_usuario_activo()
+        usuario_id = self.usuario_activo.idUsuario
+        if not os.path.isfile(ruta):
+            raise ValueError(f"No existe el archivo {ruta}")
+        archivo = sqlite3.connect(ruta, timeout=BUSY_TIMEOUT_MS / 1000)
+        try:
+            try:
+                datos = leer_archivada(archivo, id_tarea)
+            except sqlite3.DatabaseError as ex:
+                raise ValueError(f"{ruta} no es un archivo de tareas") from ex
+            if datos is None or datos.pop("usuario_id") != usuario_id:
+                raise ValueError(f"La tarea con id {id_tarea} no está en el archivo")
+            datos.pop("version")
+
+            def _op(session):
+                materia = session.get(Materia, datos["materia_id"])
+                if materia is None or materia.usuario_id != usuario_id:
+                    raise ValueError("La materia de la tarea archivada ya no existe")
+                if datos["recurrencia_id"] is not None and \
+                        session.get(Recurrencia, datos["recurrencia_id"]) is None:
+                    datos["recurrencia_id"] = None
+                if session.get(Tarea, id_tarea) is not None:
+                    datos["idTarea"] = None
+                tarea = Tarea(**datos)
+                session.add(tarea)
+                session.flush()
+                return tarea
+
+            tarea = self._ejecutar_escritura(_op)
+            # Después de confirmar: si se interrumpe aquí queda en ambos lados
+            with archivo:
+                archivo.execute(f'DELETE FROM {TABLA_ARCHIVO} WHERE "idTarea" = ?',
+                                (id_tarea,))
+        finally:
+            archivo.close()
+        self._invalidar(("tarea", tarea.idTarea))
+        return tarea
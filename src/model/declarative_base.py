@@ -20,8 +20,10 @@ Uso típico:
     session = Session()
 """
 
+import atexit
 import os
-from sqlalchemy import create_engine
+import sqlite3
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # ---------------------------------------------------------------------------
@@ -31,17 +33,92 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 # Obtener la ruta absoluta del directorio donde reside este archivo (src/model)
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
-# Construir la ruta completa al archivo SQLite
-db_path = os.path.join(current_dir, 'db.sqlite')
+# Construir la ruta completa al archivo SQLite.
+# La variable de entorno TASKMASTER_DB permite apuntar a otro archivo
+# (benchmarks, pruebas de concurrencia entre procesos, etc.).
+db_path = os.environ.get('TASKMASTER_DB') or os.path.join(current_dir, 'db.sqlite')
 
 # ---------------------------------------------------------------------------
 # Engine
 # ---------------------------------------------------------------------------
 
+# Tiempo (ms) que una conexión espera a que se libere el bloqueo de
+# escritura antes de fallar con "database is locked". Configurable con la
+# variable de entorno TASKMASTER_BUSY_TIMEOUT_MS.
+BUSY_TIMEOUT_MS = int(os.environ.get('TASKMASTER_BUSY_TIMEOUT_MS', '5000'))
+
+# Filas por índice que examina ANALYZE (y PRAGMA optimize) al calcular
+# estadísticas; acota su duración en tablas grandes.
+LIMITE_ANALISIS = 1000
+
 # Crear el motor de conexión SQLite.
 # echo=False desactiva el log de sentencias SQL en consola.
 # Para depuración, cambiar a echo=True.
-engine = create_engine(f'sqlite:///{db_path}', echo=False)
+engine = create_engine(
+    f'sqlite:///{db_path}',
+    echo=False,
+    connect_args={'timeout': BUSY_TIMEOUT_MS / 1000.0},
+)
+
+
+# El driver pysqlite abre transacciones de forma implícita (solo antes de
+# un INSERT/UPDATE/DELETE), lo que rompe los SAVEPOINT que usa la cola de
+# escritura (src.logic.cola_escritura) para agrupar varias operaciones en
+# un mismo commit. Se desactiva ese manejo y se emite BEGIN explícitamente,
+# siguiendo la receta recomendada por la documentación de SQLAlchemy.
+@event.listens_for(engine, "connect")
+def _configurar_conexion(dbapi_connection, connection_record):
+    """
+    Configura cada conexión nueva.
+
+    - Desactiva el BEGIN implícito de pysqlite.
+    - Si el archivo está vacío (base de datos nueva), pide auto_vacuum
+      incremental; las bases existentes se convierten con
+      src.logic.mantenimiento.convertir.
+    - Activa el modo WAL, que permite leer mientras otro proceso escribe
+      (CLI e interfaz Flet compartiendo el mismo archivo).
+    """
+    dbapi_connection.isolation_level = None
+    # En un archivo existente el PRAGMA no tendría efecto y puede chocar
+    # con el bloqueo de otro proceso
+    if not os.path.getsize(db_path):
+        dbapi_connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+
+@event.listens_for(engine, "close")
+def _optimizar_al_cerrar(dbapi_connection, connection_record):
+    """
+    Ejecuta PRAGMA optimize antes de cerrar una conexión del pool.
+
+    SQLite recuerda qué índices usó la conexión y solo vuelve a analizar
+    las tablas cuyas estadísticas faltan o quedaron desactualizadas, de
+    a LIMITE_ANALISIS filas por índice. Si la base está ocupada o la
+    conexión quedó inválida simplemente se omite.
+    """
+    try:
+        dbapi_connection.execute(f"PRAGMA analysis_limit={LIMITE_ANALISIS}")
+        dbapi_connection.execute("PRAGMA optimize")
+    except sqlite3.Error:
+        pass
+
+
+# Cierra las conexiones del pool al salir, para que pasen por PRAGMA optimize
+atexit.register(engine.dispose)
+
+
+@event.listens_for(engine, "begin")
+def _iniciar_transaccion(conn):
+    """
+    Emite BEGIN al iniciar cada transacción de SQLAlchemy.
+
+    Las sesiones de escritura usan BEGIN IMMEDIATE: toman el bloqueo de
+    escritura al comenzar, de modo que la espera del busy timeout ocurre
+    antes de leer y no puede producirse un interbloqueo al pasar de
+    lector a escritor a mitad de la transacción.
+    """
+    modo = conn.get_execution_options().get('inicio_transaccion', '')
+    conn.exec_driver_sql(f"BEGIN {modo}".strip())
 
 # ---------------------------------------------------------------------------
 # Session factory
@@ -53,6 +130,15 @@ engine = create_engine(f'sqlite:///{db_path}', echo=False)
 # NO se debe crear una sesión global compartida.
 Session = sessionmaker(bind=engine)
 
+# SessionEscritura abre sus transacciones con BEGIN IMMEDIATE.
+# La usan las operaciones que modifican datos (TaskManager, ColaEscritura).
+# expire_on_commit=False: los resultados se recargan antes del commit, de
+# modo que confirmar sea el último acceso a la BD de cada transacción y
+# un reintento nunca repita una escritura ya confirmada.
+SessionEscritura = sessionmaker(
+    bind=engine.execution_options(inicio_transaccion='IMMEDIATE'),
+    expire_on_commit=False)
+
 # ---------------------------------------------------------------------------
 # Base declarativa
 # ---------------------------------------------------------------------------
@@ -0,0 +1,300 @@
+"""
+migraciones.py
+==============
+Inicialización y migración del esquema de la base de datos del proyecto
+TaskMaster Student.
+
+Base.metadata.create_all crea las tablas que faltan, pero no modifica las
+tablas existentes. Este módulo lleva la cuenta de la versión del esquema
+en `PRAGMA user_version` y aplica, en orden, los pasos necesarios para
+actualizar una base de datos creada con una versión anterior del código.
+
+Cada paso es idempotente (verifica el estado antes de modificar), de modo
+que volver a ejecutarlo sobre una base ya migrada no produce cambios.
+
+También ofrece reparar_resumenes, que recalcula desde cero los contadores
+de tareas (ResumenMateria / ResumenUsuario) mantenidos por triggers.
+
+Uso típico:
+    from src.model.migraciones import inicializar_bd
+
+    inicializar_bd()          # usa el engine por defecto
+
+Ejecución directa:
+    python -m src.model.migraciones
+    python -m src.model.migraciones --reparar-resumenes
+"""
+
+import sys
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+from src.model.declarative_base import Base, engine as engine_defecto
+from src.model.modelo import (RegistroCambio, ContadorCambios, Tarea, EstadoTarea,
+                              ResumenMateria, ResumenUsuario, Recurrencia,
+                              MarcaMantenimiento,
+                              sentencias_triggers_cambios, sentencias_triggers_resumen)
+
+
+def _columnas(conn, tabla: str) -> set:
+    """Retorna los nombres de columna de una tabla (incluidas las generadas)."""
+    return {fila[1] for fila in conn.exec_driver_sql(f"PRAGMA table_xinfo({tabla})")}
+
+
+# ---------------------------------------------------------------------------
+# Pasos de migración
+# ---------------------------------------------------------------------------
+
+def _m001_columnas_version(conn):
+    """Agrega la columna `version` (concurrencia optimista)."""
+    for tabla in ("usuarios", "materias", "tareas"):
+        if "version" not in _columnas(conn, tabla):
+            conn.exec_driver_sql(
+                f"ALTER TABLE {tabla} ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
+
+def _m002_indices_usuarios(conn):
+    """Crea los índices NOCASE del directorio de usuarios."""
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_usuarios_nombre "
+                         "ON usuarios (nombre COLLATE NOCASE)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_usuarios_correo "
+                         "ON usuarios (correo COLLATE NOCASE)")
+
+
+def _m003_registro_cambios(conn):
+    """Crea el historial de cambios y sus triggers."""
+    for modelo in (RegistroCambio, ContadorCambios):
+        modelo.__table__.create(conn, checkfirst=True)
+    for sentencia in sentencias_triggers_cambios():
+        conn.exec_driver_sql(sentencia)
+
+
+def _m004_enums_enteros(conn):
+    """
+    Guarda prioridad y estado de las tareas como enteros (EnumEntero).
+
+    SQLite no permite cambiar el tipo de una columna, así que la tabla se
+    reconstruye: se renombra, se crea con el esquema actual (incluido
+    ix_tareas_materia_prioridad) y se copian las filas traduciendo cada
+    nombre a su código. Los triggers del historial se recrean al final.
+    """
+    tipos = {fila[1]: fila[2].upper()
+             for fila in conn.exec_driver_sql("PRAGMA table_info(tareas)")}
+    if "INT" in tipos["prioridad"]:
+        return
+
+    def _codigos(columna: str) -> str:
+        miembros = Tarea.__table__.c[columna].type.miembros
+        casos = " ".join(f"WHEN '{m.name}' THEN {i}" for i, m in enumerate(miembros))
+        return f"CASE {columna} {casos} END"
+
+    conn.exec_driver_sql("ALTER TABLE tareas RENAME TO tareas_anterior")
+    for operacion in ("insert", "update", "delete"):
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS trg_tareas_{operacion}")
+    Tarea.__table__.create(conn)
+    # Las columnas agregadas por pasos posteriores quedan con su valor por defecto
+    copiadas = [c for c in Tarea.__table__.c
+                if c.name in _columnas(conn, "tareas_anterior") and c.computed is None]
+    columnas = ", ".join(c.name for c in copiadas)
+    valores = ", ".join(_codigos(c.name) if c.name in ("prioridad", "estado")
+                        else c.name for c in copiadas)
+    conn.exec_driver_sql(f"INSERT INTO tareas ({columnas}) "
+                         f"SELECT {valores} FROM tareas_anterior")
+    conn.exec_driver_sql("DROP TABLE tareas_anterior")
+    for sentencia in sentencias_triggers_cambios():
+        conn.exec_driver_sql(sentencia)
+
+
+def _m005_resumenes(conn):
+    """Crea los resúmenes de tareas, sus triggers y los calcula."""
+    for modelo in (ResumenMateria, ResumenUsuario):
+        modelo.__table__.create(conn, checkfirst=True)
+    for sentencia in sentencias_triggers_resumen():
+        conn.exec_driver_sql(sentencia)
+    _recalcular_resumenes(conn)
+
+
+def _recalcular_resumenes(conn) -> int:
+    """
+    Reemplaza el contenido de los resúmenes por el calculado a partir de
+    las tareas. Retorna cuántas filas no coincidían (incluidas las que
+    faltaban o sobraban).
+    """
+    codigo = Tarea.__table__.c.estado.type.codigo
+    pendiente = codigo(EstadoTarea.Pendiente)
+    completada = codigo(EstadoTarea.Completada)
+    calculado_materias = f"""
+        SELECT m."idMateria", m.usuario_id, COUNT(t."idTarea"),
+               COALESCE(SUM(t.estado = {pendiente}), 0),
+               COALESCE(SUM(t.estado = {completada}), 0),
+               MIN(CASE WHEN t.estado = {pendiente} THEN t."fechaEntrega" END)
+        FROM materias m LEFT JOIN tareas t ON t.materia_id = m."idMateria"
+        GROUP BY 1"""
+    calculado_usuarios = """
+        SELECT u."idUsuario", COALESCE(SUM(r.total), 0),
+               COALESCE(SUM(r.pendientes), 0), COALESCE(SUM(r.completadas), 0),
+               MIN(r.primera_pendiente)
+        FROM usuarios u LEFT JOIN resumen_materias r ON r.usuario_id = u."idUsuario"
+        GROUP BY 1"""
+    diferencias = 0
+    for tabla, columnas, calculado, claves in (
+            ("resumen_materias",
+             "materia_id, usuario_id, total, pendientes, completadas, primera_pendiente",
+             calculado_materias,
+             'SELECT "idMateria" FROM materias EXCEPT SELECT materia_id FROM resumen_materias'),
+            ("resumen_usuarios",
+             "usuario_id, total, pendientes, completadas, primera_pendiente",
+             calculado_usuarios,
+             'SELECT "idUsuario" FROM usuarios EXCEPT SELECT usuario_id FROM resumen_usuarios')):
+        # Filas guardadas con valores distintos (o sobrantes) y filas faltantes
+        diferencias += conn.exec_driver_sql(
+            f"SELECT COUNT(*) FROM (SELECT {columnas} FROM {tabla} EXCEPT {calculado})"
+        ).scalar()
+        diferencias += conn.exec_driver_sql(f"SELECT COUNT(*) FROM ({claves})").scalar()
+        conn.exec_driver_sql(f"DELETE FROM {tabla}")
+        conn.exec_driver_sql(f"INSERT INTO {tabla} ({columnas}) {calculado}")
+    return diferencias
+
+
+def _m006_indice_pendientes(conn):
+    """Crea el índice parcial de tareas pendientes por fecha de entrega."""
+    for indice in Tarea.__table__.indexes:
+        if indice.name == "ix_tareas_pendientes_entrega":
+            indice.create(conn, checkfirst=True)
+
+
+def _m007_recurrencias(conn):
+    """Crea la tabla de recurrencias y enlaza las tareas con ella."""
+    Recurrencia.__table__.create(conn, checkfirst=True)
+    if "recurrencia_id" not in _columnas(conn, "tareas"):
+        conn.exec_driver_sql(
+            'ALTER TABLE tareas ADD COLUMN recurrencia_id INTEGER '
+            'REFERENCES recurrencias ("idRecurrencia") ON DELETE SET NULL')
+    for indice in Tarea.__table__.indexes:
+        if indice.name == "ix_tareas_recurrencia":
+            indice.create(conn, checkfirst=True)
+
+
+def _m008_esfuerzo(conn):
+    """
+    Agrega el esfuerzo estimado de las tareas, la columna generada
+    inicio_sugerido y el índice parcial de TaskManager.siguientes.
+    """
+    existentes = _columnas(conn, "tareas")
+    for nombre in ("esfuerzo", "inicio_sugerido"):
+        if nombre not in existentes:
+            columna = CreateColumn(Tarea.__table__.c[nombre]).compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE tareas ADD COLUMN {columna}")
+    for indice in Tarea.__table__.indexes:
+        if indice.name == "ix_tareas_pendientes_inicio":
+            indice.create(conn, checkfirst=True)
+
+
+def _m009_marcas_mantenimiento(conn):
+    """Crea la tabla con la última ejecución del mantenimiento."""
+    MarcaMantenimiento.__table__.create(conn, checkfirst=True)
+
+
+# Lista ordenada de (número de versión, paso). El número de la última
+# entrada es la versión del esquema que genera create_all.
+MIGRACIONES = [
+    (1, _m001_columnas_version),
+    (2, _m002_indices_usuarios),
+    (3, _m003_registro_cambios),
+    (4, _m004_enums_enteros),
+    (5, _m005_resumenes),
+    (6, _m006_indice_pendientes),
+    (7, _m007_recurrencias),
+    (8, _m008_esfuerzo),
+    (9, _m009_marcas_mantenimiento),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1][0]
+
+
+# ---------------------------------------------------------------------------
+# API pública
+# ---------------------------------------------------------------------------
+
+def version_esquema(engine=engine_defecto) -> int:
+    """
+    Retorna la versión de esquema registrada en la base de datos.
+
+    Args:
+        engine: Engine de SQLAlchemy (por defecto, el del proyecto).
+
+    Returns:
+        int: Valor de PRAGMA user_version.
+    """
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def migrar(engine=engine_defecto) -> list:
+    """
+    Aplica los pasos de migración pendientes.
+
+    Args:
+        engine: Engine de SQLAlchemy (por defecto, el del proyecto).
+
+    Returns:
+        list[int]: Números de los pasos aplicados (vacía si no había).
+    """
+    aplicados = []
+    with engine.begin() as conn:
+        actual = conn.exec_driver_sql("PRAGMA user_version").scalar()
+        for numero, paso in MIGRACIONES:
+            if numero > actual:
+                paso(conn)
+                conn.exec_driver_sql(f"PRAGMA user_version = {numero}")
+                aplicados.append(numero)
+    return aplicados
+
+
+def inicializar_bd(engine=engine_defecto) -> list:
+    """
+    Crea las tablas que falten y deja el esquema en la versión actual.
+
+    Si la base de datos es nueva, create_all ya genera el esquema completo
+    y solo se registra VERSION_ESQUEMA. Si ya existía, se aplican las
+    migraciones pendientes.
+
+    Args:
+        engine: Engine de SQLAlchemy (por defecto, el del proyecto).
+
+    Returns:
+        list[int]: Números de los pasos de migración aplicados.
+    """
+    existia = inspect(engine).has_table("usuarios")
+    Base.metadata.create_all(engine)
+    if not existia:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+        return []
+    return migrar(engine)
+
+
+def reparar_resumenes(engine=engine_defecto) -> int:
+    """
+    Recalcula ResumenMateria y ResumenUsuario a partir de las tareas.
+
+    Los triggers los mantienen exactos; esta función sirve para corregirlos
+    si se modificaron las tablas con los triggers desactivados o a mano.
+
+    Args:
+        engine: Engine de SQLAlchemy (por defecto, el del proyecto).
+
+    Returns:
+        int: Filas de resumen que estaban desfasadas (0 si todo coincidía).
+    """
+    with engine.begin() as conn:
+        return _recalcular_resumenes(conn)
+
+
+if __name__ == "__main__":
+    if "--reparar-resumenes" in sys.argv[1:]:
+        inicializar_bd()
+        print(f"✅ Resúmenes recalculados ({reparar_resumenes()} filas corregidas)")
+        sys.exit(0)
+    pasos = inicializar_bd()
+    print(f"✅ Esquema en versión {VERSION_ESQUEMA}"
+          + (f" (migraciones aplicadas: {pasos})" if pasos else ""))
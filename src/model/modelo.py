@@ -7,20 +7,46 @@ TaskMaster Student usando SQLAlchemy.
 Este módulo define las entidades principales del sistema:
     - Prioridad:   Enumeración de niveles de prioridad para tareas.
     - EstadoTarea: Enumeración de estados posibles de una tarea.
+    - EnumEntero:  Tipo de columna que guarda una enumeración como entero.
     - Usuario:     Representa a un estudiante registrado en el sistema.
     - Materia:     Representa una asignatura académica asociada a un usuario.
     - Tarea:       Representa una tarea académica asociada a una materia.
+    - Recurrencia: Plantilla de una tarea que se repite (laboratorios
+                   semanales, lecturas); sus ocurrencias son Tareas.
+    - ResumenMateria / ResumenUsuario: Contadores de tareas mantenidos por
+                   triggers.
+    - RegistroCambio / ContadorCambios: Historial de cambios llenado por
+      triggers (ver "Registro de cambios").
+    - MarcaMantenimiento: Última ejecución de cada tarea de mantenimiento
+      (ver src.logic.mantenimiento).
 
 Relaciones:
     Usuario 1──N Materia 1──N Tarea
+                 Materia 1──N Recurrencia 1──N Tarea (ocurrencias)
+
+Concurrencia optimista:
+    Usuario, Materia y Tarea tienen una columna `version` configurada como
+    version_id_col de SQLAlchemy. Cada UPDATE incrementa la versión y lleva
+    la condición "WHERE version = <versión leída>", por lo que una
+    modificación concurrente se detecta sin bloqueos pesimistas.
+
+Registro de cambios:
+    Triggers de SQLite agregan una fila a `registro_cambios` por cada
+    INSERT, UPDATE o DELETE sobre usuarios, materias y tareas, con el
+    usuario afectado, y cuentan los cambios por tabla en
+    `contadores_cambios`. Así cualquier proceso puede saber qué cambió,
+    incluso si la escritura la hizo otro programa. El historial conserva
+    las últimas MAX_REGISTRO_CAMBIOS filas.
 
 Ejecución directa:
     python -m src.model.modelo
     Crea todas las tablas en la base de datos si no existen.
+    Para actualizar una base existente usar python -m src.model.migraciones.
 """
 
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Enum, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, SmallInteger, String, Date, DateTime, ForeignKey, UniqueConstraint, Index, Computed, text, literal_column, event, DDL
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.orm import relationship, deferred
 from src.model.declarative_base import Base
 import enum
 
@@ -55,6 +81,51 @@ class EstadoTarea(enum.Enum):
     Completada = "Completada"
 
 
+class EnumEntero(TypeDecorator):
+    """
+    Enumeración guardada como entero pequeño en lugar de texto.
+
+    El código de cada miembro es su posición en `miembros`, por lo que el
+    orden en SQL (ORDER BY, índices, comparaciones) es el orden indicado.
+    Los miembros nuevos solo pueden agregarse al final: reordenarlos
+    cambia el significado de los datos ya guardados.
+
+    Ejemplo:
+        prioridad = Column(EnumEntero(Prioridad.Baja, Prioridad.Media,
+                                      Prioridad.Alta), nullable=False)
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, *miembros: enum.Enum):
+        """
+        Args:
+            *miembros (enum.Enum): Miembros de la enumeración, en el orden
+                                   de sus códigos (0, 1, 2, ...).
+        """
+        super().__init__()
+        self.miembros = miembros
+        self._codigos = {m: i for i, m in enumerate(miembros)}
+
+    def codigo(self, miembro: enum.Enum) -> int:
+        """Retorna el código entero con que se guarda `miembro`."""
+        return self._codigos[miembro]
+
+    def process_bind_param(self, valor, dialect):
+        """Convierte el miembro en su código."""
+        if valor is None:
+            return None
+        try:
+            return self._codigos[valor]
+        except KeyError:
+            raise ValueError(f"{valor!r} no es un valor válido para esta columna")
+
+    def process_result_value(self, valor, dialect):
+        """Convierte el código leído en el miembro."""
+        return None if valor is None else self.miembros[valor]
+
+
 # ---------------------------------------------------------------------------
 # Modelos ORM
 # ---------------------------------------------------------------------------
@@ -63,7 +134,8 @@ class Usuario(Base):
     """
     Modelo que representa a un estudiante registrado en el sistema.
 
-    El sistema permite un máximo de 5 usuarios simultáneos. Cada usuario
+    El sistema permite un máximo configurable de usuarios (5 por defecto,
+    ver TaskManager.limite_usuarios). Cada usuario
     puede tener múltiples materias asociadas. Al eliminarse un usuario,
     sus materias (y por cascada, sus tareas) se eliminan automáticamente.
 
@@ -73,11 +145,16 @@ class Usuario(Base):
                                Solo letras y espacios, mínimo 3 caracteres.
         correo         (str):  Correo electrónico único (máx. 100 caracteres).
         fecha_creacion (date): Fecha en que se registró el usuario.
+        version        (int):  Versión de la fila (concurrencia optimista).
         materias       (list): Lista de objetos Materia asociados (relación 1-N).
 
     Restricciones de BD:
         - correo es UNIQUE a nivel de base de datos.
         - nombre y correo son NOT NULL.
+
+    Índices:
+        - ix_usuarios_nombre / ix_usuarios_correo (COLLATE NOCASE): orden
+          alfabético, paginación y búsqueda por prefijo con LIKE.
     """
 
     __tablename__ = 'usuarios'
@@ -87,6 +164,7 @@ class Usuario(Base):
     # ← Agregar longitud máxima
     correo = Column(String(100), nullable=False, unique=True)
     fecha_creacion = Column(Date, nullable=False)  # ← Cambiar a NOT NULL
+    version = Column(Integer, nullable=False)
 
     # Relación 1-N con Materia.
     # cascade="all, delete-orphan": al eliminar un Usuario,
@@ -97,6 +175,14 @@ class Usuario(Base):
         cascade="all, delete-orphan"
     )
 
+    # LIKE en SQLite no distingue mayúsculas: solo aprovecha índices NOCASE
+    __table_args__ = (
+        Index('ix_usuarios_nombre', text('nombre COLLATE NOCASE')),
+        Index('ix_usuarios_correo', text('correo COLLATE NOCASE')),
+    )
+
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         """Representación legible del objeto para depuración."""
         return f"<Usuario(id={self.idUsuario}, nombre={self.nombre})>"
@@ -115,8 +201,10 @@ class Materia(Base):
         nombre     (str): Nombre de la materia (máx. 50 caracteres, mín. 3).
         color      (str): Color identificador en formato HEX (#RRGGBB, 7 caracteres).
         usuario_id (int): FK hacia la tabla usuarios (NOT NULL).
+        version    (int): Versión de la fila (concurrencia optimista).
         usuario    (obj): Objeto Usuario al que pertenece esta materia.
         tareas     (list): Lista de objetos Tarea asociados (relación 1-N).
+        recurrencias (list): Recurrencias de la materia (relación 1-N).
 
     Restricciones de BD:
         - Unique constraint compuesto: (nombre, usuario_id).
@@ -137,6 +225,7 @@ class Materia(Base):
         ForeignKey('usuarios.idUsuario', ondelete='CASCADE'),
         nullable=False
     )
+    version = Column(Integer, nullable=False)
 
     # Relación inversa hacia Usuario
     usuario = relationship("Usuario", back_populates="materias")
@@ -150,17 +239,30 @@ class Materia(Base):
         cascade="all, delete-orphan"
     )
 
+    # Relación 1-N con Recurrencia (mismo cascade que las tareas)
+    recurrencias = relationship(
+        "Recurrencia",
+        back_populates="materia",
+        cascade="all, delete-orphan"
+    )
+
     # Constraint único compuesto: un usuario no puede tener dos materias
     # con el mismo nombre.
     __table_args__ = (
         UniqueConstraint('nombre', 'usuario_id', name='uq_materia_usuario'),
     )
 
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         """Representación legible del objeto para depuración."""
         return f"<Materia(id={self.idMateria}, nombre={self.nombre})>"
 
 
+# Horas de trabajo por día con las que se calcula Tarea.inicio_sugerido
+HORAS_POR_DIA = 4
+
+
 class Tarea(Base):
     """
 
@@ -172,27 +274,55 @@ class Tarea(Base):
         idTarea      (int):         Clave primaria autoincremental.
         titulo       (str):         Título de la tarea (máx. 100 caracteres, mín. 3).
         descripcion  (str|None):    Descripción opcional (máx. 500 caracteres).
+                                    Columna diferida: no se lee al cargar la
+                                    tarea, sino al acceder al atributo (o con
+                                    undefer en la consulta).
         prioridad    (Prioridad):   Nivel de prioridad: Baja, Media o Alta.
         fechaEntrega (date):        Fecha límite de entrega (no puede ser pasada).
         estado       (EstadoTarea): Estado actual: Pendiente o Completada.
         materia_id   (int):         FK hacia la tabla materias (NOT NULL).
+        version      (int):         Versión de la fila (concurrencia optimista).
+        recurrencia_id (int|None):  Recurrencia que generó la tarea (None si
+                                    se creó a mano o la recurrencia ya no existe).
+        esfuerzo     (int|None):    Horas de trabajo estimadas (opcional).
+        inicio_sugerido (date):     Columna generada por SQLite: la entrega
+                                    menos los días de esfuerzo, a
+                                    HORAS_POR_DIA horas por día (redondeando
+                                    hacia arriba). Diferida y de solo lectura.
         materia      (obj):         Objeto Materia al que pertenece esta tarea.
 
     Restricciones de BD:
         - FK materia_id con ondelete='CASCADE': si se elimina la materia,
           se eliminan sus tareas automáticamente a nivel de BD.
         - estado tiene valor por defecto EstadoTarea.Pendiente.
+        - prioridad y estado se guardan como enteros (EnumEntero): Baja=0,
+          Media=1, Alta=2; Pendiente=0, Completada=1.
+
+    Índices:
+        - ix_tareas_materia_prioridad (materia_id, prioridad DESC, fechaEntrega):
+          tareas de una materia con las de mayor prioridad primero.
+        - ix_tareas_pendientes_entrega (materia_id, fechaEntrega), parcial
+          (solo pendientes): agenda y entrega pendiente más próxima.
+        - ix_tareas_recurrencia (recurrencia_id): ocurrencias de una
+          recurrencia.
+        - ix_tareas_pendientes_inicio (prioridad, inicio_sugerido,
+          fechaEntrega), parcial (solo pendientes): candidatas de
+          TaskManager.siguientes.
     """
 
     __tablename__ = 'tareas'
 
     idTarea = Column(Integer, primary_key=True, autoincrement=True)
     titulo = Column(String(100), nullable=False)  # ← Agregar longitud máxima
-    descripcion = Column(String(500))  # ← Agregar longitud máxima
-    prioridad = Column(Enum(Prioridad), nullable=False)
+    # Diferida: los listados no la necesitan (ver TaskManager.listar_tareas)
+    descripcion = deferred(Column(String(500)))
+    prioridad = Column(
+        EnumEntero(Prioridad.Baja, Prioridad.Media, Prioridad.Alta),
+        nullable=False
+    )
     fechaEntrega = Column(Date, nullable=False)  # ← Cambiar a NOT NULL
     estado = Column(
-        Enum(EstadoTarea),
+        EnumEntero(EstadoTarea.Pendiente, EstadoTarea.Completada),
         nullable=False,
         default=EstadoTarea.Pendiente
     )
@@ -201,15 +331,383 @@ class Tarea(Base):
         ForeignKey('materias.idMateria', ondelete='CASCADE'),
         nullable=False
     )
+    version = Column(Integer, nullable=False)
+    recurrencia_id = Column(
+        Integer,
+        ForeignKey('recurrencias.idRecurrencia', ondelete='SET NULL')
+    )
+    esfuerzo = Column(SmallInteger)
+    # Generada por SQLite; solo se usa para ordenar candidatas por índice
+    inicio_sugerido = deferred(Column(Date, Computed(
+        "date(fechaEntrega, '-' || ((coalesce(esfuerzo, 0) + "
+        f"{HORAS_POR_DIA - 1}) / {HORAS_POR_DIA}) || ' days')", persisted=False)))
 
     # Relación inversa hacia Materia
     materia = relationship("Materia", back_populates="tareas")
 
+    # Orden "Alta primero" de una materia: se recorre el índice sin ordenar
+    __table_args__ = (
+        Index('ix_tareas_materia_prioridad', 'materia_id', text('prioridad DESC'),
+              'fechaEntrega'),
+        Index('ix_tareas_recurrencia', 'recurrencia_id'),
+    )
+
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         """Representación legible del objeto para depuración."""
         return f"<Tarea(id={self.idTarea}, titulo={self.titulo})>"
 
 
+# Condición "tarea pendiente" con el código escrito en el SQL. SQLite solo
+# usa un índice parcial si la consulta repite su WHERE literalmente (un
+# parámetro ligado no sirve), así que las consultas sobre pendientes deben
+# filtrar con esta expresión.
+TAREA_PENDIENTE = Tarea.estado == literal_column(
+    str(Tarea.__table__.c.estado.type.codigo(EstadoTarea.Pendiente)))
+
+Index('ix_tareas_pendientes_entrega', Tarea.materia_id, Tarea.fechaEntrega,
+      sqlite_where=TAREA_PENDIENTE)
+Index('ix_tareas_pendientes_inicio', Tarea.prioridad, Tarea.inicio_sugerido,
+      Tarea.fechaEntrega, sqlite_where=TAREA_PENDIENTE)
+
+
+class Recurrencia(Base):
+    """
+    Plantilla de una tarea que se repite.
+
+    La regla es una de dos formas: cada `cada_dias` días a partir de
+    `inicio` (7 = semanal), o los días de la semana marcados en
+    `dias_semana`. Las ocurrencias se guardan como Tareas normales, pero
+    solo unas pocas por adelantado (ver TaskManager.crear_recurrencia):
+    `siguiente` es la primera fecha de la regla que todavía no tiene tarea.
+
+    Atributos:
+        idRecurrencia (int):        Clave primaria autoincremental.
+        titulo        (str):        Título de cada ocurrencia.
+        descripcion   (str|None):   Descripción de cada ocurrencia.
+        prioridad     (Prioridad):  Prioridad de cada ocurrencia.
+        materia_id    (int):        FK hacia la tabla materias (NOT NULL).
+        inicio        (date):       Primera fecha posible de la regla.
+        cada_dias     (int|None):   Días entre ocurrencias.
+        dias_semana   (int|None):   Máscara de días (bit 0 = lunes … bit 6 = domingo).
+        hasta         (date|None):  Última fecha posible (None: sin fin).
+        siguiente     (date|None):  Próxima fecha sin generar (None: la regla
+                                    ya no tiene más fechas).
+        version       (int):        Versión de la fila (concurrencia optimista).
+        materia       (obj):        Objeto Materia al que pertenece.
+    """
+
+    __tablename__ = 'recurrencias'
+
+    idRecurrencia = Column(Integer, primary_key=True, autoincrement=True)
+    titulo = Column(String(100), nullable=False)
+    descripcion = Column(String(500))
+    prioridad = Column(
+        EnumEntero(Prioridad.Baja, Prioridad.Media, Prioridad.Alta),
+        nullable=False
+    )
+    materia_id = Column(
+        Integer,
+        ForeignKey('materias.idMateria', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    inicio = Column(Date, nullable=False)
+    cada_dias = Column(Integer)
+    dias_semana = Column(SmallInteger)
+    hasta = Column(Date)
+    siguiente = Column(Date)
+    version = Column(Integer, nullable=False)
+
+    materia = relationship("Materia", back_populates="recurrencias")
+
+    __mapper_args__ = {"version_id_col": version}
+
+    def __repr__(self):
+        """Representación legible del objeto para depuración."""
+        return f"<Recurrencia(id={self.idRecurrencia}, titulo={self.titulo})>"
+
+
+class RegistroCambio(Base):
+    """
+    Fila del historial de cambios, escrita por triggers (nunca por el ORM).
+
+    Atributos:
+        seq        (int): Número de cambio, creciente y sin reutilizar.
+        tabla      (str): 'usuarios', 'materias', 'tareas' o
+                          TABLA_RESTAURACION.
+        operacion  (str): 'INSERT', 'UPDATE', 'DELETE' o 'RESTORE'.
+        id_entidad (int): Clave primaria de la fila modificada.
+        usuario_id (int|None): Usuario dueño de la fila (None si ya no
+                               se puede determinar).
+    """
+
+    __tablename__ = 'registro_cambios'
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    tabla = Column(String(10), nullable=False)
+    operacion = Column(String(6), nullable=False)
+    id_entidad = Column(Integer, nullable=False)
+    usuario_id = Column(Integer)
+
+    def __repr__(self):
+        """Representación legible del objeto para depuración."""
+        return (f"<RegistroCambio(seq={self.seq}, {self.operacion} "
+                f"{self.tabla}#{self.id_entidad})>")
+
+
+class ContadorCambios(Base):
+    """
+    Cantidad de cambios por tabla, mantenida por triggers.
+
+    Atributos:
+        tabla   (str): Nombre de la tabla observada.
+        cambios (int): Filas insertadas, modificadas o eliminadas.
+    """
+
+    __tablename__ = 'contadores_cambios'
+
+    tabla = Column(String(10), primary_key=True)
+    cambios = Column(Integer, nullable=False, default=0)
+
+
+class MarcaMantenimiento(Base):
+    """
+    Última ejecución de una tarea de mantenimiento de la base de datos.
+
+    Atributos:
+        tarea   (str):      Tarea de mantenimiento ('analyze').
+        cambios (int):      Suma de ContadorCambios al ejecutarla; la
+                            diferencia con la suma actual son las filas
+                            modificadas desde entonces.
+        fecha   (datetime): Momento de la ejecución.
+    """
+
+    __tablename__ = 'marcas_mantenimiento'
+
+    tarea = Column(String(10), primary_key=True)
+    cambios = Column(Integer, nullable=False)
+    fecha = Column(DateTime, nullable=False)
+
+
+class ResumenMateria(Base):
+    """
+    Contadores de las tareas de una materia, mantenidos por triggers.
+
+    Se leen en lugar de contar las tareas (COUNT(*)) en cada refresco; si
+    alguna vez quedan desfasados, migraciones.reparar_resumenes los
+    recalcula.
+
+    Atributos:
+        materia_id        (int):  Materia resumida.
+        usuario_id        (int):  Dueño de la materia.
+        total             (int):  Tareas de la materia.
+        pendientes        (int):  Tareas en estado Pendiente.
+        completadas       (int):  Tareas en estado Completada.
+        primera_pendiente (date|None): Entrega más próxima entre las
+                                  pendientes; si es anterior a hoy, hay
+                                  tareas vencidas.
+    """
+
+    __tablename__ = 'resumen_materias'
+
+    materia_id = Column(Integer, primary_key=True)
+    usuario_id = Column(Integer, nullable=False, index=True)
+    total = Column(Integer, nullable=False, default=0)
+    pendientes = Column(Integer, nullable=False, default=0)
+    completadas = Column(Integer, nullable=False, default=0)
+    primera_pendiente = Column(Date)
+
+    def __repr__(self):
+        """Representación legible del objeto para depuración."""
+        return (f"<ResumenMateria(materia={self.materia_id}, total={self.total}, "
+                f"pendientes={self.pendientes})>")
+
+
+class ResumenUsuario(Base):
+    """
+    Contadores de todas las tareas de un usuario, mantenidos por triggers.
+
+    Atributos:
+        usuario_id        (int):  Usuario resumido.
+        total             (int):  Tareas del usuario.
+        pendientes        (int):  Tareas en estado Pendiente.
+        completadas       (int):  Tareas en estado Completada.
+        primera_pendiente (date|None): Entrega más próxima entre las
+                                  pendientes de todas sus materias.
+    """
+
+    __tablename__ = 'resumen_usuarios'
+
+    usuario_id = Column(Integer, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    pendientes = Column(Integer, nullable=False, default=0)
+    completadas = Column(Integer, nullable=False, default=0)
+    primera_pendiente = Column(Date)
+
+    def __repr__(self):
+        """Representación legible del objeto para depuración."""
+        return (f"<ResumenUsuario(usuario={self.usuario_id}, total={self.total}, "
+                f"pendientes={self.pendientes})>")
+
+
+# ---------------------------------------------------------------------------
+# Triggers del registro de cambios
+# ---------------------------------------------------------------------------
+
+# Filas del historial que se conservan; las más antiguas se eliminan
+MAX_REGISTRO_CAMBIOS = 10000
+
+# `tabla` de la fila que src.model.respaldo.restaurar agrega al historial:
+# quien la lea debe recargar todo, ya que el contenido entero cambió
+TABLA_RESTAURACION = "*"
+
+# (tabla, columna de la clave primaria, expresión del usuario dueño).
+# "{fila}" se reemplaza por NEW u OLD según la operación.
+_TABLAS_OBSERVADAS = [
+    ("usuarios", '"idUsuario"', '{fila}."idUsuario"'),
+    ("materias", '"idMateria"', '{fila}.usuario_id'),
+    ("tareas", '"idTarea"',
+     '(SELECT usuario_id FROM materias WHERE "idMateria" = {fila}.materia_id)'),
+]
+
+
+def sentencias_triggers_cambios() -> list:
+    """
+    Genera el DDL de los triggers del registro de cambios.
+
+    Todas las sentencias usan IF NOT EXISTS, por lo que pueden ejecutarse
+    sobre una base que ya los tenga.
+
+    Returns:
+        list[str]: Sentencias CREATE TRIGGER.
+    """
+    sentencias = []
+    for tabla, pk, usuario in _TABLAS_OBSERVADAS:
+        for operacion, fila in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            sentencias.append(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{tabla}_{operacion.lower()}
+                AFTER {operacion} ON {tabla}
+                BEGIN
+                    INSERT INTO registro_cambios (tabla, operacion, id_entidad, usuario_id)
+                    VALUES ('{tabla}', '{operacion}', {fila}.{pk},
+                            {usuario.format(fila=fila)});
+                    INSERT INTO contadores_cambios (tabla, cambios) VALUES ('{tabla}', 1)
+                    ON CONFLICT (tabla) DO UPDATE SET cambios = cambios + 1;
+                END""")
+    sentencias.append(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_registro_cambios_recorte
+        AFTER INSERT ON registro_cambios
+        BEGIN
+            DELETE FROM registro_cambios WHERE seq <= NEW.seq - {MAX_REGISTRO_CAMBIOS};
+        END""")
+    return sentencias
+
+
+# ---------------------------------------------------------------------------
+# Triggers de los resúmenes de tareas
+# ---------------------------------------------------------------------------
+
+def _sumar_tarea(fila: str, signo: str) -> list:
+    """
+    Sentencias que suman (signo '+') o restan (signo '-') la tarea `fila`
+    (NEW u OLD) de los resúmenes de su materia y de su usuario.
+
+    Al restar una tarea pendiente cuya entrega era la primera, esa fecha
+    se recalcula: en la materia, con sus tareas; en el usuario, con los
+    resúmenes de sus materias.
+    """
+    pendiente = Tarea.__table__.c.estado.type.codigo(EstadoTarea.Pendiente)
+    completada = Tarea.__table__.c.estado.type.codigo(EstadoTarea.Completada)
+    es_pendiente = f"{fila}.estado = {pendiente}"
+    usuario = f"(SELECT usuario_id FROM resumen_materias WHERE materia_id = {fila}.materia_id)"
+    contadores = (f"total = total {signo} 1, "
+                  f"pendientes = pendientes {signo} ({es_pendiente}), "
+                  f"completadas = completadas {signo} ({fila}.estado = {completada})")
+    if signo == "+":
+        primera_materia = primera_usuario = (
+            f"CASE WHEN {es_pendiente} AND (primera_pendiente IS NULL "
+            f'OR {fila}."fechaEntrega" < primera_pendiente) '
+            f'THEN {fila}."fechaEntrega" ELSE primera_pendiente END')
+    else:
+        recalcular = (f'CASE WHEN {es_pendiente} AND {fila}."fechaEntrega" = primera_pendiente '
+                      f"THEN ({{}}) ELSE primera_pendiente END")
+        primera_materia = recalcular.format(
+            f'SELECT MIN("fechaEntrega") FROM tareas '
+            f"WHERE materia_id = {fila}.materia_id AND estado = {pendiente}")
+        primera_usuario = recalcular.format(
+            f"SELECT MIN(primera_pendiente) FROM resumen_materias "
+            f"WHERE usuario_id = {usuario}")
+    return [
+        f"UPDATE resumen_materias SET {contadores}, primera_pendiente = {primera_materia} "
+        f"WHERE materia_id = {fila}.materia_id",
+        f"UPDATE resumen_usuarios SET {contadores}, primera_pendiente = {primera_usuario} "
+        f"WHERE usuario_id = {usuario}",
+    ]
+
+
+def sentencias_triggers_resumen() -> list:
+    """
+    Genera el DDL de los triggers que mantienen ResumenMateria y
+    ResumenUsuario.
+
+    Un cambio de estado, materia o fecha de entrega de una tarea se
+    trata como quitar la fila anterior y agregar la nueva. Todas las
+    sentencias usan IF NOT EXISTS.
+
+    Returns:
+        list[str]: Sentencias CREATE TRIGGER.
+    """
+    cuerpos = {
+        "trg_resumen_tareas_insert": ("AFTER INSERT ON tareas", _sumar_tarea("NEW", "+")),
+        "trg_resumen_tareas_update": (
+            'AFTER UPDATE OF estado, materia_id, "fechaEntrega" ON tareas',
+            _sumar_tarea("OLD", "-") + _sumar_tarea("NEW", "+")),
+        "trg_resumen_tareas_delete": ("AFTER DELETE ON tareas", _sumar_tarea("OLD", "-")),
+        "trg_resumen_materias_insert": ("AFTER INSERT ON materias", [
+            "INSERT OR IGNORE INTO resumen_materias "
+            "(materia_id, usuario_id, total, pendientes, completadas) "
+            'VALUES (NEW."idMateria", NEW.usuario_id, 0, 0, 0)']),
+        # Si las tareas ya se borraron, la fila llega en cero; si no, sus
+        # triggers ya no encuentran la materia y se descuenta aquí todo.
+        "trg_resumen_materias_delete": ("AFTER DELETE ON materias", [
+            "UPDATE resumen_usuarios SET "
+            "total = total - (SELECT total FROM resumen_materias r "
+            'WHERE r.materia_id = OLD."idMateria"), '
+            "pendientes = pendientes - (SELECT pendientes FROM resumen_materias r "
+            'WHERE r.materia_id = OLD."idMateria"), '
+            "completadas = completadas - (SELECT completadas FROM resumen_materias r "
+            'WHERE r.materia_id = OLD."idMateria") '
+            'WHERE usuario_id = OLD.usuario_id AND EXISTS (SELECT 1 FROM resumen_materias r '
+            'WHERE r.materia_id = OLD."idMateria")',
+            'DELETE FROM resumen_materias WHERE materia_id = OLD."idMateria"',
+            "UPDATE resumen_usuarios SET primera_pendiente = (SELECT MIN(primera_pendiente) "
+            "FROM resumen_materias WHERE usuario_id = OLD.usuario_id) "
+            "WHERE usuario_id = OLD.usuario_id"]),
+        "trg_resumen_usuarios_insert": ("AFTER INSERT ON usuarios", [
+            "INSERT OR IGNORE INTO resumen_usuarios "
+            "(usuario_id, total, pendientes, completadas) "
+            'VALUES (NEW."idUsuario", 0, 0, 0)']),
+        "trg_resumen_usuarios_delete": ("AFTER DELETE ON usuarios", [
+            'DELETE FROM resumen_materias WHERE usuario_id = OLD."idUsuario"',
+            'DELETE FROM resumen_usuarios WHERE usuario_id = OLD."idUsuario"']),
+    }
+    separador = ";\n            "
+    return [f"""
+        CREATE TRIGGER IF NOT EXISTS {nombre}
+        {evento}
+        BEGIN
+            {separador.join(sentencias)};
+        END""" for nombre, (evento, sentencias) in cuerpos.items()]
+
+
+# create_all crea los triggers junto con las tablas
+for _sentencia in sentencias_triggers_cambios() + sentencias_triggers_resumen():
+    event.listen(Base.metadata, "after_create", DDL(_sentencia))
+
+
 # ---------------------------------------------------------------------------
 # Punto de entrada para creación directa de tablas
 # ---------------------------------------------------------------------------
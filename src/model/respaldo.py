@@ -0,0 +1,313 @@
+"""
+respaldo.py
+===========
+Respaldo y restauración en caliente de la base de datos del proyecto
+TaskMaster Student, con la API de respaldo en línea de SQLite
+(sqlite3.Connection.backup).
+
+Copiar db.sqlite con el sistema de archivos mientras la aplicación escribe
+puede dejar una copia inconsistente (y no incluye lo que todavía está en
+db.sqlite-wal). La API de respaldo copia las páginas a través de una
+conexión, que siempre ve un estado confirmado.
+
+respaldar copia de a PAGINAS_POR_PASO páginas con una pausa entre pasos,
+de modo que nunca ocupa la base de datos mucho tiempo seguido. Si otra
+conexión confirma una escritura entre dos pasos, SQLite reinicia la copia
+desde el principio; tras MAX_REINICIOS reinicios lo que falta se copia en
+un solo paso (en modo WAL un paso solo abre una lectura, así que tampoco
+bloquea a los escritores, pero retiene el checkpoint mientras dura).
+
+La copia se escribe en un archivo temporal, se verifica con
+PRAGMA quick_check y recién entonces rota las generaciones anteriores:
+
+    respaldos/db.sqlite      la más reciente
+    respaldos/db.sqlite.1    la anterior
+    ...
+    respaldos/db.sqlite.<generaciones - 1>
+
+Uso típico:
+    from src.model.respaldo import respaldar, restaurar
+
+    respaldar("respaldos/db.sqlite", generaciones=7)
+    restaurar("respaldos/db.sqlite.2")
+
+Ejecución directa:
+    python run.py respaldar respaldos/db.sqlite
+    python run.py restaurar respaldos/db.sqlite.2
+"""
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+from src.model.declarative_base import engine as engine_defecto
+from src.model.migraciones import migrar
+from src.model.modelo import TABLA_RESTAURACION
+
+# Páginas copiadas por paso (con páginas de 4 KiB, 1 MiB por paso)
+PAGINAS_POR_PASO = 256
+
+# Segundos de pausa entre pasos, para dejar pasar a los escritores
+PAUSA_ENTRE_PASOS = 0.002
+
+# Reinicios tolerados antes de copiar lo que falta en un solo paso
+MAX_REINICIOS = 3
+
+# Generaciones que se conservan por defecto (incluida la nueva)
+GENERACIONES = 5
+
+
+class ResultadoRespaldo(NamedTuple):
+    """
+    Resumen de respaldar / restaurar.
+
+    Atributos:
+        ruta      (str):   Respaldo escrito (respaldar) o leído (restaurar).
+        paginas   (int):   Páginas de la base de datos copiada.
+        pasos     (int):   Pasos de copia realizados.
+        reinicios (int):   Veces que la copia volvió a empezar por
+                           escrituras de otras conexiones.
+        segundos  (float): Duración total, verificación incluida.
+    """
+    ruta: str
+    paginas: int
+    pasos: int
+    reinicios: int
+    segundos: float
+
+
+class _Reiniciada(Exception):
+    """La copia por pasos se reinició más de MAX_REINICIOS veces."""
+
+
+def generacion(ruta: str, numero: int) -> str:
+    """Ruta de la generación `numero` (0 es la más reciente)."""
+    return ruta if numero == 0 else f"{ruta}.{numero}"
+
+
+def _copiar(origen: sqlite3.Connection, destino: sqlite3.Connection, paginas: int,
+            pausa: float, progreso: Optional[Callable]) -> tuple:
+    """
+    Copia `origen` en `destino` de a `paginas` páginas.
+
+    Returns:
+        tuple: (páginas, pasos, reinicios).
+    """
+    pasos = reinicios = paginas_totales = 0
+    anteriores = None
+
+    def _paso(_estado, restantes, total):
+        nonlocal pasos, reinicios, paginas_totales, anteriores
+        pasos += 1
+        paginas_totales = total
+        # Cada paso descuenta páginas; si no bajaron, la copia se reinició
+        if anteriores is not None and restantes >= anteriores:
+            reinicios += 1
+            if reinicios > MAX_REINICIOS:
+                raise _Reiniciada
+        anteriores = restantes
+        if progreso is not None:
+            progreso(total - restantes, total)
+        if restantes and pausa:
+            time.sleep(pausa)
+
+    try:
+        origen.backup(destino, pages=paginas, progress=_paso)
+    except _Reiniciada:
+        anteriores = None
+        origen.backup(destino, pages=-1, progress=_paso)
+    return paginas_totales, pasos, reinicios
+
+
+def _problemas(conexion: sqlite3.Connection) -> list:
+    """Mensajes de PRAGMA quick_check distintos de 'ok'."""
+    return [fila[0] for fila in conexion.execute("PRAGMA quick_check")
+            if fila[0] != "ok"]
+
+
+def _abrir_respaldo(ruta: str) -> sqlite3.Connection:
+    """Abre un respaldo existente solo para lectura."""
+    if not os.path.isfile(ruta):
+        raise ValueError(f"No existe el respaldo {ruta}")
+    return sqlite3.connect(f"{Path(ruta).resolve().as_uri()}?mode=ro", uri=True)
+
+
+def verificar(ruta: str) -> list:
+    """
+    Verifica un respaldo con PRAGMA quick_check.
+
+    Args:
+        ruta (str): Archivo de respaldo.
+
+    Returns:
+        list[str]: Problemas encontrados (vacía si el archivo está bien).
+
+    Raises:
+        ValueError: Si el archivo no existe o no es una base de datos SQLite.
+    """
+    conexion = _abrir_respaldo(ruta)
+    try:
+        return _problemas(conexion)
+    except sqlite3.DatabaseError as ex:
+        raise ValueError(f"{ruta} no es una base de datos SQLite: {ex}") from ex
+    finally:
+        conexion.close()
+
+
+def _rotar(ruta: str, generaciones: int) -> None:
+    """
+    Corre cada generación un lugar (ruta → ruta.1 → ruta.2 …) y borra las
+    que quedan fuera de las `generaciones` conservadas.
+    """
+    numero = generaciones - 1
+    while os.path.exists(generacion(ruta, numero)):
+        os.remove(generacion(ruta, numero))
+        numero += 1
+    for numero in range(generaciones - 2, -1, -1):
+        if os.path.exists(generacion(ruta, numero)):
+            os.replace(generacion(ruta, numero), generacion(ruta, numero + 1))
+
+
+def respaldar(destino: str, generaciones: int = GENERACIONES,
+              paginas: int = PAGINAS_POR_PASO, pausa: float = PAUSA_ENTRE_PASOS,
+              progreso: Optional[Callable[[int, int], None]] = None,
+              engine=engine_defecto) -> ResultadoRespaldo:
+    """
+    Respalda la base de datos mientras la aplicación sigue en uso.
+
+    Args:
+        destino (str): Archivo del respaldo; la generación anterior pasa a
+            destino.1, y así sucesivamente.
+        generaciones (int): Respaldos conservados, incluido el nuevo (>= 1).
+        paginas (int): Páginas por paso; 0 o negativo copia todo en un paso.
+        pausa (float): Segundos de espera entre pasos (>= 0).
+        progreso (Optional[Callable]): Se llama tras cada paso con
+            (páginas copiadas, páginas totales).
+        engine: Engine de SQLAlchemy (por defecto, el del proyecto).
+
+    Returns:
+        ResultadoRespaldo: Resumen de la copia.
+
+    Raises:
+        ValueError: Si un parámetro es inválido o la copia no pasa
+            PRAGMA quick_check (en ese caso no se rota nada).
+    """
+    if isinstance(generaciones, bool) or not isinstance(generaciones, int) \
+            or generaciones < 1:
+        raise ValueError("Las generaciones deben ser un entero mayor o igual a 1")
+    if isinstance(paginas, bool) or not isinstance(paginas, int):
+        raise ValueError("Las páginas por paso deben ser un entero")
+    if pausa < 0:
+        raise ValueError("La pausa entre pasos no puede ser negativa")
+
+    inicio = time.perf_counter()
+    carpeta = os.path.dirname(destino)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    temporal = f"{destino}.tmp"
+    if os.path.exists(temporal):
+        os.remove(temporal)
+    try:
+        copia = sqlite3.connect(temporal)
+        try:
+            origen = engine.raw_connection()
+            try:
+                totales, pasos, reinicios = _copiar(
+                    origen.driver_connection, copia, paginas, pausa, progreso)
+            finally:
+                origen.close()
+            # La copia hereda el modo WAL; un respaldo es un único archivo
+            copia.execute("PRAGMA journal_mode=DELETE")
+            problemas = _problemas(copia)
+        finally:
+            copia.close()
+        if problemas:
+            raise ValueError(f"El respaldo no pasó la verificación: {problemas[0]}")
+        _rotar(destino, generaciones)
+        os.replace(temporal, destino)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    return ResultadoRespaldo(destino, totales, pasos, reinicios,
+                             time.perf_counter() - inicio)
+
+
+def _ultimo_cambio(conexion: sqlite3.Connection) -> int:
+    """Último número de cambio asignado (0 si todavía no hay historial)."""
+    try:
+        fila = conexion.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'registro_cambios'").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return fila[0] if fila else 0
+
+
+def _marcar_restauracion(engine, ultimo: int):
+    """
+    Agrega la fila TABLA_RESTAURACION al historial con un número de cambio
+    mayor que `ultimo` y que los del respaldo, para que el historial siga
+    siendo creciente.
+    """
+    with engine.begin() as conexion:
+        conexion.exec_driver_sql(
+            "INSERT INTO registro_cambios (seq, tabla, operacion, id_entidad) "
+            "SELECT MAX(?, COALESCE((SELECT seq FROM sqlite_sequence "
+            "WHERE name = 'registro_cambios'), 0)) + 1, ?, 'RESTORE', 0",
+            (ultimo, TABLA_RESTAURACION))
+
+
+def restaurar(origen: str, engine=engine_defecto) -> ResultadoRespaldo:
+    """
+    Reemplaza el contenido de la base de datos por el de un respaldo.
+
+    El respaldo se verifica antes de tocar nada. La copia se hace en un
+    solo paso, de modo que las demás conexiones ven la base anterior o la
+    restaurada, nunca una mezcla; los escritores esperan mientras dura
+    (hasta el busy timeout). Si el respaldo tiene un esquema anterior se
+    aplican las migraciones pendientes.
+
+    Al final se agrega al historial una fila TABLA_RESTAURACION con un
+    número de cambio mayor que todos los anteriores a la restauración (el
+    respaldo trae un historial más corto). Las cachés, proyecciones y
+    recordatorios de cualquier proceso la leen como "recargar todo",
+    aunque otro proceso haya escrito mientras tanto.
+
+    Args:
+        origen (str): Archivo de respaldo.
+        engine: Engine de SQLAlchemy (por defecto, el del proyecto).
+
+    Returns:
+        ResultadoRespaldo: Resumen de la copia.
+
+    Raises:
+        ValueError: Si el respaldo no existe, no es una base de datos de
+            TaskMaster o no pasa PRAGMA quick_check.
+    """
+    inicio = time.perf_counter()
+    respaldo = _abrir_respaldo(origen)
+    try:
+        try:
+            problemas = _problemas(respaldo)
+            tiene_tablas = respaldo.execute(
+                "SELECT 1 FROM sqlite_schema WHERE type = 'table' AND name = 'usuarios'"
+            ).fetchone()
+        except sqlite3.DatabaseError as ex:
+            raise ValueError(f"{origen} no es una base de datos SQLite: {ex}") from ex
+        if problemas:
+            raise ValueError(f"El respaldo no pasó la verificación: {problemas[0]}")
+        if not tiene_tablas:
+            raise ValueError(f"{origen} no es un respaldo de TaskMaster Student")
+        destino = engine.raw_connection()
+        try:
+            ultimo = _ultimo_cambio(destino.driver_connection)
+            totales, pasos, reinicios = _copiar(respaldo, destino.driver_connection,
+                                                -1, 0, None)
+        finally:
+            destino.close()
+    finally:
+        respaldo.close()
+    migrar(engine)
+    _marcar_restauracion(engine, ultimo)
+    return ResultadoRespaldo(origen, totales, pasos, reinicios,
+                             time.perf_counter() - inicio)
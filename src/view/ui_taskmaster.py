@@ -3,9 +3,15 @@ TaskMaster Student — HU001 a HU011 completo
 Uso: python -m src.view.ui_taskmaster  (o copia a raíz y corre directo)
 """
 
+import threading
 import flet as ft
 from datetime import date, timedelta
-from src.logic.task_manager import TaskManager
+from functools import wraps
+from src.logic.task_manager import TaskManager, ConflictoVersionError
+from src.logic.cambios import MonitorCambios
+from src.logic.recordatorios import MotorRecordatorios
+from src.logic.consultas_lentas import desde_entorno
+from src.model.migraciones import inicializar_bd
 from src.model.modelo import Prioridad, EstadoTarea
 
 # ── Paleta ──────────────────────────────────────────────
@@ -27,6 +33,7 @@ WARN_BG = "#FEF3C7"   # Amarillo pastel
 WARN_FG = "#D97706"   # Ámbar
 FONT    = "Segoe UI"
 AVATARES = ["🎓","👩‍💼","👨‍💻","📚","🧑‍🎓","✨","💜","🌸"]
+USUARIOS_POR_PAGINA = 30   # Usuarios cargados por página en la bienvenida
 
 COLORES_MATERIA = [
     ("#3B82F6", "Azul"),
@@ -45,7 +52,23 @@ PRIORIDADES = [
     (Prioridad.Baja,  "Baja",  "#22C55E"),
 ]
 
+# Flet ejecuta cada manejador de eventos en un hilo de su pool y el monitor
+# de cambios avisa desde su propio hilo; TaskManager y los controles no son
+# seguros entre hilos, así que todo acceso a ellos pasa por este candado.
+_LOCK_UI = threading.RLock()
+
 # ── Helpers ─────────────────────────────────────────────
+def en_ui(handler):
+    """Envuelve un manejador para que se ejecute con _LOCK_UI tomado."""
+    if handler is None:
+        return None
+
+    @wraps(handler)
+    def _serializado(*args, **kwargs):
+        with _LOCK_UI:
+            return handler(*args, **kwargs)
+    return _serializado
+
 def hex_alpha(color_hex, opacity):
     """
     Convierte color hex + opacidad a formato correcto #AARRGGBB
@@ -98,7 +121,7 @@ def filled_btn(label, on_click, danger=False, disabled=False, icon=None):
     c = DANGER if danger else ACCENT
     return ft.ElevatedButton(
         text=label,
-        on_click=on_click, disabled=disabled,
+        on_click=en_ui(on_click), disabled=disabled,
         style=ft.ButtonStyle(
             bgcolor=c,
             color="#FFFFFF",
@@ -112,7 +135,7 @@ def ghost_btn(label, on_click, color=MUTED):
     return ft.TextButton(
         content=ft.Text(label, size=13, weight=ft.FontWeight.W_500,
                         font_family=FONT, color=color),
-        on_click=on_click,
+        on_click=en_ui(on_click),
     )
 
 def tfield(label, hint="", value=""):
@@ -133,7 +156,7 @@ def small_icon_btn(icon, color, on_click, tooltip=""):
         border_radius=6,
         bgcolor=hex_alpha(color, 0.10),
         alignment=ft.Alignment(0, 0),
-        on_click=on_click,
+        on_click=en_ui(on_click),
         ink=True,
         tooltip=tooltip,
     )
@@ -177,7 +200,10 @@ def main(page: ft.Page):
     page.theme_mode        = ft.ThemeMode.LIGHT
     page.theme             = ft.Theme(color_scheme_seed=ACCENT, font_family=FONT)
 
-    tm = TaskManager()
+    inicializar_bd()
+    # Registro de consultas lentas, si TASKMASTER_CONSULTAS_LENTAS_MS lo pide
+    desde_entorno()
+    tm = TaskManager(usar_proyeccion=True)
 
     area = ft.Column([], scroll=ft.ScrollMode.ADAPTIVE, expand=True)
 
@@ -219,7 +245,8 @@ def main(page: ft.Page):
                 dlg_ban, tf_n,
                 ft.Container(height=4), tf_c,
                 ft.Container(height=2),
-                T("Solo letras en el nombre · correo único · máx. 5",
+                T("Solo letras en el nombre · correo único"
+                  + (f" · máx. {tm.limite_usuarios}" if tm.limite_usuarios else ""),
                   size=10, color=MUTED),
             ], spacing=8, tight=True),
             width=360, padding=ft.Padding(0, 4, 0, 4),
@@ -243,6 +270,7 @@ def main(page: ft.Page):
     tf_en = tfield("Nombre completo")
     tf_ec = tfield("Correo electrónico")
     _editing_id = [None]
+    _editing_version = [None]
 
     def edit_close(e=None): dlg_edit.open = False; page.update()
 
@@ -251,8 +279,11 @@ def main(page: ft.Page):
         try:
             tm.editar_usuario(_editing_id[0],
                               nuevo_nombre=tf_en.value or None,
-                              nuevo_correo=tf_ec.value or None)
+                              nuevo_correo=tf_ec.value or None,
+                              version_esperada=_editing_version[0])
             edit_close(); lista_refresh()
+        except ConflictoVersionError as ex:
+            edit_show(f"{ex}. Cierra y vuelve a abrir el diálogo.", "warn")
         except (ValueError, TypeError) as ex:
             edit_show(str(ex), "error")
 
@@ -273,6 +304,7 @@ def main(page: ft.Page):
 
     def edit_open(u):
         _editing_id[0] = u.idUsuario
+        _editing_version[0] = u.version
         tm.seleccionar_usuario(u.idUsuario)
         tf_en.value = u.nombre; tf_ec.value = u.correo
         tf_en.update(); tf_ec.update()
@@ -319,8 +351,19 @@ def main(page: ft.Page):
     # ════════════════════════════════════════════════
     # LISTA USUARIOS (HU002)
     # ════════════════════════════════════════════════
-    lista_col = ft.Column([], spacing=10)
+    # ListView solo construye las tarjetas visibles; las páginas se piden
+    # con listar_usuarios (keyset) a medida que se acerca el final.
+    lista_col = ft.ListView([], spacing=10, expand=True, on_scroll_interval=100)
     ban_col, ban_show, ban_hide = make_banner()
+    _cursor_usuarios = [None]     # (nombre, idUsuario) del último cargado
+    _fin_usuarios    = [False]    # True cuando ya no quedan páginas
+
+    def _buscar_usuarios(e):
+        lista_refresh()
+
+    tf_buscar = tfield("Buscar usuario", "Nombre o correo")
+    tf_buscar.prefix_icon = ft.icons.SEARCH
+    tf_buscar.on_change = en_ui(_buscar_usuarios)
 
     def _user_card(u):
         emoji = AVATARES[u.idUsuario % len(AVATARES)]
@@ -359,11 +402,32 @@ def main(page: ft.Page):
                                 color="#00000025", offset=ft.Offset(0, 3)),
         )
 
+    def _cargar_pagina_usuarios():
+        pagina = tm.listar_usuarios(busqueda=tf_buscar.value,
+                                    despues_de=_cursor_usuarios[0],
+                                    limite=USUARIOS_POR_PAGINA)
+        for u in pagina:
+            lista_col.controls.append(_user_card(u))
+        if pagina:
+            _cursor_usuarios[0] = (pagina[-1].nombre, pagina[-1].idUsuario)
+        _fin_usuarios[0] = len(pagina) < USUARIOS_POR_PAGINA
+
+    def _scroll_usuarios(e):
+        if _fin_usuarios[0] or e.pixels < e.max_scroll_extent - 300:
+            return
+        _cargar_pagina_usuarios()
+        lista_col.update()
+
+    lista_col.on_scroll = en_ui(_scroll_usuarios)
+
     def lista_refresh():
-        usuarios = tm.listar_usuarios()
         lista_col.controls.clear()
-        for u in usuarios:
-            lista_col.controls.append(_user_card(u))
+        _cursor_usuarios[0] = None
+        _cargar_pagina_usuarios()
+        if not lista_col.controls:
+            lista_col.controls.append(T(
+                "Sin coincidencias" if tf_buscar.value else "Aún no hay usuarios",
+                size=12, color=MUTED, align=ft.TextAlign.CENTER))
         try: lista_col.update()
         except Exception: pass
 
@@ -375,7 +439,7 @@ def main(page: ft.Page):
             ], alignment=ft.MainAxisAlignment.CENTER, spacing=8),
             border=_ball(ACCENT, 1.5), border_radius=12,
             padding=ft.Padding(0, 14, 0, 14),
-            on_click=dlg_open, ink=True, bgcolor=hex_alpha(ACCENT, 0.12),
+            on_click=en_ui(dlg_open), ink=True, bgcolor=hex_alpha(ACCENT, 0.12),
         )
         return ft.Column([
             ft.Container(
@@ -389,10 +453,10 @@ def main(page: ft.Page):
                 ], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=4),
                 padding=ft.Padding(0, 0, 0, 28),
             ),
-            ban_col, lista_col,
+            ban_col, tf_buscar, lista_col,
             ft.Container(height=8),
             btn_crear,
-        ], spacing=8)
+        ], spacing=8, expand=True)
 
     # ════════════════════════════════════════════════
     # HU003 — CREAR MATERIA
@@ -414,7 +478,7 @@ def main(page: ft.Page):
                 alignment=ft.Alignment(0, 0),
                 border=ft.border.all(3, "#FFFFFF") if sel else ft.border.all(2, hex_c),
                 shadow=ft.BoxShadow(blur_radius=6, color=hex_alpha(hex_c, 0.33)) if sel else None,
-                on_click=lambda e, hc=hex_c: _pick_color(hc),
+                on_click=en_ui(lambda e, hc=hex_c: _pick_color(hc)),
                 ink=True, tooltip=nombre,
             ))
         _color_btns.controls = btns
@@ -472,6 +536,7 @@ def main(page: ft.Page):
     _emat_color_sel = [COLORES_MATERIA[0][0]]
     _emat_color_btns = ft.Row([], spacing=8, wrap=True)
     _editing_mat_id  = [None]
+    _editing_mat_version = [None]
 
     def _build_ecolor_picker():
         btns = []
@@ -485,7 +550,7 @@ def main(page: ft.Page):
                 alignment=ft.Alignment(0, 0),
                 border=ft.border.all(3, "#FFFFFF") if sel else ft.border.all(2, hex_c),
                 shadow=ft.BoxShadow(blur_radius=6, color=hex_alpha(hex_c, 0.33)) if sel else None,
-                on_click=lambda e, hc=hex_c: _epick_color(hc),
+                on_click=en_ui(lambda e, hc=hex_c: _epick_color(hc)),
                 ink=True, tooltip=nombre,
             ))
         _emat_color_btns.controls = btns
@@ -503,8 +568,11 @@ def main(page: ft.Page):
         try:
             tm.editar_materia(_editing_mat_id[0],
                               nuevo_nombre=tf_emat_nombre.value or None,
-                              nuevo_color=_emat_color_sel[0])
+                              nuevo_color=_emat_color_sel[0],
+                              version_esperada=_editing_mat_version[0])
             emat_close(); _refresh_materias()
+        except ConflictoVersionError as ex:
+            emat_show(f"{ex}. Cierra y vuelve a abrir el diálogo.", "warn")
         except (ValueError, TypeError) as ex:
             emat_show(str(ex), "error")
 
@@ -530,6 +598,7 @@ def main(page: ft.Page):
 
     def emat_open(m):
         _editing_mat_id[0] = m.idMateria
+        _editing_mat_version[0] = m.version
         tf_emat_nombre.value = m.nombre
         _emat_color_sel[0] = m.color
         tf_emat_nombre.update()
@@ -648,13 +717,7 @@ def main(page: ft.Page):
 
     def tar_open(e=None):
         # Cargar materias del usuario activo
-        from src.model.modelo import Materia
-        from sqlalchemy.orm import sessionmaker
-        from src.model.declarative_base import engine
-        S = sessionmaker(bind=engine)
-        s = S()
-        mats = s.query(Materia).filter_by(usuario_id=tm.usuario_activo.idUsuario).all()
-        s.close()
+        mats = tm.listar_materias()
         if not mats:
             ban_tar_show("Primero debes crear al menos una materia.", "warn")
             return
@@ -693,6 +756,7 @@ def main(page: ft.Page):
     )
     tf_etar_fecha  = tfield("Fecha entrega (YYYY-MM-DD)")
     _editing_tar_id = [None]
+    _editing_tar_version = [None]
 
     def etar_close(e=None): dlg_etar.open = False; page.update()
 
@@ -711,8 +775,11 @@ def main(page: ft.Page):
                 nueva_prioridad=prioridad,
                 nueva_fecha_entrega=fecha,
                 nueva_materia_id=mat_id,  # ✅ PASAR MATERIA
+                version_esperada=_editing_tar_version[0],
             )
             etar_close(); _refresh_tareas()
+        except ConflictoVersionError as ex:
+            etar_show(f"{ex}. Cierra y vuelve a abrir el diálogo.", "warn")
         except (ValueError, TypeError) as ex:
             etar_show(str(ex), "error")
 
@@ -738,25 +805,21 @@ def main(page: ft.Page):
 
     def etar_open(t):
         # ✅ CARGAR MATERIAS DEL USUARIO ACTIVO
-        from src.model.modelo import Materia
-        from sqlalchemy.orm import sessionmaker
-        from src.model.declarative_base import engine
-        S = sessionmaker(bind=engine)
-        s = S()
-        mats = s.query(Materia).filter_by(usuario_id=tm.usuario_activo.idUsuario).all()
+        mats = tm.listar_materias()
         
         # ✅ LLENAR DROPDOWN DE MATERIAS
         _etar_mat_dd.options = [ft.dropdown.Option(str(m.idMateria), m.nombre) for m in mats]
         _etar_mat_dd.value = str(t.materia_id)  # ✅ SELECCIONAR MATERIA ACTUAL
         
         _editing_tar_id[0] = t.idTarea
+        _editing_tar_version[0] = t.version
         tf_etar_titulo.value = t.titulo
-        tf_etar_desc.value   = t.descripcion or ""
+        # Los listados no traen la descripción completa: se carga aquí
+        completa = tm.seleccionar_tarea(t.idTarea)
+        tf_etar_desc.value   = (completa.descripcion if completa else None) or ""
         _etar_pri_dd.value   = t.prioridad.name if t.prioridad else "Media"
         tf_etar_fecha.value  = str(t.fechaEntrega)
-        
-        s.close()
-        
+
         tf_etar_titulo.update(); tf_etar_desc.update()
         _etar_mat_dd.update()  # ✅ ACTUALIZAR DROPDOWN
         _etar_pri_dd.update(); tf_etar_fecha.update()
@@ -805,15 +868,20 @@ def main(page: ft.Page):
     mat_body    = ft.Column([], spacing=10, scroll=ft.ScrollMode.ADAPTIVE, expand=True)
     ban_mat_col, ban_mat_show, ban_mat_hide = make_banner()
 
-    def _materia_card(m, num_tareas=0):
+    def _materia_card(m, resumen=None):
+        if resumen is None or resumen.total == 0:
+            detalle = "0 tareas"
+        else:
+            detalle = f"{resumen.total} tareas · {resumen.pendientes} pendientes"
+            if resumen.primera_pendiente and resumen.primera_pendiente < date.today():
+                detalle += " · con vencidas"
         return ft.Container(
             content=ft.Row([
                 ft.Container(width=8, bgcolor=m.color, border_radius=4,
                              height=50, margin=ft.margin.only(right=4)),
                 ft.Column([
                     T(m.nombre, size=14, weight=ft.FontWeight.W_700),
-                    T(f"{num_tareas} tareas",
-                      size=11, color=MUTED),
+                    T(detalle, size=11, color=MUTED),
                 ], spacing=2, expand=True),
                 ft.Row([
                     small_icon_btn(ft.icons.EDIT_OUTLINED, MUTED,
@@ -829,16 +897,8 @@ def main(page: ft.Page):
 
     def _refresh_materias():
         if not tm.usuario_activo: return
-        from src.model.modelo import Materia, Tarea
-        from sqlalchemy.orm import sessionmaker
-        from src.model.declarative_base import engine
-        S = sessionmaker(bind=engine)
-        s = S()
-        mats = s.query(Materia).filter_by(usuario_id=tm.usuario_activo.idUsuario).all()
-        conteos = {}
-        for m in mats:
-            conteos[m.idMateria] = s.query(Tarea).filter_by(materia_id=m.idMateria).count()
-        s.close()
+        mats = tm.listar_materias()
+        resumenes = tm.resumen_materias()
         mat_body.controls.clear()
         mat_body.controls.append(ban_mat_col)
         if not mats:
@@ -855,7 +915,7 @@ def main(page: ft.Page):
             ))
         else:
             for m in mats:
-                mat_body.controls.append(_materia_card(m, conteos.get(m.idMateria, 0)))
+                mat_body.controls.append(_materia_card(m, resumenes.get(m.idMateria)))
         try: mat_body.update()
         except Exception: pass
 
@@ -876,18 +936,37 @@ def main(page: ft.Page):
     tar_body    = ft.Column([], spacing=10, scroll=ft.ScrollMode.ADAPTIVE, expand=True)
     ban_tar_col, ban_tar_show, ban_tar_hide = make_banner()
     _filtro_estado = [None]  # None=todos, True=completadas, False=pendientes
+    btn_todas       = ft.TextButton("Todas")
+    btn_pendientes  = ft.TextButton("Pendientes")
+    btn_completadas = ft.TextButton("Completadas")
+    agenda_row      = ft.Row([], spacing=8, wrap=True)
+    _AGENDA_LIMITE  = 5
+
+    def _agenda_chip(etiqueta, tareas, fg, bg):
+        cantidad = f"{len(tareas)}+" if len(tareas) >= _AGENDA_LIMITE else f"{len(tareas)}"
+        proxima = f" · {tareas[0].titulo}" if tareas else ""
+        return ft.Container(
+            content=T(f"{etiqueta}: {cantidad}{proxima}", size=11, color=fg,
+                      weight=ft.FontWeight.W_600),
+            bgcolor=bg, border_radius=20, padding=ft.Padding(10, 4, 10, 4),
+        )
+
+    def _refresh_agenda():
+        # Widget de agenda: pendientes vencidas, de hoy y de esta semana
+        agenda = tm.agenda(horizonte=7, limite=_AGENDA_LIMITE)
+        agenda_row.controls = [
+            _agenda_chip("Vencidas", agenda.vencidas, ERR_FG, ERR_BG),
+            _agenda_chip("Hoy", agenda.hoy, WARN_FG, WARN_BG),
+            _agenda_chip("Esta semana", agenda.semana, OK_FG, OK_BG),
+        ]
+        try: agenda_row.update()
+        except Exception: pass
 
     def _tarea_card(t):
         completada = t.estado == EstadoTarea.Completada
         
-        # ✅ OBTENER MATERIA PARA MOSTRAR NOMBRE Y COLOR
-        from src.model.modelo import Materia
-        from sqlalchemy.orm import sessionmaker
-        from src.model.declarative_base import engine
-        S = sessionmaker(bind=engine)
-        s = S()
-        materia = s.query(Materia).filter_by(idMateria=t.materia_id).first()
-        s.close()
+        # ✅ OBTENER MATERIA PARA MOSTRAR NOMBRE Y COLOR (cacheada)
+        materia = tm.seleccionar_materia(t.materia_id)
         
         nombre_materia = materia.nombre if materia else "Sin materia"
         color_materia = materia.color if materia else MUTED
@@ -911,7 +990,7 @@ def main(page: ft.Page):
                         size=22,
                         color=SUCCESS if completada else BORDER,
                     ),
-                    on_click=toggle, ink=True,
+                    on_click=en_ui(toggle), ink=True,
                     border_radius=11, width=36, height=36,
                     alignment=ft.Alignment(0, 0),
                     tooltip="Marcar/desmarcar",
@@ -934,8 +1013,8 @@ def main(page: ft.Page):
                         chip_prioridad(t.prioridad),
                         chip_estado(t.estado),
                     ], spacing=8, wrap=True),
-                    T(t.descripcion or "", size=11, color=MUTED,
-                    italic=True) if t.descripcion else ft.Container(height=0),
+                    T(t.resumen, size=11, color=MUTED,
+                    italic=True) if t.resumen else ft.Container(height=0),
                     T(f"Entrega: {t.fechaEntrega}", size=10, color=MUTED),
                 ], spacing=3, expand=True),
                 # Acciones
@@ -956,29 +1035,23 @@ def main(page: ft.Page):
 
     def _refresh_tareas():
         if not tm.usuario_activo: return
-        from src.model.modelo import Tarea, Materia
-        from sqlalchemy.orm import sessionmaker
-        from src.model.declarative_base import engine
-        S = sessionmaker(bind=engine)
-        s = S()
-        # Tareas del usuario activo
-        mats = s.query(Materia).filter_by(usuario_id=tm.usuario_activo.idUsuario).all()
-        mat_ids = [m.idMateria for m in mats]
-        tareas = []
-        if mat_ids:
-            tareas = s.query(Tarea).filter(Tarea.materia_id.in_(mat_ids)).all()
-        s.close()
+        # Tareas del usuario activo, con el filtro de estado seleccionado
+        estado = {True: EstadoTarea.Completada,
+                  False: EstadoTarea.Pendiente}.get(_filtro_estado[0])
+        filtradas = tm.listar_tareas(estado=estado)
+        resumen = tm.resumen_usuario()
+        if resumen is not None:
+            btn_todas.text       = f"Todas ({resumen.total})"
+            btn_pendientes.text  = f"Pendientes ({resumen.pendientes})"
+            btn_completadas.text = f"Completadas ({resumen.completadas})"
+            for b in (btn_todas, btn_pendientes, btn_completadas):
+                try: b.update()
+                except Exception: pass
+        _refresh_agenda()
 
         tar_body.controls.clear()
         tar_body.controls.append(ban_tar_col)
 
-        # Filtro
-        filtradas = tareas
-        if _filtro_estado[0] is True:
-            filtradas = [t for t in tareas if t.estado == EstadoTarea.Completada]
-        elif _filtro_estado[0] is False:
-            filtradas = [t for t in tareas if t.estado == EstadoTarea.Pendiente]
-
         if not filtradas:
             tar_body.controls.append(ft.Container(
                 content=ft.Column([
@@ -999,11 +1072,10 @@ def main(page: ft.Page):
             _filtro_estado[0] = v
             _refresh_tareas()
 
-        filtros = ft.Row([
-            ft.TextButton("Todas",      on_click=lambda e: set_filtro(None)),
-            ft.TextButton("Pendientes", on_click=lambda e: set_filtro(False)),
-            ft.TextButton("Completadas",on_click=lambda e: set_filtro(True)),
-        ], spacing=4)
+        btn_todas.on_click       = en_ui(lambda e: set_filtro(None))
+        btn_pendientes.on_click  = en_ui(lambda e: set_filtro(False))
+        btn_completadas.on_click = en_ui(lambda e: set_filtro(True))
+        filtros = ft.Row([btn_todas, btn_pendientes, btn_completadas], spacing=4)
 
         return ft.Column([
             ft.Row([
@@ -1011,6 +1083,7 @@ def main(page: ft.Page):
                 ft.Container(expand=True),
                 filled_btn("+ Nueva tarea", tar_open, icon=ft.icons.ADD),
             ], vertical_alignment=ft.CrossAxisAlignment.CENTER),
+            agenda_row,
             filtros,
             ft.Container(height=8),
             tar_body,
@@ -1034,7 +1107,7 @@ def main(page: ft.Page):
             bgcolor=hex_alpha(ACCENT, 0.10) if active else "transparent",
             border_radius=10,
             padding=ft.Padding(14, 10, 14, 10),
-            on_click=lambda e, i=idx: _nav_to(i),
+            on_click=en_ui(lambda e, i=idx: _nav_to(i)),
             ink=True,
         )
 
@@ -1125,8 +1198,11 @@ def main(page: ft.Page):
         try:
             tm.editar_usuario(u.idUsuario,
                               nuevo_nombre=tf_de_n.value or None,
-                              nuevo_correo=tf_de_c.value or None)
+                              nuevo_correo=tf_de_c.value or None,
+                              version_esperada=u.version)
             dash_edit_close(); _refresh_sidebar_user()
+        except ConflictoVersionError as ex:
+            dash_edit_show(f"{ex}. Cierra y vuelve a abrir el diálogo.", "warn")
         except (ValueError, TypeError) as ex:
             dash_edit_show(str(ex), "error")
 
@@ -1215,7 +1291,7 @@ def main(page: ft.Page):
                                 ft.Icon(ft.icons.EDIT_OUTLINED, size=13, color=MUTED),
                                 T("Editar", size=11, color=MUTED),
                             ], spacing=5),
-                            on_click=dash_edit_open, ink=True, border_radius=7,
+                            on_click=en_ui(dash_edit_open), ink=True, border_radius=7,
                             padding=ft.Padding(10, 6, 10, 6), bgcolor=hex_alpha(MUTED, 0.07),
                         ),
                         ft.Container(
@@ -1223,7 +1299,7 @@ def main(page: ft.Page):
                                 ft.Icon(ft.icons.DELETE_OUTLINE, size=13, color=DANGER),
                                 T("Eliminar", size=11, color=DANGER),
                             ], spacing=5),
-                            on_click=dash_del_open, ink=True, border_radius=7,
+                            on_click=en_ui(dash_del_open), ink=True, border_radius=7,
                             padding=ft.Padding(10, 6, 10, 6), bgcolor=hex_alpha(DANGER, 0.07),
                         ),
                     ], spacing=6),
@@ -1233,7 +1309,7 @@ def main(page: ft.Page):
                             ft.Icon(ft.icons.LOGOUT, size=13, color=MUTED),
                             T("Cerrar sesión", size=11, color=MUTED),
                         ], spacing=6),
-                        on_click=lambda e: ir_bienvenida(),
+                        on_click=en_ui(lambda e: ir_bienvenida()),
                         ink=True, border_radius=7,
                         padding=ft.Padding(10, 6, 10, 6), bgcolor=hex_alpha(MUTED, 0.04),
                     ),
@@ -1255,23 +1331,102 @@ def main(page: ft.Page):
         ),
     ], spacing=0, expand=True)
 
+    # ════════════════════════════════════════════════
+    # RECORDATORIOS DE ENTREGA
+    # ════════════════════════════════════════════════
+    _recordatorios = [None]     # motor del usuario activo
+
+    def _mostrar_recordatorio(r):
+        # Llega desde el hilo del motor. No toma _LOCK_UI: solo usa el
+        # SnackBar (ningún manejador lo toca) y los manejadores cierran el
+        # motor esperando su hilo, por lo que tomarlo podría bloquearlos
+        page.snack_bar = ft.SnackBar(
+            T(f"🔔 «{r.titulo}» vence el {r.vence:%d/%m a las %H:%M}",
+              size=13, color="#FFFFFF"),
+            bgcolor=ACCENT, duration=8000,
+        )
+        page.snack_bar.open = True
+        page.update()
+
+    def _activar_recordatorios():
+        if _recordatorios[0] is not None:
+            _recordatorios[0].cerrar()
+            _recordatorios[0] = None
+        u = tm.usuario_activo
+        if u is not None:
+            motor = MotorRecordatorios(u.idUsuario)
+            motor.suscribir(_mostrar_recordatorio)
+            motor.iniciar()
+            _recordatorios[0] = motor
+
     # ════════════════════════════════════════════════
     # NAVEGACIÓN PRINCIPAL
     # ════════════════════════════════════════════════
     def ir_bienvenida():
+        if _recordatorios[0] is not None:
+            _recordatorios[0].cerrar()
+            _recordatorios[0] = None
         lista_refresh()
         render(build_bienvenida())
 
     def ir_dashboard():
+        _activar_recordatorios()
         _refresh_sidebar_user()
         _nav_idx[0] = 0
         _refresh_nav()
         _show_seccion(0)
         render(dashboard_view)
 
+    # ════════════════════════════════════════════════
+    # CAMBIOS HECHOS POR OTRAS VENTANAS O PROCESOS
+    # ════════════════════════════════════════════════
+    # Los cambios de esta ventana ya se reflejan al escribir
+    monitor = MonitorCambios(intervalo_s=1.0, solo_externos=True)
+
+    @en_ui
+    def _al_cambiar(cambios):
+        # Llega desde el hilo del monitor.
+        # cambios=None: el historial no alcanza, se refresca todo lo visible
+        u = tm.usuario_activo
+        if u is None:
+            if cambios is None or any(c.tabla == "usuarios" for c in cambios):
+                lista_refresh()
+            return
+        if cambios is None:
+            tablas = {"usuarios", "materias", "tareas"}
+        else:
+            tablas = {c.tabla for c in cambios if c.usuario_id == u.idUsuario}
+        if "usuarios" in tablas:
+            try:
+                vigente = tm.seleccionar_usuario(u.idUsuario)
+            except ValueError:
+                vigente = None
+            if vigente is None:     # eliminado desde otra ventana
+                tm.usuario_activo = None
+                ir_bienvenida()
+                return
+            _refresh_sidebar_user()
+        if tablas & {"materias", "tareas"}:
+            if _nav_idx[0] == 0:
+                _refresh_materias()
+            elif _nav_idx[0] == 1:
+                _refresh_tareas()
+
+    monitor.suscribir(_al_cambiar)
+
+    def _al_desconectar(e):
+        # Sin _LOCK_UI: detener() espera al hilo del monitor, que puede
+        # estar esperando el candado
+        monitor.detener()
+        if _recordatorios[0] is not None:
+            _recordatorios[0].cerrar()
+
+    page.on_disconnect = _al_desconectar
+
     tm.usuario_activo = None
     lista_refresh()
     render(build_bienvenida())
+    monitor.iniciar()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,123 @@
+"""
+test_agenda.py
+==============
+Pruebas de TaskManager.agenda: tareas pendientes vencidas, de hoy, de la
+semana y posteriores, con y sin proyección en memoria.
+
+Ejecución:
+    py -m unittest tests.test_agenda
+"""
+
+import unittest
+from datetime import date, timedelta
+from sqlalchemy import event
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.modelo import Prioridad
+
+HOY = date.today()
+
+
+class TestAgenda(unittest.TestCase):
+    """La agenda agrupa las pendientes por fecha de entrega."""
+
+    def setUp(self):
+        """Reinicia la BD y crea tareas en cada grupo de la agenda."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager(usar_cache=False)
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        m = self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.t = {dias: self.tm.crear_tarea(f"Tarea {dias}", "", Prioridad.Media,
+                                            HOY + timedelta(days=dias), m.idMateria)
+                  for dias in (0, 1, 6, 7, 30, 31)}
+        vencida = self.tm.crear_tarea("Tarea vencida", "", Prioridad.Alta, HOY,
+                                      m.idMateria)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("UPDATE tareas SET fechaEntrega = ? WHERE idTarea = ?",
+                                 ((HOY - timedelta(days=3)).isoformat(), vencida.idTarea))
+        self.vencida = vencida
+        completada = self.tm.crear_tarea("Tarea lista", "", Prioridad.Baja, HOY,
+                                         m.idMateria)
+        self.tm.marcar_tarea(completada.idTarea)
+
+    def tearDown(self):
+        """Limpia la BD después de cada test para evitar datos residuales."""
+        Base.metadata.drop_all(engine)
+
+    def _ids(self, agenda):
+        return [[t.idTarea for t in grupo] for grupo in agenda]
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_sin_usuario_activo(self):
+        """Sin usuario activo lanza ValueError."""
+        with self.assertRaises(ValueError):
+            TaskManager().agenda()
+
+    def test_rojo_parametros_invalidos(self):
+        """Horizonte negativo o límite menor que 1 lanzan ValueError."""
+        with self.assertRaises(ValueError):
+            self.tm.agenda(horizonte=-1)
+        with self.assertRaises(ValueError):
+            self.tm.agenda(limite=0)
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_grupos(self):
+        """Cada pendiente cae en su grupo; las completadas no aparecen."""
+        self.assertEqual(self._ids(self.tm.agenda()), [
+            [self.vencida.idTarea],
+            [self.t[0].idTarea],
+            [self.t[1].idTarea, self.t[6].idTarea],
+            [self.t[7].idTarea, self.t[30].idTarea],
+        ])
+
+    def test_verde_horizonte_y_limite(self):
+        """El horizonte acota los grupos futuros y el límite cada grupo."""
+        agenda = self.tm.agenda(horizonte=3, limite=1)
+        self.assertEqual(self._ids(agenda), [
+            [self.vencida.idTarea], [self.t[0].idTarea], [self.t[1].idTarea], []])
+
+    def test_verde_igual_con_proyeccion(self):
+        """Con proyección el resultado coincide y no se consulta la BD."""
+        con_proyeccion = TaskManager(usar_proyeccion=True)
+        con_proyeccion.seleccionar_usuario(self.tm.usuario_activo.idUsuario)
+        sentencias = []
+
+        def _capturar(*args):
+            sentencias.append(args[2])
+
+        event.listen(engine, "before_cursor_execute", _capturar)
+        try:
+            for horizonte in (0, 3, 30):
+                with self.subTest(horizonte=horizonte):
+                    self.assertEqual(con_proyeccion.agenda(horizonte=horizonte),
+                                     self.tm.agenda(horizonte=horizonte))
+        finally:
+            event.remove(engine, "before_cursor_execute", _capturar)
+            con_proyeccion._cerrar_proyeccion()
+        self.assertEqual(sum("UNION ALL" in s for s in sentencias), 3)
+
+    def test_verde_usa_indice_parcial(self):
+        """La consulta filtra pendientes con el literal del índice parcial."""
+        sentencias = []
+
+        def _capturar(*args):
+            sentencias.append((args[2], args[3]))
+
+        event.listen(engine, "before_cursor_execute", _capturar)
+        try:
+            self.tm.agenda()
+        finally:
+            event.remove(engine, "before_cursor_execute", _capturar)
+        sql, parametros = next(s for s in sentencias if "UNION ALL" in s[0])
+        with engine.connect() as conn:
+            plan = " ".join(f[-1] for f in conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {sql}", parametros))
+        self.assertIn("ix_tareas_pendientes_entrega", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+"""
+test_archivo.py
+===============
+Pruebas del archivo de tareas completadas: TaskManager.archivar,
+TaskManager.historial y TaskManager.restaurar_archivada.
+
+Ejecución:
+    py -m unittest tests.test_archivo
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import date, timedelta
+from src.logic.archivo import FilaHistorial, periodo
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.modelo import EstadoTarea, Prioridad
+
+MANANA = date.today() + timedelta(days=1)
+CORTE = date(2025, 8, 1)
+
+
+class TestArchivo(unittest.TestCase):
+    """Archivar, consultar y restaurar tareas completadas antiguas."""
+
+    def setUp(self):
+        """
+        Reinicia la BD y crea un usuario con tareas completadas de dos
+        semestres pasados, una pendiente antigua y una completada reciente.
+        """
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager()
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.materia = self.tm.crear_materia("Física", "#3B82F6")
+        self.ids = {}
+        for titulo, entrega, completada in (
+                ("Parcial 1", date(2025, 4, 10), True),
+                ("Informe", date(2025, 7, 20), True),
+                ("Guía vieja", date(2025, 5, 2), False),
+                ("Reciente", date(2025, 9, 1), True)):
+            tarea = self.tm.crear_tarea(titulo, "Detalle", Prioridad.Alta, MANANA,
+                                        self.materia.idMateria)
+            if completada:
+                self.tm.marcar_tarea(tarea.idTarea)
+            self._fechar(tarea.idTarea, entrega)
+            self.ids[titulo] = tarea.idTarea
+        self.dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.dir.name, "archivo.sqlite")
+
+    def tearDown(self):
+        """Limpia la BD y los archivos temporales."""
+        self.dir.cleanup()
+        Base.metadata.drop_all(engine)
+
+    @staticmethod
+    def _fechar(id_tarea: int, entrega: date):
+        # Las fechas pasadas no se pueden cargar con crear_tarea
+        with engine.begin() as conn:
+            conn.exec_driver_sql('UPDATE tareas SET "fechaEntrega" = ? WHERE "idTarea" = ?',
+                                 (entrega.isoformat(), id_tarea))
+
+    def _titulos(self) -> list:
+        return sorted(t.titulo for t in self.tm.listar_tareas())
+
+    @staticmethod
+    def _archivadas(ruta: str) -> dict:
+        with sqlite3.connect(ruta) as conexion:
+            return dict(conexion.execute(
+                'SELECT titulo, confirmada FROM tareas_archivadas').fetchall())
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_sin_usuario_activo(self):
+        """Sin usuario activo lanza ValueError."""
+        otro = TaskManager()
+        with self.assertRaises(ValueError):
+            otro.archivar(CORTE, self.ruta)
+        with self.assertRaises(ValueError):
+            otro.historial([self.ruta])
+        with self.assertRaises(ValueError):
+            otro.restaurar_archivada(self.ruta, 1)
+
+    def test_rojo_parametros_invalidos(self):
+        """Una fecha o un ID inválidos lanzan ValueError o TypeError."""
+        with self.assertRaises(ValueError):
+            self.tm.archivar("2025-08-01", self.ruta)
+        with self.assertRaises(TypeError):
+            self.tm.restaurar_archivada(self.ruta, "1")
+
+    def test_rojo_archivo_inexistente_o_ajeno(self):
+        """Consultar o restaurar de un archivo que no existe o no es de tareas."""
+        ajeno = os.path.join(self.dir.name, "ajeno.sqlite")
+        with sqlite3.connect(ajeno) as conexion:
+            conexion.execute("CREATE TABLE notas (texto TEXT)")
+        for ruta in (self.ruta, ajeno):
+            with self.subTest(ruta=os.path.basename(ruta)):
+                with self.assertRaises(ValueError):
+                    self.tm.historial([ruta])
+                with self.assertRaises(ValueError):
+                    self.tm.restaurar_archivada(ruta, self.ids["Informe"])
+        self.assertFalse(os.path.exists(self.ruta))
+
+    def test_rojo_restaurar_no_archivada(self):
+        """Una tarea que no está en el archivo, o es de otro usuario, no se restaura."""
+        self.tm.archivar(CORTE, self.ruta)
+        with self.assertRaises(ValueError):
+            self.tm.restaurar_archivada(self.ruta, self.ids["Reciente"])
+        otro = TaskManager()
+        u = otro.crear_usuario("Ana Perez", "ana@mail.com")
+        otro.seleccionar_usuario(u.idUsuario)
+        with self.assertRaises(ValueError):
+            otro.restaurar_archivada(self.ruta, self.ids["Informe"])
+
+    def test_rojo_restaurar_sin_materia(self):
+        """Si la materia ya no existe, la tarea queda en el archivo."""
+        self.tm.archivar(CORTE, self.ruta)
+        self.tm.eliminar_materia(self.materia.idMateria)
+        with self.assertRaises(ValueError):
+            self.tm.restaurar_archivada(self.ruta, self.ids["Informe"])
+        self.assertIn("Informe", self._archivadas(self.ruta))
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_archivar(self):
+        """Solo se mueven las completadas anteriores al corte."""
+        resultado = self.tm.archivar(CORTE, self.ruta)
+        self.assertEqual((resultado.tareas, resultado.archivos, resultado.omitidas),
+                         (2, [self.ruta], 0))
+        self.assertEqual(self._titulos(), ["Guía vieja", "Reciente"])
+        self.assertEqual(self.tm.contar_tareas(), 2)
+        self.assertEqual(self.tm.resumen_usuario().completadas, 1)
+        self.assertIsNone(self.tm.seleccionar_tarea(self.ids["Informe"]))
+        self.assertEqual(self._archivadas(self.ruta), {"Parcial 1": 1, "Informe": 1})
+        self.assertEqual(self.tm.archivar(CORTE, self.ruta).tareas, 0)
+
+    def test_verde_archivo_por_periodo(self):
+        """Con {periodo} cada tarea va al archivo de su semestre."""
+        ruta = os.path.join(self.dir.name, "archivo", "{periodo}.sqlite")
+        resultado = self.tm.archivar(CORTE, ruta)
+        primero = os.path.join(self.dir.name, "archivo", "2025-1.sqlite")
+        segundo = os.path.join(self.dir.name, "archivo", "2025-2.sqlite")
+        self.assertEqual(resultado.archivos, [primero, segundo])
+        self.assertEqual(self._archivadas(primero), {"Parcial 1": 1})
+        self.assertEqual(self._archivadas(segundo), {"Informe": 1})
+        self.assertEqual((periodo(date(2025, 6, 30)), periodo(date(2025, 7, 1))),
+                         ("2025-1", "2025-2"))
+
+    def test_verde_historial(self):
+        """El historial une las tareas en uso con las archivadas."""
+        self.tm.archivar(CORTE, self.ruta)
+        historial = self.tm.historial([self.ruta])
+        self.assertEqual([(f.titulo, f.archivada) for f in historial], [
+            ("Parcial 1", True), ("Guía vieja", False), ("Informe", True),
+            ("Reciente", False)])
+        self.assertEqual(historial[0], FilaHistorial(
+            self.ids["Parcial 1"], "Parcial 1", Prioridad.Alta, date(2025, 4, 10),
+            EstadoTarea.Completada, self.materia.idMateria, "Física", True))
+        self.assertEqual([f.titulo for f in self.tm.historial(
+            [self.ruta], desde=date(2025, 5, 1), hasta=date(2025, 7, 31))],
+            ["Guía vieja", "Informe"])
+
+    def test_verde_restaurar(self):
+        """La tarea vuelve con su ID y sus datos, y sale del archivo."""
+        self.tm.archivar(CORTE, self.ruta)
+        self.assertEqual(self.tm.contar_tareas(), 2)
+        tarea = self.tm.restaurar_archivada(self.ruta, self.ids["Informe"])
+        self.assertEqual(tarea.idTarea, self.ids["Informe"])
+        restaurada = self.tm.seleccionar_tarea(tarea.idTarea)
+        self.assertEqual((restaurada.titulo, restaurada.descripcion, restaurada.estado,
+                          restaurada.fechaEntrega),
+                         ("Informe", "Detalle", EstadoTarea.Completada, date(2025, 7, 20)))
+        self.assertEqual(self.tm.contar_tareas(), 3)
+        self.assertEqual(self._archivadas(self.ruta), {"Parcial 1": 1})
+
+    def test_verde_restaurar_con_id_ocupado(self):
+        """Si el ID se reutilizó, la tarea restaurada recibe uno nuevo."""
+        self.tm.archivar(CORTE, self.ruta)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                'INSERT INTO tareas ("idTarea", titulo, prioridad, "fechaEntrega", '
+                "estado, materia_id, version) VALUES (?, 'Nueva', 0, ?, 0, ?, 1)",
+                (self.ids["Informe"], MANANA.isoformat(), self.materia.idMateria))
+        tarea = self.tm.restaurar_archivada(self.ruta, self.ids["Informe"])
+        self.assertNotEqual(tarea.idTarea, self.ids["Informe"])
+        self.assertIn("Informe", self._titulos())
+        self.assertIn("Nueva", self._titulos())
+
+    def test_verde_traslado_interrumpido(self):
+        """Un traslado a medias se completa en la siguiente llamada, sin duplicados."""
+        self.tm.archivar(date(2025, 5, 1), self.ruta)
+        # Simula una interrupción entre copiar y borrar
+        with sqlite3.connect(self.ruta) as conexion:
+            conexion.execute(
+                'INSERT INTO tareas_archivadas ("idTarea", titulo, prioridad, '
+                '"fechaEntrega", estado, materia_id, materia, usuario_id, version, '
+                "archivada, confirmada) SELECT ?, 'Informe', 2, '2025-07-20', 1, ?, "
+                "'Física', ?, version, '2025-08-02', 0 FROM tareas_archivadas LIMIT 1",
+                (self.ids["Informe"], self.materia.idMateria,
+                 self.tm.usuario_activo.idUsuario))
+        with engine.begin() as conn:
+            conn.exec_driver_sql('UPDATE tareas SET version = 2 WHERE "idTarea" = ?',
+                                 (self.ids["Informe"],))
+        self.assertEqual([f.titulo for f in self.tm.historial([self.ruta])].count(
+            "Informe"), 1)
+        self.tm.archivar(CORTE, self.ruta)
+        self.assertEqual(self._archivadas(self.ruta), {"Parcial 1": 1, "Informe": 1})
+        self.assertEqual(self._titulos(), ["Guía vieja", "Reciente"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,328 @@
+"""
+test_cache.py
+=============
+Pruebas de las cachés de src.logic.cache (CacheLRU y CacheResultados) y
+de su uso dentro de TaskManager: aciertos, invalidación por mutaciones y
+detección de escrituras hechas por otras conexiones.
+
+Ejecución:
+    py -m unittest tests.test_cache
+"""
+
+import sqlite3
+import unittest
+from datetime import date
+from sqlalchemy import event
+from src.logic.cache import CacheLRU, CacheResultados
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine, db_path
+from src.model.modelo import Prioridad, EstadoTarea
+
+
+class RelojFalso:
+    """Reloj controlable para probar la expiración."""
+
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+class TestCacheLRU(unittest.TestCase):
+    """Pruebas unitarias de CacheLRU."""
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_capacidad_invalida(self):
+        """Capacidad menor a 1 debe lanzar ValueError."""
+        with self.assertRaises(ValueError):
+            CacheLRU(capacidad=0)
+
+    def test_rojo_ttl_invalido(self):
+        """TTL no positivo debe lanzar ValueError."""
+        with self.assertRaises(ValueError):
+            CacheLRU(ttl_s=0)
+
+    def test_rojo_entrada_expirada(self):
+        """Una entrada vencida cuenta como fallo y se descarta."""
+        reloj = RelojFalso()
+        cache = CacheLRU(ttl_s=10, reloj=reloj)
+        cache.guardar("a", 1)
+        reloj.ahora = 11
+        self.assertEqual(cache.obtener("a"), (False, None))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.fallos, 1)
+
+    def test_rojo_descarta_menos_usada(self):
+        """Al superar la capacidad se descarta la menos usada."""
+        cache = CacheLRU(capacidad=2)
+        cache.guardar("a", 1)
+        cache.guardar("b", 2)
+        cache.obtener("a")          # "b" pasa a ser la menos usada
+        cache.guardar("c", 3)
+        self.assertEqual(cache.obtener("b"), (False, None))
+        self.assertEqual(cache.obtener("a"), (True, 1))
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_acierto_y_estadisticas(self):
+        """Los aciertos y fallos se cuentan y se exponen."""
+        cache = CacheLRU()
+        cache.obtener("a")
+        cache.guardar("a", None)
+        self.assertEqual(cache.obtener("a"), (True, None))
+        est = cache.estadisticas()
+        self.assertEqual((est["aciertos"], est["fallos"]), (1, 1))
+        self.assertAlmostEqual(est["tasa_aciertos"], 0.5)
+
+    def test_verde_invalidar_si(self):
+        """invalidar_si elimina solo las entradas que cumplen el predicado."""
+        cache = CacheLRU()
+        for i in range(4):
+            cache.guardar(("tarea", i), i)
+        borradas = cache.invalidar_si(lambda clave, valor: valor % 2 == 0)
+        self.assertEqual(borradas, 2)
+        self.assertEqual(cache.obtener(("tarea", 1)), (True, 1))
+
+
+class TestCacheTaskManager(unittest.TestCase):
+    """Lecturas cacheadas de TaskManager y su invalidación."""
+
+    def setUp(self):
+        """Reinicia la BD y crea usuario, materia y tarea."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager()
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.materia = self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.tarea = self.tm.crear_tarea("Estudiar límites", "", Prioridad.Media,
+                                         date.today(), self.materia.idMateria)
+
+    def tearDown(self):
+        """Limpia la BD después de cada test para evitar datos residuales."""
+        Base.metadata.drop_all(engine)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_escritura_externa_invalida(self):
+        """Un cambio hecho por otra conexión no deja datos viejos."""
+        self.tm.seleccionar_materia(self.materia.idMateria)
+        externa = sqlite3.connect(db_path)
+        try:
+            externa.execute("UPDATE materias SET nombre = 'Álgebra' "
+                            "WHERE idMateria = ?", (self.materia.idMateria,))
+            externa.commit()
+        finally:
+            externa.close()
+        self.assertEqual(self.tm.seleccionar_materia(self.materia.idMateria).nombre,
+                         "Álgebra")
+
+    def test_rojo_otra_instancia_invalida(self):
+        """Las mutaciones de otro TaskManager también se detectan."""
+        self.assertEqual(len(self.tm.listar_materias()), 1)
+        otra = TaskManager()
+        otra.seleccionar_usuario(self.tm.usuario_activo.idUsuario)
+        otra.crear_materia("Física", "#0000FF")
+        self.assertEqual(len(self.tm.listar_materias()), 2)
+
+    def test_rojo_sin_usuario_activo(self):
+        """listar_materias sin usuario activo debe lanzar ValueError."""
+        self.tm.usuario_activo = None
+        with self.assertRaises(ValueError):
+            self.tm.listar_materias()
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_lecturas_repetidas_son_aciertos(self):
+        """Repetir una lectura se sirve desde la caché."""
+        for _ in range(3):
+            self.tm.seleccionar_materia(self.materia.idMateria)
+            self.tm.listar_materias()
+        est = self.tm.cache.estadisticas()
+        self.assertEqual(est["fallos"], 2)
+        self.assertEqual(est["aciertos"], 4)
+
+    def test_verde_mutaciones_invalidan(self):
+        """Las mutaciones propias invalidan solo sus claves."""
+        self.tm.seleccionar_tarea(self.tarea.idTarea)
+        self.tm.seleccionar_materia(self.materia.idMateria)
+        self.tm.editar_materia(self.materia.idMateria, nuevo_nombre="Cálculo")
+        self.tm.marcar_tarea(self.tarea.idTarea)
+
+        self.assertEqual(self.tm.seleccionar_materia(self.materia.idMateria).nombre,
+                         "Cálculo")
+        self.assertEqual(self.tm.seleccionar_tarea(self.tarea.idTarea).version,
+                         self.tarea.version + 1)
+
+    def test_verde_escritura_propia_conserva_otras_claves(self):
+        """Un commit propio no vacía toda la caché."""
+        otra = self.tm.crear_materia("Física", "#0000FF")
+        self.tm.seleccionar_materia(otra.idMateria)
+        self.tm.marcar_tarea(self.tarea.idTarea)
+        fallos = self.tm.cache.fallos
+        self.tm.seleccionar_materia(otra.idMateria)
+        self.assertEqual(self.tm.cache.fallos, fallos)
+
+    def test_verde_eliminar_materia_invalida_sus_tareas(self):
+        """Eliminar una materia invalida sus tareas cacheadas."""
+        self.tm.seleccionar_tarea(self.tarea.idTarea)
+        self.tm.eliminar_materia(self.materia.idMateria)
+        self.assertIsNone(self.tm.seleccionar_tarea(self.tarea.idTarea))
+        self.assertEqual(self.tm.listar_materias(), [])
+
+    def test_verde_cache_desactivada(self):
+        """Con usar_cache=False no hay caché."""
+        tm = TaskManager(usar_cache=False)
+        self.assertIsNone(tm.cache)
+        self.assertIsNotNone(tm.seleccionar_materia(self.materia.idMateria))
+
+
+class TestCacheResultados(unittest.TestCase):
+    """Pruebas unitarias de CacheResultados."""
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_parametros_invalidos(self):
+        """Capacidad o tamaño máximo menores a 1 deben lanzar ValueError."""
+        with self.assertRaises(ValueError):
+            CacheResultados(capacidad=0)
+        with self.assertRaises(ValueError):
+            CacheResultados(max_bytes=0)
+
+    def test_rojo_version_nueva_descarta(self):
+        """Invalidar un usuario descarta solo sus resultados."""
+        cache = CacheResultados()
+        for usuario in (1, 2):
+            cache.guardar(usuario, "q", (usuario,), cache.version(usuario))
+        cache.invalidar_usuarios(1)
+        self.assertEqual(cache.obtener(1, "q"), (False, None))
+        self.assertEqual(cache.obtener(2, "q"), (True, (2,)))
+
+    def test_rojo_invalidar_todo(self):
+        """invalidar_todo descarta los resultados de todos los usuarios."""
+        cache = CacheResultados()
+        cache.guardar(1, "q", 1, cache.version(1))
+        cache.guardar(None, "q", 2, cache.version(None))
+        cache.invalidar_todo()
+        self.assertEqual(cache.obtener(1, "q"), (False, None))
+        self.assertEqual(cache.obtener(None, "q"), (False, None))
+
+    def test_rojo_calculado_con_version_vieja(self):
+        """Un resultado calculado antes de un cambio no se guarda."""
+        cache = CacheResultados()
+        version = cache.version(1)
+        cache.invalidar_usuarios(1)
+        cache.guardar(1, "q", (1,), version)
+        self.assertEqual(len(cache), 0)
+
+    def test_rojo_limite_de_memoria(self):
+        """Al superar max_bytes se descartan las entradas más antiguas."""
+        cache = CacheResultados(max_bytes=2000)
+        for i in range(20):
+            cache.guardar(1, i, tuple(range(i * 10, i * 10 + 10)), cache.version(1))
+        est = cache.estadisticas()
+        self.assertLessEqual(est["bytes"], 2000)
+        self.assertLess(est["entradas"], 20)
+        self.assertEqual(cache.obtener(1, 19)[0], True)
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_acierto_y_estadisticas(self):
+        """Los aciertos, fallos y bytes se exponen."""
+        cache = CacheResultados()
+        cache.obtener(1, "q")
+        cache.guardar(1, "q", (1, 2, 3), cache.version(1))
+        self.assertEqual(cache.obtener(1, "q"), (True, (1, 2, 3)))
+        est = cache.estadisticas()
+        self.assertEqual((est["aciertos"], est["fallos"]), (1, 1))
+        self.assertGreater(est["bytes"], 0)
+
+
+class TestResultadosTaskManager(unittest.TestCase):
+    """Listados y conteos de TaskManager servidos desde CacheResultados."""
+
+    def setUp(self):
+        """Reinicia la BD y crea dos usuarios, con una tarea el primero."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager()
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.otro = self.tm.crear_usuario("Pedro Garcia", "pedro@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.materia = self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.tarea = self.tm.crear_tarea("Estudiar límites", "", Prioridad.Media,
+                                         date.today(), self.materia.idMateria)
+
+    def tearDown(self):
+        """Limpia la BD después de cada test para evitar datos residuales."""
+        Base.metadata.drop_all(engine)
+
+    def _sentencias(self, funcion) -> int:
+        """Cuenta las sentencias SQL que ejecuta `funcion` vía el engine."""
+        sentencias = []
+
+        def _contar(*args):
+            sentencias.append(args[2])
+
+        event.listen(engine, "before_cursor_execute", _contar)
+        try:
+            funcion()
+        finally:
+            event.remove(engine, "before_cursor_execute", _contar)
+        return len(sentencias)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_mutacion_invalida(self):
+        """Tras marcar la tarea, el filtro de pendientes se recalcula."""
+        self.assertEqual(len(self.tm.listar_tareas(estado=EstadoTarea.Pendiente)), 1)
+        self.tm.marcar_tarea(self.tarea.idTarea)
+        self.assertEqual(self.tm.listar_tareas(estado=EstadoTarea.Pendiente), [])
+        self.assertEqual(self.tm.contar_tareas(estado=EstadoTarea.Completada), 1)
+
+    def test_rojo_escritura_externa_invalida(self):
+        """Un cambio hecho por otra conexión no deja resultados viejos."""
+        self.tm.listar_tareas()
+        externa = sqlite3.connect(db_path)
+        try:
+            externa.execute("UPDATE tareas SET titulo = 'Repasar derivadas'")
+            externa.commit()
+        finally:
+            externa.close()
+        self.assertEqual(self.tm.listar_tareas()[0].titulo, "Repasar derivadas")
+
+    def test_rojo_alta_de_usuario_invalida_directorio(self):
+        """Crear un usuario invalida las páginas del directorio."""
+        self.assertEqual(len(self.tm.listar_usuarios(limite=10)), 2)
+        self.tm.crear_usuario("Ana Torres", "ana@mail.com")
+        self.assertEqual(len(self.tm.listar_usuarios(limite=10)), 3)
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_llamada_repetida_sin_consultas(self):
+        """La misma consulta repetida no vuelve a la base de datos."""
+        self.tm.listar_tareas(estado=EstadoTarea.Pendiente)
+        self.tm.contar_tareas(materia_id=self.materia.idMateria)
+        self.assertEqual(self._sentencias(lambda: (
+            self.tm.listar_tareas(estado=EstadoTarea.Pendiente),
+            self.tm.contar_tareas(materia_id=self.materia.idMateria))), 0)
+        self.assertEqual(self.tm.cache_resultados.aciertos, 2)
+
+    def test_verde_cambios_de_otro_usuario_conservan_resultados(self):
+        """Las escrituras de otro usuario no invalidan los resultados propios."""
+        self.tm.listar_tareas()
+        otra = TaskManager()
+        otra.seleccionar_usuario(self.otro.idUsuario)
+        otra.crear_materia("Física", "#0000FF")
+        self.assertEqual(self._sentencias(self.tm.listar_tareas), 0)
+
+    def test_verde_resultado_es_copia(self):
+        """Modificar la lista retornada no altera la caché."""
+        self.tm.listar_tareas().clear()
+        self.assertEqual(len(self.tm.listar_tareas()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+"""
+test_calendario.py
+==================
+Pruebas del calendario iCalendar de las entregas: formato RFC 5545
+(VTODO / VEVENT, escape y plegado de líneas), UIDs estables y
+actualización incremental con registro_cambios.
+
+Ejecución:
+    py -m unittest tests.test_calendario
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from src.logic.calendario import copiar_entradas, plegar, uid
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.modelo import Prioridad
+
+MANANA = date.today() + timedelta(days=1)
+
+
+def _entradas(texto: str) -> dict:
+    """UID → propiedades de cada entrada (sin DTSTAMP), con líneas desplegadas."""
+    entradas = {}
+    actual = None
+    for linea in texto.replace("\r\n ", "").split("\r\n"):
+        clave, _, valor = linea.partition(":")
+        if clave == "UID":
+            actual = entradas.setdefault(valor, {})
+        elif clave.startswith("END") and valor != "VCALENDAR":
+            actual = None
+        elif actual is not None and clave != "DTSTAMP":
+            actual[clave] = valor
+    return entradas
+
+
+class TestCalendario(unittest.TestCase):
+    """Calendario de entregas pendientes e incremental."""
+
+    def setUp(self):
+        """Reinicia la BD y crea un usuario con una materia y tres tareas."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager()
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.materia = self.tm.crear_materia("Física, Química", "#3B82F6")
+        self.tareas = [self.tm.crear_tarea(f"Tarea {i}", "", Prioridad.Media,
+                                           MANANA, self.materia.idMateria).idTarea
+                       for i in range(3)]
+        self.dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.dir.name, "entregas.ics")
+
+    def tearDown(self):
+        """Limpia la BD y los archivos temporales."""
+        self.dir.cleanup()
+        Base.metadata.drop_all(engine)
+
+    def _leer(self) -> str:
+        with open(self.ruta, encoding="utf-8", newline="") as archivo:
+            return archivo.read()
+
+    def _completo(self, componente="VTODO") -> dict:
+        salida = io.StringIO(newline="")
+        self.tm.exportar_calendario(salida, componente)
+        return _entradas(salida.getvalue())
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_sin_usuario_activo(self):
+        """Sin usuario activo lanza ValueError."""
+        with self.assertRaises(ValueError):
+            TaskManager().exportar_calendario(io.StringIO())
+        with self.assertRaises(ValueError):
+            TaskManager().actualizar_calendario(self.ruta)
+
+    def test_rojo_componente_desconocido(self):
+        """Un componente distinto de VTODO o VEVENT lanza ValueError."""
+        with self.assertRaises(ValueError):
+            self.tm.exportar_calendario(io.StringIO(), "VJOURNAL")
+        with self.assertRaises(ValueError):
+            self.tm.actualizar_calendario(self.ruta, "vtodo")
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_vtodo(self):
+        """Cada tarea pendiente es un VTODO con UID estable, escapado y en CRLF."""
+        self.tm.marcar_tarea(self.tareas[2])
+        self.tm.editar_tarea(self.tareas[0], nueva_prioridad=Prioridad.Alta)
+        resultado = self.tm.exportar_calendario(self.ruta)
+        texto = self._leer()
+        self.assertTrue(texto.startswith("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"))
+        self.assertTrue(texto.endswith("END:VCALENDAR\r\n"))
+        self.assertNotIn("\n", texto.replace("\r\n", ""))
+        self.assertEqual(resultado.entradas, 2)
+        self.assertEqual(_entradas(texto)[uid(self.tareas[0])], {
+            "SUMMARY": "Tarea 0", "CATEGORIES": "Física\\, Química",
+            "PRIORITY": "1", "SEQUENCE": "1", "DUE;VALUE=DATE": f"{MANANA:%Y%m%d}",
+            "STATUS": "NEEDS-ACTION"})
+
+    def test_verde_vevent(self):
+        """Como VEVENT la entrega es un evento de día completo."""
+        propiedades = self._completo("VEVENT")[uid(self.tareas[1])]
+        self.assertEqual(propiedades["DTSTART;VALUE=DATE"], f"{MANANA:%Y%m%d}")
+        self.assertEqual(propiedades["DTEND;VALUE=DATE"],
+                         f"{MANANA + timedelta(days=1):%Y%m%d}")
+
+    def test_verde_plegado(self):
+        """Las líneas largas se parten a 75 octetos sin cortar caracteres."""
+        linea = "SUMMARY:" + "ñ" * 100
+        plegada = plegar(linea)
+        self.assertTrue(all(len(parte.encode()) <= 75
+                            for parte in plegada.split("\r\n")))
+        self.assertEqual(plegada.replace("\r\n ", "").rstrip("\r\n"), linea)
+
+    def test_verde_copiar_por_tramos(self):
+        """La copia da lo mismo con tramos pequeños y con muchos UID a quitar."""
+        self.tm.exportar_calendario(self.ruta)
+        esperado = _entradas(self._leer())
+        del esperado[uid(self.tareas[1])]
+        ajenas = {uid(i) for i in range(1000, 1100)}
+        for tamano, quitar in ((7, {uid(self.tareas[1])}),
+                               (1 << 20, ajenas | {uid(self.tareas[1])})):
+            with self.subTest(tamano=tamano):
+                salida = io.StringIO(newline="")
+                with open(self.ruta, encoding="utf-8", newline="") as anterior:
+                    copiadas = copiar_entradas(anterior, salida, "VTODO", quitar, tamano)
+                self.assertEqual(copiadas, 2)
+                self.assertEqual(_entradas(salida.getvalue()), esperado)
+
+    def test_verde_sin_cambios_no_reescribe(self):
+        """Sin cambios del usuario el archivo queda igual."""
+        self.tm.actualizar_calendario(self.ruta)
+        antes = self._leer()
+        otro = TaskManager()
+        otro.crear_usuario("Ana Perez", "ana@mail.com")
+        resultado = self.tm.actualizar_calendario(self.ruta)
+        self.assertEqual((resultado.entradas, resultado.escritas), (None, 0))
+        self.assertEqual(self._leer(), antes)
+
+    def test_verde_incremental(self):
+        """Solo se regeneran las tareas cambiadas; el resultado es el completo."""
+        self.assertTrue(self.tm.actualizar_calendario(self.ruta).completo)
+        anterior = self._leer()
+        self.tm.editar_tarea(self.tareas[0], nuevo_titulo="Informe final")
+        self.tm.marcar_tarea(self.tareas[1])
+        nueva = self.tm.crear_tarea("Parcial", "", Prioridad.Baja, MANANA,
+                                    self.materia.idMateria).idTarea
+        resultado = self.tm.actualizar_calendario(self.ruta)
+        self.assertEqual((resultado.entradas, resultado.escritas, resultado.completo),
+                         (3, 2, False))
+        texto = self._leer()
+        self.assertEqual(_entradas(texto), self._completo())
+        self.assertIn(uid(nueva), _entradas(texto))
+        bloque = anterior[anterior.index(f"BEGIN:VTODO\r\nUID:{uid(self.tareas[2])}"):]
+        bloque = bloque[:bloque.index("END:VTODO\r\n")]
+        self.assertIn(bloque, texto)
+
+    def test_verde_materia_renombrada(self):
+        """Renombrar la materia regenera todas sus tareas."""
+        self.tm.actualizar_calendario(self.ruta)
+        self.tm.editar_materia(self.materia.idMateria, nuevo_nombre="Física")
+        resultado = self.tm.actualizar_calendario(self.ruta)
+        self.assertEqual(resultado.escritas, 3)
+        self.assertEqual({p["CATEGORIES"] for p in _entradas(self._leer()).values()},
+                         {"Física"})
+
+    def test_verde_materia_eliminada(self):
+        """Eliminar la materia quita sus tareas del calendario."""
+        self.tm.actualizar_calendario(self.ruta)
+        self.tm.eliminar_materia(self.materia.idMateria)
+        self.tm.actualizar_calendario(self.ruta)
+        self.assertEqual(_entradas(self._leer()), {})
+
+    def test_verde_regenera_archivo_ajeno(self):
+        """Un archivo sin marcas o de otro componente se regenera completo."""
+        with open(self.ruta, "w", encoding="utf-8") as archivo:
+            archivo.write("BEGIN:VCALENDAR\r\nEND:VCALENDAR\r\n")
+        self.assertTrue(self.tm.actualizar_calendario(self.ruta).completo)
+        resultado = self.tm.actualizar_calendario(self.ruta, "VEVENT")
+        self.assertEqual((resultado.entradas, resultado.completo), (3, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
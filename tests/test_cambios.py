@@ -0,0 +1,194 @@
+"""
+test_cambios.py
+===============
+Pruebas del registro de cambios mantenido por triggers y del servicio de
+notificación basado en PRAGMA data_version (src.logic.cambios).
+
+Ejecución:
+    py -m unittest tests.test_cambios
+"""
+
+import sqlite3
+import threading
+import unittest
+from datetime import date
+from src.logic.cambios import DetectorCambios, MonitorCambios
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine, db_path
+from src.model.modelo import Prioridad, MAX_REGISTRO_CAMBIOS
+
+
+def _registro():
+    """Retorna el historial completo como tuplas (tabla, operacion, id, usuario)."""
+    with engine.connect() as conn:
+        return [tuple(f) for f in conn.exec_driver_sql(
+            "SELECT tabla, operacion, id_entidad, usuario_id "
+            "FROM registro_cambios ORDER BY seq")]
+
+
+class TestRegistroCambios(unittest.TestCase):
+    """Los triggers registran cada cambio con su usuario."""
+
+    def setUp(self):
+        """Reinicia la BD y crea un usuario activo."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager()
+        self.usuario = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(self.usuario.idUsuario)
+
+    def tearDown(self):
+        """Limpia la BD después de cada test para evitar datos residuales."""
+        Base.metadata.drop_all(engine)
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_registra_operaciones_con_usuario(self):
+        """INSERT, UPDATE y DELETE quedan registrados con el usuario dueño."""
+        uid = self.usuario.idUsuario
+        m = self.tm.crear_materia("Matemáticas", "#FF5733")
+        t = self.tm.crear_tarea("Estudiar límites", "", Prioridad.Media,
+                                date.today(), m.idMateria)
+        self.tm.marcar_tarea(t.idTarea)
+        self.tm.eliminar_tarea(t.idTarea)
+        self.assertEqual(_registro(), [
+            ("usuarios", "INSERT", uid, uid),
+            ("materias", "INSERT", m.idMateria, uid),
+            ("tareas", "INSERT", t.idTarea, uid),
+            ("tareas", "UPDATE", t.idTarea, uid),
+            ("tareas", "DELETE", t.idTarea, uid),
+        ])
+
+    def test_verde_contadores_por_tabla(self):
+        """contadores_cambios acumula los cambios de cada tabla."""
+        m = self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.tm.editar_materia(m.idMateria, nuevo_color="#000000")
+        with engine.connect() as conn:
+            contadores = dict(conn.exec_driver_sql(
+                "SELECT tabla, cambios FROM contadores_cambios").fetchall())
+        self.assertEqual(contadores, {"usuarios": 1, "materias": 2})
+
+    def test_verde_historial_acotado(self):
+        """El historial conserva como máximo MAX_REGISTRO_CAMBIOS filas."""
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO registro_cambios (tabla, operacion, id_entidad) "
+                "VALUES ('tareas', 'UPDATE', ?)",
+                [(i,) for i in range(MAX_REGISTRO_CAMBIOS + 10)])
+            total = conn.exec_driver_sql(
+                "SELECT COUNT(*) FROM registro_cambios").scalar()
+        self.assertEqual(total, MAX_REGISTRO_CAMBIOS)
+
+
+class TestMonitorCambios(unittest.TestCase):
+    """Notificación de cambios a suscriptores."""
+
+    def setUp(self):
+        """Reinicia la BD, crea un usuario y un monitor sin hilo."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager()
+        self.usuario = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(self.usuario.idUsuario)
+        self.detector = DetectorCambios(db_path)
+        self.monitor = MonitorCambios(intervalo_s=0.01, detector=self.detector)
+        self.recibidos = []
+        self.monitor.suscribir(self.recibidos.append)
+
+    def tearDown(self):
+        """Detiene el monitor y limpia la BD."""
+        self.monitor.detener()
+        self.detector.cerrar()
+        Base.metadata.drop_all(engine)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_intervalo_invalido(self):
+        """Un intervalo no positivo debe lanzar ValueError."""
+        with self.assertRaises(ValueError):
+            MonitorCambios(intervalo_s=0, detector=self.detector)
+
+    def test_rojo_sin_cambios_no_notifica(self):
+        """Sin escrituras no se notifica y el sondeo es una sola consulta."""
+        consultas = []
+        self.detector._conn.set_trace_callback(consultas.append)
+        self.assertFalse(self.monitor.revisar())
+        self.assertEqual(consultas, ["PRAGMA data_version"])
+        self.assertEqual(self.recibidos, [])
+
+    def test_rojo_tablas_recreadas_piden_recargar(self):
+        """Si el historial se reinicia, los suscriptores reciben None."""
+        self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.monitor.revisar()
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.assertTrue(self.monitor.revisar())
+        self.assertIsNone(self.recibidos[-1])
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_notifica_entidades_cambiadas(self):
+        """El suscriptor recibe las entidades modificadas."""
+        m = self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.assertTrue(self.monitor.revisar())
+        self.assertEqual([(c.tabla, c.operacion, c.id_entidad) for c in self.recibidos[0]],
+                         [("materias", "INSERT", m.idMateria)])
+
+    def test_verde_filtra_por_usuario(self):
+        """Una suscripción por usuario ignora los cambios de otros."""
+        otros = []
+        otro = self.tm.crear_usuario("Pedro Garcia", "pedro@mail.com")
+        self.monitor.revisar()
+        self.monitor.suscribir(otros.append, usuario_id=otro.idUsuario)
+        self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.monitor.revisar()
+        self.assertEqual(otros, [])
+
+    def test_verde_detecta_escritura_de_otra_conexion(self):
+        """Un cambio hecho fuera de SQLAlchemy también se notifica."""
+        externa = sqlite3.connect(db_path)
+        try:
+            externa.execute("UPDATE usuarios SET nombre = 'Juan Pablo'")
+            externa.commit()
+        finally:
+            externa.close()
+        self.assertTrue(self.monitor.revisar())
+        self.assertEqual(self.recibidos[0][0].tabla, "usuarios")
+
+    def test_verde_solo_externos_omite_escrituras_propias(self):
+        """Con solo_externos, las escrituras de este proceso no se notifican."""
+        externos = []
+        monitor = MonitorCambios(detector=self.detector, solo_externos=True)
+        monitor.suscribir(externos.append)
+        self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.assertFalse(monitor.revisar())
+        externa = sqlite3.connect(db_path)
+        try:
+            externa.execute("UPDATE usuarios SET nombre = 'Juan Pablo'")
+            externa.commit()
+        finally:
+            externa.close()
+        self.tm.crear_materia("Física", "#0000FF")
+        self.assertTrue(monitor.revisar())
+        self.assertEqual([c.tabla for c in externos[0]], ["usuarios"])
+
+    def test_verde_cancelar_suscripcion(self):
+        """Tras cancelar, el suscriptor deja de recibir cambios."""
+        otros = []
+        cancelar = self.monitor.suscribir(otros.append)
+        cancelar()
+        self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.monitor.revisar()
+        self.assertEqual(otros, [])
+
+    def test_verde_hilo_de_sondeo(self):
+        """Con el hilo iniciado, el cambio llega sin llamar a revisar()."""
+        llego = threading.Event()
+        self.monitor.suscribir(lambda cambios: llego.set())
+        self.monitor.iniciar()
+        self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.assertTrue(llego.wait(timeout=5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+test_cola_escritura.py
+======================
+Pruebas unitarias de la cola de escritura con commit agrupado
+(src.logic.cola_escritura).
+
+Verifica que las mutaciones enviadas a través de la cola conservan la
+semántica de cada operación (resultado o error propio por llamador) y que
+varias operaciones concurrentes se confirman en un mismo lote.
+
+Ejecución:
+    py -m unittest tests.test_cola_escritura
+"""
+
+import threading
+import unittest
+from datetime import date
+from src.logic.cola_escritura import ColaEscritura
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.modelo import Prioridad, EstadoTarea
+
+
+class TestColaEscritura(unittest.TestCase):
+    """Pruebas del hilo escritor único y del commit agrupado."""
+
+    def setUp(self):
+        """Reinicia la BD y crea un TaskManager que escribe vía cola."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.cola = ColaEscritura(ventana_ms=20.0)
+        self.tm = TaskManager(cola_escritura=self.cola)
+        usuario = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(usuario.idUsuario)
+        self.materia = self.tm.crear_materia("Matemáticas", "#FF5733")
+
+    def tearDown(self):
+        """Detiene el hilo escritor y limpia la BD."""
+        self.cola.cerrar()
+        Base.metadata.drop_all(engine)
+
+    def _crear_tarea(self, titulo="Tarea de prueba"):
+        return self.tm.crear_tarea(titulo, "", Prioridad.Media,
+                                   date.today(), self.materia.idMateria)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_tamano_lote_invalido(self):
+        """Un lote máximo menor a 1 debe lanzar ValueError."""
+        with self.assertRaises(ValueError):
+            ColaEscritura(max_lote=0)
+
+    def test_rojo_error_se_entrega_al_llamador(self):
+        """El ValueError de la operación llega intacto al llamador."""
+        with self.assertRaises(ValueError) as ctx:
+            self.tm.marcar_tarea(9999)
+        self.assertIn("tarea", str(ctx.exception).lower())
+
+    def test_rojo_enviar_tras_cerrar(self):
+        """Enviar a una cola cerrada debe lanzar RuntimeError."""
+        self.cola.cerrar()
+        with self.assertRaises(RuntimeError):
+            self.cola.enviar(lambda session: None)
+
+    def test_rojo_error_no_afecta_al_resto_del_lote(self):
+        """Una operación fallida no revierte las demás del mismo lote."""
+        tarea = self._crear_tarea()
+        resultados = {}
+
+        def marcar(clave, tarea_id):
+            try:
+                resultados[clave] = self.tm.marcar_tarea(tarea_id).estado
+            except ValueError as ex:
+                resultados[clave] = ex
+
+        hilos = [threading.Thread(target=marcar, args=("ok", tarea.idTarea)),
+                 threading.Thread(target=marcar, args=("error", 9999))]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+
+        self.assertEqual(resultados["ok"], EstadoTarea.Completada)
+        self.assertIsInstance(resultados["error"], ValueError)
+        persistida = self.tm.seleccionar_tarea(tarea.idTarea)
+        self.assertEqual(persistida.estado, EstadoTarea.Completada)
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_resultado_desvinculado(self):
+        """La tarea devuelta por la cola es utilizable sin sesión."""
+        tarea = self._crear_tarea("Parcial uno")
+        self.assertIsNotNone(tarea.idTarea)
+        self.assertEqual(tarea.titulo, "Parcial uno")
+        self.assertEqual(tarea.estado, EstadoTarea.Pendiente)
+
+    def test_verde_operaciones_concurrentes_se_agrupan(self):
+        """Varias mutaciones concurrentes se confirman en menos commits."""
+        tareas = [self._crear_tarea(f"Tarea numero {i}") for i in range(20)]
+        lotes_antes = self.cola.lotes
+        barrera = threading.Barrier(len(tareas))
+
+        def marcar(tarea_id):
+            barrera.wait()
+            self.tm.marcar_tarea(tarea_id)
+
+        hilos = [threading.Thread(target=marcar, args=(t.idTarea,))
+                 for t in tareas]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+
+        self.assertLess(self.cola.lotes - lotes_antes, len(tareas))
+        for t in tareas:
+            self.assertEqual(self.tm.seleccionar_tarea(t.idTarea).estado,
+                             EstadoTarea.Completada)
+
+    def test_verde_cerrar_procesa_pendientes(self):
+        """Cerrar la cola confirma las operaciones ya encoladas."""
+        tarea = self._crear_tarea()
+        usuario_id = self.tm.usuario_activo.idUsuario
+
+        def _op(session):
+            from src.model.modelo import Tarea
+            t = session.get(Tarea, tarea.idTarea)
+            t.titulo = f"Renombrada por {usuario_id}"
+            return t
+
+        futuro = self.cola.enviar(_op)
+        self.cola.cerrar()
+        self.assertEqual(futuro.result().titulo, f"Renombrada por {usuario_id}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+"""
+test_consultas_lentas.py
+========================
+Pruebas del registro de consultas lentas (src.logic.consultas_lentas):
+umbral, redacción de parámetros, origen, EXPLAIN QUERY PLAN una vez por
+sentencia, rotación del archivo y resumen por tiempo total.
+
+Ejecución:
+    py -m unittest tests.test_consultas_lentas
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+from sqlalchemy import event
+from src.logic import consultas_lentas
+from src.logic.consultas_lentas import RegistroConsultasLentas, redactar, resumir
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.modelo import Prioridad
+
+MANANA = date.today() + timedelta(days=1)
+
+
+class TestConsultasLentas(unittest.TestCase):
+    """Anotar y resumir las sentencias lentas del engine."""
+
+    def setUp(self):
+        """Reinicia la BD, crea un usuario con una materia y un registro temporal."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager(usar_cache=False)
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.materia = self.tm.crear_materia("Física", "#3B82F6")
+        self.dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.dir.name, "lentas", "consultas.log")
+        self.registros = []
+
+    def tearDown(self):
+        """Desactiva los registros y limpia la BD y los archivos temporales."""
+        for registro in self.registros:
+            registro.desactivar()
+        self.dir.cleanup()
+        Base.metadata.drop_all(engine)
+
+    def _activar(self, **opciones) -> RegistroConsultasLentas:
+        registro = RegistroConsultasLentas(self.ruta, **opciones)
+        self.registros.append(registro)
+        registro.activar()
+        return registro
+
+    def _entradas(self) -> list:
+        return list(consultas_lentas.leer(self.ruta))
+
+    def _crear(self, titulo: str):
+        self.tm.crear_tarea(titulo, "Secreto", Prioridad.Media, MANANA,
+                            self.materia.idMateria)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_parametros_invalidos(self):
+        """Umbral, tamaño o copias fuera de rango lanzan ValueError."""
+        for parametros in ({"umbral_ms": -1}, {"max_bytes": 0}, {"copias": -1}):
+            with self.subTest(**parametros):
+                with self.assertRaises(ValueError):
+                    RegistroConsultasLentas(self.ruta, **parametros)
+        with self.assertRaises(ValueError):
+            resumir(self.ruta)
+
+    def test_rojo_variable_de_entorno(self):
+        """Sin la variable no se activa nada; con un valor inválido, ValueError."""
+        with mock.patch.dict(os.environ, {consultas_lentas.VARIABLE_ENTORNO: ""}):
+            self.assertIsNone(consultas_lentas.desde_entorno())
+        with mock.patch.dict(os.environ, {consultas_lentas.VARIABLE_ENTORNO: "rápido"}):
+            with self.assertRaises(ValueError):
+                consultas_lentas.desde_entorno()
+
+    def test_rojo_bajo_el_umbral(self):
+        """Las sentencias más rápidas que el umbral no se anotan."""
+        self._activar(umbral_ms=60_000)
+        self._crear("Informe")
+        self.tm.listar_tareas()
+        self.assertFalse(os.path.exists(self.ruta))
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_anota_con_origen_y_parametros_redactados(self):
+        """Cada sentencia lleva duración, origen y parámetros sin textos."""
+        self._activar(umbral_ms=0)
+        self._crear("Informe")
+        entradas = self._entradas()
+        insercion = next(e for e in entradas if e["sentencia"].startswith("INSERT INTO tareas"))
+        self.assertEqual(insercion["origen"], "TaskManager.crear_tarea")
+        self.assertGreaterEqual(insercion["ms"], 0)
+        self.assertIn("<texto:7>", insercion["parametros"])
+        self.assertIn(self.materia.idMateria, insercion["parametros"])
+        with open(self.ruta, encoding="utf-8") as archivo:
+            contenido = archivo.read()
+        self.assertNotIn("Informe", contenido)
+        self.assertNotIn("Secreto", contenido)
+
+    def test_verde_plan_una_vez_por_sentencia(self):
+        """EXPLAIN QUERY PLAN se captura solo la primera vez."""
+        self._activar(umbral_ms=0)
+        for _ in range(3):
+            self.tm.listar_tareas(materia_id=self.materia.idMateria)
+        sentencia = next(e["sentencia"] for e in self._entradas()
+                         if "FROM tareas" in e["sentencia"])
+        iguales = [e for e in self._entradas() if e["sentencia"] == sentencia]
+        self.assertEqual(len(iguales), 3)
+        self.assertTrue(iguales[0]["plan"])
+        self.assertTrue(any("tareas" in linea for linea in iguales[0]["plan"]))
+        self.assertTrue(all("plan" not in e for e in iguales[1:]))
+
+    def test_verde_origen_fuera_de_task_manager(self):
+        """Una sentencia emitida fuera de TaskManager lleva su archivo y función."""
+        self._activar(umbral_ms=0)
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT COUNT(*) FROM tareas").scalar()
+        entrada = next(e for e in self._entradas() if "COUNT(*)" in e["sentencia"])
+        self.assertEqual(entrada["origen"],
+                         "test_consultas_lentas.py:test_verde_origen_fuera_de_task_manager")
+        self.assertEqual(len(entrada["plan"]), 1)
+        self.assertTrue(entrada["plan"][0].startswith("SCAN tareas"))
+
+    def test_verde_desactivar(self):
+        """Desactivado quita los listeners y deja de escribir."""
+        registro = self._activar(umbral_ms=0)
+        self._crear("Informe")
+        registro.desactivar()
+        self.assertFalse(registro.activo)
+        self.assertFalse(event.contains(engine, "after_cursor_execute", registro._despues))
+        antes = len(self._entradas())
+        self._crear("Guía 3")
+        self.assertEqual(len(self._entradas()), antes)
+
+    def test_verde_rotacion(self):
+        """Al llegar al tamaño máximo se rota, conservando `copias` archivos."""
+        self._activar(umbral_ms=0, max_bytes=2000, copias=2)
+        for i in range(10):
+            self._crear(f"Tarea {i}")
+        archivos = sorted(os.listdir(os.path.dirname(self.ruta)))
+        self.assertEqual(archivos, ["consultas.log", "consultas.log.1", "consultas.log.2"])
+        fechas = [e["fecha"] for e in self._entradas()]
+        self.assertEqual(fechas, sorted(fechas))
+
+    def test_verde_resumen_por_tiempo_total(self):
+        """resumir agrupa por sentencia y ordena por tiempo total."""
+        os.makedirs(os.path.dirname(self.ruta))
+        with open(self.ruta, "w", encoding="utf-8") as archivo:
+            for ms, origen, sentencia, plan in (
+                    (30, "TaskManager.agenda", "SELECT 1", ["SCAN tareas"]),
+                    (30, "ui_taskmaster.refrescar", "SELECT  1", None),
+                    (50, "TaskManager.listar_tareas", "SELECT 2", ["SEARCH tareas"]),
+                    (5, "TaskManager.agenda", "SELECT 1", None)):
+                entrada = {"ms": ms, "origen": origen, "sentencia": sentencia}
+                if plan:
+                    entrada["plan"] = plan
+                archivo.write(json.dumps(entrada) + "\n")
+            archivo.write("línea dañada\n")
+        resumen = resumir(self.ruta)
+        self.assertEqual([(r.sentencia, r.veces, r.total_ms) for r in resumen],
+                         [("SELECT 1", 3, 65), ("SELECT 2", 1, 50)])
+        self.assertEqual(resumen[0].origenes,
+                         ("TaskManager.agenda", "ui_taskmaster.refrescar"))
+        self.assertEqual((resumen[0].maximo_ms, resumen[0].plan), (30, ("SCAN tareas",)))
+        self.assertEqual(len(resumir(self.ruta, limite=1)), 1)
+
+    def test_verde_redactar(self):
+        """Números y NULL se conservan; textos y blobs, solo su largo."""
+        self.assertEqual(redactar(("Ana", 3, None, 1.5, b"xy")),
+                         ["<texto:3>", 3, None, 1.5, "<bytes:2>"])
+        self.assertEqual(redactar({"correo": "a@b.c", "id": 7}),
+                         {"correo": "<texto:5>", "id": 7})
+        self.assertEqual(redactar([("Ana", 1), ("Luis", 2)], executemany=True),
+                         {"filas": 2, "primera": ["<texto:3>", 1]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+test_exportacion.py
+===================
+Pruebas de TaskManager.exportar: escritura de CSV y JSONL (también
+comprimidos), exportación por rangos de ID y lectura con la importación.
+
+Ejecución:
+    py -m unittest tests.test_exportacion
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from src.logic.exportacion import CAMPOS_EXPORTACION
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.modelo import Prioridad
+
+MANANA = date.today() + timedelta(days=1)
+
+
+class TestExportacion(unittest.TestCase):
+    """Exportación en streaming de materias y tareas."""
+
+    def setUp(self):
+        """Reinicia la BD y crea un usuario con dos materias y cinco tareas."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager()
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        fisica = self.tm.crear_materia("Física", "#3B82F6")
+        mate = self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.tareas = [
+            self.tm.crear_tarea(f"Tarea {i}", "Péndulo, informe" if i == 0 else "",
+                                Prioridad.Alta if i % 2 else Prioridad.Baja,
+                                MANANA + timedelta(days=i),
+                                (fisica, mate)[i % 2].idMateria,
+                                esfuerzo=6 if i == 0 else None).idTarea
+            for i in range(5)]
+        self.tm.marcar_tarea(self.tareas[1])
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Limpia la BD y los archivos temporales."""
+        self.dir.cleanup()
+        Base.metadata.drop_all(engine)
+
+    def _ruta(self, nombre: str) -> str:
+        return os.path.join(self.dir.name, nombre)
+
+    def _jsonl(self, **kwargs) -> list:
+        salida = io.StringIO()
+        self.tm.exportar(salida, "jsonl", **kwargs)
+        return [json.loads(linea) for linea in salida.getvalue().splitlines()]
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_sin_usuario_activo(self):
+        """Sin usuario activo lanza ValueError."""
+        with self.assertRaises(ValueError):
+            TaskManager().exportar(io.StringIO(), "csv")
+
+    def test_rojo_formato_o_rango_invalido(self):
+        """Un formato desconocido o un ID negativo lanza ValueError."""
+        with self.assertRaises(ValueError):
+            self.tm.exportar(self._ruta("datos.txt"))
+        with self.assertRaises(ValueError):
+            self.tm.exportar(io.StringIO(), "xml")
+        for cota in (-1, 1.5, True):
+            with self.subTest(cota=cota):
+                with self.assertRaises(ValueError):
+                    self.tm.exportar(io.StringIO(), "csv", desde_id=cota)
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_exporta_jsonl(self):
+        """Primero las materias y luego las tareas en orden de ID."""
+        registros = self._jsonl()
+        self.assertEqual([r["tipo"] for r in registros], ["materia"] * 2 + ["tarea"] * 5)
+        self.assertEqual([r["id"] for r in registros[2:]], self.tareas)
+        self.assertEqual(registros[2], {
+            "tipo": "tarea", "id": self.tareas[0], "titulo": "Tarea 0",
+            "descripcion": "Péndulo, informe", "prioridad": "Baja",
+            "fecha_entrega": MANANA.isoformat(), "materia": "Física",
+            "estado": "Pendiente", "esfuerzo": 6})
+        self.assertEqual(registros[3]["estado"], "Completada")
+
+    def test_verde_exporta_csv_comprimido(self):
+        """Un .csv.gz se comprime al escribir y tiene el encabezado completo."""
+        resultado = self.tm.exportar(self._ruta("datos.csv.gz"))
+        self.assertEqual((resultado.materias, resultado.tareas, resultado.ultimo_id),
+                         (2, 5, self.tareas[-1]))
+        with gzip.open(self._ruta("datos.csv.gz"), "rt", encoding="utf-8") as archivo:
+            lector = csv.DictReader(archivo)
+            filas = list(lector)
+        self.assertEqual(tuple(lector.fieldnames), CAMPOS_EXPORTACION)
+        self.assertEqual(filas[2]["descripcion"], "Péndulo, informe")
+
+    def test_verde_rangos_de_id(self):
+        """Los tramos por rango de ID cubren todas las tareas sin repetir."""
+        primero = self._jsonl(hasta_id=self.tareas[1])
+        resto = self._jsonl(desde_id=self.tareas[1])
+        self.assertEqual(len(primero), 4)
+        self.assertEqual([r["tipo"] for r in resto], ["tarea"] * 3)
+        self.assertEqual(primero + resto, self._jsonl())
+
+    def test_verde_ignora_otros_usuarios(self):
+        """Las materias y tareas de otros usuarios no se exportan."""
+        otro = TaskManager()
+        u = otro.crear_usuario("Ana Perez", "ana@mail.com")
+        otro.seleccionar_usuario(u.idUsuario)
+        self.assertEqual(otro.exportar(io.StringIO(), "jsonl")[:3], (0, 0, None))
+        m = otro.crear_materia("Química", "#000000")
+        otro.crear_tarea("Ajena", "", Prioridad.Alta, MANANA, m.idMateria)
+        self.assertEqual(len(self._jsonl()), 7)
+        self.assertEqual(otro.exportar(io.StringIO(), "jsonl")[:2], (1, 1))
+
+    def test_verde_importar_lo_exportado(self):
+        """Lo exportado se importa en otro usuario con los mismos datos."""
+        self.tm.exportar(self._ruta("datos.csv"))
+        otro = TaskManager()
+        u = otro.crear_usuario("Ana Perez", "ana@mail.com")
+        otro.seleccionar_usuario(u.idUsuario)
+        resultado = otro.importar(self._ruta("datos.csv"))
+        self.assertEqual((resultado.materias, resultado.tareas, resultado.errores),
+                         (2, 5, []))
+        self.assertEqual([t.titulo for t in otro.listar_tareas()],
+                         [t.titulo for t in self.tm.listar_tareas()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+"""
+test_importacion.py
+===================
+Pruebas de TaskManager.importar: lectura de CSV y JSONL (también
+comprimidos), validación registro por registro con número de línea y
+escritura en lotes.
+
+Ejecución:
+    py -m unittest tests.test_importacion
+"""
+
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.modelo import Prioridad
+
+MANANA = (date.today() + timedelta(days=1)).isoformat()
+AYER = (date.today() - timedelta(days=1)).isoformat()
+
+CSV_VALIDO = f"""tipo,nombre,color,titulo,descripcion,prioridad,fecha_entrega,materia,esfuerzo
+materia,Física,#3B82F6,,,,,,
+tarea,,,Laboratorio 1,"Péndulo, informe",alta,{MANANA},Física,6
+tarea,,,Guía 3,,Baja,{MANANA},Matemáticas,
+"""
+
+
+class TestImportacion(unittest.TestCase):
+    """Importación en streaming de materias y tareas."""
+
+    def setUp(self):
+        """Reinicia la BD y crea un usuario con una materia."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager()
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Limpia la BD y los archivos temporales."""
+        self.dir.cleanup()
+        Base.metadata.drop_all(engine)
+
+    def _archivo(self, nombre: str, contenido: str) -> str:
+        ruta = os.path.join(self.dir.name, nombre)
+        abrir = gzip.open if nombre.endswith(".gz") else open
+        with abrir(ruta, "wt", encoding="utf-8", newline="") as archivo:
+            archivo.write(contenido)
+        return ruta
+
+    @staticmethod
+    def _jsonl(*registros) -> str:
+        return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in registros)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_sin_usuario_activo(self):
+        """Sin usuario activo lanza ValueError."""
+        with self.assertRaises(ValueError):
+            TaskManager().importar(io.StringIO(""), "csv")
+
+    def test_rojo_formato_desconocido(self):
+        """Una extensión o formato desconocido lanza ValueError."""
+        with self.assertRaises(ValueError):
+            self.tm.importar(self._archivo("datos.txt", ""))
+        with self.assertRaises(ValueError):
+            self.tm.importar(io.StringIO(""), "xml")
+        with self.assertRaises(ValueError):
+            self.tm.importar(io.StringIO(""), "csv", tamano_lote=0)
+
+    def test_rojo_errores_con_numero_de_linea(self):
+        """Se informan todos los registros inválidos y se importan los demás."""
+        contenido = self._jsonl(
+            {"tipo": "materia", "nombre": "Química", "color": "rojo"},
+            {"tipo": "materia", "nombre": "Matemáticas", "color": "#000000"},
+            {"tipo": "tarea", "titulo": "ab", "prioridad": "Alta",
+             "fecha_entrega": MANANA, "materia": "Matemáticas"},
+            {"tipo": "tarea", "titulo": "Guía", "prioridad": "Urgente",
+             "fecha_entrega": MANANA, "materia": "Matemáticas"},
+            {"tipo": "tarea", "titulo": "Guía", "prioridad": "Alta",
+             "fecha_entrega": AYER, "materia": "Matemáticas"},
+            {"tipo": "tarea", "titulo": "Guía", "prioridad": "Alta",
+             "fecha_entrega": MANANA, "materia": "Química"},
+            {"tipo": "tarea", "titulo": "Guía", "prioridad": "Alta",
+             "fecha_entrega": MANANA, "materia": "Matemáticas", "esfuerzo": "mucho"},
+            {"tipo": "evento"},
+        ) + "{no es json\n" + self._jsonl(
+            {"tipo": "tarea", "titulo": "Parcial", "prioridad": "Alta",
+             "fecha_entrega": MANANA, "materia": "Matemáticas"})
+        resultado = self.tm.importar(io.StringIO(contenido), "jsonl")
+        self.assertEqual([e.linea for e in resultado.errores], list(range(1, 10)))
+        self.assertEqual((resultado.registros, resultado.total_errores), (10, 9))
+        self.assertEqual((resultado.materias, resultado.tareas), (0, 1))
+        self.assertIn("Química", resultado.errores[5].mensaje)
+        self.assertEqual([t.titulo for t in self.tm.listar_tareas()], ["Parcial"])
+
+    def test_rojo_max_errores(self):
+        """Solo se conservan max_errores errores, pero se cuentan todos."""
+        contenido = self._jsonl(*[{"tipo": "materia", "nombre": "x"}] * 5)
+        resultado = self.tm.importar(io.StringIO(contenido), "jsonl", max_errores=2)
+        self.assertEqual(len(resultado.errores), 2)
+        self.assertEqual(resultado.total_errores, 5)
+
+    def test_rojo_csv_sin_columna_tipo(self):
+        """Un CSV sin la columna 'tipo' se rechaza en la línea 1."""
+        resultado = self.tm.importar(io.StringIO("nombre,color\nFísica,#000000\n"), "csv")
+        self.assertEqual([e.linea for e in resultado.errores], [1])
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_importa_csv(self):
+        """Un CSV crea materias y tareas, incluso en materias existentes."""
+        resultado = self.tm.importar(self._archivo("datos.csv", CSV_VALIDO))
+        self.assertEqual((resultado.materias, resultado.tareas, resultado.errores),
+                         (1, 2, []))
+        self.assertEqual(sorted(m.nombre for m in self.tm.listar_materias()),
+                         ["Física", "Matemáticas"])
+        laboratorio = self.tm.listar_tareas(prioridad=Prioridad.Alta)[0]
+        completa = self.tm.seleccionar_tarea(laboratorio.idTarea)
+        self.assertEqual((completa.descripcion, completa.esfuerzo), ("Péndulo, informe", 6))
+        self.assertGreater(resultado.filas_por_segundo, 0)
+
+    def test_verde_importa_jsonl_comprimido(self):
+        """Un .jsonl.gz se descomprime al leer."""
+        ruta = self._archivo("datos.jsonl.gz", self._jsonl(
+            {"tipo": "materia", "nombre": "Física", "color": "#3B82F6"},
+            {"tipo": "tarea", "titulo": "Laboratorio", "prioridad": "Media",
+             "fecha_entrega": MANANA, "materia": "Física", "esfuerzo": 3}))
+        resultado = self.tm.importar(ruta)
+        self.assertEqual((resultado.materias, resultado.tareas), (1, 1))
+
+    def test_verde_lotes_pequenos(self):
+        """Con lotes de 2 registros se importan todos, en varias transacciones."""
+        registros = [{"tipo": "materia", "nombre": "Física", "color": "#3B82F6"}]
+        registros += [{"tipo": "tarea", "titulo": f"Tarea {i}", "prioridad": "Baja",
+                       "fecha_entrega": MANANA, "materia": "Física"} for i in range(9)]
+        resultado = self.tm.importar(io.StringIO(self._jsonl(*registros)), "jsonl",
+                                     tamano_lote=2)
+        self.assertEqual((resultado.materias, resultado.tareas), (1, 9))
+        self.assertEqual(len(self.tm.listar_tareas()), 9)
+
+    def test_verde_materia_repetida_en_el_archivo(self):
+        """Una materia repetida en el mismo archivo se rechaza una vez."""
+        contenido = self._jsonl(*[{"tipo": "materia", "nombre": "Física",
+                                   "color": "#3B82F6"}] * 2)
+        resultado = self.tm.importar(io.StringIO(contenido), "jsonl")
+        self.assertEqual((resultado.materias, [e.linea for e in resultado.errores]),
+                         (1, [2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
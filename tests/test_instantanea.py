@@ -0,0 +1,156 @@
+"""
+test_instantanea.py
+===================
+Pruebas de la instantánea binaria: TaskManager.guardar_instantanea y la
+lectura con mmap de src.logic.instantanea (filas, columnas, búsqueda por
+ID y validación del formato).
+
+Ejecución:
+    py -m unittest tests.test_instantanea
+"""
+
+import os
+import struct
+import tempfile
+import unittest
+from datetime import date, timedelta
+from src.logic import instantanea
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.modelo import EstadoTarea, Prioridad
+
+MANANA = date.today() + timedelta(days=1)
+
+
+class TestInstantanea(unittest.TestCase):
+    """Guardar y abrir instantáneas de un usuario."""
+
+    def setUp(self):
+        """Reinicia la BD y crea un usuario con dos materias y tareas."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager()
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.fisica = self.tm.crear_materia("Física", "#3B82F6")
+        self.mate = self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.tm.crear_tarea("Informe del péndulo", "Con gráficos", Prioridad.Alta,
+                            MANANA, self.fisica.idMateria, esfuerzo=6)
+        self.tm.crear_tarea("Guía 3", None, Prioridad.Baja,
+                            MANANA + timedelta(days=30), self.mate.idMateria)
+        self.tm.crear_tarea("Lectura", "", Prioridad.Media, MANANA, self.mate.idMateria)
+        self.tm.marcar_tarea(self.tm.listar_tareas()[0].idTarea)
+        self.dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.dir.name, "juan.tmsnap")
+
+    def tearDown(self):
+        """Limpia la BD y los archivos temporales."""
+        self.dir.cleanup()
+        Base.metadata.drop_all(engine)
+
+    def _escribir(self, contenido: bytes):
+        with open(self.ruta, "wb") as archivo:
+            archivo.write(contenido)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_sin_usuario_activo(self):
+        """Sin usuario activo lanza ValueError."""
+        with self.assertRaises(ValueError):
+            TaskManager().guardar_instantanea(self.ruta)
+
+    def test_rojo_archivo_invalido(self):
+        """Un archivo vacío, ajeno o truncado lanza ValueError."""
+        self.tm.guardar_instantanea(self.ruta)
+        with open(self.ruta, "rb") as archivo:
+            contenido = archivo.read()
+        for invalido in (b"", b"no es una instantanea " * 4, contenido[:-8]):
+            with self.subTest(largo=len(invalido)):
+                self._escribir(invalido)
+                with self.assertRaises(ValueError):
+                    instantanea.abrir(self.ruta)
+
+    def test_rojo_formato_posterior(self):
+        """Un formato más nuevo que el soportado lanza ValueError."""
+        self.tm.guardar_instantanea(self.ruta)
+        with open(self.ruta, "r+b") as archivo:
+            archivo.seek(len(instantanea.MAGIA))
+            archivo.write(struct.pack("<H", instantanea.FORMATO + 1))
+        with self.assertRaises(ValueError):
+            instantanea.abrir(self.ruta)
+
+    def test_rojo_columna_inexistente(self):
+        """Pedir una columna que no está lanza ValueError."""
+        self.tm.guardar_instantanea(self.ruta)
+        with instantanea.abrir(self.ruta) as inst:
+            with self.assertRaises(ValueError):
+                inst.columna("tareas.color")
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_mismas_tareas_que_la_bd(self):
+        """Las filas coinciden con las tareas guardadas, nulos incluidos."""
+        resultado = self.tm.guardar_instantanea(self.ruta)
+        self.assertEqual((resultado.materias, resultado.tareas), (2, 3))
+        with instantanea.abrir(self.ruta) as inst:
+            self.assertEqual(inst.usuario_id, self.tm.usuario_activo.idUsuario)
+            self.assertEqual(inst.seq, resultado.seq)
+            self.assertEqual(list(inst.materias), [
+                instantanea.FilaMateria(self.fisica.idMateria, "Física", "#3B82F6", 1),
+                instantanea.FilaMateria(self.mate.idMateria, "Matemáticas", "#FF5733", 1)])
+            for fila in inst.tareas:
+                tarea = self.tm.seleccionar_tarea(fila.idTarea)
+                self.assertEqual(fila, instantanea.FilaTarea(
+                    tarea.idTarea, tarea.titulo, tarea.descripcion, tarea.prioridad,
+                    tarea.fechaEntrega, tarea.estado, tarea.materia_id, tarea.version,
+                    tarea.esfuerzo, tarea.recurrencia_id))
+            self.assertEqual([t.descripcion for t in inst.tareas],
+                             ["Con gráficos", None, ""])
+
+    def test_verde_acceso_por_indice_y_busqueda(self):
+        """Índices, negativos, tramos y búsqueda por ID."""
+        self.tm.guardar_instantanea(self.ruta)
+        with instantanea.abrir(self.ruta) as inst:
+            self.assertEqual(len(inst.tareas), 3)
+            self.assertEqual(inst.tareas[-1].titulo, "Lectura")
+            self.assertEqual([t.titulo for t in inst.tareas[1:]], ["Guía 3", "Lectura"])
+            self.assertEqual(inst.tareas.buscar(inst.tareas[1].idTarea).titulo, "Guía 3")
+            self.assertIsNone(inst.tareas.buscar(999))
+            with self.assertRaises(IndexError):
+                inst.tareas[3]
+
+    def test_verde_recorrido_por_tramos(self):
+        """Recorrer de a tramos da las mismas filas que el acceso por índice."""
+        self.tm.guardar_instantanea(self.ruta)
+        tramo = instantanea.FILAS_POR_TRAMO
+        instantanea.FILAS_POR_TRAMO = 2
+        try:
+            with instantanea.abrir(self.ruta) as inst:
+                self.assertEqual(list(inst.tareas),
+                                 [inst.tareas[i] for i in range(len(inst.tareas))])
+        finally:
+            instantanea.FILAS_POR_TRAMO = tramo
+
+    def test_verde_columnas_sin_copiar(self):
+        """Las columnas numéricas se recorren como memoryview de enteros."""
+        self.tm.guardar_instantanea(self.ruta)
+        with instantanea.abrir(self.ruta) as inst:
+            estados = inst.columna("tareas.estado")
+            self.assertIsInstance(estados, memoryview)
+            self.assertEqual(list(estados), [1, 0, 0])
+            self.assertEqual(inst.tareas[0].estado, EstadoTarea.Completada)
+            self.assertEqual(list(inst.columna("tareas.esfuerzo")), [6, -1, -1])
+
+    def test_verde_usuario_sin_tareas(self):
+        """Un usuario sin materias ni tareas da una instantánea vacía."""
+        otro = TaskManager()
+        u = otro.crear_usuario("Ana Perez", "ana@mail.com")
+        otro.seleccionar_usuario(u.idUsuario)
+        otro.guardar_instantanea(self.ruta)
+        with instantanea.abrir(self.ruta) as inst:
+            self.assertEqual((len(inst.materias), len(inst.tareas)), (0, 0))
+            self.assertEqual(list(inst.tareas), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
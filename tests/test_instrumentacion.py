@@ -0,0 +1,165 @@
+"""
+test_instrumentacion.py
+=======================
+Pruebas de la medición por método de TaskManager
+(src.logic.instrumentacion): llamadas, errores, percentiles, sentencias
+SQL, filas retornadas y costo nulo desactivada.
+
+Ejecución:
+    py -m unittest tests.test_instrumentacion
+"""
+
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+from sqlalchemy import event
+from src.logic.instrumentacion import Instrumentacion, instrumentacion
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.modelo import Prioridad
+
+MANANA = date.today() + timedelta(days=1)
+ORIGINAL = TaskManager.crear_tarea
+
+
+class _Servicio:
+    """Clase mínima para medir llamadas anidadas y latencias conocidas."""
+
+    def externo(self):
+        return [self.interno(), self.interno()]
+
+    def interno(self):
+        return 1
+
+    def _privado(self):
+        return None
+
+
+class TestInstrumentacion(unittest.TestCase):
+    """Mediciones por método de TaskManager."""
+
+    def setUp(self):
+        """Reinicia la BD y crea un usuario con una materia."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager(usar_cache=False)
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.materia = self.tm.crear_materia("Física", "#3B82F6")
+        instrumentacion.reiniciar()
+
+    def tearDown(self):
+        """Desactiva la medición y limpia la BD."""
+        instrumentacion.desactivar()
+        instrumentacion.reiniciar()
+        Base.metadata.drop_all(engine)
+
+    def _crear(self, titulo: str):
+        return self.tm.crear_tarea(titulo, "", Prioridad.Media, MANANA,
+                                   self.materia.idMateria)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_desactivada_no_mide(self):
+        """Desactivada, los métodos son los originales y no hay listener."""
+        self.assertFalse(instrumentacion.activa)
+        self.assertIs(TaskManager.crear_tarea, ORIGINAL)
+        self._crear("Informe")
+        self.assertEqual(instrumentacion.instantanea(), {})
+        self.assertEqual(instrumentacion.reporte(), "Sin llamadas medidas")
+
+        instrumentacion.activar()
+        instrumentacion.activar()
+        self.assertIsNot(TaskManager.crear_tarea, ORIGINAL)
+        instrumentacion.desactivar()
+        self.assertIs(TaskManager.crear_tarea, ORIGINAL)
+        self.assertFalse(event.contains(engine, "before_cursor_execute",
+                                        instrumentacion._contar_sentencia))
+        self._crear("Guía 3")
+        self.assertEqual(instrumentacion.instantanea(), {})
+
+    def test_rojo_errores(self):
+        """Una llamada que lanza una excepción se cuenta como error, sin filas."""
+        instrumentacion.activar()
+        with self.assertRaises(ValueError):
+            self.tm.crear_tarea("", "", Prioridad.Media, MANANA, self.materia.idMateria)
+        estadistica = instrumentacion.instantanea()["crear_tarea"]
+        self.assertEqual((estadistica.llamadas, estadistica.errores, estadistica.filas),
+                         (1, 1, 0))
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_llamadas_sentencias_y_filas(self):
+        """Cada método cuenta sus llamadas, sentencias SQL y filas."""
+        instrumentacion.activar()
+        for titulo in ("Informe", "Guía 3", "Parcial 1"):
+            self._crear(titulo)
+        self.tm.listar_tareas()
+        self.tm.listar_tareas(materia_id=self.materia.idMateria)
+        instantanea = instrumentacion.instantanea()
+        crear = instantanea["crear_tarea"]
+        self.assertEqual((crear.llamadas, crear.errores, crear.filas), (3, 0, 3))
+        self.assertGreater(crear.sentencias, 0)
+        self.assertGreater(crear.total_s, 0)
+        listar = instantanea["listar_tareas"]
+        self.assertEqual((listar.llamadas, listar.filas), (2, 6))
+        self.assertGreaterEqual(listar.sentencias, 2)
+        self.assertLessEqual(listar.p50_s, listar.p99_s)
+        self.assertLessEqual(listar.p99_s, listar.maximo_s)
+        self.assertEqual(instrumentacion.reporte().splitlines()[0].split()[0], "método")
+
+    def test_verde_solo_la_llamada_externa(self):
+        """Las llamadas anidadas cuentan para la externa; los privados no se miden."""
+        registro = Instrumentacion(clase=_Servicio)
+        registro.activar()
+        try:
+            servicio = _Servicio()
+            self.assertEqual(servicio.externo(), [1, 1])
+            servicio.interno()
+            servicio._privado()
+        finally:
+            registro.desactivar()
+        instantanea = registro.instantanea()
+        self.assertEqual(set(instantanea), {"externo", "interno"})
+        self.assertEqual((instantanea["externo"].llamadas, instantanea["externo"].filas),
+                         (1, 2))
+        self.assertEqual(instantanea["interno"].llamadas, 1)
+
+    def test_verde_percentiles(self):
+        """Los percentiles salen del histograma, con error acotado."""
+        registro = Instrumentacion(clase=_Servicio)
+        # 98 llamadas de 1 ms, una de 10 ms y una de 100 ms
+        duraciones = [0.001] * 98 + [0.010, 0.100]
+        relojes = []
+        for duracion in duraciones:
+            relojes += [0.0, duracion]
+        registro.activar()
+        try:
+            with mock.patch("src.logic.instrumentacion.time.perf_counter",
+                            side_effect=relojes):
+                for _ in duraciones:
+                    _Servicio().interno()
+        finally:
+            registro.desactivar()
+        estadistica = registro.instantanea()["interno"]
+        self.assertEqual(estadistica.llamadas, 100)
+        self.assertAlmostEqual(estadistica.total_s, sum(duraciones))
+        self.assertEqual(estadistica.maximo_s, 0.100)
+        for percentil, esperado in ((estadistica.p50_s, 0.001),
+                                    (estadistica.p95_s, 0.001),
+                                    (estadistica.p99_s, 0.010)):
+            self.assertGreaterEqual(percentil, esperado)
+            self.assertLess(percentil, esperado * 1.19)
+
+    def test_verde_reiniciar(self):
+        """reiniciar descarta lo medido sin desactivar."""
+        instrumentacion.activar()
+        self._crear("Informe")
+        instrumentacion.reiniciar()
+        self.assertEqual(instrumentacion.instantanea(), {})
+        self.tm.contar_tareas()
+        self.assertEqual(set(instrumentacion.instantanea()), {"contar_tareas"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+"""
+test_mantenimiento.py
+=====================
+Pruebas del mantenimiento de la base de datos (src.logic.mantenimiento):
+umbrales de ANALYZE, incremental_vacuum por pasos, conversión a
+auto_vacuum incremental, PRAGMA optimize al cerrar y mantenimiento en
+reposo.
+
+Ejecución:
+    py -m unittest tests.test_mantenimiento
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+from sqlalchemy import create_engine
+from src.logic import mantenimiento
+from src.logic.mantenimiento import MantenimientoEnReposo, convertir, estado, mantener
+from src.logic.metricas import metricas
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.modelo import Prioridad
+
+MANANA = date.today() + timedelta(days=1)
+
+
+class TestMantenimiento(unittest.TestCase):
+    """Estadísticas y recuperación de espacio libre."""
+
+    def setUp(self):
+        """Reinicia la BD (en modo incremental) y crea un usuario con una materia."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        convertir()
+        self.tm = TaskManager()
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.materia = self.tm.crear_materia("Física", "#3B82F6")
+
+    def tearDown(self):
+        """Limpia la BD."""
+        Base.metadata.drop_all(engine)
+
+    def _poblar(self, cantidad: int, materia_id=None):
+        # Tareas con descripciones largas, para que ocupen varias páginas
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                'INSERT INTO tareas (titulo, descripcion, prioridad, "fechaEntrega", '
+                "estado, materia_id, version) VALUES (?, ?, 1, ?, 0, ?, 1)",
+                [(f"Tarea {i}", "x" * 450, MANANA.isoformat(),
+                  materia_id or self.materia.idMateria) for i in range(cantidad)])
+
+    def _liberar(self) -> int:
+        """Llena una materia nueva y la elimina; retorna las páginas libres."""
+        otra = self.tm.crear_materia("Química", "#10B981")
+        self._poblar(2000, materia_id=otra.idMateria)
+        self.tm.eliminar_materia(otra.idMateria)
+        return estado().libres
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_parametros_invalidos(self):
+        """Páginas, pausa, presupuesto o tiempos inválidos lanzan ValueError."""
+        for parametros in ({"paginas": 0}, {"paginas": True}, {"pausa": -1},
+                           {"presupuesto_s": 0}):
+            with self.subTest(**parametros):
+                with self.assertRaises(ValueError):
+                    mantener(**parametros)
+        for parametros in ({"reposo_s": -1}, {"intervalo_s": 0}, {"presupuesto_s": 0}):
+            with self.subTest(**parametros):
+                with self.assertRaises(ValueError):
+                    MantenimientoEnReposo(**parametros)
+
+    def test_rojo_sin_auto_vacuum_incremental(self):
+        """Una base creada antes no recupera espacio hasta convertirla."""
+        with tempfile.TemporaryDirectory() as carpeta:
+            otro = create_engine(f"sqlite:///{os.path.join(carpeta, 'vieja.sqlite')}")
+            try:
+                Base.metadata.create_all(otro)
+                with otro.begin() as conn:
+                    conn.exec_driver_sql("CREATE TABLE notas (texto TEXT)")
+                    conn.exec_driver_sql(
+                        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n "
+                        "WHERE i < 500) INSERT INTO notas SELECT zeroblob(2000) FROM n")
+                    conn.exec_driver_sql("DELETE FROM notas")
+                antes = estado(otro)
+                self.assertEqual(antes.auto_vacuum, "none")
+                self.assertGreater(antes.libres, 0)
+                self.assertFalse(antes.requiere_vacuum)
+                self.assertEqual(mantener(forzar=True, engine=otro).liberadas, 0)
+
+                resultado = convertir(otro)
+                self.assertEqual(resultado.pasos, 1)
+                self.assertEqual(resultado.despues.auto_vacuum, "incremental")
+                self.assertEqual(resultado.despues.libres, 0)
+                self.assertEqual(convertir(otro).pasos, 0)
+            finally:
+                otro.dispose()
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_estado_y_metricas(self):
+        """estado() mide el archivo y publica las métricas bd.*."""
+        libres = self._liberar()
+        actual = estado()
+        self.assertEqual(actual.auto_vacuum, "incremental")
+        self.assertEqual(actual.bytes_archivo, os.path.getsize(engine.url.database))
+        self.assertAlmostEqual(actual.fraccion_libre, libres / actual.paginas)
+        self.assertEqual(metricas.valor("bd.paginas_libres"), libres)
+        self.assertEqual(metricas.valor("bd.paginas"), actual.paginas)
+
+    def test_verde_analyze_por_umbral(self):
+        """ANALYZE la primera vez y cuando se supera el umbral de cambios."""
+        self._poblar(20)
+        primero = mantener()
+        self.assertTrue(primero.analizada)
+        self.assertEqual(primero.despues.cambios, 0)
+        with engine.connect() as conn:
+            tablas = {f[0] for f in conn.exec_driver_sql("SELECT tbl FROM sqlite_stat1")}
+        self.assertIn("tareas", tablas)
+
+        self.assertFalse(mantener().analizada)
+        with mock.patch.object(mantenimiento, "UMBRAL_CAMBIOS", 5):
+            self.tm.crear_tarea("Informe", "", Prioridad.Media, MANANA,
+                                self.materia.idMateria)
+            self.assertFalse(mantener().analizada)
+            self._poblar(4)
+            self.assertEqual(estado().cambios, 5)
+            self.assertTrue(mantener().analizada)
+
+    def test_verde_vacuum_por_pasos(self):
+        """El espacio libre se devuelve al sistema de a unas páginas por paso."""
+        libres = self._liberar()
+        antes = estado()
+        self.assertTrue(antes.requiere_vacuum)
+        resultado = mantener(paginas=64, pausa=0, presupuesto_s=None)
+        self.assertEqual(resultado.liberadas, libres)
+        self.assertEqual(resultado.pasos, -(-libres // 64))
+        self.assertEqual(resultado.despues.libres, 0)
+        self.assertEqual(resultado.despues.paginas, antes.paginas - libres)
+        self.assertEqual(len(self.tm.listar_materias()), 1)
+
+    def test_verde_presupuesto(self):
+        """Agotado el presupuesto no se empiezan más pasos."""
+        libres = self._liberar()
+        resultado = mantener(paginas=16, pausa=0, presupuesto_s=1e-9)
+        self.assertEqual(resultado.pasos, 1)
+        self.assertEqual(resultado.despues.libres, libres - 16)
+        self.assertEqual(mantener(presupuesto_s=None).despues.libres, 0)
+
+    def test_verde_optimizar_al_cerrar(self):
+        """Cerrar las conexiones del pool deja estadísticas de lo consultado."""
+        self._poblar(20)
+        tm = TaskManager(usar_cache=False)
+        tm.seleccionar_usuario(self.tm.usuario_activo.idUsuario)
+        tm.listar_tareas(materia_id=self.materia.idMateria)
+        engine.dispose()
+        with engine.connect() as conn:
+            tablas = {f[0] for f in conn.exec_driver_sql("SELECT tbl FROM sqlite_stat1")}
+        self.assertIn("tareas", tablas)
+
+    def test_verde_reposo(self):
+        """Solo mantiene tras reposo_s sin escrituras y si hay algo que hacer."""
+        ahora = [0.0]
+        reposo = MantenimientoEnReposo(reposo_s=10, reloj=lambda: ahora[0])
+        try:
+            self._liberar()
+            self.assertIsNone(reposo.revisar())
+            ahora[0] = 5
+            self.assertIsNone(reposo.revisar())
+            self._poblar(1)
+            ahora[0] = 12
+            self.assertIsNone(reposo.revisar())
+            ahora[0] = 22
+            resultado = reposo.revisar()
+            self.assertIsNotNone(resultado)
+            self.assertTrue(resultado.analizada)
+            self.assertGreater(resultado.liberadas, 0)
+            self.assertIs(reposo.ultimo, resultado)
+            # La pasada misma cuenta como escritura; luego no queda nada por hacer
+            ahora[0] = 40
+            self.assertIsNone(reposo.revisar())
+            ahora[0] = 60
+            self.assertEqual(mantener(presupuesto_s=None).despues.libres, 0)
+            ahora[0] = 80
+            reposo.revisar()
+            ahora[0] = 100
+            self.assertIsNone(reposo.revisar())
+        finally:
+            reposo.cerrar()
+
+
+if __name__ == "__main__":
+    unittest.main()
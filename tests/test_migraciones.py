@@ -0,0 +1,179 @@
+"""
+test_migraciones.py
+===================
+Pruebas de la inicialización y migración del esquema
+(src.model.migraciones).
+
+Cada prueba trabaja sobre un archivo SQLite temporal propio, de modo que
+no interfiere con la base de datos usada por las demás pruebas.
+
+Ejecución:
+    py -m unittest tests.test_migraciones
+"""
+
+import os
+import tempfile
+import unittest
+from sqlalchemy import create_engine
+from src.model.migraciones import (inicializar_bd, migrar, version_esquema,
+                                   VERSION_ESQUEMA)
+
+# Esquema de la primera versión del proyecto (sin columnas `version` y con
+# prioridad/estado guardados como texto)
+_ESQUEMA_V0 = [
+    """CREATE TABLE usuarios (
+        "idUsuario" INTEGER PRIMARY KEY, nombre VARCHAR(50) NOT NULL,
+        correo VARCHAR(100) NOT NULL UNIQUE, fecha_creacion DATE NOT NULL)""",
+    """CREATE TABLE materias (
+        "idMateria" INTEGER PRIMARY KEY, nombre VARCHAR(50) NOT NULL,
+        color VARCHAR(7) NOT NULL,
+        usuario_id INTEGER NOT NULL REFERENCES usuarios ("idUsuario") ON DELETE CASCADE,
+        CONSTRAINT uq_materia_usuario UNIQUE (nombre, usuario_id))""",
+    """CREATE TABLE tareas (
+        "idTarea" INTEGER PRIMARY KEY, titulo VARCHAR(100) NOT NULL,
+        descripcion VARCHAR(500), prioridad VARCHAR(5) NOT NULL,
+        "fechaEntrega" DATE NOT NULL, estado VARCHAR(10) NOT NULL,
+        materia_id INTEGER NOT NULL REFERENCES materias ("idMateria") ON DELETE CASCADE)""",
+    "INSERT INTO usuarios VALUES (1, 'Juan Lopez', 'juan@mail.com', '2025-03-01')",
+    "INSERT INTO materias VALUES (1, 'Matemáticas', '#FF5733', 1)",
+    "INSERT INTO tareas VALUES (1, 'Parcial', 'Capítulos 1 a 3', 'Alta', "
+    "'2025-04-10', 'Completada', 1)",
+    "INSERT INTO tareas VALUES (2, 'Guía', NULL, 'Baja', '2025-04-12', 'Pendiente', 1)",
+]
+
+
+class TestMigraciones(unittest.TestCase):
+    """Pruebas de inicializar_bd y migrar sobre bases temporales."""
+
+    def setUp(self):
+        """Crea un engine sobre un archivo temporal."""
+        self.dir = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.dir.name, 'm.sqlite')}")
+
+    def tearDown(self):
+        """Libera el engine y elimina el directorio temporal."""
+        self.engine.dispose()
+        self.dir.cleanup()
+
+    def _columnas(self, tabla):
+        with self.engine.connect() as conn:
+            return {f[1] for f in conn.exec_driver_sql(f"PRAGMA table_xinfo({tabla})")}
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_bd_nueva_queda_en_version_actual(self):
+        """Una BD nueva se crea completa y sin pasos de migración."""
+        self.assertEqual(inicializar_bd(self.engine), [])
+        self.assertEqual(version_esquema(self.engine), VERSION_ESQUEMA)
+        self.assertIn("version", self._columnas("tareas"))
+
+    def test_verde_migra_bd_anterior(self):
+        """Una BD de la versión anterior recibe las columnas nuevas."""
+        with self.engine.begin() as conn:
+            for sentencia in _ESQUEMA_V0:
+                conn.exec_driver_sql(sentencia)
+
+        self.assertEqual(inicializar_bd(self.engine), [1, 2, 3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual(version_esquema(self.engine), VERSION_ESQUEMA)
+        for tabla in ("usuarios", "materias", "tareas"):
+            self.assertIn("version", self._columnas(tabla))
+        with self.engine.connect() as conn:
+            self.assertEqual(conn.exec_driver_sql(
+                "SELECT version FROM usuarios").scalar(), 1)
+            triggers = {f[0] for f in conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        self.assertIn("trg_tareas_update", triggers)
+        self.assertIn("trg_registro_cambios_recorte", triggers)
+
+    def test_verde_migra_enums_a_enteros(self):
+        """prioridad y estado pasan de texto a sus códigos enteros."""
+        with self.engine.begin() as conn:
+            for sentencia in _ESQUEMA_V0:
+                conn.exec_driver_sql(sentencia)
+
+        inicializar_bd(self.engine)
+        with self.engine.connect() as conn:
+            filas = conn.exec_driver_sql(
+                "SELECT idTarea, titulo, descripcion, prioridad, estado, "
+                "typeof(prioridad), version FROM tareas ORDER BY idTarea").fetchall()
+            indices = {f[1] for f in conn.exec_driver_sql("PRAGMA index_list(tareas)")}
+            anterior = conn.exec_driver_sql(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name = 'tareas_anterior'").scalar()
+        self.assertEqual([tuple(f) for f in filas], [
+            (1, "Parcial", "Capítulos 1 a 3", 2, 1, "integer", 1),
+            (2, "Guía", None, 0, 0, "integer", 1),
+        ])
+        self.assertIn("ix_tareas_materia_prioridad", indices)
+        self.assertIn("ix_tareas_pendientes_entrega", indices)
+        self.assertEqual(anterior, 0)
+
+    def test_verde_migra_resumenes(self):
+        """Los resúmenes de tareas se calculan a partir de los datos existentes."""
+        with self.engine.begin() as conn:
+            for sentencia in _ESQUEMA_V0:
+                conn.exec_driver_sql(sentencia)
+
+        inicializar_bd(self.engine)
+        with self.engine.connect() as conn:
+            materia = conn.exec_driver_sql(
+                "SELECT total, pendientes, completadas, primera_pendiente "
+                "FROM resumen_materias WHERE materia_id = 1").fetchone()
+            usuario = conn.exec_driver_sql(
+                "SELECT total, pendientes, completadas FROM resumen_usuarios "
+                "WHERE usuario_id = 1").fetchone()
+        self.assertEqual(tuple(materia), (2, 1, 1, "2025-04-12"))
+        self.assertEqual(tuple(usuario), (2, 1, 1))
+
+    def test_verde_migra_recurrencias(self):
+        """Una BD en versión 6 recibe la tabla de recurrencias y tareas.recurrencia_id."""
+        inicializar_bd(self.engine)
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE tareas")
+            conn.exec_driver_sql("DROP TABLE recurrencias")
+            conn.exec_driver_sql("""CREATE TABLE tareas (
+                "idTarea" INTEGER PRIMARY KEY, titulo VARCHAR(100) NOT NULL,
+                descripcion VARCHAR(500), prioridad SMALLINT NOT NULL,
+                "fechaEntrega" DATE NOT NULL, estado SMALLINT NOT NULL,
+                materia_id INTEGER NOT NULL, version INTEGER NOT NULL)""")
+            conn.exec_driver_sql("PRAGMA user_version = 6")
+
+        self.assertEqual(migrar(self.engine), [7, 8, 9])
+        self.assertIn("recurrencia_id", self._columnas("tareas"))
+        self.assertIn("siguiente", self._columnas("recurrencias"))
+        with self.engine.connect() as conn:
+            indices = {f[1] for f in conn.exec_driver_sql("PRAGMA index_list(tareas)")}
+        self.assertIn("ix_tareas_recurrencia", indices)
+
+    def test_verde_migra_esfuerzo(self):
+        """Una BD en versión 7 recibe el esfuerzo y el inicio sugerido calculado."""
+        inicializar_bd(self.engine)
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE tareas")
+            conn.exec_driver_sql("""CREATE TABLE tareas (
+                "idTarea" INTEGER PRIMARY KEY, titulo VARCHAR(100) NOT NULL,
+                descripcion VARCHAR(500), prioridad SMALLINT NOT NULL,
+                "fechaEntrega" DATE NOT NULL, estado SMALLINT NOT NULL,
+                materia_id INTEGER NOT NULL, version INTEGER NOT NULL,
+                recurrencia_id INTEGER)""")
+            conn.exec_driver_sql("INSERT INTO tareas VALUES "
+                                 "(1, 'Informe', NULL, 1, '2025-04-10', 0, 1, 1, NULL)")
+            conn.exec_driver_sql("PRAGMA user_version = 7")
+
+        self.assertEqual(migrar(self.engine), [8, 9])
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql("UPDATE tareas SET esfuerzo = 10")
+            inicio = conn.exec_driver_sql("SELECT inicio_sugerido FROM tareas").scalar()
+            indices = {f[1] for f in conn.exec_driver_sql("PRAGMA index_list(tareas)")}
+        self.assertEqual(inicio, "2025-04-07")
+        self.assertIn("ix_tareas_pendientes_inicio", indices)
+
+    def test_verde_migrar_es_idempotente(self):
+        """Migrar una BD ya actualizada no aplica ningún paso."""
+        inicializar_bd(self.engine)
+        self.assertEqual(migrar(self.engine), [])
+        self.assertEqual(inicializar_bd(self.engine), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
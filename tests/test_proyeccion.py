@@ -0,0 +1,334 @@
+"""
+test_proyeccion.py
+==================
+Pruebas de la proyección en memoria de tareas (src.logic.proyeccion) y de
+listar_tareas / contar_tareas de TaskManager, incluida la lectura de solo
+las columnas de listado (descripción diferida).
+
+Ejecución:
+    py -m unittest tests.test_proyeccion
+"""
+
+import sqlite3
+import unittest
+from datetime import date, timedelta
+from sqlalchemy import event
+from sqlalchemy.exc import StatementError
+from sqlalchemy.orm.exc import DetachedInstanceError
+from src.logic.cola_escritura import ColaEscritura
+from src.logic.proyeccion import LARGO_RESUMEN
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, Session, SessionEscritura, engine, db_path
+from src.model.modelo import Tarea, Prioridad, EstadoTarea
+
+HOY = date.today()
+
+
+class TestProyeccionTareas(unittest.TestCase):
+    """La proyección se mantiene igual a la base de datos."""
+
+    def setUp(self):
+        """Reinicia la BD y crea un usuario con dos materias y tareas."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager(usar_proyeccion=True)
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.mate = self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.fisica = self.tm.crear_materia("Física", "#0000FF")
+        self.tareas = [
+            self.tm.crear_tarea(f"Tarea {i}", "", prioridad,
+                                HOY + timedelta(days=dias), materia.idMateria)
+            for i, (prioridad, dias, materia) in enumerate([
+                (Prioridad.Alta, 3, self.mate),
+                (Prioridad.Baja, 1, self.fisica),
+                (Prioridad.Media, 3, self.fisica),
+                (Prioridad.Alta, 0, self.mate),
+            ])
+        ]
+        self.tm.marcar_tarea(self.tareas[2].idTarea)
+
+    def tearDown(self):
+        """Libera la proyección y limpia la BD."""
+        self.tm._cerrar_proyeccion()
+        Base.metadata.drop_all(engine)
+
+    def assertConsistente(self):
+        self.assertEqual(self.tm.proyeccion.verificar_consistencia(), [])
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_sin_usuario_activo(self):
+        """listar_tareas y contar_tareas sin usuario activo lanzan ValueError."""
+        tm = TaskManager(usar_proyeccion=True)
+        with self.assertRaises(ValueError):
+            tm.listar_tareas()
+        with self.assertRaises(ValueError):
+            tm.contar_tareas()
+
+    def test_rojo_savepoint_revertido_no_se_aplica(self):
+        """Una operación fallida dentro de un lote no altera la proyección."""
+        cola = ColaEscritura(ventana_ms=0)
+        try:
+            def _op(session):
+                session.add(Tarea(titulo="Fantasma", prioridad=Prioridad.Baja,
+                                  fechaEntrega=HOY, materia_id=self.mate.idMateria))
+                session.flush()
+                raise ValueError("falla después del flush")
+
+            with self.assertRaises(ValueError):
+                cola.ejecutar(_op)
+        finally:
+            cola.cerrar()
+        self.assertEqual(self.tm.contar_tareas(), 4)
+        self.assertConsistente()
+
+    def test_rojo_escritura_externa_recarga(self):
+        """Un cambio hecho por otro proceso obliga a recargar."""
+        externa = sqlite3.connect(db_path)
+        try:
+            externa.execute("UPDATE tareas SET titulo = 'Externa' WHERE idTarea = ?",
+                            (self.tareas[0].idTarea,))
+            externa.commit()
+        finally:
+            externa.close()
+        titulos = {t.titulo for t in self.tm.listar_tareas()}
+        self.assertIn("Externa", titulos)
+        self.assertEqual(self.tm.proyeccion.recargas, 2)
+        self.assertConsistente()
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_lecturas_sin_consultas(self):
+        """Listar y contar no ejecutan SQL a través del engine."""
+        sentencias = []
+
+        def _contar(*args):
+            sentencias.append(args[2])
+
+        event.listen(engine, "before_cursor_execute", _contar)
+        try:
+            self.tm.listar_tareas(estado=EstadoTarea.Pendiente)
+            self.tm.contar_tareas(materia_id=self.mate.idMateria)
+        finally:
+            event.remove(engine, "before_cursor_execute", _contar)
+        self.assertEqual(sentencias, [])
+
+    def test_verde_escrituras_propias_sin_recargar(self):
+        """Las mutaciones propias se aplican de forma incremental."""
+        t = self.tareas[0]
+        self.tm.editar_tarea(t.idTarea, nuevo_titulo="Parcial final",
+                             nueva_prioridad=Prioridad.Baja)
+        self.tm.desmarcar_tarea(self.tareas[2].idTarea)
+        self.tm.eliminar_tarea(self.tareas[3].idTarea)
+        self.tm.eliminar_materia(self.fisica.idMateria)
+        self.tm.listar_tareas()
+        self.assertEqual(self.tm.proyeccion.recargas, 1)
+        self.assertEqual([x.titulo for x in self.tm.listar_tareas()], ["Parcial final"])
+        self.assertConsistente()
+
+    def test_verde_escritura_sin_descripcion_no_la_consulta(self):
+        """Editar una Tarea cargada sin descripción no la lee al anotar el cambio."""
+        sentencias = []
+
+        def _contar(*args):
+            sentencias.append(args[2])
+
+        session = SessionEscritura()
+        try:
+            tarea = session.get(Tarea, self.tareas[0].idTarea)
+            event.listen(engine, "before_cursor_execute", _contar)
+            try:
+                tarea.titulo = "Parcial final"
+                session.commit()
+            finally:
+                event.remove(engine, "before_cursor_execute", _contar)
+        finally:
+            session.close()
+        self.assertEqual([s for s in sentencias if s.lstrip().startswith("SELECT")
+                          and "tareas" in s], [])
+        self.assertEqual(self.tm.proyeccion.recargas, 1)
+        self.assertConsistente()
+
+    def test_verde_igual_a_la_consulta_sql(self):
+        """Filtros y orden coinciden con la consulta a la BD."""
+        sin_proyeccion = TaskManager(usar_proyeccion=False)
+        sin_proyeccion.seleccionar_usuario(self.tm.usuario_activo.idUsuario)
+        combinaciones = [
+            {},
+            {"materia_id": self.mate.idMateria},
+            {"estado": EstadoTarea.Completada},
+            {"prioridad": Prioridad.Alta, "hasta": HOY + timedelta(days=1)},
+            {"materia_id": self.fisica.idMateria, "estado": EstadoTarea.Pendiente},
+            {"desde": HOY + timedelta(days=2)},
+            {"por_prioridad": True},
+            {"materia_id": self.mate.idMateria, "por_prioridad": True},
+        ]
+        for filtros in combinaciones:
+            with self.subTest(filtros=filtros):
+                self.assertEqual(self.tm.listar_tareas(**filtros),
+                                 sin_proyeccion.listar_tareas(**filtros))
+                for clave in ("desde", "hasta", "por_prioridad"):
+                    filtros.pop(clave, None)
+                self.assertEqual(self.tm.contar_tareas(**filtros),
+                                 sin_proyeccion.contar_tareas(**filtros))
+
+    def test_verde_orden_por_fecha(self):
+        """Las tareas se listan por fecha de entrega y luego por ID."""
+        ids = [t.idTarea for t in self.tm.listar_tareas()]
+        esperado = [self.tareas[i].idTarea for i in (3, 1, 0, 2)]
+        self.assertEqual(ids, esperado)
+
+    def test_verde_orden_por_prioridad(self):
+        """Con por_prioridad, Alta primero y por fecha dentro de cada nivel."""
+        ids = [t.idTarea for t in self.tm.listar_tareas(por_prioridad=True)]
+        esperado = [self.tareas[i].idTarea for i in (3, 0, 2, 1)]
+        self.assertEqual(ids, esperado)
+
+    def test_verde_escrituras_de_otro_usuario_no_afectan(self):
+        """Las tareas de otro usuario no entran en la proyección."""
+        otro = TaskManager()
+        u = otro.crear_usuario("Pedro Garcia", "pedro@mail.com")
+        otro.seleccionar_usuario(u.idUsuario)
+        m = otro.crear_materia("Química", "#00FF00")
+        otro.crear_tarea("Laboratorio", "", Prioridad.Media, HOY, m.idMateria)
+        self.assertEqual(self.tm.contar_tareas(), 4)
+        self.assertEqual(self.tm.proyeccion.recargas, 1)
+        self.assertConsistente()
+
+    def test_verde_escrituras_via_cola(self):
+        """Las escrituras confirmadas por la cola también se aplican."""
+        with ColaEscritura(ventana_ms=5) as cola:
+            tm_cola = TaskManager(cola_escritura=cola)
+            tm_cola.seleccionar_usuario(self.tm.usuario_activo.idUsuario)
+            tm_cola.crear_tarea("Por cola", "", Prioridad.Baja, HOY,
+                                self.mate.idMateria)
+        self.assertEqual(self.tm.contar_tareas(materia_id=self.mate.idMateria), 3)
+        self.assertConsistente()
+
+    def test_verde_cambio_de_usuario_recarga(self):
+        """Seleccionar otro usuario carga su propia proyección."""
+        u = self.tm.crear_usuario("Pedro Garcia", "pedro@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.assertEqual(self.tm.proyeccion.usuario_id, u.idUsuario)
+        self.assertEqual(self.tm.listar_tareas(), [])
+
+
+class TestPrioridadEntera(unittest.TestCase):
+    """prioridad y estado se guardan como enteros ordenables."""
+
+    def setUp(self):
+        """Reinicia la BD y crea una tarea de prioridad Alta."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager(usar_cache=False)
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.materia = self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.tarea = self.tm.crear_tarea("Parcial", "", Prioridad.Alta, HOY,
+                                         self.materia.idMateria)
+
+    def tearDown(self):
+        """Limpia la BD después de cada test para evitar datos residuales."""
+        Base.metadata.drop_all(engine)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_valor_invalido(self):
+        """Un valor que no es miembro de la enumeración se rechaza con ValueError."""
+        session = Session()
+        try:
+            session.add(Tarea(titulo="Inválida", prioridad="Urgente", fechaEntrega=HOY,
+                              materia_id=self.materia.idMateria))
+            with self.assertRaises(StatementError) as ctx:
+                session.flush()
+            self.assertIsInstance(ctx.exception.orig, ValueError)
+        finally:
+            session.rollback()
+            session.close()
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_guarda_codigos_enteros(self):
+        """La fila guarda enteros y el modelo sigue exponiendo los miembros."""
+        self.tm.marcar_tarea(self.tarea.idTarea)
+        externa = sqlite3.connect(db_path)
+        try:
+            fila = externa.execute("SELECT prioridad, estado, typeof(prioridad) "
+                                   "FROM tareas").fetchone()
+        finally:
+            externa.close()
+        self.assertEqual(fila, (2, 1, "integer"))
+        tarea = self.tm.seleccionar_tarea(self.tarea.idTarea)
+        self.assertIs(tarea.prioridad, Prioridad.Alta)
+        self.assertIs(tarea.estado, EstadoTarea.Completada)
+
+    def test_verde_orden_por_prioridad_usa_indice(self):
+        """El orden Alta primero de una materia se resuelve con el índice."""
+        with engine.connect() as conn:
+            plan = " ".join(str(f[-1]) for f in conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT idTarea FROM tareas WHERE materia_id = ? "
+                "ORDER BY prioridad DESC, fechaEntrega, idTarea", (self.materia.idMateria,)))
+        self.assertIn("ix_tareas_materia_prioridad", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class TestColumnasListado(unittest.TestCase):
+    """Los listados no cargan la descripción completa."""
+
+    DESCRIPCION = "Resolver los ejercicios 1 a 40 del capítulo 3. " * 10
+
+    def setUp(self):
+        """Reinicia la BD y crea una tarea con descripción larga."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager(usar_cache=False)
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        m = self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.tarea = self.tm.crear_tarea("Guía de ejercicios", self.DESCRIPCION,
+                                         Prioridad.Media, HOY, m.idMateria)
+
+    def tearDown(self):
+        """Limpia la BD después de cada test para evitar datos residuales."""
+        Base.metadata.drop_all(engine)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_descripcion_diferida(self):
+        """Una Tarea cargada sin undefer no trae la descripción."""
+        session = Session()
+        tarea = session.get(Tarea, self.tarea.idTarea)
+        session.close()
+        with self.assertRaises(DetachedInstanceError):
+            tarea.descripcion
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_listado_lee_solo_el_resumen(self):
+        """listar_tareas consulta el resumen, no la descripción completa."""
+        sentencias = []
+
+        def _capturar(*args):
+            sentencias.append(args[2])
+
+        event.listen(engine, "before_cursor_execute", _capturar)
+        try:
+            tareas = self.tm.listar_tareas()
+        finally:
+            event.remove(engine, "before_cursor_execute", _capturar)
+        self.assertEqual(tareas[0].resumen, self.DESCRIPCION[:LARGO_RESUMEN])
+        sql = "\n".join(sentencias)
+        self.assertIn("substr(tareas.descripcion", sql)
+        self.assertNotIn("tareas.descripcion AS", sql)
+
+    def test_verde_descripcion_completa_bajo_demanda(self):
+        """seleccionar_tarea y las mutaciones devuelven la descripción completa."""
+        self.assertEqual(self.tm.seleccionar_tarea(self.tarea.idTarea).descripcion,
+                         self.DESCRIPCION)
+        marcada = self.tm.marcar_tarea(self.tarea.idTarea)
+        self.assertEqual(marcada.descripcion, self.DESCRIPCION)
+
+
+if __name__ == "__main__":
+    unittest.main()
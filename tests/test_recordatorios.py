@@ -0,0 +1,174 @@
+"""
+test_recordatorios.py
+=====================
+Pruebas de MotorRecordatorios: avisos a las antelaciones configuradas y
+actualización incremental cuando las tareas se crean, editan, completan o
+eliminan.
+
+Ejecución:
+    py -m unittest tests.test_recordatorios
+"""
+
+import unittest
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+from src.logic.recordatorios import MotorRecordatorios
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.modelo import Prioridad
+
+HOY = date.today()
+UNA_HORA = timedelta(hours=1)
+UN_DIA = timedelta(days=1)
+
+
+def _en(dias: int, hora: int, minuto: int = 0) -> datetime:
+    """Fecha y hora a `dias` de hoy."""
+    return datetime.combine(HOY + timedelta(days=dias), time(hora, minuto))
+
+
+class TestRecordatorios(unittest.TestCase):
+    """El motor avisa antes de cada entrega y sigue las escrituras."""
+
+    def setUp(self):
+        """Reinicia la BD y crea un usuario con una materia y una tarea."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager(usar_cache=False)
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.materia = self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.tarea = self.tm.crear_tarea("Parcial", "", Prioridad.Alta,
+                                         HOY + timedelta(days=2),
+                                         self.materia.idMateria)
+        self.ahora = _en(0, 8)
+        self.motor = MotorRecordatorios(u.idUsuario, reloj=lambda: self.ahora)
+
+    def tearDown(self):
+        """Limpia la BD después de cada test para evitar datos residuales."""
+        self.motor.cerrar()
+        Base.metadata.drop_all(engine)
+
+    def _avisos(self, momento: datetime) -> list:
+        self.ahora = momento
+        return [(r.tarea_id, r.antelacion) for r in self.motor.revisar()]
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_antelaciones_invalidas(self):
+        """Sin antelaciones, negativas o con fracciones de segundo lanzan ValueError."""
+        for antelaciones in ((), (timedelta(hours=-1),), (timedelta(seconds=1.5),),
+                             ("1 hora",)):
+            with self.subTest(antelaciones=antelaciones):
+                with self.assertRaises(ValueError):
+                    MotorRecordatorios(1, antelaciones=antelaciones)
+
+    def test_rojo_intervalo_invalido(self):
+        """Un intervalo de revisión menor o igual a 0 lanza ValueError."""
+        with self.assertRaises(ValueError):
+            MotorRecordatorios(1, intervalo_s=0)
+
+    def test_rojo_sin_avisos_antes_de_tiempo(self):
+        """Antes de la primera antelación no se emite nada."""
+        self.assertEqual(self._avisos(_en(1, 23, 58)), [])
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_avisa_en_cada_antelacion(self):
+        """Avisa un día y una hora antes de las 23:59 del día de entrega."""
+        id_tarea = self.tarea.idTarea
+        self.assertEqual(self.motor.proximo(), _en(1, 23, 59))
+        self.assertEqual(self._avisos(_en(1, 23, 59)), [(id_tarea, UN_DIA)])
+        self.assertEqual(self._avisos(_en(2, 22, 58)), [])
+        self.assertEqual(self._avisos(_en(2, 22, 59)), [(id_tarea, UNA_HORA)])
+        self.assertEqual(len(self.motor), 0)
+        self.assertIsNone(self.motor.proximo())
+
+    def test_verde_recordatorio_completo(self):
+        """El aviso incluye título y vencimiento; los suscriptores lo reciben."""
+        recibidos = []
+        self.motor.suscribir(recibidos.append)
+        self._avisos(_en(1, 23, 59))
+        self.assertEqual(len(recibidos), 1)
+        self.assertEqual(recibidos[0].titulo, "Parcial")
+        self.assertEqual(recibidos[0].vence, _en(2, 23, 59))
+
+    def test_verde_avisos_atrasados_se_unen(self):
+        """Si pasaron varias antelaciones a la vez, solo avisa la más cercana."""
+        self.assertEqual(self._avisos(_en(2, 23)), [(self.tarea.idTarea, UNA_HORA)])
+        self.assertEqual(self._avisos(_en(2, 23, 30)), [])
+
+    def test_verde_crear_tarea_sin_recargar(self):
+        """Una tarea creada después se programa sin volver a cargar todo."""
+        with mock.patch.object(self.motor, "cargar", side_effect=AssertionError):
+            nueva = self.tm.crear_tarea("Informe", "", Prioridad.Baja,
+                                        HOY + timedelta(days=1), self.materia.idMateria)
+            self.assertEqual(len(self.motor), 2)
+            self.assertEqual(self._avisos(_en(0, 23, 59)), [(nueva.idTarea, UN_DIA)])
+
+    def test_verde_editar_fecha_reprograma(self):
+        """Al cambiar la fecha de entrega solo quedan los avisos nuevos."""
+        self.tm.editar_tarea(self.tarea.idTarea, nueva_fecha_entrega=HOY + timedelta(days=5))
+        self.assertEqual(self._avisos(_en(2, 23, 59)), [])
+        self.assertEqual(self._avisos(_en(4, 23, 59)), [(self.tarea.idTarea, UN_DIA)])
+
+    def test_verde_editar_despues_del_ultimo_aviso(self):
+        """Editar sin cambiar la fecha no repite el último aviso emitido."""
+        id_tarea = self.tarea.idTarea
+        self.assertEqual(self._avisos(_en(1, 23, 59)), [(id_tarea, UN_DIA)])
+        self.assertEqual(self._avisos(_en(2, 22, 59)), [(id_tarea, UNA_HORA)])
+        self.tm.editar_tarea(id_tarea, nuevo_titulo="Parcial final")
+        self.assertEqual(self._avisos(_en(2, 23)), [])
+        self.motor.cargar()
+        self.assertEqual(self._avisos(_en(2, 23, 1)), [])
+        self.tm.editar_tarea(id_tarea, nueva_fecha_entrega=HOY + timedelta(days=3))
+        self.assertEqual(self._avisos(_en(3, 22, 59)), [(id_tarea, UNA_HORA)])
+
+    def test_verde_generacion_repetida_no_revive_avisos(self):
+        """Tras 256 programaciones, los avisos de una fecha anterior no reviven."""
+        id_tarea = self.tarea.idTarea
+        self.tm.editar_tarea(id_tarea, nueva_fecha_entrega=HOY + timedelta(days=30))
+        for i in range(254):
+            self.motor.programar(10 ** 6 + i, HOY + timedelta(days=100))
+        self.tm.editar_tarea(id_tarea, nueva_fecha_entrega=HOY + timedelta(days=60))
+        self.assertEqual(self._avisos(_en(2, 23)), [])
+        self.assertEqual(self._avisos(_en(59, 23, 59)), [(id_tarea, UN_DIA)])
+
+    def test_verde_completar_y_eliminar_cancelan(self):
+        """Completar o eliminar una tarea cancela sus avisos."""
+        otra = self.tm.crear_tarea("Informe", "", Prioridad.Baja,
+                                   HOY + timedelta(days=2), self.materia.idMateria)
+        self.tm.marcar_tarea(self.tarea.idTarea)
+        self.tm.eliminar_tarea(otra.idTarea)
+        self.assertEqual(len(self.motor), 0)
+        self.assertEqual(self._avisos(_en(2, 23)), [])
+        self.tm.desmarcar_tarea(self.tarea.idTarea)
+        self.assertEqual(self._avisos(_en(2, 23)), [(self.tarea.idTarea, UNA_HORA)])
+
+    def test_verde_ignora_otros_usuarios(self):
+        """Las tareas de otros usuarios no se programan."""
+        otro = TaskManager(usar_cache=False)
+        u = otro.crear_usuario("Ana Perez", "ana@mail.com")
+        otro.seleccionar_usuario(u.idUsuario)
+        m = otro.crear_materia("Física", "#3B82F6")
+        otro.crear_tarea("Laboratorio", "", Prioridad.Media,
+                         HOY + timedelta(days=1), m.idMateria)
+        self.assertEqual(len(self.motor), 1)
+        self.assertEqual(self._avisos(_en(0, 23, 59)), [])
+
+    def test_verde_cambios_de_otro_proceso(self):
+        """Un cambio escrito por fuera del proceso se incorpora al revisar."""
+        with engine.begin() as conn:
+            conn.exec_driver_sql("UPDATE tareas SET fechaEntrega = ? WHERE idTarea = ?",
+                                 ((HOY + timedelta(days=1)).isoformat(),
+                                  self.tarea.idTarea))
+        self.assertEqual(self._avisos(_en(1, 22, 59)), [(self.tarea.idTarea, UNA_HORA)])
+
+    def test_verde_materia_eliminada(self):
+        """Las tareas de una materia eliminada ya no avisan."""
+        self.tm.eliminar_materia(self.materia.idMateria)
+        self.assertEqual(self._avisos(_en(2, 23)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
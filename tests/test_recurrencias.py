@@ -0,0 +1,166 @@
+"""
+test_recurrencias.py
+====================
+Pruebas de las tareas recurrentes: validación de la regla, generación
+perezosa de ocurrencias (solo las próximas quedan guardadas) y reposición
+al completar, eliminar o listar un rango de fechas.
+
+Ejecución:
+    py -m unittest tests.test_recurrencias
+"""
+
+import unittest
+from datetime import date, timedelta
+from src.logic.recurrencias import dias_de_mascara, mascara_dias
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.modelo import EstadoTarea, Prioridad
+
+HOY = date.today()
+
+
+class TestRecurrencias(unittest.TestCase):
+    """Una recurrencia guarda pocas ocurrencias y genera el resto a demanda."""
+
+    def setUp(self):
+        """Reinicia la BD y crea un usuario con una materia."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager(ocurrencias_adelantadas=3)
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.materia = self.tm.crear_materia("Física", "#FF5733")
+
+    def tearDown(self):
+        """Limpia la BD después de cada test para evitar datos residuales."""
+        Base.metadata.drop_all(engine)
+
+    def _semanal(self, **kwargs):
+        datos = dict(titulo="Laboratorio", descripcion="", prioridad=Prioridad.Media,
+                     materia_id=self.materia.idMateria, inicio=HOY, cada_dias=7)
+        datos.update(kwargs)
+        return self.tm.crear_recurrencia(**datos)
+
+    def _fechas(self, **filtros) -> list:
+        return [t.fechaEntrega for t in self.tm.listar_tareas(**filtros)]
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_regla_invalida(self):
+        """Sin regla, con dos reglas o con valores fuera de rango lanza ValueError."""
+        casos = (
+            dict(cada_dias=None),
+            dict(dias_semana=[0]),
+            dict(cada_dias=0),
+            dict(cada_dias=True),
+            dict(cada_dias=None, dias_semana=[]),
+            dict(cada_dias=None, dias_semana=[7]),
+            dict(inicio=HOY - timedelta(days=1)),
+            dict(hasta=HOY - timedelta(days=1)),
+            dict(titulo="ab"),
+            dict(prioridad="Alta"),
+        )
+        for caso in casos:
+            with self.subTest(caso=caso):
+                with self.assertRaises(ValueError):
+                    self._semanal(**caso)
+        self.assertEqual(self.tm.listar_recurrencias(), [])
+
+    def test_rojo_materia_de_otro_usuario(self):
+        """No se puede crear una recurrencia en la materia de otro usuario."""
+        otro = TaskManager()
+        u = otro.crear_usuario("Ana Perez", "ana@mail.com")
+        otro.seleccionar_usuario(u.idUsuario)
+        with self.assertRaises(ValueError):
+            otro.crear_recurrencia("Laboratorio", "", Prioridad.Media,
+                                   self.materia.idMateria, HOY, cada_dias=7)
+
+    def test_rojo_eliminar_recurrencia_inexistente(self):
+        """Eliminar una recurrencia que no existe lanza ValueError."""
+        with self.assertRaises(ValueError):
+            self.tm.eliminar_recurrencia(999)
+
+    def test_rojo_ocurrencias_adelantadas_invalidas(self):
+        """Mantener menos de una ocurrencia guardada lanza ValueError."""
+        with self.assertRaises(ValueError):
+            TaskManager(ocurrencias_adelantadas=0)
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_semestre_guarda_solo_las_proximas(self):
+        """Una regla semanal de un semestre solo crea las próximas 3 tareas."""
+        regla = self._semanal(hasta=HOY + timedelta(weeks=18))
+        self.assertEqual(self._fechas(), [HOY + timedelta(weeks=i) for i in range(3)])
+        self.assertEqual(regla.siguiente, HOY + timedelta(weeks=3))
+
+    def test_verde_completar_genera_la_siguiente(self):
+        """Al completar una ocurrencia se genera la siguiente."""
+        self._semanal()
+        primera = self.tm.listar_tareas()[0]
+        self.tm.marcar_tarea(primera.idTarea)
+        self.assertEqual(self._fechas(estado=EstadoTarea.Pendiente),
+                         [HOY + timedelta(weeks=i) for i in range(1, 4)])
+        self.tm.desmarcar_tarea(primera.idTarea)
+        self.assertEqual(len(self.tm.listar_tareas()), 4)
+
+    def test_verde_eliminar_ocurrencia_repone(self):
+        """Al eliminar una ocurrencia se repone para seguir teniendo 3."""
+        self._semanal()
+        self.tm.eliminar_tarea(self.tm.listar_tareas()[1].idTarea)
+        self.assertEqual(self._fechas(), [HOY, HOY + timedelta(weeks=2),
+                                          HOY + timedelta(weeks=3)])
+
+    def test_verde_listar_rango_materializa(self):
+        """Listar un rango lejano genera todas las ocurrencias hasta su final."""
+        self._semanal()
+        fin = HOY + timedelta(weeks=10)
+        self.assertEqual(self._fechas(hasta=fin),
+                         [HOY + timedelta(weeks=i) for i in range(11)])
+        self.assertEqual(len(self.tm.listar_tareas()), 11)
+
+    def test_verde_respeta_fecha_final(self):
+        """No se generan ocurrencias después de la fecha final de la regla."""
+        regla = self._semanal(hasta=HOY + timedelta(weeks=4))
+        self.assertEqual(len(self._fechas(hasta=HOY + timedelta(weeks=20))), 5)
+        self.assertIsNone(self.tm.listar_recurrencias()[0].siguiente)
+        self.assertEqual(regla.hasta, HOY + timedelta(weeks=4))
+
+    def test_verde_dias_de_la_semana(self):
+        """Una regla de lunes y miércoles solo genera esos días."""
+        self._semanal(cada_dias=None, dias_semana=[2, 0])
+        fechas = self._fechas(hasta=HOY + timedelta(weeks=3))
+        self.assertTrue(all(f.weekday() in (0, 2) for f in fechas))
+        self.assertEqual(len(fechas), len({f for f in fechas}))
+        self.assertGreaterEqual(len(fechas), 6)
+        self.assertEqual(dias_de_mascara(mascara_dias([2, 0])), [0, 2])
+
+    def test_verde_cada_n_dias(self):
+        """Una regla cada 3 días desde mañana queda alineada con su inicio."""
+        inicio = HOY + timedelta(days=1)
+        self._semanal(inicio=inicio, cada_dias=3)
+        self.assertEqual(self._fechas(hasta=HOY + timedelta(days=10)),
+                         [inicio + timedelta(days=3 * i) for i in range(4)])
+
+    def test_verde_eliminar_recurrencia(self):
+        """Se eliminan las pendientes y se conservan las completadas."""
+        regla = self._semanal()
+        completada = self.tm.listar_tareas()[0]
+        self.tm.marcar_tarea(completada.idTarea)
+        self.assertEqual(self.tm.seleccionar_tarea(completada.idTarea).recurrencia_id,
+                         regla.idRecurrencia)
+        self.assertTrue(self.tm.eliminar_recurrencia(regla.idRecurrencia))
+        tareas = self.tm.listar_tareas()
+        self.assertEqual([t.idTarea for t in tareas], [completada.idTarea])
+        self.assertIsNone(self.tm.seleccionar_tarea(completada.idTarea).recurrencia_id)
+        self.assertEqual(self.tm.listar_recurrencias(), [])
+
+    def test_verde_eliminar_materia_elimina_recurrencias(self):
+        """Eliminar la materia elimina sus recurrencias y ocurrencias."""
+        self._semanal()
+        self.tm.eliminar_materia(self.materia.idMateria)
+        self.assertEqual(self.tm.listar_recurrencias(), [])
+        self.assertEqual(self.tm.listar_tareas(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+"""
+test_reintentos.py
+==================
+Pruebas de la política de reintentos ante bloqueos de SQLite
+(src.logic.reintentos), incluida una prueba de contención real entre
+varios procesos que comparten el mismo archivo de base de datos.
+
+Ejecución:
+    py -m unittest tests.test_reintentos
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from sqlalchemy.exc import OperationalError
+from src.logic.metricas import metricas
+from src.logic.reintentos import PoliticaReintentos, es_error_bloqueo
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _error_bloqueo():
+    """Construye un OperationalError equivalente a 'database is locked'."""
+    return OperationalError("UPDATE tareas ...", {},
+                            sqlite3.OperationalError("database is locked"))
+
+
+class TestPoliticaReintentos(unittest.TestCase):
+    """Pruebas unitarias de PoliticaReintentos."""
+
+    def setUp(self):
+        """Reinicia las métricas globales."""
+        metricas.reiniciar()
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_intentos_invalidos(self):
+        """max_intentos menor a 1 debe lanzar ValueError."""
+        with self.assertRaises(ValueError):
+            PoliticaReintentos(max_intentos=0)
+
+    def test_rojo_error_no_bloqueo_no_se_reintenta(self):
+        """Un ValueError se propaga sin reintentos."""
+        llamadas = []
+
+        def falla():
+            llamadas.append(1)
+            raise ValueError("La tarea no existe")
+
+        with self.assertRaises(ValueError):
+            PoliticaReintentos(espera_base_ms=0).ejecutar(falla)
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual(metricas.valor("escritura.reintentos"), 0)
+
+    def test_rojo_intentos_agotados(self):
+        """Tras agotar los intentos se propaga el error de bloqueo."""
+        def siempre_bloqueada():
+            raise _error_bloqueo()
+
+        politica = PoliticaReintentos(max_intentos=3, espera_base_ms=0,
+                                      espera_max_ms=0)
+        with self.assertRaises(OperationalError):
+            politica.ejecutar(siempre_bloqueada)
+        self.assertEqual(metricas.valor("escritura.reintentos"), 2)
+        self.assertEqual(metricas.valor("escritura.reintentos_agotados"), 1)
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_reintenta_hasta_exito(self):
+        """Un bloqueo transitorio se resuelve reintentando."""
+        intentos = []
+
+        def bloqueada_dos_veces():
+            intentos.append(1)
+            if len(intentos) < 3:
+                raise _error_bloqueo()
+            return "ok"
+
+        politica = PoliticaReintentos(espera_base_ms=0, espera_max_ms=0)
+        self.assertEqual(politica.ejecutar(bloqueada_dos_veces), "ok")
+        self.assertEqual(metricas.valor("escritura.reintentos"), 2)
+
+    def test_verde_espera_acotada(self):
+        """La espera con jitter nunca supera el tope configurado."""
+        politica = PoliticaReintentos(espera_base_ms=10, espera_max_ms=40)
+        for intento in range(1, 10):
+            self.assertLessEqual(politica.espera(intento), 0.040)
+
+    def test_verde_detecta_errores_de_bloqueo(self):
+        """Solo los errores de bloqueo se consideran reintentables."""
+        self.assertTrue(es_error_bloqueo(_error_bloqueo()))
+        self.assertFalse(es_error_bloqueo(ValueError("database is locked")))
+
+
+# Script que ejecuta cada proceso de la prueba de contención.
+_TRABAJADOR = textwrap.dedent("""
+    import json, sys
+    from src.logic.metricas import metricas
+    from src.logic.reintentos import PoliticaReintentos
+    from src.logic.task_manager import TaskManager
+
+    usuario_id, tarea_id, cambios = map(int, sys.argv[1:4])
+    tm = TaskManager(politica_reintentos=PoliticaReintentos(
+        max_intentos=50, espera_base_ms=2, espera_max_ms=50))
+    tm.seleccionar_usuario(usuario_id)
+    fallos = 0
+    for i in range(cambios):
+        try:
+            (tm.marcar_tarea if i % 2 == 0 else tm.desmarcar_tarea)(tarea_id)
+        except Exception:
+            fallos += 1
+    print(json.dumps({"fallos": fallos,
+                      "reintentos": metricas.valor("escritura.reintentos")}))
+""")
+
+_PREPARAR = textwrap.dedent("""
+    import json, sys
+    from datetime import date
+    from src.logic.task_manager import TaskManager
+    from src.model.declarative_base import Base, engine
+    from src.model.modelo import Prioridad
+
+    Base.metadata.create_all(engine)
+    tm = TaskManager()
+    u = tm.crear_usuario("Usuario Concurrente", "conc@mail.com")
+    tm.seleccionar_usuario(u.idUsuario)
+    m = tm.crear_materia("Concurrencia", "#3B82F6")
+    ids = [tm.crear_tarea(f"Tarea {i}", "", Prioridad.Media, date.today(),
+                          m.idMateria).idTarea for i in range(int(sys.argv[1]))]
+    print(json.dumps({"usuario": u.idUsuario, "tareas": ids}))
+""")
+
+
+class TestContencionMultiproceso(unittest.TestCase):
+    """Varios procesos escriben a la vez sobre el mismo archivo SQLite."""
+
+    PROCESOS = 4
+    CAMBIOS = 40
+
+    def setUp(self):
+        """Crea un archivo de BD temporal y un entorno que apunta a él."""
+        self.dir = tempfile.TemporaryDirectory()
+        self.env = dict(os.environ,
+                        TASKMASTER_DB=os.path.join(self.dir.name, "c.sqlite"),
+                        # Timeout corto para forzar la ruta de reintentos
+                        TASKMASTER_BUSY_TIMEOUT_MS="1",
+                        PYTHONPATH=RAIZ)
+
+    def tearDown(self):
+        """Elimina el directorio temporal."""
+        self.dir.cleanup()
+
+    def _python(self, codigo, *args):
+        return subprocess.Popen([sys.executable, "-c", codigo, *map(str, args)],
+                                cwd=RAIZ, env=self.env, text=True,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def test_verde_sin_fallos_visibles_bajo_contencion(self):
+        """Ningún proceso ve errores de bloqueo gracias a los reintentos."""
+        proc = self._python(_PREPARAR, self.PROCESOS)
+        salida, error = proc.communicate(timeout=60)
+        self.assertEqual(proc.returncode, 0, error)
+        datos = json.loads(salida)
+
+        procesos = [self._python(_TRABAJADOR, datos["usuario"], t, self.CAMBIOS)
+                    for t in datos["tareas"]]
+        fallos = 0
+        for p in procesos:
+            salida, error = p.communicate(timeout=120)
+            self.assertEqual(p.returncode, 0, error)
+            fallos += json.loads(salida)["fallos"]
+
+        self.assertEqual(fallos, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
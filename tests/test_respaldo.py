@@ -0,0 +1,156 @@
+"""
+test_respaldo.py
+================
+Pruebas del respaldo en caliente (src.model.respaldo): copia por pasos,
+progreso, rotación de generaciones, verificación y restauración.
+
+Ejecución:
+    py -m unittest tests.test_respaldo
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import date, timedelta
+from src.logic.cambios import DetectorCambios, SeguidorCambios
+from src.logic.task_manager import TaskManager
+from src.model import respaldo
+from src.model.declarative_base import Base, engine, db_path
+from src.model.modelo import Prioridad
+
+MANANA = date.today() + timedelta(days=1)
+
+
+class TestRespaldo(unittest.TestCase):
+    """Respaldar y restaurar la base de datos en uso."""
+
+    def setUp(self):
+        """Reinicia la BD y crea un usuario con una materia y dos tareas."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager()
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.materia = self.tm.crear_materia("Física", "#3B82F6")
+        for titulo in ("Informe", "Guía 3"):
+            self.tm.crear_tarea(titulo, "", Prioridad.Media, MANANA,
+                                self.materia.idMateria)
+        self.dir = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.dir.name, "respaldos", "db.sqlite")
+
+    def tearDown(self):
+        """Limpia la BD y los archivos temporales."""
+        self.dir.cleanup()
+        Base.metadata.drop_all(engine)
+
+    def _titulos(self, ruta=None) -> list:
+        if ruta is None:
+            return sorted(t.titulo for t in self.tm.listar_tareas())
+        with sqlite3.connect(ruta) as conexion:
+            return sorted(f[0] for f in conexion.execute("SELECT titulo FROM tareas"))
+
+    def _crear(self, titulo: str):
+        self.tm.crear_tarea(titulo, "", Prioridad.Baja, MANANA, self.materia.idMateria)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_parametros_invalidos(self):
+        """Generaciones, páginas o pausa inválidas lanzan ValueError."""
+        for parametros in ({"generaciones": 0}, {"generaciones": True},
+                           {"paginas": "10"}, {"pausa": -1}):
+            with self.subTest(**parametros):
+                with self.assertRaises(ValueError):
+                    respaldo.respaldar(self.ruta, **parametros)
+        self.assertFalse(os.path.exists(os.path.dirname(self.ruta)))
+
+    def test_rojo_restaurar_archivo_invalido(self):
+        """Un respaldo inexistente, que no es SQLite o ajeno lanza ValueError."""
+        ajeno = os.path.join(self.dir.name, "ajeno.sqlite")
+        with sqlite3.connect(ajeno) as conexion:
+            conexion.execute("CREATE TABLE notas (texto TEXT)")
+        basura = os.path.join(self.dir.name, "basura.sqlite")
+        with open(basura, "wb") as archivo:
+            archivo.write(b"no es una base de datos" * 200)
+        for ruta in (os.path.join(self.dir.name, "no_existe.sqlite"), basura, ajeno):
+            with self.subTest(ruta=os.path.basename(ruta)):
+                with self.assertRaises(ValueError):
+                    respaldo.restaurar(ruta)
+        self.assertEqual(self._titulos(), ["Guía 3", "Informe"])
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_respaldo_verificado(self):
+        """El respaldo es un único archivo con los datos y pasa quick_check."""
+        avances = []
+        resultado = respaldo.respaldar(self.ruta, paginas=2, pausa=0,
+                                       progreso=lambda c, t: avances.append((c, t)))
+        self.assertEqual(respaldo.verificar(self.ruta), [])
+        self.assertEqual(self._titulos(self.ruta), ["Guía 3", "Informe"])
+        self.assertEqual(os.listdir(os.path.dirname(self.ruta)), ["db.sqlite"])
+        self.assertGreater(resultado.pasos, 1)
+        self.assertEqual(len(avances), resultado.pasos)
+        self.assertEqual(avances[-1], (resultado.paginas, resultado.paginas))
+        self.assertEqual([c for c, _ in avances], sorted(c for c, _ in avances))
+        with sqlite3.connect(self.ruta) as conexion:
+            self.assertEqual(conexion.execute("PRAGMA journal_mode").fetchone()[0],
+                             "delete")
+
+    def test_verde_rotacion_de_generaciones(self):
+        """Se conservan las últimas generaciones, la más nueva sin sufijo."""
+        for titulo in ("Parcial 1", "Parcial 2", "Parcial 3"):
+            self._crear(titulo)
+            respaldo.respaldar(self.ruta, generaciones=2)
+        self.assertEqual(sorted(os.listdir(os.path.dirname(self.ruta))),
+                         ["db.sqlite", "db.sqlite.1"])
+        self.assertIn("Parcial 3", self._titulos(self.ruta))
+        anterior = self._titulos(respaldo.generacion(self.ruta, 1))
+        self.assertIn("Parcial 2", anterior)
+        self.assertNotIn("Parcial 3", anterior)
+        respaldo.respaldar(self.ruta, generaciones=1)
+        self.assertEqual(os.listdir(os.path.dirname(self.ruta)), ["db.sqlite"])
+
+    def test_verde_escrituras_durante_el_respaldo(self):
+        """Si otra conexión escribe en cada paso, se termina en un solo paso."""
+        escritas = []
+
+        def _escribir(copiadas, total):
+            if copiadas < total:
+                escritas.append(f"Durante {len(escritas)}")
+                self._crear(escritas[-1])
+
+        resultado = respaldo.respaldar(self.ruta, paginas=1, pausa=0, progreso=_escribir)
+        self.assertGreater(resultado.reinicios, respaldo.MAX_REINICIOS)
+        self.assertEqual(respaldo.verificar(self.ruta), [])
+        self.assertEqual(self._titulos(self.ruta), self._titulos())
+
+    def test_verde_restaurar(self):
+        """Restaurar vuelve al estado respaldado, también en la caché."""
+        respaldo.respaldar(self.ruta)
+        self.assertEqual(len(self.tm.listar_tareas()), 2)
+        self._crear("Después del respaldo")
+        resultado = respaldo.restaurar(self.ruta)
+        self.assertEqual(resultado.pasos, 1)
+        self.assertEqual(self._titulos(), ["Guía 3", "Informe"])
+        self._crear("Tras restaurar")
+        self.assertEqual(len(self.tm.listar_tareas()), 3)
+
+    def test_verde_restaurar_se_detecta_aunque_siga_el_historial(self):
+        """Tras restaurar se recarga todo aunque el historial vuelva a crecer."""
+        respaldo.respaldar(self.ruta)
+        for i in range(5):
+            self._crear(f"Antes {i}")
+        detector = DetectorCambios(db_path)
+        try:
+            seguidor = SeguidorCambios(detector)
+            seguidor.revisar()
+            respaldo.restaurar(self.ruta)
+            for i in range(10):
+                self._crear(f"Después {i}")
+            self.assertEqual(seguidor.revisar(), (True, None))
+        finally:
+            detector.cerrar()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+test_resumenes.py
+=================
+Pruebas de los contadores de tareas por materia y por usuario
+(ResumenMateria / ResumenUsuario), mantenidos por triggers, y de su
+reparación (src.model.migraciones.reparar_resumenes).
+
+Ejecución:
+    py -m unittest tests.test_resumenes
+"""
+
+import unittest
+from datetime import date, timedelta
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.migraciones import reparar_resumenes
+from src.model.modelo import Prioridad
+
+HOY = date.today()
+
+
+class TestResumenes(unittest.TestCase):
+    """Los resúmenes coinciden siempre con las tareas."""
+
+    def setUp(self):
+        """Reinicia la BD y crea un usuario con dos materias."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager()
+        self.usuario = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(self.usuario.idUsuario)
+        self.mate = self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.fisica = self.tm.crear_materia("Física", "#0000FF")
+
+    def tearDown(self):
+        """Limpia la BD después de cada test para evitar datos residuales."""
+        Base.metadata.drop_all(engine)
+
+    def _tarea(self, dias, materia=None):
+        materia = materia or self.mate
+        return self.tm.crear_tarea(f"Tarea {dias}", "", Prioridad.Media,
+                                   HOY + timedelta(days=dias), materia.idMateria)
+
+    def assertExactos(self):
+        """Recalcular desde las tareas no debe encontrar diferencias."""
+        self.assertEqual(reparar_resumenes(engine), 0)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_sin_usuario_activo(self):
+        """Leer los resúmenes sin usuario activo lanza ValueError."""
+        tm = TaskManager()
+        with self.assertRaises(ValueError):
+            tm.resumen_materias()
+        with self.assertRaises(ValueError):
+            tm.resumen_usuario()
+
+    def test_rojo_resumen_desfasado_se_repara(self):
+        """reparar_resumenes corrige contadores modificados a mano."""
+        self._tarea(1)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("UPDATE resumen_materias SET total = 99")
+            conn.exec_driver_sql("DELETE FROM resumen_usuarios")
+        self.assertEqual(reparar_resumenes(engine), 3)
+        self.assertEqual(self.tm.resumen_materias()[self.mate.idMateria].total, 1)
+        self.assertEqual(self.tm.resumen_usuario().total, 1)
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_materias_nuevas_en_cero(self):
+        """Cada materia y usuario nuevos tienen su resumen en cero."""
+        resumenes = self.tm.resumen_materias()
+        self.assertEqual(set(resumenes), {self.mate.idMateria, self.fisica.idMateria})
+        self.assertEqual(resumenes[self.mate.idMateria].total, 0)
+        self.assertIsNone(resumenes[self.mate.idMateria].primera_pendiente)
+        self.assertEqual(self.tm.resumen_usuario().total, 0)
+
+    def test_verde_crear_marcar_y_eliminar(self):
+        """Los contadores siguen altas, cambios de estado y bajas."""
+        t1, t2, t3 = self._tarea(1), self._tarea(2), self._tarea(5, self.fisica)
+        self.tm.marcar_tarea(t1.idTarea)
+        self.tm.eliminar_tarea(t2.idTarea)
+        mate = self.tm.resumen_materias()[self.mate.idMateria]
+        self.assertEqual((mate.total, mate.pendientes, mate.completadas), (1, 0, 1))
+        usuario = self.tm.resumen_usuario()
+        self.assertEqual((usuario.total, usuario.pendientes, usuario.completadas),
+                         (2, 1, 1))
+        self.assertEqual(usuario.primera_pendiente, t3.fechaEntrega)
+        self.assertExactos()
+
+    def test_verde_primera_pendiente_se_recalcula(self):
+        """Al completar la entrega más próxima, pasa a la siguiente."""
+        vencida, proxima = self._tarea(1), self._tarea(4)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("UPDATE tareas SET fechaEntrega = ? WHERE idTarea = ?",
+                                 ((HOY - timedelta(days=2)).isoformat(), vencida.idTarea))
+        self.assertLess(self.tm.resumen_usuario().primera_pendiente, HOY)
+        self.tm.marcar_tarea(vencida.idTarea)
+        self.assertEqual(self.tm.resumen_materias()[self.mate.idMateria].primera_pendiente,
+                         proxima.fechaEntrega)
+        self.tm.editar_tarea(proxima.idTarea, nueva_fecha_entrega=HOY + timedelta(days=9))
+        self.assertEqual(self.tm.resumen_usuario().primera_pendiente,
+                         HOY + timedelta(days=9))
+        self.assertExactos()
+
+    def test_verde_mover_tarea_de_materia(self):
+        """Cambiar materia_id descuenta de una materia y suma a la otra."""
+        t = self._tarea(3)
+        self.tm.editar_tarea(t.idTarea, nueva_materia_id=self.fisica.idMateria)
+        resumenes = self.tm.resumen_materias()
+        self.assertEqual(resumenes[self.mate.idMateria].total, 0)
+        self.assertEqual(resumenes[self.fisica.idMateria].total, 1)
+        self.assertExactos()
+
+    def test_verde_eliminar_materia_y_usuario(self):
+        """Eliminar una materia descuenta sus tareas del usuario."""
+        self._tarea(1)
+        self._tarea(2, self.fisica)
+        self.tm.eliminar_materia(self.mate.idMateria)
+        self.assertEqual(set(self.tm.resumen_materias()), {self.fisica.idMateria})
+        self.assertEqual(self.tm.resumen_usuario().total, 1)
+        self.assertExactos()
+        self.tm.eliminar_materia(self.fisica.idMateria)
+        self.tm.eliminar_usuario(self.usuario.idUsuario)
+        with engine.connect() as conn:
+            filas = conn.exec_driver_sql(
+                "SELECT (SELECT COUNT(*) FROM resumen_materias), "
+                "(SELECT COUNT(*) FROM resumen_usuarios)").fetchone()
+        self.assertEqual(tuple(filas), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+test_siguientes.py
+==================
+Pruebas de TaskManager.siguientes ("qué hago ahora"): puntaje por
+prioridad, días hasta la entrega y esfuerzo estimado, y recálculo cuando
+cambian las tareas o la fecha.
+
+Ejecución:
+    py -m unittest tests.test_siguientes
+"""
+
+import random
+import unittest
+from datetime import date, timedelta
+from src.logic.ranking import puntaje
+from src.logic.task_manager import TaskManager
+from src.model.declarative_base import Base, engine
+from src.model.modelo import Prioridad
+
+HOY = date.today()
+
+
+def _en(dias: int) -> date:
+    return HOY + timedelta(days=dias)
+
+
+class TestSiguientes(unittest.TestCase):
+    """siguientes elige las tareas más urgentes sin recorrer todas."""
+
+    def setUp(self):
+        """Reinicia la BD y crea un usuario con una materia."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager()
+        u = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(u.idUsuario)
+        self.materia = self.tm.crear_materia("Matemáticas", "#FF5733")
+
+    def tearDown(self):
+        """Limpia la BD después de cada test para evitar datos residuales."""
+        Base.metadata.drop_all(engine)
+
+    def _tarea(self, titulo, prioridad, dias, esfuerzo=None):
+        return self.tm.crear_tarea(titulo, "", prioridad, _en(dias),
+                                   self.materia.idMateria, esfuerzo=esfuerzo)
+
+    def _titulos(self, n=10, hoy=None) -> list:
+        return [s.tarea.titulo for s in self.tm.siguientes(n, hoy=hoy)]
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_cantidad_invalida(self):
+        """Una cantidad menor que 1 o no entera lanza ValueError."""
+        for n in (0, -1, 2.5, True):
+            with self.subTest(n=n):
+                with self.assertRaises(ValueError):
+                    self.tm.siguientes(n)
+
+    def test_rojo_sin_usuario_activo(self):
+        """Sin usuario activo lanza ValueError."""
+        with self.assertRaises(ValueError):
+            TaskManager().siguientes()
+
+    def test_rojo_esfuerzo_invalido(self):
+        """Un esfuerzo negativo, enorme o no entero lanza ValueError."""
+        tarea = self._tarea("Informe", Prioridad.Media, 3)
+        for esfuerzo in (-1, 10_000, 1.5, "3"):
+            with self.subTest(esfuerzo=esfuerzo):
+                with self.assertRaises(ValueError):
+                    self._tarea("Guía", Prioridad.Baja, 2, esfuerzo=esfuerzo)
+                with self.assertRaises(ValueError):
+                    self.tm.editar_tarea(tarea.idTarea, nuevo_esfuerzo=esfuerzo)
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_prioridad_y_cercania(self):
+        """Una Alta pesa como una Baja que vence dos semanas antes."""
+        self._tarea("Alta lejana", Prioridad.Alta, 14)
+        self._tarea("Baja hoy", Prioridad.Baja, 0)
+        self._tarea("Media en una semana", Prioridad.Media, 7)
+        self._tarea("Baja mañana", Prioridad.Baja, 1)
+        self.assertEqual(self._titulos(),
+                         ["Baja hoy", "Media en una semana", "Alta lejana", "Baja mañana"])
+        self.assertEqual(self.tm.siguientes(1)[0].puntaje, 1.0)
+
+    def test_verde_esfuerzo_adelanta(self):
+        """Una tarea con mucho esfuerzo estimado sube aunque venza después."""
+        self._tarea("Lectura", Prioridad.Media, 3)
+        proyecto = self._tarea("Proyecto", Prioridad.Media, 10)
+        self.assertEqual(self._titulos(1), ["Lectura"])
+        self.tm.editar_tarea(proyecto.idTarea, nuevo_esfuerzo=40)
+        primera = self.tm.siguientes(1)[0]
+        self.assertEqual(primera.tarea.titulo, "Proyecto")
+        self.assertEqual(primera.inicio, _en(0))
+
+    def test_verde_completar_recalcula(self):
+        """Completar la primera tarea la saca del resultado."""
+        primera = self._tarea("Parcial", Prioridad.Alta, 1)
+        self._tarea("Guía", Prioridad.Baja, 5)
+        self.assertEqual(self._titulos(), ["Parcial", "Guía"])
+        self.tm.marcar_tarea(primera.idTarea)
+        self.assertEqual(self._titulos(), ["Guía"])
+
+    def test_verde_cambio_de_dia(self):
+        """Al cambiar la fecha el puntaje se calcula de nuevo."""
+        self._tarea("Informe", Prioridad.Media, 7)
+        self.assertEqual(self.tm.siguientes(hoy=HOY)[0].puntaje, 1.0)
+        self.assertEqual(self.tm.siguientes(hoy=_en(7))[0].puntaje, 2.0)
+
+    def test_verde_ignora_otros_usuarios(self):
+        """Las tareas de otros usuarios no aparecen."""
+        self._tarea("Propia", Prioridad.Baja, 20)
+        otro = TaskManager()
+        u = otro.crear_usuario("Ana Perez", "ana@mail.com")
+        otro.seleccionar_usuario(u.idUsuario)
+        m = otro.crear_materia("Física", "#3B82F6")
+        otro.crear_tarea("Ajena", "", Prioridad.Alta, HOY, m.idMateria)
+        self.assertEqual(self._titulos(), ["Propia"])
+
+    def test_verde_igual_a_ordenar_todo(self):
+        """El resultado coincide con puntuar y ordenar todas las pendientes."""
+        azar = random.Random(7)
+        for i in range(120):
+            self._tarea(f"Tarea {i}", azar.choice(list(Prioridad)), azar.randrange(60),
+                        azar.choice((None, 2, 8, 30)))
+        hoy = _en(5)
+        esperado = sorted(
+            ((puntaje(t.prioridad, t.fechaEntrega - timedelta(
+                days=-(-(self.tm.seleccionar_tarea(t.idTarea).esfuerzo or 0) // 4)), hoy),
+              -t.fechaEntrega.toordinal(), -t.idTarea)
+             for t in self.tm.listar_tareas()), reverse=True)[:15]
+        obtenido = [(s.puntaje, -s.tarea.fechaEntrega.toordinal(), -s.tarea.idTarea)
+                    for s in self.tm.siguientes(15, hoy=hoy)]
+        self.assertEqual(obtenido, esperado)
+
+
+if __name__ == "__main__":
+    unittest.main()
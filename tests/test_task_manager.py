@@ -18,8 +18,10 @@ garantizando aislamiento total entre tests.
 """
 
 from datetime import date, timedelta
+import threading
 import unittest
-from src.logic.task_manager import TaskManager
+from sqlalchemy import event
+from src.logic.task_manager import TaskManager, ConflictoVersionError
 from src.model.declarative_base import Base, engine
 from src.model.modelo import Prioridad, EstadoTarea, Usuario, Materia, Tarea
 
@@ -131,6 +133,54 @@ class TestHU001CrearUsuario(unittest.TestCase):
             self.tm.crear_usuario("Sexto Usuario", "sexto@mail.com")
         self.assertIn("límite", str(ctx.exception).lower())
 
+    def test_rojo_limite_con_creadores_concurrentes(self):
+        """50 hilos creando usuarios a la vez no superan el límite de 5."""
+        barrera = threading.Barrier(50)
+        errores = []
+
+        def crear(i):
+            tm = TaskManager()
+            barrera.wait()
+            try:
+                tm.crear_usuario(f"Usuario Concurrente {chr(65 + i % 26)}",
+                                 f"conc{i}@mail.com")
+            except ValueError as ex:
+                errores.append(str(ex).lower())
+
+        hilos = [threading.Thread(target=crear, args=(i,)) for i in range(50)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+
+        self.assertEqual(len(self.tm.listar_usuarios()), 5)
+        self.assertEqual(len(errores), 45)
+        self.assertTrue(all("límite" in e for e in errores))
+
+    def test_rojo_correo_duplicado_concurrente(self):
+        """Dos hilos con el mismo correo: solo uno lo registra."""
+        barrera = threading.Barrier(2)
+        errores = []
+
+        def crear(nombre):
+            tm = TaskManager()
+            barrera.wait()
+            try:
+                tm.crear_usuario(nombre, "mismo@mail.com")
+            except ValueError as ex:
+                errores.append(str(ex).lower())
+
+        hilos = [threading.Thread(target=crear, args=(n,))
+                 for n in ("Ana Torres", "Luis Perez")]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+
+        self.assertEqual(len(self.tm.listar_usuarios()), 1)
+        self.assertEqual(len(errores), 1)
+        self.assertIn("registrado", errores[0])
+
     def test_rojo_nombre_vacio(self):
         """Nombre vacío debe lanzar ValueError."""
         with self.assertRaises(ValueError) as ctx:
@@ -297,6 +347,108 @@ class TestHU002SeleccionarUsuario(unittest.TestCase):
         self.assertEqual(self.tm.usuario_activo.idUsuario, creado.idUsuario)
 
 
+# ══════════════════════════════════════════════════════════════════
+# HU-001 / HU-002: LÍMITE CONFIGURABLE Y DIRECTORIO DE USUARIOS
+# ══════════════════════════════════════════════════════════════════
+
+class TestDirectorioUsuarios(unittest.TestCase):
+    """
+    Pruebas del límite configurable de usuarios y del listado paginado
+    con búsqueda por prefijo de nombre o correo.
+    """
+
+    NOMBRES = ["Ana Torres", "ana Beltran", "Andres Mora", "Bruno Diaz",
+               "Carla Ruiz", "Zoe Paz", "Mario Lopez"]
+
+    def setUp(self):
+        """Reinicia la BD y crea usuarios sin límite."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager(limite_usuarios=None)
+        for n in self.NOMBRES:
+            nombre, apellido = n.lower().split()
+            self.tm.crear_usuario(n, f"{apellido}.{nombre}@mail.com")
+
+    def tearDown(self):
+        """Limpia la BD después de cada test para evitar datos residuales."""
+        Base.metadata.drop_all(engine)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_limite_configurado(self):
+        """Un límite configurado se respeta con su propio valor."""
+        tm = TaskManager(limite_usuarios=len(self.NOMBRES))
+        with self.assertRaises(ValueError) as ctx:
+            tm.crear_usuario("Nuevo Usuario", "nuevo@mail.com")
+        self.assertIn(f"máximo {len(self.NOMBRES)}", str(ctx.exception).lower())
+
+    def test_rojo_limite_invalido(self):
+        """Un límite menor a 1 debe lanzar ValueError."""
+        with self.assertRaises(ValueError):
+            TaskManager(limite_usuarios=0)
+
+    def test_rojo_pagina_invalida(self):
+        """Un tamaño de página menor a 1 debe lanzar ValueError."""
+        with self.assertRaises(ValueError):
+            self.tm.listar_usuarios(limite=0)
+
+    def test_rojo_busqueda_escapa_comodines(self):
+        """Los comodines de LIKE se buscan como texto literal."""
+        self.assertEqual(self.tm.listar_usuarios(busqueda="%"), [])
+        self.assertEqual(self.tm.listar_usuarios(busqueda="a_"), [])
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_sin_limite(self):
+        """Sin límite se pueden registrar más de 5 usuarios."""
+        self.assertEqual(len(self.tm.listar_usuarios()), len(self.NOMBRES))
+
+    def test_verde_orden_alfabetico(self):
+        """El listado se ordena por nombre sin distinguir mayúsculas."""
+        nombres = [u.nombre for u in self.tm.listar_usuarios()]
+        self.assertEqual(nombres, sorted(self.NOMBRES, key=str.lower))
+
+    def test_verde_paginacion_recorre_todo(self):
+        """Las páginas consecutivas cubren todos los usuarios sin repetir."""
+        vistos, cursor = [], None
+        while True:
+            pagina = self.tm.listar_usuarios(despues_de=cursor, limite=3)
+            vistos += [u.idUsuario for u in pagina]
+            if len(pagina) < 3:
+                break
+            cursor = (pagina[-1].nombre, pagina[-1].idUsuario)
+        todos = [u.idUsuario for u in self.tm.listar_usuarios()]
+        self.assertEqual(vistos, todos)
+
+    def test_verde_busqueda_por_prefijo(self):
+        """La búsqueda coincide por prefijo de nombre o de correo."""
+        por_nombre = [u.nombre for u in self.tm.listar_usuarios(busqueda="AN")]
+        self.assertEqual(por_nombre, ["ana Beltran", "Ana Torres", "Andres Mora"])
+        por_correo = [u.nombre for u in self.tm.listar_usuarios(busqueda="paz.")]
+        self.assertEqual(por_correo, ["Zoe Paz"])
+
+    def test_verde_consultas_usan_indices(self):
+        """La búsqueda y la paginación usan los índices NOCASE."""
+        sentencias = []
+
+        def capturar(conn, cursor, sql, params, *args):
+            if sql.startswith("SELECT"):
+                sentencias.append((sql, params))
+
+        event.listen(engine, "before_cursor_execute", capturar)
+        try:
+            self.tm.listar_usuarios(busqueda="an", limite=2)
+            self.tm.listar_usuarios(despues_de=("Carla Ruiz", 5), limite=2)
+        finally:
+            event.remove(engine, "before_cursor_execute", capturar)
+
+        with engine.connect() as conn:
+            for sql, params in sentencias:
+                plan = " ".join(str(f[-1]) for f in conn.exec_driver_sql(
+                    "EXPLAIN QUERY PLAN " + sql, params))
+                self.assertIn("USING INDEX ix_usuarios_nombre", plan)
+
+
 # ══════════════════════════════════════════════════════════════════
 # HU-003: CREAR MATERIA
 # ══════════════════════════════════════════════════════════════════
@@ -1084,5 +1236,96 @@ class TestHU011EliminarTarea(unittest.TestCase):
         self.assertIsNone(self.tm.seleccionar_tarea(id_tarea))
 
 
+
+# ══════════════════════════════════════════════════════════════════
+# CONCURRENCIA OPTIMISTA (columna version)
+# ══════════════════════════════════════════════════════════════════
+
+class TestConcurrenciaOptimista(unittest.TestCase):
+    """
+    Pruebas de detección de ediciones concurrentes.
+
+    Simula dos ventanas (dos instancias de TaskManager) que leen la misma
+    entidad; la segunda en guardar debe recibir ConflictoVersionError en
+    lugar de sobrescribir en silencio los cambios de la primera.
+    """
+
+    def setUp(self):
+        """Reinicia la BD y crea dos gestores sobre el mismo usuario."""
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.tm = TaskManager()
+        self.usuario = self.tm.crear_usuario("Juan Lopez", "juan@mail.com")
+        self.tm.seleccionar_usuario(self.usuario.idUsuario)
+        self.materia = self.tm.crear_materia("Matemáticas", "#FF5733")
+        self.tarea = crear_tarea_helper(self.tm, self.materia.idMateria)
+        self.otra_ventana = TaskManager()
+        self.otra_ventana.seleccionar_usuario(self.usuario.idUsuario)
+
+    def tearDown(self):
+        """Limpia la BD después de cada test para evitar datos residuales."""
+        Base.metadata.drop_all(engine)
+
+    # ── CASOS ROJOS ───────────────────────────────────────────────
+
+    def test_rojo_conflicto_editar_tarea(self):
+        """Editar una tarea con versión desactualizada debe fallar."""
+        leida = self.tarea.version
+        self.otra_ventana.editar_tarea(self.tarea.idTarea, nuevo_titulo="Cambio ajeno")
+        with self.assertRaises(ConflictoVersionError):
+            self.tm.editar_tarea(self.tarea.idTarea, nuevo_titulo="Cambio propio",
+                                 version_esperada=leida)
+        self.assertEqual(self.tm.seleccionar_tarea(self.tarea.idTarea).titulo,
+                         "Cambio ajeno")
+
+    def test_rojo_conflicto_tras_marcar(self):
+        """Marcar la tarea también incrementa la versión."""
+        leida = self.tarea.version
+        self.otra_ventana.marcar_tarea(self.tarea.idTarea)
+        with self.assertRaises(ConflictoVersionError):
+            self.tm.editar_tarea(self.tarea.idTarea, nuevo_titulo="Cambio propio",
+                                 version_esperada=leida)
+
+    def test_rojo_conflicto_editar_materia(self):
+        """Editar una materia con versión desactualizada debe fallar."""
+        leida = self.materia.version
+        self.otra_ventana.editar_materia(self.materia.idMateria, nuevo_nombre="Álgebra")
+        with self.assertRaises(ConflictoVersionError):
+            self.tm.editar_materia(self.materia.idMateria, nuevo_color="#000000",
+                                   version_esperada=leida)
+
+    def test_rojo_conflicto_editar_usuario(self):
+        """Editar un usuario con versión desactualizada debe fallar."""
+        leida = self.usuario.version
+        self.otra_ventana.editar_usuario(self.usuario.idUsuario, nuevo_nombre="Juan Pablo")
+        with self.assertRaises(ConflictoVersionError):
+            self.tm.editar_usuario(self.usuario.idUsuario, nuevo_nombre="Juan Carlos",
+                                   version_esperada=leida)
+
+    def test_rojo_conflicto_es_value_error(self):
+        """ConflictoVersionError es un ValueError (compatible con la UI)."""
+        self.assertTrue(issubclass(ConflictoVersionError, ValueError))
+
+    # ── CASOS VERDES ──────────────────────────────────────────────
+
+    def test_verde_version_incrementa_al_editar(self):
+        """Cada edición confirmada incrementa la versión en uno."""
+        editada = self.tm.editar_tarea(self.tarea.idTarea, nuevo_titulo="Nuevo Título",
+                                       version_esperada=self.tarea.version)
+        self.assertEqual(editada.version, self.tarea.version + 1)
+        self.assertEqual(self.tm.consultar_version(Tarea, self.tarea.idTarea),
+                         editada.version)
+
+    def test_verde_sin_version_esperada_no_verifica(self):
+        """Sin version_esperada se mantiene el comportamiento anterior."""
+        self.otra_ventana.editar_tarea(self.tarea.idTarea, nuevo_titulo="Cambio ajeno")
+        editada = self.tm.editar_tarea(self.tarea.idTarea, nuevo_titulo="Cambio propio")
+        self.assertEqual(editada.titulo, "Cambio propio")
+
+    def test_verde_consultar_version_inexistente(self):
+        """consultar_version retorna None si la entidad no existe."""
+        self.assertIsNone(self.tm.consultar_version(Tarea, 9999))
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file